@@ -39,8 +39,14 @@ class _XMLparser(ContentHandler):
         """
         self._tag = []
         self._value = ''
+        self._chars = []
+        self._keep_chars = True
         self._debug = debug
         self._debug_ignore_list = []
+        #Cache of the start and end methods found for each tag name,
+        #and the names of any tags to skip (including their text):
+        self._methods = {}
+        self._ignore = set()
 
     def _secure_name(self, name):
         """Removes 'dangerous' from tag names
@@ -49,6 +55,24 @@ class _XMLparser(ContentHandler):
         """
         # Replace '-' with '_' in XML tag names
         return name.replace('-', '_')
+
+    def _method(self, method):
+        """Returns the named method (defined in subclasses) or None (PRIVATE).
+
+        method -- name of the method, e.g. '_start_' plus the tag name
+        """
+        try:
+            return self._methods[method]
+        except KeyError:
+            pass
+        #Note could use try / except AttributeError
+        #BUT I found often triggered by nested errors...
+        name = self._secure_name(method)
+        if hasattr(self, name):
+            self._methods[method] = getattr(self, name)
+        else:
+            self._methods[method] = None
+        return self._methods[method]
     
     def startElement(self, name, attr):
         """Found XML start tag
@@ -61,27 +85,32 @@ class _XMLparser(ContentHandler):
         """
         self._tag.append(name)
         
-        # Try to call a method (defined in subclasses)
-        method = self._secure_name('_start_' + name)
-
-        #Note could use try / except AttributeError
-        #BUT I found often triggered by nested errors...
-        if hasattr(self, method):
-            eval("self.%s()" % method)
-            if self._debug > 4:
-                print "NCBIXML: Parsed:  " + method
+        if name in self._ignore:
+            #Skip this tag, and don't keep its text
+            self._keep_chars = False
         else:
-            # Doesn't exist (yet)
-            if method not in self._debug_ignore_list:
-                if self._debug > 3:
+            # Try to call a method (defined in subclasses)
+            method = self._method('_start_' + name)
+            if method is not None:
+                method()
+                if self._debug > 4:
+                    print "NCBIXML: Parsed:  " + \
+                          self._secure_name('_start_' + name)
+            elif self._debug > 3:
+                # Doesn't exist (yet)
+                method = self._secure_name('_start_' + name)
+                if method not in self._debug_ignore_list:
                     print "NCBIXML: Ignored: " + method
-                self._debug_ignore_list.append(method)
+                    self._debug_ignore_list.append(method)
 
         #We don't care about white space in parent tags like Hsp,
         #but that white space doesn't belong to child tags like Hsp_midline
-        if self._value.strip():
-            raise ValueError("What should we do with %s before the %s tag?" \
-                             % (repr(self._value), name))
+        if self._chars:
+            self._value = "".join(self._chars)
+            self._chars = []
+            if self._value.strip():
+                raise ValueError("What should we do with %s before the %s tag?" \
+                                 % (repr(self._value), name))
         self._value = ""
 
     def characters(self, ch):
@@ -89,7 +118,8 @@ class _XMLparser(ContentHandler):
 
         ch -- characters read
         """
-        self._value += ch # You don't ever get the whole string
+        if self._keep_chars:
+            self._chars.append(ch) # You don't ever get the whole string
 
     def endElement(self, name):
         """Found XML end tag
@@ -97,21 +127,26 @@ class _XMLparser(ContentHandler):
         name -- tag name
         """
         # DON'T strip any white space, we may need it e.g. the hsp-midline
-        
-        # Try to call a method (defined in subclasses)
-        method = self._secure_name('_end_' + name)
-        #Note could use try / except AttributeError
-        #BUT I found often triggered by nested errors...
-        if hasattr(self, method):
-            eval("self.%s()" % method)
-            if self._debug > 2:
-                print "NCBIXML: Parsed:  " + method, self._value
+        self._value = "".join(self._chars)
+        self._chars = []
+        self._tag.pop()
+
+        if name in self._ignore:
+            self._keep_chars = True
         else:
-            # Doesn't exist (yet)
-            if method not in self._debug_ignore_list:
-                if self._debug > 1:
+            # Try to call a method (defined in subclasses)
+            method = self._method('_end_' + name)
+            if method is not None:
+                method()
+                if self._debug > 2:
+                    print "NCBIXML: Parsed:  " + \
+                          self._secure_name('_end_' + name), self._value
+            elif self._debug > 1:
+                # Doesn't exist (yet)
+                method = self._secure_name('_end_' + name)
+                if method not in self._debug_ignore_list:
                     print "NCBIXML: Ignored: " + method, self._value
-                self._debug_ignore_list.append(method)
+                    self._debug_ignore_list.append(method)
         
         # Reset character buffer
         self._value = ''
@@ -124,13 +159,63 @@ class BlastParser(_XMLparser):
     _end_TAG        called when the end tag is found
     """
 
-    def __init__(self, debug=0):
+    #The optional HSP and statistics fields, as the XML tags and the
+    #attributes of the Record.HSP and Record.Blast objects they set:
+    _fields = {"Hsp_score" : "score",
+               "Hsp_bit-score" : "bits",
+               "Hsp_evalue" : "expect",
+               "Hsp_query-from" : "query_start",
+               "Hsp_query-to" : "query_end",
+               "Hsp_hit-from" : "sbjct_start",
+               "Hsp_hit-to" : "sbjct_end",
+               "Hsp_query-frame" : "frame",
+               "Hsp_hit-frame" : "frame",
+               "Hsp_identity" : "identities",
+               "Hsp_positive" : "positives",
+               "Hsp_gaps" : "gaps",
+               "Hsp_align-len" : "align_length",
+               "Hsp_qseq" : "query",
+               "Hsp_hseq" : "sbjct",
+               "Hsp_midline" : "match",
+               "Statistics_db-num" : "num_sequences_in_database",
+               "Statistics_db-len" : "num_letters_in_database",
+               "Statistics_hsp-len" : "effective_hsp_length",
+               "Statistics_eff-space" : "effective_search_space",
+               "Statistics_kappa" : "ka_params",
+               "Statistics_lambda" : "ka_params",
+               "Statistics_entropy" : "ka_params"}
+
+    def __init__(self, debug=0, fields=None, max_evalue=None):
         """Constructor
 
         debug - integer, amount of debug information to print
+        fields - optional list of the HSP and statistics fields to keep
+                 (see the parse function), by default all of them
+        max_evalue - optional e-value cutoff, HSPs with a larger e-value
+                     (and hits left without any HSPs) are skipped
         """
         # Calling superclass method
         _XMLparser.__init__(self, debug)
+
+        self._max_evalue = max_evalue
+        self._ignore_fields = set()
+        if fields is not None:
+            fields = set(fields)
+            unknown = fields.difference(self._fields.values())
+            if unknown:
+                raise ValueError("Unknown BLAST field(s): %s" \
+                                 % ", ".join(sorted(unknown)))
+            for tag, field in self._fields.items():
+                if field not in fields:
+                    self._ignore_fields.add(tag)
+            if max_evalue is not None:
+                #Need the e-values to apply the cutoff
+                self._ignore_fields.discard("Hsp_evalue")
+        #Once an HSP is over the e-value cutoff, skip the rest of it:
+        self._ignore_hsp = self._ignore_fields.union(
+            [tag for tag in self._fields if tag.startswith("Hsp_")] +
+            ["Hsp_num", "Hsp_pattern-from", "Hsp_pattern-to", "Hsp_density"])
+        self._ignore = self._ignore_fields
         
         self._parser = xml.sax.make_parser()
         self._parser.setContentHandler(self)
@@ -383,6 +468,10 @@ class BlastParser(_XMLparser):
         self._descr.num_alignments = 0
 
     def _end_Hit(self):
+        if self._max_evalue is not None and not self._hit.hsps:
+            #None of the HSPs were within the e-value cutoff
+            self._blast.alignments.pop()
+            self._blast.descriptions.pop()
         #Cleanup
         self._blast.multiple_alignment = None
         self._hit = None
@@ -420,6 +509,17 @@ class BlastParser(_XMLparser):
         self._blast.multiple_alignment.append(Record.MultipleAlignment())
         self._mult_al = self._blast.multiple_alignment[-1]
 
+    def _end_Hsp(self):
+        if self._ignore is self._ignore_hsp:
+            #This HSP was over the e-value cutoff, so remove it
+            self._ignore = self._ignore_fields
+            self._hit.hsps.pop()
+            self._blast.multiple_alignment.pop()
+            self._descr.num_alignments -= 1
+            if not self._hit.hsps:
+                #Don't use its scores for the description
+                self._descr.score = self._descr.bits = self._descr.e = None
+
     # Hsp_num is useless
     def _end_Hsp_score(self):
         """raw score of HSP
@@ -441,6 +541,10 @@ class BlastParser(_XMLparser):
         self._hsp.expect = float(self._value)
         if self._descr.e == None:
             self._descr.e = float(self._value)
+        if self._max_evalue is not None \
+        and self._hsp.expect > self._max_evalue:
+            #Skip the rest of this HSP, it is removed in _end_Hsp
+            self._ignore = self._ignore_hsp
 
     def _end_Hsp_query_from(self):
         """offset of query at the start of the alignment (one-offset)
@@ -521,8 +625,10 @@ class BlastParser(_XMLparser):
         """Formatting middle line as normally seen in BLAST report
         """
         self._hsp.match = self._value # do NOT strip spaces!
-        assert len(self._hsp.match)==len(self._hsp.query)
-        assert len(self._hsp.match)==len(self._hsp.sbjct)
+        if "Hsp_qseq" not in self._ignore:
+            assert len(self._hsp.match)==len(self._hsp.query)
+        if "Hsp_hseq" not in self._ignore:
+            assert len(self._hsp.match)==len(self._hsp.sbjct)
 
     # Statistics
     def _end_Statistics_db_num(self):
@@ -561,7 +667,7 @@ class BlastParser(_XMLparser):
         """
         self._blast.ka_params = self._blast.ka_params + (float(self._value),)
     
-def read(handle, debug=0):
+def read(handle, debug=0, fields=None, max_evalue=None):
    """Returns a single Blast record (assumes just one query).
 
    This function is for use when there is one and only one BLAST
@@ -569,9 +675,11 @@ def read(handle, debug=0):
 
    Use the Bio.Blast.NCBIXML.parse() function if you expect more than
    one BLAST record (i.e. if you have more than one query sequence).
+   The optional fields and max_evalue arguments are as in the parse
+   function.
 
    """
-   iterator = parse(handle, debug)
+   iterator = parse(handle, debug, fields, max_evalue)
    try:
        first = iterator.next()
    except StopIteration:
@@ -587,11 +695,21 @@ def read(handle, debug=0):
    return first
 
 
-def parse(handle, debug=0):
+def parse(handle, debug=0, fields=None, max_evalue=None):
     """Returns an iterator a Blast record for each query.
 
     handle - file handle to and XML file to parse
     debug - integer, amount of debug information to print
+    fields - optional list of the HSP and statistics fields to keep,
+             named as the Record.HSP and Record.Blast attributes, e.g.
+             ["expect", "bits"].  The hits and the other fields of the
+             record are always kept, but anything not listed is left
+             with its default value.  Skipping the alignment strings
+             ("query", "sbjct" and "match") saves time and memory.
+    max_evalue - optional e-value cutoff, applied to the HSPs for each
+             query.  Once an HSP's e-value is found to be over the
+             cutoff, the rest of that HSP is skipped and it is removed,
+             as are any hits left without any HSPs.
 
     This is a generator function that returns multiple Blast records
     objects - one for each query sequence given to blast.  The file
@@ -603,9 +721,25 @@ def parse(handle, debug=0):
 
     Should also cope with XML output from older versions BLAST which
     gave multiple XML files concatenated together (giving a single file
-    which strictly speaking wasn't valid XML)."""
+    which strictly speaking wasn't valid XML).
+
+    For example, to get just the hits and e-values better than 1e-50
+    (here from three PSI-BLAST iterations), without the alignments:
+
+    >>> from Bio.Blast import NCBIXML
+    >>> handle = open("Blast/xbt011.xml")
+    >>> for record in NCBIXML.parse(handle, fields=["expect"],
+    ...                             max_evalue=1e-50):
+    ...     for alignment in record.alignments:
+    ...         for hsp in alignment.hsps:
+    ...             print alignment.hit_id, hsp.expect, repr(hsp.query)
+    gi|75750454|ref|YP_319893.1| 4.72196e-70 ''
+    gi|75750454|ref|YP_319893.1| 1.28615e-59 ''
+    gi|75750454|ref|YP_319893.1| 3.43623e-53 ''
+    >>> handle.close()
+    """
     from xml.parsers import expat
-    BLOCK = 1024
+    BLOCK = 65536
     MARGIN = 10 # must be at least length of newline + XML start
     XML_START = "<?xml"
 
@@ -624,7 +758,9 @@ def parse(handle, debug=0):
                              % (XML_START, repr(text[:20])))
 
         expat_parser = expat.ParserCreate()
-        blast_parser = BlastParser(debug)
+        #Fewer calls to the characters method for the same text
+        expat_parser.buffer_text = True
+        blast_parser = BlastParser(debug, fields, max_evalue)
         expat_parser.StartElementHandler = blast_parser.startElement
         expat_parser.EndElementHandler = blast_parser.endElement
         expat_parser.CharacterDataHandler = blast_parser.characters
@@ -38,6 +38,48 @@ standard_rna_table = None
 class TranslationError(Exception):
     pass
 
+class _TranslationTable(dict):
+    """Dictionary mapping codons to single letters for translation (PRIVATE).
+
+    This is used for the fast translation of nucleotide sequences, see
+    the _translate_str function in Bio.Seq, and is built up as codons are
+    looked up (which is the slow part for ambiguous codon tables).
+
+    Each (upper case) codon maps to its amino acid, or to STOP for a stop
+    codon, or to POSSIBLE_STOP for an ambiguous codon (using only valid
+    nucleotide letters) which could be a stop codon or an amino acid (e.g.
+    TAN or NNN). Looking up an invalid codon (e.g. TA?) gives a KeyError,
+    and these are not cached.
+    """
+    STOP = "*"
+    POSSIBLE_STOP = "\x00"
+
+    def __init__(self, codon_table):
+        dict.__init__(self)
+        self._forward_table = codon_table.forward_table
+        self._stop_codons = set(codon_table.stop_codons)
+        if codon_table.nucleotide_alphabet.letters is not None:
+            letters = codon_table.nucleotide_alphabet.letters.upper()
+        else:
+            #Assume the worst case, ambiguous DNA or RNA:
+            letters = IUPAC.ambiguous_dna.letters.upper() + \
+                      IUPAC.ambiguous_rna.letters.upper()
+        self._valid_letters = set(letters)
+
+    def __missing__(self, codon):
+        try:
+            amino = self._forward_table[codon]
+        except (KeyError, TranslationError):
+            if codon in self._stop_codons:
+                amino = self.STOP
+            elif self._valid_letters.issuperset(codon):
+                amino = self.POSSIBLE_STOP
+            else:
+                raise KeyError(codon)
+        self[codon] = amino
+        return amino
+
+
 class CodonTable(object):
     nucleotide_alphabet = Alphabet.generic_nucleotide
     protein_alphabet = Alphabet.generic_protein
@@ -46,6 +88,7 @@ class CodonTable(object):
     back_table = {}       # for back translations
     start_codons = []
     stop_codons = []
+    _translation_table = None # built on demand, see _get_translation_table
     # Not always called from derived classes!
     def __init__(self, nucleotide_alphabet = nucleotide_alphabet,
                  protein_alphabet = protein_alphabet,
@@ -58,6 +101,18 @@ class CodonTable(object):
         self.start_codons = start_codons
         self.stop_codons = stop_codons
 
+    def _get_translation_table(self):
+        """Returns a _TranslationTable for this codon table (PRIVATE).
+
+        This is created on first use and then reused, so assumes the codon
+        table is not modified after being used for translation.
+        """
+        #Note the AmbiguousCodonTable forwards missing attribute lookups to
+        #the unambiguous table, but this will find the class attribute:
+        if self._translation_table is None:
+            self._translation_table = _TranslationTable(self)
+        return self._translation_table
+
     def __str__(self):
         """Returns a simple text representation of the codon table
 
@@ -123,7 +123,7 @@ class InsdcScanner(object):
         self.line = line
         return header_lines
 
-    def parse_features(self, skip=False):
+    def parse_features(self, skip=False, lazy=False):
         """Return list of tuples for the features (if present)
 
         Each feature is returned as a tuple (key, location, qualifiers)
@@ -131,16 +131,27 @@ class InsdcScanner(object):
         "complement(join(490883..490885,1..879))") while qualifiers
         is a list of two string tuples (feature qualifier keys and values).
 
+        If lazy=True, the features are not parsed. Instead this returns
+        a tuple of the feature table text (the lines for each feature as
+        expected by the parse_feature method, joined with new lines), and
+        a list of (key, start, end) tuples giving the feature key and the
+        slice of the text for each feature.
+
         Assumes you have already read to the start of the features table.
         """
         if self.line.rstrip() not in self.FEATURE_START_MARKERS:
             if self.debug : print "Didn't find any feature table"
+            if lazy:
+                return "", []
             return []
         
         while self.line.rstrip() in self.FEATURE_START_MARKERS:
             self.line = self.handle.readline()
 
         features = []
+        #For lazy parsing:
+        chunks = []
+        offset = 0
         line = self.line
         while True:
             if not line:
@@ -185,8 +196,16 @@ class InsdcScanner(object):
                     #white space (e.g. out of spec files with too much intentation)
                     feature_lines.append(line[self.FEATURE_QUALIFIER_INDENT:].strip())
                     line = self.handle.readline()
-                features.append(self.parse_feature(feature_key, feature_lines))
+                if lazy:
+                    text = "\n".join(feature_lines)
+                    chunks.append(text)
+                    features.append((feature_key, offset, offset + len(text)))
+                    offset += len(text) + 1
+                else:
+                    features.append(self.parse_feature(feature_key, feature_lines))
         self.line = line
+        if lazy:
+            return "\n".join(chunks), features
         return features
 
     def parse_feature(self, feature_key, lines):
@@ -364,7 +383,7 @@ class InsdcScanner(object):
         """
         pass
 
-    def feed(self, handle, consumer, do_features=True):
+    def feed(self, handle, consumer, do_features=True, lazy_features=False):
         """Feed a set of data into the consumer.
 
         This method is intended for use with the "old" code in Bio.GenBank
@@ -374,6 +393,9 @@ class InsdcScanner(object):
         consumer - The consumer that should be informed of events.
         do_features - Boolean, should the features be parsed?
                       Skipping the features can be much faster.
+        lazy_features - Boolean, should the features only be parsed
+                      when accessed? This requires a consumer with a
+                      lazy_feature_table method (i.e. _FeatureConsumer).
 
         Return values:
         true  - Passed a record
@@ -396,7 +418,11 @@ class InsdcScanner(object):
         self._feed_header_lines(consumer, self.parse_header())
 
         #Features (common to both EMBL and GenBank):
-        if do_features:
+        if do_features and lazy_features:
+            text, index = self.parse_features(lazy=True)
+            #Use a new scanner without the handle to parse the features later
+            consumer.lazy_feature_table(self.__class__(self.debug), text, index)
+        elif do_features:
             self._feed_feature_table(consumer, self.parse_features(skip=False))
         else:
             self.parse_features(skip=True) # ignore the data
@@ -414,9 +440,13 @@ class InsdcScanner(object):
         #And we are done
         return True
 
-    def parse(self, handle, do_features=True):
+    def parse(self, handle, do_features=True, lazy_features=False):
         """Returns a SeqRecord (with SeqFeatures if do_features=True)
 
+        If lazy_features=True, each SeqFeature is only parsed from the
+        feature table text when first accessed (see the parse_records
+        method).
+
         See also the method parse_records() for use on multi-record files.
         """
         from Bio.GenBank import _FeatureConsumer
@@ -425,24 +455,29 @@ class InsdcScanner(object):
         consumer = _FeatureConsumer(use_fuzziness = 1, 
                     feature_cleaner = FeatureValueCleaner())
 
-        if self.feed(handle, consumer, do_features):
+        if self.feed(handle, consumer, do_features, lazy_features):
             return consumer.data
         else:
             return None
 
     
-    def parse_records(self, handle, do_features=True):
+    def parse_records(self, handle, do_features=True, lazy_features=False):
         """Returns a SeqRecord object iterator
 
         Each record (from the ID/LOCUS line to the // line) becomes a SeqRecord
 
         The SeqRecord objects include SeqFeatures if do_features=True
+
+        If lazy_features=True, the record's features list only holds the
+        raw feature table text and the offsets of each feature, and each
+        SeqFeature is parsed when first accessed. This is much faster if
+        you only need some of the features (see Bio.SeqIO.InsdcIO for details).
         
         This method is intended for use in Bio.SeqIO
         """
         #This is a generator function
         while True:
-            record = self.parse(handle, do_features)
+            record = self.parse(handle, do_features, lazy_features)
             if record is None : break
             assert record.id is not None
             assert record.name != "<unknown name>"
@@ -796,7 +831,7 @@ class _ImgtScanner(EmblScanner):
                              "FH   Key                 Location/Qualifiers",
                              "FH"]
 
-    def parse_features(self, skip=False):
+    def parse_features(self, skip=False, lazy=False):
         """Return list of tuples for the features (if present)
 
         Each feature is returned as a tuple (key, location, qualifiers)
@@ -805,7 +840,10 @@ class _ImgtScanner(EmblScanner):
         is a list of two string tuples (feature qualifier keys and values).
 
         Assumes you have already read to the start of the features table.
+        Lazy parsing of the features is not supported for IMGT files.
         """
+        if lazy:
+            raise ValueError("Lazy feature parsing not supported for IMGT files")
         if self.line.rstrip() not in self.FEATURE_START_MARKERS:
             if self.debug : print "Didn't find any feature table"
             return []
@@ -576,6 +576,156 @@ class _BaseGenBankConsumer(object):
 
         return new_start, new_end
 
+class _UnparsedFeature(object):
+    """Place holder for a feature in a _LazyFeatureList (PRIVATE).
+
+    Records the feature key (as the type attribute, like a SeqFeature) and
+    the start and end of the feature's text in the feature table.
+    """
+    __slots__ = ["type", "start", "end"]
+
+    def __init__(self, type, start, end):
+        self.type = type
+        self.start = start
+        self.end = end
+
+
+class _LazyFeatureList(list):
+    """List of SeqFeature objects which are parsed when first accessed (PRIVATE).
+
+    This is used as the SeqRecord's features list when parsing GenBank or
+    EMBL files with lazy_features=True. It holds the raw feature table text,
+    and initially just a place holder for each feature recording the
+    feature type and the offsets of its text. A feature is parsed into a
+    SeqFeature object the first time it is accessed (by index, slice or
+    iteration), and that SeqFeature replaces the place holder in the list.
+    Any other list method which needs all the features (e.g. sort, count
+    or comparison) parses all the remaining features first.
+
+    The by_type method gives a cheap way to select features by their type
+    (feature key), only parsing the matching features.
+
+    Note any problems with the feature table (e.g. an unparsable location)
+    are only reported when the feature is parsed. Also note that adding a
+    normal list to this one (i.e. some_list + record.features) will see the
+    place holders, use list(record.features) to parse them first.
+    """
+
+    def __init__(self, text, index, scanner, consumer):
+        list.__init__(self, [_UnparsedFeature(key, start, end) \
+                             for key, start, end in index])
+        self._text = text
+        self._scanner = scanner
+        self._consumer = consumer
+
+    def _parse(self, i):
+        """Return feature i, parsing it if required (PRIVATE)."""
+        feature = list.__getitem__(self, i)
+        if isinstance(feature, _UnparsedFeature):
+            scanner = self._scanner
+            consumer = self._consumer
+            lines = self._text[feature.start:feature.end].split("\n")
+            scanner._feed_feature_table(consumer,
+                [scanner.parse_feature(feature.type, lines)])
+            feature = consumer.data.features.pop()
+            list.__setitem__(self, i, feature)
+        return feature
+
+    def _parse_all(self):
+        """Parse any remaining features, and discard the text (PRIVATE)."""
+        if self._text is not None:
+            for i in xrange(len(self)):
+                self._parse(i)
+            self._text = None
+            self._scanner = None
+            self._consumer = None
+
+    def by_type(self, *types):
+        """Returns a list of the features of the given type(s).
+
+        Only those features are parsed, e.g. record.features.by_type("CDS")
+        """
+        return [self._parse(i) for i, f in enumerate(list.__iter__(self)) \
+                if f.type in types]
+
+    def __getitem__(self, index):
+        if self._text is None:
+            return list.__getitem__(self, index)
+        if isinstance(index, slice):
+            return [self._parse(i) for i in xrange(*index.indices(len(self)))]
+        return self._parse(index)
+
+    def __getslice__(self, i, j):
+        return self.__getitem__(slice(i, j))
+
+    def __iter__(self):
+        if self._text is None:
+            return list.__iter__(self)
+        return self._iter_parsed()
+
+    def _iter_parsed(self):
+        """Generator function used by __iter__ (PRIVATE)."""
+        i = 0
+        while i < len(self):
+            yield self._parse(i)
+            i += 1
+        self._parse_all()
+
+    def __reversed__(self):
+        self._parse_all()
+        return list.__reversed__(self)
+
+    def __contains__(self, value):
+        self._parse_all()
+        return list.__contains__(self, value)
+
+    def __repr__(self):
+        self._parse_all()
+        return list.__repr__(self)
+
+    def __reduce__(self):
+        #Pickle (and copy) as a plain list of SeqFeature objects
+        return (list, (list(self),))
+
+    def __eq__(self, other):
+        self._parse_all()
+        return list.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._parse_all()
+        return list.__ne__(self, other)
+
+    def __add__(self, other):
+        self._parse_all()
+        return list.__add__(self, other)
+
+    def __mul__(self, n):
+        self._parse_all()
+        return list.__mul__(self, n)
+
+    __rmul__ = __mul__
+
+    def count(self, value):
+        self._parse_all()
+        return list.count(self, value)
+
+    def index(self, value, *args):
+        self._parse_all()
+        return list.index(self, value, *args)
+
+    def remove(self, value):
+        self._parse_all()
+        return list.remove(self, value)
+
+    def pop(self, index=-1):
+        self._parse(index)
+        return list.pop(self, index)
+
+    def sort(self, *args, **kwargs):
+        self._parse_all()
+        return list.sort(self, *args, **kwargs)
+
+
 class _FeatureConsumer(_BaseGenBankConsumer):
     """Create a SeqRecord object with Features to return (PRIVATE).
 
@@ -600,6 +750,20 @@ class _FeatureConsumer(_BaseGenBankConsumer):
         self._cur_reference = None
         self._cur_feature = None
         self._expected_size = None
+        #Cache of ExactPosition objects, see _exact_position method
+        self._positions = {}
+
+    def _exact_position(self, value):
+        """Returns an ExactPosition shared within this record (PRIVATE).
+
+        Features often share coordinates (e.g. a gene and its CDS), so
+        reusing the position objects saves memory on large records.
+        """
+        try:
+            return self._positions[value]
+        except KeyError:
+            position = self._positions[value] = SeqFeature.ExactPosition(value)
+            return position
 
     def locus(self, locus_name):
         """Set the locus name is set as the name of the Sequence.
@@ -922,6 +1086,22 @@ class _FeatureConsumer(_BaseGenBankConsumer):
             self.data.annotations['references'].append(self._cur_reference)
             self._cur_reference = None
 
+    def lazy_feature_table(self, scanner, text, index):
+        """Use a _LazyFeatureList for the features (PRIVATE).
+
+        The scanner's parse_feature method and a copy of this consumer are
+        used to turn the feature table text into SeqFeature objects only
+        when they are accessed. The index is a list of (key, start, end)
+        tuples giving the slice of the text for each feature.
+        """
+        self.start_feature_table()
+        #The location parsing depends on the sequence type and length,
+        #so take a snapshot of these now (as if parsing the features now).
+        consumer = _FeatureConsumer(self._use_fuzziness, self._feature_cleaner)
+        consumer._seq_type = self._seq_type
+        consumer._expected_size = self._expected_size
+        self.data.features = _LazyFeatureList(text, index, scanner, consumer)
+
     def feature_key(self, content):
         # start a new feature
         self._cur_feature = SeqFeature.SeqFeature()
@@ -966,9 +1146,10 @@ class _FeatureConsumer(_BaseGenBankConsumer):
         if _re_simple_location.match(location_line):
             #e.g. "123..456"
             s, e = location_line.split("..")
-            cur_feature.location = SeqFeature.FeatureLocation(int(s)-1,
-                                                              int(e),
-                                                              strand)
+            cur_feature.location = SeqFeature.FeatureLocation(
+                                        self._exact_position(int(s)-1),
+                                        self._exact_position(int(e)),
+                                        strand)
             return
 
         if _re_simple_compound.match(location_line):
@@ -978,9 +1159,10 @@ class _FeatureConsumer(_BaseGenBankConsumer):
             #we can split on the comma because these are simple locations
             for part in location_line[i+1:-1].split(","):
                 s, e = part.split("..")
-                f = SeqFeature.SeqFeature(SeqFeature.FeatureLocation(int(s)-1,
-                                                                     int(e),
-                                                                     strand),
+                f = SeqFeature.SeqFeature(SeqFeature.FeatureLocation(
+                                            self._exact_position(int(s)-1),
+                                            self._exact_position(int(e)),
+                                            strand),
                         location_operator=cur_feature.location_operator,
                         type=cur_feature.type)
                 cur_feature.sub_features.append(f)
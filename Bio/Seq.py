@@ -47,6 +47,74 @@ def _maketrans(complement_mapping):
 
 _dna_complement_table = _maketrans(ambiguous_dna_complement)
 _rna_complement_table = _maketrans(ambiguous_rna_complement)
+_transcribe_table = _maketrans({"T": "U"})
+_back_transcribe_table = _maketrans({"U": "T"})
+
+#Cache of the complement table for each (base) alphabet class, see
+#the _alphabet_complement_table function. False is used for proteins.
+_complement_tables = {}
+
+def _alphabet_complement_table(alphabet):
+    """Returns the translation table for a (reverse) complement, or None (PRIVATE).
+
+    Arguments:
+     - alphabet - the sequence's alphabet.
+
+    Returns None if the table depends on the sequence (i.e. if the alphabet
+    is not DNA or RNA). Raises a ValueError for proteins. The answer for each
+    alphabet class is cached, so the alphabet is normally only checked once.
+    """
+    try:
+        table = _complement_tables[alphabet.__class__]
+    except KeyError:
+        base = Alphabet._get_base_alphabet(alphabet)
+        if isinstance(base, Alphabet.ProteinAlphabet):
+            table = False
+        elif isinstance(base, Alphabet.DNAAlphabet):
+            table = _dna_complement_table
+        elif isinstance(base, Alphabet.RNAAlphabet):
+            table = _rna_complement_table
+        else:
+            table = None
+        if not isinstance(alphabet, Alphabet.AlphabetEncoder):
+            #Can't cache an encoder (e.g. Gapped) by class as the
+            #answer depends on the alphabet it wraps
+            _complement_tables[alphabet.__class__] = table
+    if table is False:
+        raise ValueError("Proteins do not have complements!")
+    return table
+
+def _sequence_complement_table(sequence):
+    """Returns the translation table to use based on the letters (PRIVATE).
+
+    Arguments:
+     - sequence - the sequence (anything supporting the 'in' keyword), which
+       is checked for U or T.
+
+    Raises a ValueError for mixed RNA/DNA.
+    """
+    if 'U' in sequence or 'u' in sequence:
+        if 'T' in sequence or 't' in sequence:
+            #TODO - Handle this cleanly?
+            raise ValueError("Mixed RNA/DNA found")
+        return _rna_complement_table
+    else:
+        return _dna_complement_table
+
+def _get_complement_table(alphabet, sequence):
+    """Returns the translation table for a (reverse) complement (PRIVATE).
+
+    Arguments:
+     - alphabet - the sequence's alphabet.
+     - sequence - the sequence (anything supporting the 'in' keyword), only
+       used to look for U or T if the alphabet is not DNA or RNA.
+
+    Raises a ValueError for proteins, or mixed RNA/DNA.
+    """
+    table = _alphabet_complement_table(alphabet)
+    if table is None:
+        table = _sequence_complement_table(sequence)
+    return table
 
 class Seq(object):
     """A read-only sequence object (essentially a string with an alphabet).
@@ -144,7 +212,7 @@ class Seq(object):
                                    repr(self.alphabet))
         else:
             return "%s(%s, %s)" % (self.__class__.__name__,
-                                  repr(self._data),
+                                  repr(str(self)),
                                    repr(self.alphabet))
     def __str__(self):
         """Returns the full sequence as a python string, use str(my_seq).
@@ -749,21 +817,7 @@ class Seq(object):
            ...
         ValueError: Proteins do not have complements!
         """
-        base = Alphabet._get_base_alphabet(self.alphabet)
-        if isinstance(base, Alphabet.ProteinAlphabet):
-            raise ValueError("Proteins do not have complements!")
-        if isinstance(base, Alphabet.DNAAlphabet):
-            ttable = _dna_complement_table
-        elif isinstance(base, Alphabet.RNAAlphabet):
-            ttable = _rna_complement_table
-        elif ('U' in self._data or 'u' in self._data) \
-        and ('T' in self._data or 't' in self._data):
-            #TODO - Handle this cleanly?
-            raise ValueError("Mixed RNA/DNA found")
-        elif 'U' in self._data or 'u' in self._data:
-            ttable = _rna_complement_table
-        else:
-            ttable = _dna_complement_table
+        ttable = _get_complement_table(self.alphabet, self._data)
         #Much faster on really long sequences than the previous loop based one.
         #thx to Michael Palmer, University of Waterloo
         return Seq(str(self).translate(ttable), self.alphabet)
@@ -800,8 +854,10 @@ class Seq(object):
            ...
         ValueError: Proteins do not have complements!
         """
-        #Use -1 stride/step to reverse the complement
-        return self.complement()[::-1]
+        ttable = _get_complement_table(self.alphabet, self._data)
+        #Use -1 stride/step to reverse the complement (done on the string
+        #to avoid making an intermediate Seq object)
+        return Seq(str(self).translate(ttable)[::-1], self.alphabet)
 
     def transcribe(self):
         """Returns the RNA sequence from a DNA sequence. New Seq object.
@@ -835,7 +891,7 @@ class Seq(object):
             alphabet = IUPAC.ambiguous_rna
         else:
             alphabet = Alphabet.generic_rna
-        return Seq(str(self).replace('T','U').replace('t','u'), alphabet)
+        return Seq(str(self).translate(_transcribe_table), alphabet)
     
     def back_transcribe(self):
         """Returns the DNA sequence from an RNA sequence. New Seq object.
@@ -870,7 +926,7 @@ class Seq(object):
             alphabet = IUPAC.ambiguous_dna
         else:
             alphabet = Alphabet.generic_dna
-        return Seq(str(self).replace("U", "T").replace("u", "t"), alphabet)
+        return Seq(str(self).translate(_back_transcribe_table), alphabet)
 
     def translate(self, table="Standard", stop_symbol="*", to_stop=False,
                   cds=False):
@@ -1328,9 +1384,8 @@ class UnknownSeq(Seq):
         >>> print my_nuc.complement()
         ????????
         """
-        if isinstance(Alphabet._get_base_alphabet(self.alphabet),
-                      Alphabet.ProteinAlphabet):
-            raise ValueError("Proteins do not have complements!")
+        #This raises an exception for proteins
+        _alphabet_complement_table(self.alphabet)
         return self
 
     def reverse_complement(self):
@@ -1346,9 +1401,8 @@ class UnknownSeq(Seq):
         >>> print my_nuc.reverse_complement()
         ??????????
         """
-        if isinstance(Alphabet._get_base_alphabet(self.alphabet),
-                      Alphabet.ProteinAlphabet):
-            raise ValueError("Proteins do not have complements!")
+        #This raises an exception for proteins
+        _alphabet_complement_table(self.alphabet)
         return self
 
     def transcribe(self):
@@ -1495,6 +1549,479 @@ class UnknownSeq(Seq):
         else :
             return Seq("", s.alphabet)
 
+def _adjust_indices(start, end, length):
+    """Adjust start and end like the python string methods (PRIVATE).
+
+    Negative values count from the end of the sequence, and the end is
+    capped at the length (but not the start, as a start beyond the end
+    matters to methods like find).
+    """
+    if end > length:
+        end = length
+    elif end < 0:
+        end = max(0, end + length)
+    if start < 0:
+        start = max(0, start + length)
+    return start, end
+
+def _slice_to_string(data):
+    """Turns a slice of a bytes like object into a python string (PRIVATE)."""
+    if isinstance(data, str):
+        return data
+    try:
+        #e.g. array
+        return data.tostring()
+    except AttributeError:
+        pass
+    try:
+        #e.g. memoryview
+        return data.tobytes()
+    except AttributeError:
+        #e.g. bytearray or buffer
+        return str(data)
+
+try:
+    #Python 2.6 onwards - these support find, rfind, count and translate
+    #with start and end arguments like a string.
+    _string_like = (str, bytearray)
+except NameError:
+    #Python 2.5
+    _string_like = (str,)
+
+
+class BytesSeq(Seq):
+    """A read-only sequence object backed by a bytes like object.
+
+    A normal Seq object holds its sequence as a python string, and slicing
+    it makes a new string. A BytesSeq instead holds a reference to a bytes
+    like object (e.g. a string, bytearray, array of characters, memory
+    mapped file or memoryview) and the start and end of the sequence in it.
+    Slicing a BytesSeq (with a step of one) gives another BytesSeq using the
+    same underlying data, so nothing is copied:
+
+    >>> from Bio.Seq import BytesSeq
+    >>> from Bio.Alphabet import generic_dna
+    >>> data = bytearray("GATCGATCGATCCCGGGAAATTTAAA")
+    >>> my_seq = BytesSeq(data, generic_dna)
+    >>> my_seq
+    BytesSeq('GATCGATCGATCCCGGGAAATTTAAA', DNAAlphabet())
+    >>> sub_seq = my_seq[12:20]
+    >>> sub_seq
+    BytesSeq('CCGGGAAA', DNAAlphabet())
+    >>> sub_seq._bytes is data
+    True
+
+    The find, rfind, count and complement methods work on the underlying
+    data directly (for strings and bytearrays), without first making a
+    python string of the whole sequence:
+
+    >>> sub_seq.find("GGA")
+    3
+    >>> sub_seq.count("G")
+    3
+    >>> sub_seq.reverse_complement()
+    BytesSeq('TTTCCCGG', DNAAlphabet())
+
+    Other methods behave like those of the Seq object, and the underlying
+    data should not be modified while in use (Seq objects are immutable).
+    """
+    def __init__(self, data, alphabet = Alphabet.generic_alphabet,
+                 start = 0, end = None):
+        """Create a BytesSeq object.
+
+        Arguments:
+         - data - bytes like object holding the sequence (e.g. a string,
+                  bytearray, array of characters or memoryview).
+         - alphabet - Optional argument, an Alphabet object from Bio.Alphabet
+         - start - Optional offset in the data of the start of the sequence.
+         - end - Optional offset in the data of the end of the sequence
+                 (default is the end of the data).
+        """
+        length = len(data)
+        if end is None:
+            end = length
+        if not 0 <= start <= end <= length:
+            raise ValueError("Invalid start %r and end %r for data of "
+                             "length %i" % (start, end, length))
+        self._bytes = data
+        self._start = start
+        self._end = end
+        self.alphabet = alphabet
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __str__(self):
+        """Returns the full sequence as a python string, use str(my_seq)."""
+        if self._start == 0 and self._end == len(self._bytes) \
+        and isinstance(self._bytes, str):
+            return self._bytes
+        return _slice_to_string(self._bytes[self._start:self._end])
+
+    def __getitem__(self, index):
+        """Returns a letter (string), or a BytesSeq or Seq for a slice.
+
+        >>> from Bio.Seq import BytesSeq
+        >>> my_seq = BytesSeq("ACGTTTAA")
+        >>> my_seq[1]
+        'C'
+        >>> my_seq[-1]
+        'A'
+        >>> my_seq[2:6]
+        BytesSeq('GTTT', Alphabet())
+        >>> my_seq[::2]
+        Seq('AGTA', Alphabet())
+        """
+        if isinstance(index, int):
+            length = self._end - self._start
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise IndexError("sequence index out of range")
+            return _slice_to_string(self._bytes[self._start + index:
+                                                self._start + index + 1])
+        start, end, step = index.indices(self._end - self._start)
+        if step != 1:
+            return Seq(str(self)[index], self.alphabet)
+        end = max(start, end)
+        return BytesSeq(self._bytes, self.alphabet,
+                        self._start + start, self._start + end)
+
+    def __add__(self, other):
+        """Add another sequence or string, giving a new BytesSeq or Seq."""
+        #Offload to the base class (which makes a new object of this class)
+        return Seq.__add__(self, other)
+
+    def count(self, sub, start=0, end=sys.maxint):
+        """Non-overlapping count method, like that of a python string.
+
+        See the Seq object's count method for details.
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        if not isinstance(self._bytes, _string_like):
+            return str(self).count(sub_str, start, end)
+        start, end = _adjust_indices(start, end, len(self))
+        return self._bytes.count(sub_str, self._start + start,
+                                 self._start + end)
+
+    def find(self, sub, start=0, end=sys.maxint):
+        """Find method, like that of a python string.
+
+        See the Seq object's find method for details.
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        if not isinstance(self._bytes, _string_like):
+            return str(self).find(sub_str, start, end)
+        start, end = _adjust_indices(start, end, len(self))
+        answer = self._bytes.find(sub_str, self._start + start,
+                                  self._start + end)
+        if answer == -1:
+            return -1
+        return answer - self._start
+
+    def rfind(self, sub, start=0, end=sys.maxint):
+        """Find from right method, like that of a python string.
+
+        See the Seq object's rfind method for details.
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        if not isinstance(self._bytes, _string_like):
+            return str(self).rfind(sub_str, start, end)
+        start, end = _adjust_indices(start, end, len(self))
+        answer = self._bytes.rfind(sub_str, self._start + start,
+                                   self._start + end)
+        if answer == -1:
+            return -1
+        return answer - self._start
+
+    def __contains__(self, char):
+        """Implements the 'in' keyword, like a python string."""
+        return self.find(char) != -1
+
+    def complement(self):
+        """Returns the complement sequence, as a new BytesSeq object.
+
+        See the Seq object's complement method for details.
+        """
+        ttable = _get_complement_table(self.alphabet, self)
+        data = self._bytes[self._start:self._end]
+        if isinstance(data, _string_like):
+            data = data.translate(ttable)
+        else:
+            data = _slice_to_string(data).translate(ttable)
+        return BytesSeq(data, self.alphabet)
+
+    def reverse_complement(self):
+        """Returns the reverse complement sequence, as a new BytesSeq object.
+
+        See the Seq object's reverse_complement method for details.
+        """
+        data = _slice_to_string(self.complement()._bytes)[::-1]
+        return BytesSeq(data, self.alphabet)
+
+
+#The 2-bit encoding used in TwoBitSeq objects, four bases per byte with
+#the first base in the most significant bits:
+_two_bit_codes = "ACGT"
+_two_bit_decode = [a + b + c + d for a in _two_bit_codes \
+                   for b in _two_bit_codes for c in _two_bit_codes \
+                   for d in _two_bit_codes]
+_two_bit_encode = dict((bases, chr(i)) \
+                       for i, bases in enumerate(_two_bit_decode))
+_two_bit_decode = dict((chr(i), bases) \
+                       for i, bases in enumerate(_two_bit_decode))
+#The complement of a base (A=0, C=1, G=2, T=3) is three minus its code,
+#so the complement of a byte is given by flipping all its bits:
+_two_bit_complement = "".join(chr(255 - i) for i in range(256))
+#To reverse complement a byte, complement it and reverse the four bases:
+_two_bit_reverse_complement = "".join(_two_bit_encode[ \
+    _two_bit_decode[chr(255 - i)][::-1]] for i in range(256))
+#For each base, a translation table giving the count in each byte:
+_two_bit_count_tables = dict((base, "".join(chr(_two_bit_decode[chr(i)] \
+                                                .count(base)) \
+                                            for i in range(256))) \
+                             for base in _two_bit_codes)
+#Chunk size (in bases) used when looking for a sub-sequence
+_two_bit_chunk = 4 * 65536
+
+
+class TwoBitSeq(Seq):
+    """A read-only unambiguous DNA sequence object packed into two bits a base.
+
+    A normal Seq object uses one byte for each letter. For unambiguous DNA
+    (just the four upper case letters A, C, G and T) only two bits per base
+    are needed, so this class uses a quarter of the memory. This is useful
+    for keeping large sequences like whole chromosomes in memory:
+
+    >>> from Bio.Seq import TwoBitSeq
+    >>> my_seq = TwoBitSeq("GATCGATCGATCCCGGGAAATTTAAA")
+    >>> my_seq
+    TwoBitSeq('GATCGATCGATCCCGGGAAATTTAAA', IUPACUnambiguousDNA())
+    >>> print my_seq
+    GATCGATCGATCCCGGGAAATTTAAA
+    >>> len(my_seq._packed)
+    7
+
+    Sequences with any other letters (including lower case) give an error:
+
+    >>> TwoBitSeq("GATCNNNN")
+    Traceback (most recent call last):
+       ...
+    ValueError: TwoBitSeq only supports unambiguous DNA (A, C, G and T)
+
+    Slicing (with a step of one) gives another TwoBitSeq using the same
+    packed data, so nothing is copied. The count method (for single bases),
+    and the complement and reverse_complement methods work directly on the
+    packed data, and the find and rfind methods only unpack a chunk of the
+    sequence at a time:
+
+    >>> sub_seq = my_seq[10:21]
+    >>> sub_seq
+    TwoBitSeq('TCCCGGGAAAT', IUPACUnambiguousDNA())
+    >>> sub_seq.count("G")
+    3
+    >>> sub_seq.find("GGA")
+    5
+    >>> sub_seq.reverse_complement()
+    TwoBitSeq('ATTTCCCGGGA', IUPACUnambiguousDNA())
+
+    Other methods (e.g. translate, or str(my_seq)) unpack the sequence and
+    behave like those of the Seq object, returning Seq objects.
+    """
+    def __init__(self, data, alphabet = IUPAC.unambiguous_dna):
+        """Create a TwoBitSeq object.
+
+        Arguments:
+         - data - the sequence (string, or Seq object), which must contain
+                  only the letters A, C, G and T.
+         - alphabet - Optional argument, a DNA Alphabet object from
+                  Bio.Alphabet (default IUPAC.unambiguous_dna).
+        """
+        base = Alphabet._get_base_alphabet(alphabet)
+        if isinstance(base, (Alphabet.ProteinAlphabet, Alphabet.RNAAlphabet)):
+            raise ValueError("TwoBitSeq only supports DNA, not %r" % alphabet)
+        data = str(data)
+        length = len(data)
+        if length % 4:
+            #Pad the final byte:
+            data += "A" * (4 - length % 4)
+        encode = _two_bit_encode
+        chunks = []
+        try:
+            for i in xrange(0, len(data), _two_bit_chunk):
+                chunk = data[i:i+_two_bit_chunk]
+                chunks.append("".join([encode[chunk[j:j+4]] \
+                                       for j in xrange(0, len(chunk), 4)]))
+        except KeyError:
+            raise ValueError("TwoBitSeq only supports unambiguous DNA "
+                             "(A, C, G and T)")
+        self._packed = "".join(chunks)
+        self._start = 0
+        self._end = length
+        self.alphabet = alphabet
+
+    def _view(self, packed, start, end):
+        """Returns a new TwoBitSeq using the given packed data (PRIVATE)."""
+        answer = TwoBitSeq("", self.alphabet)
+        answer._packed = packed
+        answer._start = start
+        answer._end = end
+        return answer
+
+    def _unpack(self, start, end):
+        """Returns the bases from start to end as a string (PRIVATE).
+
+        The start and end are offsets in the packed data (in bases).
+        """
+        offset = start - start % 4
+        decode = _two_bit_decode
+        text = "".join([decode[c] for c in \
+                        self._packed[start // 4 : (end + 3) // 4]])
+        return text[start - offset : end - offset]
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __str__(self):
+        """Returns the full sequence as a python string, use str(my_seq)."""
+        return self._unpack(self._start, self._end)
+
+    def __getitem__(self, index):
+        """Returns a letter (string), or a TwoBitSeq or Seq for a slice.
+
+        >>> from Bio.Seq import TwoBitSeq
+        >>> my_seq = TwoBitSeq("ACGTTTAAC")
+        >>> my_seq[1]
+        'C'
+        >>> my_seq[-1]
+        'C'
+        >>> my_seq[2:6]
+        TwoBitSeq('GTTT', IUPACUnambiguousDNA())
+        >>> my_seq[::2]
+        Seq('AGTAC', IUPACUnambiguousDNA())
+        """
+        if isinstance(index, int):
+            length = self._end - self._start
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise IndexError("sequence index out of range")
+            index += self._start
+            return _two_bit_decode[self._packed[index // 4]][index % 4]
+        start, end, step = index.indices(self._end - self._start)
+        if step != 1:
+            return Seq(str(self)[index], self.alphabet)
+        end = max(start, end)
+        return self._view(self._packed, self._start + start,
+                          self._start + end)
+
+    def __add__(self, other):
+        """Add another sequence or string, giving a new Seq object."""
+        return Seq(str(self), self.alphabet) + other
+
+    def __radd__(self, other):
+        return other + Seq(str(self), self.alphabet)
+
+    def count(self, sub, start=0, end=sys.maxint):
+        """Non-overlapping count method, like that of a python string.
+
+        See the Seq object's count method for details. Counting a single
+        base is done using the packed data.
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        if sub_str not in _two_bit_count_tables:
+            #Not a single base, need to unpack the sequence
+            return str(self).count(sub_str, start, end)
+        start, end = _adjust_indices(start, end, len(self))
+        if start >= end:
+            return 0
+        start += self._start
+        end += self._start
+        #First and last whole bytes
+        first = (start + 3) // 4
+        last = end // 4
+        if first >= last:
+            return self._unpack(start, end).count(sub_str)
+        counts = self._packed[first:last].translate(
+                                        _two_bit_count_tables[sub_str])
+        return counts.count("\x01") + 2 * counts.count("\x02") \
+               + 3 * counts.count("\x03") + 4 * counts.count("\x04") \
+               + self._unpack(start, first * 4).count(sub_str) \
+               + self._unpack(last * 4, end).count(sub_str)
+
+    def find(self, sub, start=0, end=sys.maxint):
+        """Find method, like that of a python string.
+
+        See the Seq object's find method for details. This unpacks the
+        sequence a chunk at a time.
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        start, end = _adjust_indices(start, end, len(self))
+        if not sub_str:
+            if start <= end:
+                return start
+            return -1
+        n = len(sub_str)
+        while start < end:
+            chunk_end = min(end, start + _two_bit_chunk + n - 1)
+            i = self._unpack(self._start + start,
+                             self._start + chunk_end).find(sub_str)
+            if i != -1:
+                return start + i
+            start += _two_bit_chunk
+        return -1
+
+    def rfind(self, sub, start=0, end=sys.maxint):
+        """Find from right method, like that of a python string.
+
+        See the Seq object's rfind method for details. This unpacks the
+        sequence a chunk at a time.
+        """
+        sub_str = self._get_seq_str_and_check_alphabet(sub)
+        start, end = _adjust_indices(start, end, len(self))
+        if not sub_str:
+            if start <= end:
+                return end
+            return -1
+        n = len(sub_str)
+        while start < end:
+            chunk_start = max(start, end - _two_bit_chunk - n + 1)
+            i = self._unpack(self._start + chunk_start,
+                             self._start + end).rfind(sub_str)
+            if i != -1:
+                return chunk_start + i
+            end -= _two_bit_chunk
+        return -1
+
+    def __contains__(self, char):
+        """Implements the 'in' keyword, like a python string."""
+        return self.find(char) != -1
+
+    def complement(self):
+        """Returns the complement sequence, as a new TwoBitSeq object.
+
+        >>> from Bio.Seq import TwoBitSeq
+        >>> TwoBitSeq("AACGTTTAG").complement()
+        TwoBitSeq('TTGCAAATC', IUPACUnambiguousDNA())
+        """
+        return self._view(self._packed.translate(_two_bit_complement),
+                          self._start, self._end)
+
+    def reverse_complement(self):
+        """Returns the reverse complement sequence, as a new TwoBitSeq object.
+
+        >>> from Bio.Seq import TwoBitSeq
+        >>> TwoBitSeq("AACGTTTAG").reverse_complement()
+        TwoBitSeq('CTAAACGTT', IUPACUnambiguousDNA())
+        """
+        first = self._start // 4
+        last = (self._end + 3) // 4
+        packed = self._packed[first:last].translate(
+                                        _two_bit_reverse_complement)[::-1]
+        #Offsets of the sequence from the end of these bytes:
+        return self._view(packed, 4 * last - self._end,
+                          4 * last - self._start)
+
 class MutableSeq(object):
     """An editable sequence object (with an alphabet).
 
@@ -1557,7 +2084,20 @@ class MutableSeq(object):
         should continue to use my_seq.tostring() rather than str(my_seq).
         """
         #See test_GAQueens.py for an historic usage of a non-string alphabet!
-        return "".join(self.data)
+        return self._as_string()
+
+    def _as_string(self):
+        """Returns the sequence as a python string (PRIVATE).
+
+        This is much faster than joining the letters of a long array.
+        """
+        data = self.data
+        if isinstance(data, array.array):
+            if data.typecode == "c":
+                return data.tostring()
+            elif data.typecode == "u":
+                return data.tounicode()
+        return "".join(data)
 
     def __cmp__(self, other):
         """Compare the sequence to another sequence or a string (README).
@@ -1786,35 +2326,34 @@ class MutableSeq(object):
         Trying to complement a protein sequence raises an exception.
 
         No return value.
+
+        >>> from Bio.Alphabet import generic_dna
+        >>> my_seq = MutableSeq("ACTCGNNNTCG", generic_dna)
+        >>> my_seq.complement()
+        >>> my_seq
+        MutableSeq('TGAGCNNNAGC', DNAAlphabet())
         """
-        if isinstance(Alphabet._get_base_alphabet(self.alphabet),
-                      Alphabet.ProteinAlphabet):
-            raise ValueError("Proteins do not have complements!")
-        if self.alphabet in (IUPAC.ambiguous_dna, IUPAC.unambiguous_dna):
-            d = ambiguous_dna_complement
-        elif self.alphabet in (IUPAC.ambiguous_rna, IUPAC.unambiguous_rna):
-            d = ambiguous_rna_complement
-        elif 'U' in self.data and 'T' in self.data:
-            #TODO - Handle this cleanly?
-            raise ValueError("Mixed RNA/DNA found")
-        elif 'U' in self.data:
-            d = ambiguous_rna_complement
-        else:
-            d = ambiguous_dna_complement
-        c = dict([(x.lower(), y.lower()) for x,y in d.iteritems()])
-        d.update(c)
-        self.data = map(lambda c: d[c], self.data)
-        self.data = array.array(self.array_indicator, self.data)
-        
+        data = self._as_string()
+        ttable = _get_complement_table(self.alphabet, data)
+        self.data = array.array(self.array_indicator, data.translate(ttable))
+
     def reverse_complement(self):
         """Modify the mutable sequence to take on its reverse complement.
 
         Trying to reverse complement a protein sequence raises an exception.
 
         No return value.
+
+        >>> from Bio.Alphabet import generic_dna
+        >>> my_seq = MutableSeq("ACTCGNNNTCG", generic_dna)
+        >>> my_seq.reverse_complement()
+        >>> my_seq
+        MutableSeq('CGANNNCGAGT', DNAAlphabet())
         """
-        self.complement()
-        self.data.reverse()
+        data = self._as_string()
+        ttable = _get_complement_table(self.alphabet, data)
+        self.data = array.array(self.array_indicator,
+                                data.translate(ttable)[::-1])
 
     ## Sorting a sequence makes no sense.
     # def sort(self, *args): self.data.sort(*args)
@@ -1842,7 +2381,7 @@ class MutableSeq(object):
 
         print "ID={%s}, sequence={%s}" % (my_name, my_seq.tostring())
         """
-        return "".join(self.data)
+        return self._as_string()
 
     def toseq(self):
         """Returns the full sequence as a new immutable Seq object.
@@ -1858,7 +2397,7 @@ class MutableSeq(object):
 
         Note that the alphabet is preserved.
         """
-        return Seq("".join(self.data), self.alphabet)
+        return Seq(self._as_string(), self.alphabet)
 
 # The transcribe, backward_transcribe, and translate functions are
 # user-friendly versions of the corresponding functions in Bio.Transcribe
@@ -1882,7 +2421,10 @@ def transcribe(dna):
         return dna.transcribe()
     elif isinstance(dna, MutableSeq):
         return dna.toseq().transcribe()
+    elif isinstance(dna, str):
+        return dna.translate(_transcribe_table)
     else:
+        #e.g. unicode
         return dna.replace('T','U').replace('t','u')
 
 def back_transcribe(rna):
@@ -1903,7 +2445,10 @@ def back_transcribe(rna):
         return rna.back_transcribe()
     elif isinstance(rna, MutableSeq):
         return rna.toseq().back_transcribe()
+    elif isinstance(rna, str):
+        return rna.translate(_back_transcribe_table)
     else:
+        #e.g. unicode
         return rna.replace('U','T').replace('u','t')
     
 def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
@@ -1957,15 +2502,6 @@ def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
     TranslationError: Extra in frame stop codon found.
     """
     sequence = sequence.upper()
-    amino_acids = []
-    forward_table = table.forward_table
-    stop_codons = table.stop_codons
-    if table.nucleotide_alphabet.letters is not None:
-        valid_letters = set(table.nucleotide_alphabet.letters.upper())
-    else:
-        #Assume the worst case, ambiguous DNA or RNA:
-        valid_letters = set(IUPAC.ambiguous_dna.letters.upper() + \
-                            IUPAC.ambiguous_rna.letters.upper())
     if cds:
         if str(sequence[:3]).upper() not in table.start_codons:
             raise CodonTable.TranslationError(\
@@ -1973,31 +2509,69 @@ def _translate_str(sequence, table, stop_symbol="*", to_stop=False,
         if len(sequence) % 3 != 0:
             raise CodonTable.TranslationError(\
                 "Sequence length %i is not a multiple of three" % len(sequence))
-        if str(sequence[-3:]).upper() not in stop_codons:
+        if str(sequence[-3:]).upper() not in table.stop_codons:
             raise CodonTable.TranslationError(\
                 "Final codon '%s' is not a stop codon" % sequence[-3:])
         #Don't translate the stop symbol, and manually translate the M
         sequence = sequence[3:-3]
+    #The translation table maps each codon to a single letter, using
+    #place holders for stop codons and possible stop codons:
+    lookup = table._get_translation_table()
+    n = len(sequence)
+    try:
+        protein = "".join([lookup[sequence[i:i+3]] \
+                           for i in xrange(0, n - n % 3, 3)])
+    except KeyError:
+        #Invalid codon, but it may come after a stop codon (which may be
+        #an error, or end the translation), so work out what to report:
+        return _translate_codons(sequence, table, stop_symbol, to_stop,
+                                 cds, pos_stop)
+    stop = lookup.STOP
+    if stop in protein:
+        if cds:
+            raise CodonTable.TranslationError(\
+                "Extra in frame stop codon found.")
+        if to_stop:
+            protein = protein[:protein.index(stop)]
+        if stop_symbol != stop:
+            protein = protein.replace(stop, stop_symbol)
+    if lookup.POSSIBLE_STOP in protein:
+        protein = protein.replace(lookup.POSSIBLE_STOP, pos_stop)
+    if cds:
+        protein = "M" + protein
+    return protein
+
+def _translate_codons(sequence, table, stop_symbol, to_stop, cds, pos_stop):
+    """Helper function to translate a string codon by codon (PRIVATE).
+
+    This is used by _translate_str when there is an invalid codon. It
+    expects the sequence in upper case, and for a CDS without the start
+    and stop codons.
+    """
+    if cds:
         amino_acids = ["M"]
+    else:
+        amino_acids = []
+    lookup = table._get_translation_table()
     n = len(sequence)
     for i in xrange(0,n-n%3,3):
         codon = sequence[i:i+3]
         try:
-            amino_acids.append(forward_table[codon])
-        except (KeyError, CodonTable.TranslationError):
-            #Todo? Treat "---" as a special case (gapped translation)
-            if codon in table.stop_codons:
-                if cds:
-                    raise CodonTable.TranslationError(\
-                        "Extra in frame stop codon found.")
-                if to_stop : break
-                amino_acids.append(stop_symbol)
-            elif valid_letters.issuperset(set(codon)):
-                #Possible stop codon (e.g. NNN or TAN)
-                amino_acids.append(pos_stop)
-            else:
+            amino = lookup[codon]
+        except KeyError:
+            raise CodonTable.TranslationError(\
+                "Codon '%s' is invalid" % codon)
+        if amino == lookup.STOP:
+            if cds:
                 raise CodonTable.TranslationError(\
-                    "Codon '%s' is invalid" % codon)
+                    "Extra in frame stop codon found.")
+            if to_stop : break
+            amino_acids.append(stop_symbol)
+        elif amino == lookup.POSSIBLE_STOP:
+            #Possible stop codon (e.g. NNN or TAN)
+            amino_acids.append(pos_stop)
+        else:
+            amino_acids.append(amino)
     return "".join(amino_acids)
 
 def translate(sequence, table="Standard", stop_symbol="*", to_stop=False,
@@ -2076,16 +2650,25 @@ def translate(sequence, table="Standard", stop_symbol="*", to_stop=False,
         return sequence.toseq().translate(table, stop_symbol, to_stop, cds)
     else:
         #Assume its a string, return a string
-        try:
-            codon_table = CodonTable.ambiguous_generic_by_id[int(table)]
-        except ValueError:
-            codon_table = CodonTable.ambiguous_generic_by_name[table]
-        except (AttributeError, TypeError):
-            if isinstance(table, CodonTable.CodonTable):
-                codon_table = table
-            else:
-                raise ValueError('Bad table argument')
+        codon_table = _get_codon_table(table)
         return _translate_str(sequence, codon_table, stop_symbol, to_stop, cds)
+
+def _get_codon_table(table):
+    """Returns the CodonTable for translating a string (PRIVATE).
+
+    The table can be a name (string), an NCBI identifier (integer), or a
+    CodonTable object. Names and identifiers give the ambiguous generic
+    nucleotide table (so can be used for DNA or RNA).
+    """
+    try:
+        return CodonTable.ambiguous_generic_by_id[int(table)]
+    except ValueError:
+        return CodonTable.ambiguous_generic_by_name[table]
+    except (AttributeError, TypeError):
+        if isinstance(table, CodonTable.CodonTable):
+            return table
+        else:
+            raise ValueError('Bad table argument')
       
 def reverse_complement(sequence):
     """Returns the reverse complement sequence of a nucleotide string.
@@ -2112,14 +2695,153 @@ def reverse_complement(sequence):
     #In order to avoid some code duplication, the old code would turn the string
     #into a Seq, use the reverse_complement method, and convert back to a string.
     #This worked, but is over five times slower on short sequences!
-    if ('U' in sequence or 'u' in sequence) \
-    and ('T' in sequence or 't' in sequence):
-        raise ValueError("Mixed RNA/DNA found")
-    elif 'U' in sequence or 'u' in sequence:
-        ttable = _rna_complement_table
+    return sequence.translate(_sequence_complement_table(sequence))[::-1]
+
+def reverse_complement_many(sequences):
+    """Returns the reverse complements of many nucleotide sequences (list).
+
+    Takes a list (or other iterable) of sequences, and returns a list of
+    their reverse complements. Strings give strings, and Seq or MutableSeq
+    objects give Seq objects with the same alphabet, as with the
+    reverse_complement function:
+
+    >>> reverse_complement_many(["ACTG-NH", "GGGAAT", "ACUUG"])
+    ['DN-CAGT', 'ATTCCC', 'CAAGU']
+
+    This is faster than calling reverse_complement on each sequence (for
+    strings and plain Seq objects), as the sequences using the same
+    translation table are combined and reverse complemented in one go.
+    For example, to reverse complement a chunk of FASTQ reads:
+
+    >>> from Bio.SeqIO.QualityIO import FastqGeneralIterator
+    >>> handle = open("Quality/example.fastq", "rU")
+    >>> reads = list(FastqGeneralIterator(handle))
+    >>> handle.close()
+    >>> rc_seqs = reverse_complement_many([seq for title, seq, qual in reads])
+    >>> rc_reads = [(title, rc_seq, qual[::-1]) for (title, seq, qual), rc_seq
+    ...             in zip(reads, rc_seqs)]
+    >>> print rc_reads[0][0]
+    EAS54_6_R1_2_1_413_324
+    >>> print rc_reads[0][1]
+    GGAGAAACGCTGAAGACAAGAAGGG
+    """
+    sequences = list(sequences)
+    for sequence in sequences:
+        if sequence.__class__ is not str:
+            break
     else:
-        ttable = _dna_complement_table
-    return sequence.translate(ttable)[::-1]
+        #All plain strings
+        return _reverse_complement_strings(sequences)
+    alphabet = getattr(sequences[0], "alphabet", None)
+    for sequence in sequences:
+        if sequence.__class__ is not Seq or sequence.alphabet is not alphabet:
+            break
+    else:
+        #All plain Seq objects with the same alphabet
+        table = _alphabet_complement_table(alphabet)
+        return [Seq(rc, alphabet) for rc in _reverse_complement_strings( \
+                [sequence._data for sequence in sequences], table)]
+    #Mixture of sequence types, e.g. MutableSeq or UnknownSeq
+    return [reverse_complement(sequence) for sequence in sequences]
+
+def _reverse_complement_strings(strings, table=None):
+    """Reverse complement a list of strings, returns a list (PRIVATE).
+
+    Arguments:
+     - strings - list of python strings
+     - table - translation table to use, or None to choose this by looking
+       for U or T in each sequence (as in the reverse_complement function).
+
+    Short sequences are joined up using a new line, so that they can be
+    reverse complemented in one go, which avoids the overhead of doing each
+    sequence on its own.
+    """
+    if not strings:
+        return []
+    if sum(map(len, strings)) > 1000 * len(strings):
+        #Long sequences, no point combining them
+        if table is None:
+            return [reverse_complement(s) for s in strings]
+        return [s.translate(table)[::-1] for s in strings]
+    data = "\n".join(strings)
+    if table is None:
+        if "U" in data or "u" in data:
+            #Sequences with neither U nor T are treated as DNA, so unless
+            #there are no U at all must consider each sequence on its own
+            return [reverse_complement(s) for s in strings]
+        table = _dna_complement_table
+    #The first sequence ends up last
+    answer = data.translate(table)[::-1].split("\n")
+    if len(answer) != len(strings):
+        #Must have been a new line in one of the sequences!
+        return [s.translate(table)[::-1] for s in strings]
+    answer.reverse()
+    return answer
+
+def translate_many(sequences, table="Standard", stop_symbol="*",
+                   to_stop=False, cds=False):
+    """Translate many nucleotide sequences into amino acids.
+
+    Takes a list (or other iterable) of sequences, and returns a list of
+    their translations. The optional arguments are as for the translate
+    function, and are used for every sequence. Strings give strings, and
+    Seq or MutableSeq objects give Seq objects with a protein alphabet.
+
+    This is the same as calling the translate function on each sequence,
+    but any table name or identifier is only looked up once:
+
+    >>> translate_many(["ATGGCCTGA", "GTGGCCATTGTAATG", "ATGTAGTTT"])
+    ['MA*', 'VAIVM', 'M*F']
+    >>> translate_many(["ATGGCCTGA", "ATGTAGTTT"], table=2, to_stop=True)
+    ['MAW', 'M']
+    """
+    answer = []
+    codon_table = None
+    for sequence in sequences:
+        if isinstance(sequence, (Seq, MutableSeq)):
+            answer.append(translate(sequence, table, stop_symbol,
+                                    to_stop, cds))
+        else:
+            if codon_table is None:
+                codon_table = _get_codon_table(table)
+            answer.append(_translate_str(sequence, codon_table, stop_symbol,
+                                         to_stop, cds))
+    return answer
+
+def translate_six_frames(sequence, table="Standard", stop_symbol="*"):
+    """Translate a nucleotide sequence in all six reading frames.
+
+    Returns a list of the six translations, for the three forward frames
+    (starting at the first, second and third letter of the sequence) and
+    then the three reverse frames (likewise on the reverse complement). Any
+    partial codon at the end of a frame is ignored. If given a string, these
+    are strings. Given a Seq or MutableSeq, these are Seq objects with a
+    protein alphabet.
+
+    The table and stop_symbol arguments are as for the translate function.
+
+    >>> for frame in translate_six_frames("ATGGCCATTGTAATGGGCCGCTGA"):
+    ...     print frame
+    MAIVMGR*
+    WPL*WAA
+    GHCNGPL
+    SAAHYNGH
+    QRPITMA
+    SGPLQWP
+
+    This is useful for finding open reading frames, or translating assembled
+    contigs, and is faster than calling the translate function six times.
+    """
+    if isinstance(sequence, (Seq, MutableSeq)):
+        if isinstance(sequence, MutableSeq):
+            sequence = sequence.toseq()
+        rev_comp = sequence.reverse_complement()
+        return [seq[i:].translate(table, stop_symbol) \
+                for seq in (sequence, rev_comp) for i in range(3)]
+    codon_table = _get_codon_table(table)
+    rev_comp = reverse_complement(sequence)
+    return [_translate_str(seq[i:], codon_table, stop_symbol) \
+            for seq in (sequence, rev_comp) for i in range(3)]
 
 def _test():
     """Run the Bio.Seq module's doctests (PRIVATE)."""
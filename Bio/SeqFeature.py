@@ -18,6 +18,7 @@ Base class to hold a Feature.
 ----------------------------
 classes:
 o SeqFeature
+o FeatureList - A list of features, indexed by location for fast queries.
 
 Hold information about a Reference.
 ----------------------------------
@@ -47,6 +48,9 @@ o AfterPosition - Specify the position as being found after some base.
 o OneOfPosition - Specify a position where the location can be multiple positions.
 """
 
+import sys
+import bisect
+
 from Bio.Seq import MutableSeq, reverse_complement
 
 class SeqFeature(object):
@@ -90,6 +94,13 @@ class SeqFeature(object):
     dealing with all these special cases, the SeqFeature provides an extract
     method to do this for you.
     """
+    #Using __slots__ avoids a per-instance dictionary, which matters when
+    #holding millions of features. There is still a __dict__ slot so that
+    #other attributes can be added (e.g. the SwissProt parser and BioSQL
+    #do this), but the dictionary is only created if it is used.
+    __slots__ = ("location", "type", "location_operator", "id",
+                 "qualifiers", "sub_features", "__dict__", "__weakref__")
+
     def __init__(self, location = None, type = '', location_operator = '',
                  strand = None, id = "<unknown id>", 
                  qualifiers = None, sub_features = None,
@@ -150,6 +161,14 @@ class SeqFeature(object):
         if ref_db is not None:
             self.ref_db = ref_db
 
+    def __getstate__(self):
+        """Returns the attributes as a dictionary (for pickling)."""
+        return _get_slots_state(self)
+
+    def __setstate__(self, state):
+        """Restores the attributes from a dictionary (for pickling)."""
+        _set_slots_state(self, state)
+
     def _get_strand(self):
         return self.location.strand
     def _set_strand(self, value):
@@ -431,6 +450,265 @@ class SeqFeature(object):
         else:
             return value in self.location
 
+class FeatureList(list):
+    """A list of SeqFeature objects, indexed by location for fast queries.
+
+    This is a python list (e.g. for use as a SeqRecord's features), which
+    also keeps an index of the feature locations, so that finding the
+    features overlapping a region, containing a position, within a region,
+    or nearest to a position takes O(log n + k) time for n features with
+    k matches, rather than checking every feature in turn. Rather than
+    making one yourself, you would normally use the SeqRecord's
+    index_features method:
+
+    >>> from Bio import SeqIO
+    >>> record = SeqIO.read("GenBank/NC_000932.gb", "gb")
+    >>> features = record.index_features()
+    >>> for f in features.containing(1750):
+    ...     print f.type, f.location
+    source [0:154478](+)
+    gene [1716:4347](-)
+    tRNA [1716:4347](-)
+
+    As with the SeqFeature's __contains__ method, for a feature defined as
+    a join of several subfeatures (e.g. the union of several exons), only
+    the subfeatures are used (e.g. introns are excluded). Here the tRNA
+    location is complement(join(1717..1751,4311..4347)), so position 1760
+    falls in the gap:
+
+    >>> for f in features.containing(1760):
+    ...     print f.type, f.location
+    source [0:154478](+)
+    gene [1716:4347](-)
+
+    The matching features are returned in the same order as in the list.
+    Positions and regions use python counting, with regions given as
+    start and end (so the end position itself is excluded):
+
+    >>> for f in features.overlapping(4340, 4400):
+    ...     print f.type, f.location
+    source [0:154478](+)
+    gene [1716:4347](-)
+    tRNA [1716:4347](-)
+    >>> for f in features.within(1000, 5000):
+    ...     print f.type, f.location
+    gene [1716:4347](-)
+    tRNA [1716:4347](-)
+    gene [2055:3570](-)
+    CDS [2055:3570](-)
+    >>> for f in features.nearest(4400):
+    ...     print f.type, f.location
+    source [0:154478](+)
+    >>> for f in features.nearest(4400, exclude=features.containing(4400)):
+    ...     print f.type, f.location
+    gene [1716:4347](-)
+    tRNA [1716:4347](-)
+
+    The index is rebuilt as needed when the list is changed (e.g. features
+    added or removed), but changing a feature's location in place is not
+    noticed, so in that case you must call the reindex method.
+    """
+    def __init__(self, features=()):
+        list.__init__(self, features)
+        self._index = None
+
+    def reindex(self):
+        """Rebuild the index (e.g. after changing a feature's location)."""
+        self._index = None
+
+    def _build(self):
+        """Build the index of feature locations (PRIVATE).
+
+        Each feature (or subfeature) location becomes a (start, end, i)
+        interval where i is the feature's position in the list. These are
+        sorted by start, and used as an implicit binary tree where each
+        node (the middle of a range of intervals) records the maximum end
+        of the intervals in its range. The intervals are also sorted by end
+        for the nearest method.
+        """
+        intervals = []
+        for i, feature in enumerate(self):
+            if feature.sub_features:
+                locations = [f.location for f in feature.sub_features]
+            else:
+                locations = [feature.location]
+            for loc in locations:
+                if loc is not None:
+                    intervals.append((int(loc.start), int(loc.end), i))
+        intervals.sort()
+        starts = [s for s, e, i in intervals]
+        ends = [e for s, e, i in intervals]
+        owners = [i for s, e, i in intervals]
+        max_ends = ends[:]
+        def max_end(lo, hi):
+            #Maximum end in intervals[lo:hi], recorded at the middle
+            mid = (lo + hi) // 2
+            answer = ends[mid]
+            if lo < mid:
+                answer = max(answer, max_end(lo, mid))
+            if mid + 1 < hi:
+                answer = max(answer, max_end(mid + 1, hi))
+            max_ends[mid] = answer
+            return answer
+        if intervals:
+            max_end(0, len(intervals))
+        by_end = sorted((e, i) for s, e, i in intervals)
+        self._index = (starts, ends, owners, max_ends,
+                       [e for e, i in by_end], [i for e, i in by_end])
+
+    def _overlapping(self, start, end):
+        """Returns set of list positions of overlapping features (PRIVATE)."""
+        if self._index is None:
+            self._build()
+        starts, ends, owners, max_ends = self._index[:4]
+        found = set()
+        if not starts:
+            return found
+        stack = [(0, len(starts))]
+        while stack:
+            lo, hi = stack.pop()
+            mid = (lo + hi) // 2
+            if max_ends[mid] <= start or starts[lo] >= end:
+                #Nothing in this range can overlap
+                continue
+            if lo < mid:
+                stack.append((lo, mid))
+            if starts[mid] < end:
+                if ends[mid] > start:
+                    found.add(owners[mid])
+                if mid + 1 < hi:
+                    stack.append((mid + 1, hi))
+        return found
+
+    def overlapping(self, start, end):
+        """Returns a list of the features overlapping the region start to end.
+
+        The region uses python counting, so the end position is excluded.
+        """
+        return [self[i] for i in sorted(self._overlapping(start, end))]
+
+    def containing(self, position):
+        """Returns a list of the features containing this position.
+
+        This matches using the SeqFeature's __contains__ method, i.e.
+        [f for f in features if position in f] but using the index.
+        """
+        return [self[i] for i in sorted(self._overlapping(position,
+                                                          position + 1))]
+
+    def within(self, start, end):
+        """Returns a list of the features entirely within the region.
+
+        The region uses python counting, so the end position is excluded.
+        """
+        answer = []
+        for i in sorted(self._overlapping(start, end)):
+            feature = self[i]
+            if feature.sub_features:
+                locations = [f.location for f in feature.sub_features]
+            else:
+                locations = [feature.location]
+            if start <= min(int(loc.start) for loc in locations) \
+            and max(int(loc.end) for loc in locations) <= end:
+                answer.append(feature)
+        return answer
+
+    def nearest(self, position, exclude=()):
+        """Returns a list of the features nearest to this position.
+
+        Any features containing the position are returned. Otherwise this
+        gives the closest features before or after the position, with the
+        distance taken to the feature's nearest end (several features may
+        be equally close). Any features in the optional exclude list are
+        ignored (e.g. to find the nearest other features).
+        """
+        if self._index is None:
+            self._build()
+        starts, ends, owners, max_ends, by_end, by_end_owners = self._index
+        excluded = set(id(f) for f in exclude)
+        found = [i for i in sorted(self._overlapping(position, position + 1))
+                 if id(self[i]) not in excluded]
+        if found:
+            return [self[i] for i in found]
+        #Features to the right, closest start after the position
+        best = None
+        i = bisect.bisect_right(starts, position)
+        while i < len(starts):
+            if best is not None and starts[i] - position > best:
+                break
+            if id(self[owners[i]]) not in excluded:
+                best = starts[i] - position
+                found.append((best, owners[i]))
+            i += 1
+        #Features to the left, closest end at or before the position
+        i = bisect.bisect_right(by_end, position) - 1
+        while i >= 0:
+            distance = position - by_end[i] + 1
+            if best is not None and distance > best:
+                break
+            if id(self[by_end_owners[i]]) not in excluded:
+                best = distance
+                found.append((best, by_end_owners[i]))
+            i -= 1
+        return [self[i] for i in sorted(set(i for d, i in found
+                                            if d == best))]
+
+    #Any changes to the list mean the index must be rebuilt
+    def append(self, feature):
+        list.append(self, feature)
+        self._index = None
+
+    def extend(self, features):
+        list.extend(self, features)
+        self._index = None
+
+    def insert(self, index, feature):
+        list.insert(self, index, feature)
+        self._index = None
+
+    def remove(self, feature):
+        list.remove(self, feature)
+        self._index = None
+
+    def pop(self, *args):
+        self._index = None
+        return list.pop(self, *args)
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._index = None
+
+    def reverse(self):
+        list.reverse(self)
+        self._index = None
+
+    def __setitem__(self, index, value):
+        list.__setitem__(self, index, value)
+        self._index = None
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._index = None
+
+    def __setslice__(self, i, j, values):
+        list.__setslice__(self, i, j, values)
+        self._index = None
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self._index = None
+
+    def __iadd__(self, features):
+        list.extend(self, features)
+        self._index = None
+        return self
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self._index = None
+        return self
+
+
 # --- References
 
 # TODO -- Will this hold PubMed and Medline information decently?
@@ -498,6 +776,10 @@ class FeatureLocation(object):
     thus a GenBank entry of 123..150 (one based counting) becomes a location
     of [122:150] (zero based counting).
     """
+    #See the SeqFeature class for why __slots__ is used
+    __slots__ = ("_start", "_end", "_strand", "ref", "ref_db",
+                 "__dict__", "__weakref__")
+
     def __init__(self, start, end, strand=None, ref=None, ref_db=None):
         """Specify the start, end, strand etc of a sequence feature.
 
@@ -569,6 +851,14 @@ class FeatureLocation(object):
         self.ref = ref
         self.ref_db = ref_db
 
+    def __getstate__(self):
+        """Returns the attributes as a dictionary (for pickling)."""
+        return _get_slots_state(self)
+
+    def __setstate__(self, state):
+        """Restores the attributes from a dictionary (for pickling)."""
+        _set_slots_state(self, state)
+
     def _get_strand(self):
         return self._strand
     def _set_strand(self, value):
@@ -769,9 +1059,31 @@ class FeatureLocation(object):
                 f_seq = reverse_complement(f_seq)
         return f_seq
 
+def _get_slots_state(obj):
+    """Returns the attributes of an object using __slots__ as a dict (PRIVATE).
+
+    Pickle protocols 0 and 1 cannot cope with __slots__ on their own.
+    """
+    try:
+        state = obj.__dict__.copy()
+    except AttributeError:
+        state = {}
+    for name in obj.__slots__:
+        if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+            state[name] = getattr(obj, name)
+    return state
+
+def _set_slots_state(obj, state):
+    """Restores the attributes of an object using __slots__ (PRIVATE)."""
+    for name, value in state.iteritems():
+        setattr(obj, name, value)
+
 class AbstractPosition(object):
     """Abstract base class representing a position.
     """
+    #The position classes are immutable and there can be very many of
+    #them, so they do not have a per-instance dictionary
+    __slots__ = ()
 
     def __repr__(self):
         """String representation of the location for debugging."""
@@ -809,13 +1121,30 @@ class ExactPosition(int, AbstractPosition):
     >>> p + 10
     15
 
+    Small positions are shared (interned) rather than creating a new
+    object every time, which saves memory:
+
+    >>> ExactPosition(5) is p
+    True
+
     """
+    __slots__ = ()
+
     def __new__(cls, position, extension = 0):
         if extension != 0:
             raise AttributeError("Non-zero extension %s for exact position."
                                  % extension)
+        if cls is ExactPosition:
+            try:
+                return _exact_positions[position]
+            except (KeyError, TypeError):
+                pass
         return int.__new__(cls, position)
 
+    def __reduce__(self):
+        #For pickling and copying (and so unpickling interns the position)
+        return (self.__class__, (int(self),))
+
     def __repr__(self):
         """String representation of the ExactPosition location for debugging."""
         return "%s(%i)" % (self.__class__.__name__, int(self))
@@ -844,13 +1173,17 @@ class UncertainPosition(ExactPosition):
     This is used in UniProt, e.g. ?222 for uncertain position 222, or in the
     XML format explicitly marked as uncertain. Does not apply to GenBank/EMBL.
     """
-    pass
+    __slots__ = ()
+
+#Shared instances of the most common exact positions (see ExactPosition)
+_exact_positions = dict((i, int.__new__(ExactPosition, i)) for i in range(1024))
 
 class UnknownPosition(AbstractPosition):
     """Specify a specific position which is unknown (has no position).
 
     This is used in UniProt, e.g. ? or in the XML as unknown.
     """
+    __slots__ = ()
 
     def __repr__(self):
         """String representation of the UnknownPosition location for debugging."""
@@ -959,6 +1292,10 @@ class WithinPosition(int, AbstractPosition):
     True
     
     """
+    if sys.version_info[0] < 3:
+        #Python 3 doesn't allow non-empty __slots__ on int subclasses
+        __slots__ = ("_left", "_right")
+
     def __new__(cls, position, left, right):
         assert position==left or position==right
         obj = int.__new__(cls, position)
@@ -966,6 +1303,10 @@ class WithinPosition(int, AbstractPosition):
         obj._right = right
         return obj
 
+    def __reduce__(self):
+        #For pickling and copying
+        return (self.__class__, (int(self), self._left, self._right))
+
     def __repr__(self):
         """String representation of the WithinPosition location for debugging."""
         return "%s(%i, left=%i, right=%i)" \
@@ -1060,6 +1401,10 @@ class BetweenPosition(int, AbstractPosition):
     i.e. For equality (and sorting) the position objects behave like
     integers.
     """
+    if sys.version_info[0] < 3:
+        #Python 3 doesn't allow non-empty __slots__ on int subclasses
+        __slots__ = ("_left", "_right")
+
     def __new__(cls, position, left, right):
         assert position==left or position==right
         obj = int.__new__(cls, position)
@@ -1067,6 +1412,10 @@ class BetweenPosition(int, AbstractPosition):
         obj._right = right
         return obj
 
+    def __reduce__(self):
+        #For pickling and copying
+        return (self.__class__, (int(self), self._left, self._right))
+
     def __repr__(self):
         """String representation of the WithinPosition location for debugging."""
         return "%s(%i, left=%i, right=%i)" \
@@ -1128,6 +1477,8 @@ class BeforePosition(int, AbstractPosition):
     Just remember that for equality and sorting the position objects act
     like integers.
     """
+    __slots__ = ()
+
     #Subclasses int so can't use __init__
     def __new__(cls, position, extension = 0):
         if extension != 0:
@@ -1135,6 +1486,10 @@ class BeforePosition(int, AbstractPosition):
                                  % extension)
         return int.__new__(cls, position)
 
+    def __reduce__(self):
+        #For pickling and copying
+        return (self.__class__, (int(self),))
+
     @property
     def position(self):
         """Legacy attribute to get position as integer (OBSOLETE)."""
@@ -1197,6 +1552,8 @@ class AfterPosition(int, AbstractPosition):
     Just remember that for equality and sorting the position objects act
     like integers.
     """
+    __slots__ = ()
+
     #Subclasses int so can't use __init__
     def __new__(cls, position, extension = 0):
         if extension != 0:
@@ -1204,6 +1561,10 @@ class AfterPosition(int, AbstractPosition):
                                  % extension)
         return int.__new__(cls, position)
 
+    def __reduce__(self):
+        #For pickling and copying
+        return (self.__class__, (int(self),))
+
     @property
     def position(self):
         """Legacy attribute to get position as integer (OBSOLETE)."""
@@ -1278,6 +1639,10 @@ class OneOfPosition(int, AbstractPosition):
     True
 
     """
+    if sys.version_info[0] < 3:
+        #Python 3 doesn't allow non-empty __slots__ on int subclasses
+        __slots__ = ("position_choices",)
+
     def __new__(cls, position, choices):
         """Initialize with a set of posssible positions.
 
@@ -1291,6 +1656,10 @@ class OneOfPosition(int, AbstractPosition):
         obj.position_choices = choices
         return obj
 
+    def __reduce__(self):
+        #For pickling and copying
+        return (self.__class__, (int(self), self.position_choices))
+
     @property
     def position(self):
         """Legacy attribute to get (left) position as integer (OBSOLETE)."""
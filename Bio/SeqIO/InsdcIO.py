@@ -47,27 +47,57 @@ from Bio._py3k import _is_int_or_long
 # However, all the writing code is in this file.
 
 
-def GenBankIterator(handle):
+def GenBankIterator(handle, lazy_features=False):
     """Breaks up a Genbank file into SeqRecord objects.
 
     Every section from the LOCUS line to the terminating // becomes
     a single SeqRecord with associated annotation and features.
     
     Note that for genomes or chromosomes, there is typically only
-    one record."""
+    one record.
+
+    Parsing all the features of a large genome is slow, so if you only
+    need some of them use lazy_features=True. Then the record's features
+    list holds the raw feature table text, and each SeqFeature is only
+    parsed when first accessed. You can also select features by type
+    (feature key) cheaply using the list's by_type method:
+
+    >>> from Bio.SeqIO.InsdcIO import GenBankIterator
+    >>> handle = open("GenBank/NC_005816.gb")
+    >>> record = GenBankIterator(handle, lazy_features=True).next()
+    >>> handle.close()
+    >>> len(record.features)
+    41
+    >>> cds = record.features.by_type("CDS")
+    >>> len(cds)
+    10
+    >>> print cds[0].qualifiers["protein_id"][0]
+    NP_995567.1
+
+    Accessing the features in any other way (e.g. by iteration, or writing
+    the record out) will parse them, giving the same SeqFeature objects as
+    the default mode. Note that any problems in the feature table (e.g. an
+    invalid location) are only reported when that feature is parsed.
+    """
     #This calls a generator function:
-    return GenBankScanner(debug=0).parse_records(handle)
+    return GenBankScanner(debug=0).parse_records(handle,
+                                                 lazy_features=lazy_features)
 
-def EmblIterator(handle):
+def EmblIterator(handle, lazy_features=False):
     """Breaks up an EMBL file into SeqRecord objects.
 
     Every section from the LOCUS line to the terminating // becomes
     a single SeqRecord with associated annotation and features.
     
     Note that for genomes or chromosomes, there is typically only
-    one record."""
+    one record.
+
+    If lazy_features=True, each SeqFeature is only parsed when accessed
+    (see the GenBankIterator function for details).
+    """
     #This calls a generator function:
-    return EmblScanner(debug=0).parse_records(handle)
+    return EmblScanner(debug=0).parse_records(handle,
+                                               lazy_features=lazy_features)
 
 def ImgtIterator(handle):
     """Breaks up an IMGT file into SeqRecord objects.
@@ -664,13 +694,15 @@ class GenBankWriter(_InsdcWriter):
         #Catches sequence being None:
         data = self._get_seq_string(record).lower()
         seq_len = len(data)
-        self.handle.write("ORIGIN\n")
+        #Build the lines in a list to save on write calls
+        lines = ["ORIGIN\n"]
         for line_number in range(0, seq_len, LETTERS_PER_LINE):
-            self.handle.write(str(line_number+1).rjust(SEQUENCE_INDENT))
-            for words in range(line_number,
+            words = [str(line_number+1).rjust(SEQUENCE_INDENT)]
+            for index in range(line_number,
                                min(line_number+LETTERS_PER_LINE, seq_len), 10):
-                self.handle.write(" %s" % data[words:words+10])
-            self.handle.write("\n")
+                words.append(data[index:index+10])
+            lines.append(" ".join(words) + "\n")
+        self.handle.write("".join(lines))
         
     def write_record(self, record):
         """Write a single record to the output file."""
@@ -806,23 +838,27 @@ class EmblWriter(_InsdcWriter):
         else:
             handle.write("SQ   \n")
         
+        #Build the lines in a list to save on write calls
+        lines = []
         for line_number in range(0, seq_len // LETTERS_PER_LINE):
-            handle.write("    ") #Just four, not five
+            words = ["    "] #Just four, not five
             for block in range(BLOCKS_PER_LINE) :
                 index = LETTERS_PER_LINE*line_number + LETTERS_PER_BLOCK*block
-                handle.write((" %s" % data[index:index+LETTERS_PER_BLOCK]))
-            handle.write(str((line_number+1)
+                words.append(data[index:index+LETTERS_PER_BLOCK])
+            lines.append(" ".join(words))
+            lines.append(str((line_number+1)
                              *LETTERS_PER_LINE).rjust(POSITION_PADDING))
-            handle.write("\n")
+            lines.append("\n")
         if seq_len % LETTERS_PER_LINE:
             #Final (partial) line
             line_number = (seq_len // LETTERS_PER_LINE)
-            handle.write("    ") #Just four, not five
+            lines.append("    ") #Just four, not five
             for block in range(BLOCKS_PER_LINE) :
                 index = LETTERS_PER_LINE*line_number + LETTERS_PER_BLOCK*block
-                handle.write((" %s" % data[index:index+LETTERS_PER_BLOCK]).ljust(11))
-            handle.write(str(seq_len).rjust(POSITION_PADDING))
-            handle.write("\n")
+                lines.append((" %s" % data[index:index+LETTERS_PER_BLOCK]).ljust(11))
+            lines.append(str(seq_len).rjust(POSITION_PADDING))
+            lines.append("\n")
+        handle.write("".join(lines))
 
     def _write_single_line(self, tag, text):
         assert len(tag)==2
@@ -182,6 +182,24 @@ class SequenceWriter(object):
         # You SHOULD subclass this                          #
         #####################################################
 
+class _WriteBuffer(object):
+    """Collects the strings written to it in a list (PRIVATE).
+
+    Used by SequentialSequenceWriter.write_records() in place of the real
+    output handle, so that a batch of records can be sent to the handle as
+    a single string rather than via many small write calls.
+    """
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
+
+    def flush_to(self, handle):
+        """Write any collected strings to the handle, and empty the buffer."""
+        if self.parts:
+            handle.write("".join(self.parts))
+            del self.parts[:]
+
+
 class SequentialSequenceWriter(SequenceWriter):
     """This class should be subclassed.
 
@@ -202,7 +220,16 @@ class SequentialSequenceWriter(SequenceWriter):
     
     Note that write_header() cannot require any assumptions about
     the number of records.
+
+    The write_records() method collects the output of several records
+    and passes it to the handle in one write call (see buffer_size),
+    so subclasses should only use the handle's write method within
+    their write_record() method.
     """
+    #Number of strings (typically lines) collected by write_records()
+    #before they are written to the handle:
+    buffer_size = 4096
+
     def __init__(self, handle):
         self.handle = handle
         self._header_written = False
@@ -248,13 +275,27 @@ class SequentialSequenceWriter(SequenceWriter):
 
         Returns the number of records written.
         """
-        #Default implementation:
+        #Default implementation, calls write_record() for each record but
+        #with self.handle temporarily replaced by a buffer which is flushed
+        #to the real handle every buffer_size strings (roughly lines), and
+        #at the end (or if there is an error):
         assert self._header_written, "You must call write_header() first"
         assert not self._footer_written, "You have already called write_footer()"
+        handle = self.handle
+        buffer = _WriteBuffer()
+        parts = buffer.parts
+        buffer_size = self.buffer_size
         count = 0
-        for record in records:
-            self.write_record(record)
-            count += 1
+        self.handle = buffer
+        try:
+            for record in records:
+                self.write_record(record)
+                count += 1
+                if len(parts) >= buffer_size:
+                    buffer.flush_to(handle)
+        finally:
+            self.handle = handle
+            buffer.flush_to(handle)
         #Mark as true, even if there where no records
         self._record_written = True
         return count
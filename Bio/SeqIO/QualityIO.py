@@ -369,8 +369,10 @@ from Bio.Seq import Seq, UnknownSeq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqIO.Interfaces import SequentialSequenceWriter
 from math import log
+from array import array
 import warnings
 from Bio import BiopythonWarning, BiopythonParserWarning
+from Bio._py3k import _as_bytes, _bytes_to_string
 
 
 # define score offsets. See discussion for differences between Sanger and
@@ -378,6 +380,8 @@ from Bio import BiopythonWarning, BiopythonParserWarning
 SANGER_SCORE_OFFSET = 33
 SOLEXA_SCORE_OFFSET = 64
 
+_null_byte = _as_bytes(chr(0))
+
 def solexa_quality_from_phred(phred_quality):
     """Covert a PHRED quality (range 0 to about 90) to a Solexa quality.
 
@@ -516,6 +520,148 @@ def phred_quality_from_solexa(solexa_quality):
                       % repr(solexa_quality), BiopythonWarning)
     return 10*log(10**(solexa_quality/10.0) + 1, 10)
 
+def _make_decode_table(offset):
+    """Translation table turning ASCII into signed bytes of score (PRIVATE).
+
+    After translation, the string can be loaded directly into an array of
+    signed chars (type code "b") to give the integer quality scores.
+    """
+    return _as_bytes("".join([chr((letter - offset) % 256) \
+                              for letter in range(256)]))
+
+#For each FASTQ variant, the letter annotation key used for the scores,
+#the ASCII offset, the minimum and maximum valid scores, and a translation
+#table for decoding the quality string:
+_fastq_variants = {}
+for _format, _key, _offset, _min, _max in [
+        ("fastq", "phred_quality", SANGER_SCORE_OFFSET, 0, 93),
+        ("fastq-sanger", "phred_quality", SANGER_SCORE_OFFSET, 0, 93),
+        ("fastq-solexa", "solexa_quality", SOLEXA_SCORE_OFFSET, -5, 62),
+        ("fastq-illumina", "phred_quality", SOLEXA_SCORE_OFFSET, 0, 62)]:
+    _fastq_variants[_format] = (_key, _offset, chr(_min + _offset),
+                                chr(_max + _offset),
+                                _make_decode_table(_offset))
+del _format, _key, _offset, _min, _max
+
+def _make_convert_table(in_format, out_format):
+    """Translation table between two FASTQ variant quality encodings (PRIVATE).
+
+    Returns a 256 character translation table, where invalid characters
+    for the input variant are mapped to chr(0), and any scores which must
+    be truncated in the output variant are mapped to chr(1).
+    """
+    in_key, in_offset, in_low, in_high = _fastq_variants[in_format][:4]
+    out_key, out_offset, out_low, out_high = _fastq_variants[out_format][:4]
+    out_max = ord(out_high) - out_offset
+    table = [chr(0)] * 256
+    for letter in range(ord(in_low), ord(in_high) + 1):
+        q = letter - in_offset
+        if in_key == out_key:
+            pass
+        elif in_key == "solexa_quality":
+            q = int(round(phred_quality_from_solexa(q)))
+        else:
+            q = int(round(solexa_quality_from_phred(q)))
+        if q > out_max:
+            table[letter] = chr(1)
+        else:
+            table[letter] = chr(q + out_offset)
+    return "".join(table)
+
+_fastq_convert_tables = {}
+_fastq_truncation_warnings = {
+    "fastq-solexa": "Data loss - max Solexa quality 62 in Solexa FASTQ",
+    "fastq-illumina": "Data loss - max PHRED quality 62 in Illumina 1.3+ FASTQ"}
+def convert_fastq_quality(quality, in_format, out_format):
+    """Convert FASTQ quality string(s) from one FASTQ variant to another.
+
+     - quality - encoded quality string, or a list of them
+     - in_format - FASTQ variant of the input (a Bio.SeqIO format name,
+                   i.e. "fastq", "fastq-sanger", "fastq-solexa" or
+                   "fastq-illumina")
+     - out_format - FASTQ variant for the output
+
+    This uses a precomputed translation table, so a whole read (or a whole
+    chunk of reads given as a list) is converted in one call rather than
+    one score at a time. The result is the same as Bio.SeqIO would give
+    parsing and writing the records via SeqRecord objects:
+
+    >>> print convert_fastq_quality(";;3;;;;;;;;;;;;7;;;;;;;88", "fastq", "fastq-illumina")
+    ZZRZZZZZZZZZZZZVZZZZZZZWW
+    >>> for q in convert_fastq_quality(["hgfedcba`_^]", "\\[ZYXWVUTSRQP"],
+    ...                                "fastq-solexa", "fastq-sanger"):
+    ...     print q
+    IHGFEDCBA@?>
+    =<;:987654321
+
+    An invalid character for the input variant gives an exception:
+
+    >>> convert_fastq_quality("IIII!", "fastq-illumina", "fastq")
+    Traceback (most recent call last):
+       ...
+    ValueError: Invalid character in quality string
+
+    If scores must be truncated (e.g. a PHRED score above 62 cannot be held
+    in an Illumina 1.3+ FASTQ file) a warning is issued.
+    """
+    try:
+        table, chunk_table = _fastq_convert_tables[(in_format, out_format)]
+    except KeyError:
+        for format in [in_format, out_format]:
+            if format not in _fastq_variants:
+                raise ValueError("Unknown FASTQ variant %s" % repr(format))
+        table = _make_convert_table(in_format, out_format)
+        #New lines are invalid in all variants, so we can use them to
+        #join a chunk of quality strings and translate them in one go:
+        chunk_table = table[:10] + "\n" + table[11:]
+        _fastq_convert_tables[(in_format, out_format)] = table, chunk_table
+    if isinstance(quality, basestring):
+        data = quality.translate(table)
+    else:
+        data = "\n".join(quality).translate(chunk_table)
+    if chr(0) in data:
+        raise ValueError("Invalid character in quality string")
+    if chr(1) in data:
+        warnings.warn(_fastq_truncation_warnings[out_format],
+                      BiopythonWarning)
+        data = data.replace(chr(1), chr(126))
+    if isinstance(quality, basestring):
+        return data
+    elif not quality:
+        return []
+    answer = data.split("\n")
+    if len(answer) != len(quality):
+        raise ValueError("Invalid character in quality string")
+    return answer
+
+def _make_encode_table(mapping):
+    """Translation table from signed byte scores to quality letters (PRIVATE).
+
+    Takes a dictionary mapping integer scores to ASCII letters, scores not
+    in the dictionary are mapped to chr(0).
+    """
+    table = [chr(0)] * 256
+    for q, letter in mapping.iteritems():
+        table[q % 256] = letter
+    return _as_bytes("".join(table))
+
+def _encode_quality_scores(qualities, table):
+    """Turn a list of integer quality scores into a string in one go (PRIVATE).
+
+    The scores are loaded into an array of signed chars, which is then
+    translated using the table (see _make_encode_table). Returns None if
+    this is not possible (e.g. floats, None, or scores not in the table),
+    in which case the caller must fall back on handling each score.
+    """
+    try:
+        data = array("b", qualities).tostring()
+    except (TypeError, OverflowError):
+        return None
+    data = data.translate(table)
+    if _null_byte in data:
+        return None
+    return _bytes_to_string(data)
+
 def _get_phred_quality(record):
     """Extract PHRED qualities from a SeqRecord's letter_annotations (PRIVATE).
 
@@ -537,10 +683,12 @@ def _get_phred_quality(record):
 #Only map 0 to 93, we need to give a warning on truncating at 93
 _phred_to_sanger_quality_str = dict((qp, chr(min(126, qp+SANGER_SCORE_OFFSET))) \
                                     for qp in range(0, 93+1))
+_phred_to_sanger_quality_table = _make_encode_table(_phred_to_sanger_quality_str)
 #Only map -5 to 93, we need to give a warning on truncating at 93
 _solexa_to_sanger_quality_str = dict( \
     (qs, chr(min(126, int(round(phred_quality_from_solexa(qs)))+SANGER_SCORE_OFFSET))) \
     for qs in range(-5, 93+1))
+_solexa_to_sanger_quality_table = _make_encode_table(_solexa_to_sanger_quality_str)
 def _get_sanger_quality_str(record):
     """Returns a Sanger FASTQ encoded quality string (PRIVATE).
 
@@ -611,12 +759,9 @@ def _get_sanger_quality_str(record):
         pass
     else:
         #Try and use the precomputed mapping:
-        try:
-            return "".join([_phred_to_sanger_quality_str[qp] \
-                            for qp in qualities])
-        except KeyError:
-            #Could be a float, or a None in the list, or a high value.
-            pass
+        qual = _encode_quality_scores(qualities, _phred_to_sanger_quality_table)
+        if qual is not None:
+            return qual
         if None in qualities:
             raise TypeError("A quality value of None was found")
         if max(qualities) >= 93.5:
@@ -633,12 +778,9 @@ def _get_sanger_quality_str(record):
                          "letter_annotations of SeqRecord (id=%s)." \
                          % record.id)
     #Try and use the precomputed mapping:
-    try:
-        return "".join([_solexa_to_sanger_quality_str[qs] \
-                        for qs in qualities])
-    except KeyError:
-        #Either no PHRED scores, or something odd like a float or None
-        pass
+    qual = _encode_quality_scores(qualities, _solexa_to_sanger_quality_table)
+    if qual is not None:
+        return qual
     if None in qualities:
         raise TypeError("A quality value of None was found")
     #Must do this the slow way, first converting the PHRED scores into
@@ -654,10 +796,12 @@ def _get_sanger_quality_str(record):
 assert 62+SOLEXA_SCORE_OFFSET == 126
 _phred_to_illumina_quality_str = dict((qp, chr(qp+SOLEXA_SCORE_OFFSET)) \
                                       for qp in range(0, 62+1))
+_phred_to_illumina_quality_table = _make_encode_table(_phred_to_illumina_quality_str)
 #Only map -5 to 62, we need to give a warning on truncating at 62
 _solexa_to_illumina_quality_str = dict( \
     (qs, chr(int(round(phred_quality_from_solexa(qs)))+SOLEXA_SCORE_OFFSET)) \
     for qs in range(-5, 62+1))
+_solexa_to_illumina_quality_table = _make_encode_table(_solexa_to_illumina_quality_str)
 def _get_illumina_quality_str(record):
     """Returns an Illumina 1.3 to 1.7 FASTQ encoded quality string (PRIVATE).
 
@@ -677,12 +821,9 @@ def _get_illumina_quality_str(record):
         pass
     else:
         #Try and use the precomputed mapping:
-        try:
-            return "".join([_phred_to_illumina_quality_str[qp] \
-                            for qp in qualities])
-        except KeyError:
-            #Could be a float, or a None in the list, or a high value.
-            pass
+        qual = _encode_quality_scores(qualities, _phred_to_illumina_quality_table)
+        if qual is not None:
+            return qual
         if None in qualities:
             raise TypeError("A quality value of None was found")
         if max(qualities) >= 62.5:
@@ -699,12 +840,9 @@ def _get_illumina_quality_str(record):
                          "letter_annotations of SeqRecord (id=%s)." \
                          % record.id)
     #Try and use the precomputed mapping:
-    try:
-        return "".join([_solexa_to_illumina_quality_str[qs] \
-                        for qs in qualities])
-    except KeyError:
-        #Either no PHRED scores, or something odd like a float or None
-        pass
+    qual = _encode_quality_scores(qualities, _solexa_to_illumina_quality_table)
+    if qual is not None:
+        return qual
     if None in qualities:
         raise TypeError("A quality value of None was found")
     #Must do this the slow way, first converting the PHRED scores into
@@ -720,10 +858,12 @@ def _get_illumina_quality_str(record):
 assert 62+SOLEXA_SCORE_OFFSET == 126
 _solexa_to_solexa_quality_str = dict((qs, chr(min(126, qs+SOLEXA_SCORE_OFFSET))) \
                                      for qs in range(-5, 62+1))
+_solexa_to_solexa_quality_table = _make_encode_table(_solexa_to_solexa_quality_str)
 #Only map -5 to 62, we need to give a warning on truncating at 62
 _phred_to_solexa_quality_str = dict(\
     (qp, chr(min(126, int(round(solexa_quality_from_phred(qp)))+SOLEXA_SCORE_OFFSET))) \
     for qp in range(0, 62+1))
+_phred_to_solexa_quality_table = _make_encode_table(_phred_to_solexa_quality_str)
 def _get_solexa_quality_str(record):
     """Returns a Solexa FASTQ encoded quality string (PRIVATE).
 
@@ -743,12 +883,9 @@ def _get_solexa_quality_str(record):
         pass
     else:
         #Try and use the precomputed mapping:
-        try:
-            return "".join([_solexa_to_solexa_quality_str[qs] \
-                            for qs in qualities])
-        except KeyError:
-            #Could be a float, or a None in the list, or a high value.
-            pass
+        qual = _encode_quality_scores(qualities, _solexa_to_solexa_quality_table)
+        if qual is not None:
+            return qual
         if None in qualities:
             raise TypeError("A quality value of None was found")
         if max(qualities) >= 62.5:
@@ -765,13 +902,9 @@ def _get_solexa_quality_str(record):
                          "letter_annotations of SeqRecord (id=%s)." \
                          % record.id)
     #Try and use the precomputed mapping:
-    try:
-        return "".join([_phred_to_solexa_quality_str[qp] \
-                        for qp in qualities])
-    except KeyError:
-        #Either no PHRED scores, or something odd like a float or None
-        #or too big to be in the cache
-        pass
+    qual = _encode_quality_scores(qualities, _phred_to_solexa_quality_table)
+    if qual is not None:
+        return qual
     if None in qualities:
         raise TypeError("A quality value of None was found")
     #Must do this the slow way, first converting the PHRED scores into
@@ -1012,10 +1145,9 @@ def FastqPhredIterator(handle, alphabet = single_letter_alphabet, title2ids = No
     #
     # qualities = [ord(letter)-SANGER_SCORE_OFFSET for letter in quality_string]
     #
-    #Precomputing is faster, perhaps partly by avoiding the subtractions.
-    q_mapping = dict()
-    for letter in range(0, 255):
-        q_mapping[chr(letter)] = letter-SANGER_SCORE_OFFSET
+    #Precomputing a mapping was faster, but faster still is to translate the
+    #string in one go into signed bytes which are loaded into an array:
+    table = _fastq_variants["fastq-sanger"][4]
     for title_line, seq_string, quality_string in FastqGeneralIterator(handle):
         if title2ids:
             id, name, descr = title2ids(title_line)
@@ -1025,9 +1157,10 @@ def FastqPhredIterator(handle, alphabet = single_letter_alphabet, title2ids = No
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 93):
+        if quality_string and (min(quality_string) < "!" \
+                               or max(quality_string) > "~"):
             raise ValueError("Invalid character in quality string")
+        qualities = array("b", _as_bytes(quality_string).translate(table)).tolist()
         #For speed, will now use a dirty trick to speed up assigning the
         #qualities. We do this to bypass the length check imposed by the
         #per-letter-annotations restricted dict (as this has already been
@@ -1175,9 +1308,7 @@ def FastqSolexaIterator(handle, alphabet = single_letter_alphabet, title2ids = N
     As shown above, the poor quality Solexa reads have been mapped to the
     equivalent PHRED score (e.g. -5 to 1 as shown earlier).
     """
-    q_mapping = dict()
-    for letter in range(0, 255):
-        q_mapping[chr(letter)] = letter-SOLEXA_SCORE_OFFSET
+    table = _fastq_variants["fastq-solexa"][4]
     for title_line, seq_string, quality_string in FastqGeneralIterator(handle):
         if title2ids:
             id, name, descr = title_line
@@ -1187,10 +1318,11 @@ def FastqSolexaIterator(handle, alphabet = single_letter_alphabet, title2ids = N
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        #DO NOT convert these into PHRED qualities automatically!
-        if qualities and (min(qualities) < -5 or max(qualities)>62):
+        if quality_string and (min(quality_string) < ";" \
+                               or max(quality_string) > "~"):
             raise ValueError("Invalid character in quality string")
+        #DO NOT convert these into PHRED qualities automatically!
+        qualities = array("b", _as_bytes(quality_string).translate(table)).tolist()
         #Dirty trick to speed up this line:
         #record.letter_annotations["solexa_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
@@ -1227,9 +1359,7 @@ def FastqIlluminaIterator(handle, alphabet = single_letter_alphabet, title2ids =
 
     NOTE - True Sanger style FASTQ files use PHRED scores with an offset of 33.
     """
-    q_mapping = dict()
-    for letter in range(0, 255):
-        q_mapping[chr(letter)] = letter-SOLEXA_SCORE_OFFSET
+    table = _fastq_variants["fastq-illumina"][4]
     for title_line, seq_string, quality_string in FastqGeneralIterator(handle):
         if title2ids:
             id, name, descr = title2ids(title_line)
@@ -1239,15 +1369,185 @@ def FastqIlluminaIterator(handle, alphabet = single_letter_alphabet, title2ids =
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 62):
+        if quality_string and (min(quality_string) < "@" \
+                               or max(quality_string) > "~"):
             raise ValueError("Invalid character in quality string")
+        qualities = array("b", _as_bytes(quality_string).translate(table)).tolist()
         #Dirty trick to speed up this line:
         #record.letter_annotations["phred_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
                          "phred_quality", qualities)
         yield record
-    
+
+class FastqCompactRecord(object):
+    """Lightweight FASTQ read, holding the raw title, sequence and quality.
+
+    This is used by the FastqCompactIterator, and avoids the per read cost
+    of creating a full SeqRecord with a Seq object, a letter annotations
+    dictionary and a list of integer quality scores. The quality string
+    is held exactly as in the file (one byte per base), and is only decoded
+    into scores on request:
+
+    >>> handle = open("Quality/example.fastq", "rU")
+    >>> record = FastqCompactIterator(handle, "fastq").next()
+    >>> handle.close()
+    >>> print record.id, len(record)
+    EAS54_6_R1_2_1_413_324 25
+    >>> print record.seq
+    CCCTTCTTGTCTTCAGCGTTTCTCC
+    >>> print record.quality
+    ;;3;;;;;;;;;;;;7;;;;;;;88
+    >>> print record.quality_scores()[:5]
+    array('b', [26, 26, 18, 26, 26])
+
+    When required, it can be turned into a full SeqRecord object, exactly as
+    given by the matching SeqRecord based FASTQ iterator:
+
+    >>> full = record.to_seqrecord()
+    >>> print full.id, full.seq
+    EAS54_6_R1_2_1_413_324 CCCTTCTTGTCTTCAGCGTTTCTCC
+    >>> print full.letter_annotations["phred_quality"][:5]
+    [26, 26, 18, 26, 26]
+
+    For output in the same FASTQ variant, the original strings are used
+    without any conversion:
+
+    >>> print record.format("fastq")
+    @EAS54_6_R1_2_1_413_324
+    CCCTTCTTGTCTTCAGCGTTTCTCC
+    +
+    ;;3;;;;;;;;;;;;7;;;;;;;88
+    <BLANKLINE>
+    """
+    __slots__ = ["title", "seq", "quality", "variant"]
+
+    def __init__(self, title, seq, quality, variant="fastq"):
+        """Create a compact FASTQ record.
+
+         - title - the title line (without the leading @ character)
+         - seq - the sequence as a string
+         - quality - the encoded quality as a string
+         - variant - the FASTQ variant (a Bio.SeqIO format name), used to
+                     interpret the quality string
+        """
+        if variant not in _fastq_variants:
+            raise ValueError("Unknown FASTQ variant %s" % repr(variant))
+        if len(seq) != len(quality):
+            raise ValueError("Lengths of sequence and quality values differs "
+                             " for %s (%i and %i)." \
+                             % (title, len(seq), len(quality)))
+        self.title = title
+        self.seq = seq
+        self.quality = quality
+        self.variant = variant
+
+    def __repr__(self):
+        return "%s(%s, %s, %s, %s)" % (self.__class__.__name__,
+                                       repr(self.title), repr(self.seq),
+                                       repr(self.quality), repr(self.variant))
+
+    def __len__(self):
+        return len(self.seq)
+
+    def _get_id(self):
+        try:
+            return self.title.split(None, 1)[0]
+        except IndexError:
+            return ""
+    id = property(_get_id, doc="Record identifier (first word of the title).")
+
+    def quality_scores(self):
+        """Returns the quality scores as an array of signed chars.
+
+        These are PHRED scores, or for the "fastq-solexa" variant Solexa
+        scores. This is decoded directly from the quality string using
+        a translation table, without building a list of integers.
+        """
+        table = _fastq_variants[self.variant][4]
+        return array("b", _as_bytes(self.quality).translate(table))
+
+    def to_seqrecord(self, alphabet=single_letter_alphabet, title2ids=None):
+        """Returns a full SeqRecord object for this read.
+
+         - alphabet - optional alphabet
+         - title2ids - optional function to turn the title into the id,
+                       name and description (see FastqPhredIterator)
+        """
+        if title2ids:
+            id, name, descr = title2ids(self.title)
+        else:
+            descr = self.title
+            id = self._get_id()
+            name = id
+        record = SeqRecord(Seq(self.seq, alphabet),
+                           id=id, name=name, description=descr)
+        #Dirty trick as in FastqPhredIterator, the length is already checked
+        dict.__setitem__(record._per_letter_annotations,
+                         _fastq_variants[self.variant][0],
+                         self.quality_scores().tolist())
+        return record
+
+    def format(self, format):
+        """Returns the record as a string in the specified file format.
+
+        If the format is the same FASTQ variant as the record, the original
+        sequence and quality strings are used as they are. Otherwise this
+        is done via a full SeqRecord (see the to_seqrecord method).
+        """
+        if format == self.variant \
+        or (format in ["fastq", "fastq-sanger"] \
+            and self.variant in ["fastq", "fastq-sanger"]):
+            return "@%s\n%s\n+\n%s\n" % (self.title, self.seq, self.quality)
+        return self.to_seqrecord().format(format)
+
+#This is a generator function!
+def FastqCompactIterator(handle, format="fastq"):
+    """Iterate over FASTQ records as lightweight FastqCompactRecord objects.
+
+     - handle - input file
+     - format - FASTQ variant, one of "fastq" (or "fastq-sanger"),
+                "fastq-solexa" or "fastq-illumina"
+
+    This uses the FastqGeneralIterator, but also checks the quality
+    characters are valid for the FASTQ variant (as done by the SeqRecord
+    based iterators). This is much faster and needs much less memory than
+    creating SeqRecord objects, which can be done later for individual
+    reads via their to_seqrecord method:
+
+    >>> handle = open("Quality/solexa_faked.fastq", "rU")
+    >>> for record in FastqCompactIterator(handle, "fastq-solexa"):
+    ...     print record.id, min(record.quality_scores())
+    slxa_0001_1_0001_01 -5
+    >>> handle.close()
+
+    As with the "fastq-illumina" SeqRecord parser, this will fail on
+    reading the same file as Illumina 1.3+ FASTQ:
+
+    >>> handle = open("Quality/solexa_faked.fastq", "rU")
+    >>> for record in FastqCompactIterator(handle, "fastq-illumina"):
+    ...     print record.id
+    Traceback (most recent call last):
+       ...
+    ValueError: Invalid character in quality string
+    >>> handle.close()
+    """
+    try:
+        low, high = _fastq_variants[format][2:4]
+    except KeyError:
+        raise ValueError("Unknown FASTQ variant %s" % repr(format))
+    for title_line, seq_string, quality_string in FastqGeneralIterator(handle):
+        #The min and max of a string are found without a Python loop
+        if quality_string and (min(quality_string) < low \
+                               or max(quality_string) > high):
+            raise ValueError("Invalid character in quality string")
+        #Skip the length check in __init__, done by FastqGeneralIterator
+        record = FastqCompactRecord.__new__(FastqCompactRecord)
+        record.title = title_line
+        record.seq = seq_string
+        record.quality = quality_string
+        record.variant = format
+        yield record
+
 def QualPhredIterator(handle, alphabet = single_letter_alphabet, title2ids = None):
     """For QUAL files which include PHRED quality scores, but no sequence.
 
@@ -1508,7 +1808,7 @@ class QualPhredWriter(SequentialSequenceWriter):
                 title = "%s %s" % (id, description)
             else:
                 title = id
-        handle.write(">%s\n" % title)
+        lines = [">%s" % title]
 
         qualities = _get_phred_quality(record)
         try:
@@ -1524,16 +1824,17 @@ class QualPhredWriter(SequentialSequenceWriter):
         if wrap > 5:
             #Fast wrapping
             data = " ".join(qualities_strs)
+            start = 0
             while True:
-                if len(data) <= wrap:
-                    self.handle.write(data + "\n")
+                if len(data) - start <= wrap:
+                    lines.append(data[start:])
                     break
                 else:
                     #By construction there must be spaces in the first X chars
                     #(unless we have X digit or higher quality scores!)
-                    i = data.rfind(" ", 0, wrap)
-                    handle.write(data[:i] + "\n")
-                    data = data[i+1:]
+                    i = data.rfind(" ", start, start + wrap)
+                    lines.append(data[start:i])
+                    start = i + 1
         elif wrap:
             #Safe wrapping
             while qualities_strs:
@@ -1541,11 +1842,13 @@ class QualPhredWriter(SequentialSequenceWriter):
                 while qualities_strs \
                 and len(line) + 1 + len(qualities_strs[0]) < wrap:
                     line += " " + qualities_strs.pop(0)
-                handle.write(line + "\n")
+                lines.append(line)
         else:
             #No wrapping
-            data = " ".join(qualities_strs)
-            handle.write(data + "\n")
+            lines.append(" ".join(qualities_strs))
+        #Write the whole record in one go
+        lines.append("")
+        handle.write("\n".join(lines))
 
 class FastqSolexaWriter(SequentialSequenceWriter):
     r"""Write old style Solexa/Illumina FASTQ format files (with Solexa qualities).
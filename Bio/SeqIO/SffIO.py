@@ -223,6 +223,7 @@ from Bio.SeqRecord import SeqRecord
 import struct
 import sys
 import re
+import array
 
 from Bio._py3k import _bytes_to_string, _as_bytes
 _null = _as_bytes("\0")
@@ -540,27 +541,46 @@ def _sff_read_roche_index(handle):
                          % (handle.tell(), read_index_offset + read_index_size))
 
 _valid_UAN_read_name = re.compile(r'^[a-zA-Z0-9]{14}$')
-def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
-                         key_sequence, alphabet, trim=False):
-    """Parse the next read in the file, return data as a SeqRecord (PRIVATE)."""
-    #Now on to the reads...
-    #the read header format (fixed part):
-    #read_header_length     H
-    #name_length            H
-    #seq_len                I
-    #clip_qual_left         H
-    #clip_qual_right        H
-    #clip_adapter_left      H
-    #clip_adapter_right     H
-    #[rest of read header depends on the name length etc]
-    read_header_fmt = '>2HI4H'
-    read_header_size = struct.calcsize(read_header_fmt)
-    read_flow_fmt = ">%iH" % number_of_flows_per_read
-    read_flow_size = struct.calcsize(read_flow_fmt)
+#The read header format (fixed part):
+#read_header_length     H
+#name_length            H
+#seq_len                I
+#clip_qual_left         H
+#clip_qual_right        H
+#clip_adapter_left      H
+#clip_adapter_right     H
+#[rest of read header depends on the name length etc]
+_read_header_struct = struct.Struct(">2HI4H")
+
+
+def _sff_flow_values(data, as_array=False):
+    """Decode the big endian flowgram values of a read (PRIVATE).
+
+    Returns a tuple of integers, or if as_array=True an unsigned short
+    array (which is much quicker and takes far less memory).
+    """
+    if not as_array:
+        return struct.unpack(">%iH" % (len(data) // 2), data)
+    values = array.array("H", data)
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values
 
+
+def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
+                         key_sequence, alphabet, trim=False, arrays=False):
+    """Parse the next read in the file, return data as a SeqRecord (PRIVATE).
+
+    The read's header and the rest of the read (the flowgram values, flow
+    index, bases, qualities and padding) are each loaded with a single read
+    call. With trim=True only the trimmed bases and qualities are decoded.
+    With arrays=True the flow_values, flow_index and phred_quality data are
+    held as array objects rather than tuples and lists.
+    """
+    read_header_size = _read_header_struct.size
     read_header_length, name_length, seq_len, clip_qual_left, \
     clip_qual_right, clip_adapter_left, clip_adapter_right \
-        = struct.unpack(read_header_fmt, handle.read(read_header_size))
+        = _read_header_struct.unpack(handle.read(read_header_size))
     if clip_qual_left:
         clip_qual_left -= 1 #python counting
     if clip_adapter_left:
@@ -569,25 +589,28 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
         raise ValueError("Malformed read header, says length is %i" \
                          % read_header_length)
     #now the name and any padding (remainder of header)
-    name = _bytes_to_string(handle.read(name_length))
+    data = handle.read(read_header_length - read_header_size)
+    name = _bytes_to_string(data[:name_length])
     padding = read_header_length - read_header_size - name_length
-    if handle.read(padding).count(_null) != padding:
+    if data.count(_null, name_length) != padding:
         raise ValueError("Post name %i byte padding region contained data" \
                          % padding)
     #now the flowgram values, flowgram index, bases and qualities
     #NOTE - assuming flowgram_format==1, which means struct type H
-    flow_values = handle.read(read_flow_size) #unpack later if needed
-    temp_fmt = ">%iB" % seq_len # used for flow index and quals
-    flow_index = handle.read(seq_len) #unpack later if needed
-    seq = _bytes_to_string(handle.read(seq_len)) #TODO - Use bytes in Seq?
-    quals = list(struct.unpack(temp_fmt, handle.read(seq_len)))
-    #now any padding...
+    read_flow_size = 2 * number_of_flows_per_read
     padding = (read_flow_size + seq_len*3)%8
     if padding:
         padding = 8 - padding
-        if handle.read(padding).count(_null) != padding:
-            raise ValueError("Post quality %i byte padding region contained data" \
-                             % padding)
+    data = handle.read(read_flow_size + seq_len*3 + padding)
+    index_start = read_flow_size
+    seq_start = index_start + seq_len
+    qual_start = seq_start + seq_len
+    qual_end = qual_start + seq_len
+    if len(data) < qual_end:
+        raise ValueError("Premature end of file in read %s" % name)
+    if padding and data.count(_null, qual_end) != padding:
+        raise ValueError("Post quality %i byte padding region contained data" \
+                         % padding)
     #Follow Roche and apply most aggressive of qual and adapter clipping.
     #Note Roche seems to ignore adapter clip fields when writing SFF,
     #and uses just the quality clipping values for any clipping.
@@ -605,24 +628,38 @@ def _sff_read_seq_record(handle, number_of_flows_per_read, flow_chars,
         clip_right = seq_len
     #Now build a SeqRecord
     if trim:
-        seq = seq[clip_left:clip_right].upper()
-        quals = quals[clip_left:clip_right]
+        #Only decode the trimmed region, ignoring the flows entirely
+        #(keeping the clip values within the read as slicing would)
+        clip_left = min(clip_left, seq_len)
+        clip_right = max(clip_left, min(clip_right, seq_len))
+        seq = _bytes_to_string(data[seq_start+clip_left:
+                                    seq_start+clip_right]).upper()
+        quals = array.array("B", data[qual_start+clip_left:
+                                      qual_start+clip_right])
         #Don't record the clipping values, flow etc, they make no sense now:
         annotations = {}
     else:
+        seq = _bytes_to_string(data[seq_start:qual_start])
         #This use of mixed case mimics the Roche SFF tool's FASTA output
         seq = seq[:clip_left].lower() + \
               seq[clip_left:clip_right].upper() + \
               seq[clip_right:].lower()
-        annotations = {"flow_values":struct.unpack(read_flow_fmt, flow_values),
-                       "flow_index":struct.unpack(temp_fmt, flow_index),
+        quals = array.array("B", data[qual_start:qual_end])
+        flow_index = array.array("B", data[index_start:seq_start])
+        if not arrays:
+            flow_index = tuple(flow_index)
+        annotations = {"flow_values":_sff_flow_values(data[:index_start],
+                                                      arrays),
+                       "flow_index":flow_index,
                        "flow_chars":flow_chars,
                        "flow_key":key_sequence,
                        "clip_qual_left":clip_qual_left,
                        "clip_qual_right":clip_qual_right,
                        "clip_adapter_left":clip_adapter_left,
                        "clip_adapter_right":clip_adapter_right}
-    if re.match(_valid_UAN_read_name, name):
+    if not arrays:
+        quals = quals.tolist()
+    if len(name) == 14 and re.match(_valid_UAN_read_name, name):
         annotations["time"] = _get_read_time(name)
         annotations["region"] = _get_read_region(name)
         annotations["coords"] = _get_read_xy(name)
@@ -748,13 +785,17 @@ class _AddTellHandle(object):
 
 
 #This is a generator function!
-def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
+def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False,
+                arrays=False):
     """Iterate over Standard Flowgram Format (SFF) reads (as SeqRecord objects).
 
     handle - input file, an SFF file, e.g. from Roche 454 sequencing.
              This must NOT be opened in universal read lines mode!
     alphabet - optional alphabet, defaults to generic DNA.
     trim - should the sequences be trimmed?
+    arrays - should the flow values, flow index and PHRED qualities be
+             held as array objects (from the array module) rather than
+             as tuples and lists? This is faster and uses much less memory.
 
     The resulting SeqRecord objects should match those from a paired FASTA
     and QUAL file converted from the SFF file using the Roche 454 tool
@@ -813,6 +854,18 @@ def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
     E3MFGYR02F7Z7G 130
     >>> handle.close()
 
+    Or, with the arrays option:
+
+    >>> handle = open("Roche/E3MFGYR02_random_10_reads.sff", "rb")
+    >>> record = SffIterator(handle, arrays=True).next()
+    >>> print record.id, len(record)
+    E3MFGYR02JWQ7T 265
+    >>> print record.annotations["flow_values"][:5]
+    array('H', [84, 1, 123, 5, 8])
+    >>> print record.letter_annotations["phred_quality"][:5]
+    array('B', [23, 24, 26, 38, 31])
+    >>> handle.close()
+
     """
     if isinstance(Alphabet._get_base_alphabet(alphabet),
                   Alphabet.ProteinAlphabet):
@@ -864,7 +917,8 @@ def SffIterator(handle, alphabet=Alphabet.generic_dna, trim=False):
                                    flow_chars,
                                    key_sequence,
                                    alphabet,
-                                   trim)
+                                   trim,
+                                   arrays)
     #The following is not essential, but avoids confusing error messages
     #for the user if they try and re-parse the same handle.
     if index_offset and handle.tell() == index_offset:
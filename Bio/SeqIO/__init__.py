@@ -383,8 +383,11 @@ _FormatToWriter = {"fasta" : FastaIO.FastaWriter,
 
 _BinaryFormats = ["sff", "sff-trim", "abi", "abi-trim"]
 
+#Formats whose writer takes a wrap argument for the sequence line length:
+_WrappingFormats = ["fasta", "qual"]
 
-def write(sequences, handle, format):
+
+def write(sequences, handle, format, wrap=60):
     """Write complete set of sequences to a file.
 
      - sequences - A list (or iterator) of SeqRecord objects, or (if using
@@ -392,10 +395,33 @@ def write(sequences, handle, format):
      - handle    - File handle object to write to, or filename as string
                    (note older versions of Biopython only took a handle).
      - format    - lower case string describing the file format to write.
+     - wrap      - Optional line length for the sequence (or quality
+                   scores), only for the "fasta" and "qual" formats.
+                   Defaults to 60, use zero (or None) for no wrapping,
+                   giving a single long line per record.
 
     You should close the handle after calling this function.
 
     Returns the number of records written (as an integer).
+
+    The records are formatted in batches and each batch is passed to the
+    handle in a single write call, so for example writing a FASTA file
+    without line wrapping is both quick and simple:
+
+    >>> from Bio import SeqIO
+    >>> from StringIO import StringIO
+    >>> records = SeqIO.parse("Fasta/f002", "fasta")
+    >>> handle = StringIO()
+    >>> SeqIO.write(records, handle, "fasta", wrap=None)
+    3
+    >>> for line in handle.getvalue().splitlines():
+    ...     print len(line), line[:12] + "..."
+    101 >gi|1348912|...
+    633 CGGACCAGACGG...
+    50 >gi|1348917|...
+    413 CGGAGCCAGCGA...
+    49 >gi|1592936|...
+    471 GATCAAATCTGC...
     """
     from Bio import AlignIO
 
@@ -411,6 +437,10 @@ def write(sequences, handle, format):
         #This raised an exception in order version of Biopython
         sequences = [sequences]
 
+    if wrap != 60 and format not in _WrappingFormats:
+        raise ValueError("The wrap argument is not supported for format '%s'"
+                         % format)
+
     if format in _BinaryFormats:
         mode = 'wb'
     else:
@@ -418,7 +448,10 @@ def write(sequences, handle, format):
 
     with as_handle(handle, mode) as fp:
         #Map the file format to a writer class
-        if format in _FormatToWriter:
+        if format in _WrappingFormats:
+            writer_class = _FormatToWriter[format]
+            count = writer_class(fp, wrap=wrap).write_file(sequences)
+        elif format in _FormatToWriter:
             writer_class = _FormatToWriter[format]
             count = writer_class(fp).write_file(sequences)
         elif format in AlignIO._FormatToWriter:
@@ -490,8 +523,19 @@ def parse(handle, format, alphabet=None):
     Alpha ACCGGATGTA
     Beta AGGCTCGGTTA
 
+    If given the filename of a BGZF compressed file (blocked gzip, as made
+    by the bgzip tool from samtools, or using the Bio.bgzf module), this is
+    decompressed on the fly (for text based file formats only):
+
+    >>> for record in SeqIO.parse("Quality/example.fastq.bgz", "fastq"):
+    ...     print record.id, record.seq
+    EAS54_6_R1_2_1_413_324 CCCTTCTTGTCTTCAGCGTTTCTCC
+    EAS54_6_R1_2_1_540_792 TTGGCAGGCCAAGGCCGATGGATCA
+    EAS54_6_R1_2_1_443_348 GTTGCTTCTGGCGTGGGTGGGGGGG
+
     Use the Bio.SeqIO.read(...) function when you expect a single record
-    only.
+    only. For large files in some of the slower to parse formats (e.g.
+    GenBank or EMBL), see also the Bio.SeqIO.parse_parallel(...) function.
     """
     #NOTE - The above docstring has some raw \n characters needed
     #for the StringIO example, hense the whole docstring is in raw
@@ -515,6 +559,21 @@ def parse(handle, format, alphabet=None):
                                      isinstance(alphabet, AlphabetEncoder)):
         raise ValueError("Invalid alphabet, %s" % repr(alphabet))
 
+    if isinstance(handle, basestring) and format not in _BinaryFormats:
+        #Spot BGZF compressed files (see Bio.bgzf), not supported for
+        #binary formats like SFF since these need real file offsets
+        from Bio import bgzf
+        with open(handle, "rb") as fp:
+            magic = fp.read(4)
+        if magic == bgzf._bgzf_magic:
+            handle = bgzf.BgzfReader(handle, "r")
+            try:
+                for r in parse(handle, format, alphabet):
+                    yield r
+            finally:
+                handle.close()
+            return
+
     with as_handle(handle, mode) as fp:
         #Map the file format to a sequence iterator:
         if format in _FormatToIterator:
@@ -609,6 +668,76 @@ def read(handle, format, alphabet=None):
         raise ValueError("More than one record found in handle")
     return first
 
+def parse_parallel(filename, format, alphabet=None, processes=None,
+                   ordered=True, chunk_size=1048576):
+    """Turns a large sequence file into an iterator, parsing in parallel.
+
+     - filename - string giving name of file to be parsed (not a handle)
+     - format   - lower case string describing the file format.
+     - alphabet - optional Alphabet object, useful when the sequence type
+                  cannot be automatically inferred from the file itself
+                  (e.g. format="fasta" or "tab")
+     - processes - Optional number of worker processes, by default the
+                  number of CPUs.
+     - ordered  - Return the records in the order found in the file
+                  (default), or in the order the worker processes finish
+                  parsing them (which may be a little faster).
+     - chunk_size - Approximate number of bytes (of whole records) given
+                  to a worker process at a time.
+
+    This gives the same SeqRecord objects as the Bio.SeqIO.parse function,
+    but the file is split into chunks of whole records which are parsed in
+    separate processes using the multiprocessing module. The main process
+    finds the record boundaries using the same code as Bio.SeqIO.index(),
+    so this only makes sense for formats which are slow to parse compared
+    to finding the records, such as GenBank or EMBL files with many
+    features:
+
+    >>> from Bio import SeqIO
+    >>> for record in SeqIO.parse_parallel("GenBank/cor6_6.gb", "genbank",
+    ...                                    processes=2, chunk_size=5000):
+    ...     print record.id, len(record.features)
+    X55053.1 3
+    X62281.1 15
+    M81224.1 6
+    AJ237582.1 7
+    L31939.1 3
+    AF297471.1 4
+
+    Only sequential file formats where any run of complete records can be
+    parsed on its own are supported: "embl", "fasta", "fastq" (and its
+    variants), "genbank", "imgt", "qual", "swiss" and "tab". BGZF compressed
+    files (see Bio.bgzf) are also supported. In addition, the binary "sff"
+    and "sff-trim" formats are supported, using the read offsets in the
+    SFF file's index (if present) in which case the main process does not
+    need to scan the reads at all. Note the records are pickled to send them
+    between processes.
+    """
+    #Try and give helpful error messages:
+    if not isinstance(filename, basestring):
+        raise TypeError("Need a filename (not a handle)")
+    if not isinstance(format, basestring):
+        raise TypeError("Need a string for the file format (lower case)")
+    if not format:
+        raise ValueError("Format required (lower case string)")
+    if format != format.lower():
+        raise ValueError("Format string '%s' should be lower case" % format)
+    if alphabet is not None and not (isinstance(alphabet, Alphabet) or \
+                                     isinstance(alphabet, AlphabetEncoder)):
+        raise ValueError("Invalid alphabet, %s" % repr(alphabet))
+    if processes is not None and processes < 1:
+        raise ValueError("Number of processes should be at least one")
+    if chunk_size < 1:
+        raise ValueError("The chunk_size should be a positive integer")
+
+    import _parallel #Lazy import
+    if format not in _parallel._ChunkableFormats \
+    and format not in _parallel._SffFormats:
+        raise ValueError("Format '%s' not supported for parallel parsing" \
+                         % format)
+    return _parallel._parse_parallel(filename, format, alphabet, processes,
+                                     ordered, chunk_size)
+
 def to_dict(sequences, key_function=None):
     """Turns a sequence iterator or list into a dictionary.
 
@@ -669,7 +798,8 @@ def to_dict(sequences, key_function=None):
         d[key] = record
     return d
 
-def index(filename, format, alphabet=None, key_function=None):
+def index(filename, format, alphabet=None, key_function=None,
+          offsets_filename=None, memory_map=False, lazy_seq=False):
     """Indexes a sequence file and returns a dictionary like object.
 
      - filename - string giving name of file to be indexed
@@ -680,6 +810,13 @@ def index(filename, format, alphabet=None, key_function=None):
      - key_function - Optional callback function which when given a
                   SeqRecord identifier string should return a unique
                   key for the dictionary.
+     - offsets_filename - Optional name of a sidecar file used to save the
+                  record identifiers and file offsets, so that they can be
+                  reloaded rather than rescanning the file next time.
+     - memory_map - Optional boolean, should the file be memory mapped
+                  rather than read using a normal file handle?
+     - lazy_seq - Optional boolean, should the sequences be read from the
+                  file on demand (FASTA and GenBank only, see below)?
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -762,6 +899,57 @@ def index(filename, format, alphabet=None, key_function=None):
     to be completely parsed while building the index. Right now this is
     usually avoided.
 
+    For very large files, scanning the whole file every time your script
+    runs can take several minutes. If you give an offsets_filename, the
+    record identifiers and their offsets are saved to this file the first
+    time, and reloaded from it on later calls. The offsets file records the
+    size and modification time of the indexed file, and if these no longer
+    match (e.g. the file has been edited) it is ignored, and the file is
+    rescanned and the offsets file replaced. The offsets file holds the
+    record identifiers before any key_function is applied, so it can be
+    reused with a different key_function.
+
+    Files compressed with BGZF (blocked gzip, as made by the bgzip tool from
+    samtools, or using the Bio.bgzf module) can also be indexed, with the
+    file offsets recorded as BGZF virtual offsets. This lets you keep large
+    files compressed, while still allowing random access to the records:
+
+    >>> records = SeqIO.index("Quality/example.fastq.bgz", "fastq")
+    >>> len(records)
+    3
+    >>> print records["EAS54_6_R1_2_1_540_792"].seq
+    TTGGCAGGCCAAGGCCGATGGATCA
+
+    Plain gzip compressed files are not supported as they do not allow
+    efficient random access.
+
+    If you will be looking up a lot of records, it can be faster to set
+    memory_map=True. The file is then memory mapped (using Python's mmap
+    module) and each record is sliced out of the mapped file, rather than
+    seeking and reading via a file handle. On 32 bit systems this may not
+    be possible for very large files. BGZF compressed files are not memory
+    mapped.
+
+    If you only need part of each sequence, e.g. a region of a chromosome,
+    then with lazy_seq=True the sequence is not loaded when you access the
+    record. Instead the record's seq is a read only Seq like object which
+    knows where the sequence lines are in the file, and slicing it gives
+    another lazy sequence. The letters are only read from the file when
+    needed, e.g. when you use str(...) on a slice:
+
+    >>> records = SeqIO.index("GenBank/NC_005816.gb", "gb", lazy_seq=True)
+    >>> record = records["NC_005816.1"]
+    >>> len(record)
+    9609
+    >>> print record.seq[3000:3060]
+    TGGATGCTCTGGATGCCGACGAGCAGGCGGCCATGTGTGAACGACTGCACGAACTCGCGG
+
+    This is currently supported for FASTA and GenBank files (other formats
+    are parsed as normal). As with the samtools faidx tool, all the lines of
+    each sequence (apart from the last) must be the same length. Note that
+    the sequence is read using the index's file handle, so remains valid
+    only while the index is in use.
+
     See also: Bio.SeqIO.index_db() and Bio.SeqIO.to_dict()
     """
     #Try and give helpful error messages:
@@ -779,10 +967,14 @@ def index(filename, format, alphabet=None, key_function=None):
 
     #Map the file format to a sequence iterator:
     import _index #Lazy import
-    return _index._IndexedSeqFileDict(filename, format, alphabet, key_function)
+    if offsets_filename is not None:
+        if not isinstance(offsets_filename, basestring):
+            raise TypeError("Need a filename for the offsets file")
+    return _index._IndexedSeqFileDict(filename, format, alphabet, key_function,
+                                      offsets_filename, memory_map, lazy_seq)
 
 def index_db(index_filename, filenames=None, format=None, alphabet=None,
-               key_function=None):
+               key_function=None, processes=None, memory_map=False):
     """Index several sequence files and return a dictionary like object.
 
     The index is stored in an SQLite database rather than in memory (as in the
@@ -800,6 +992,11 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
      - key_function - Optional callback function which when given a
                   SeqRecord identifier string should return a unique
                   key for the dictionary.
+     - processes - Optional number of worker processes to use when building
+                  a new index of several files (ignored when reloading an
+                  existing index).
+     - memory_map - Optional boolean, should the files be memory mapped
+                  rather than read using normal file handles?
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -823,6 +1020,20 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
 
     In this example the two files contain 85 and 10 records respectively.
 
+    When building a new index of many files, scanning them one after another
+    can be slow. If you give a number of processes greater than one, the
+    files are scanned in parallel using the multiprocessing module, while the
+    main process inserts the results into the SQLite database (in the same
+    order, so the resulting index file is the same). Note that any
+    key_function is still applied in the main process.
+
+    Normally only a limited number of the files are kept open at once (to
+    avoid operating system limits on open file handles), which means files
+    may be repeatedly closed and reopened when looking up records spread
+    over many files. If you set memory_map=True each file is instead memory
+    mapped once (the file handle itself is then closed), and the records are
+    sliced out of the mapped files (see also the Bio.SeqIO.index function).
+
     See also: Bio.SeqIO.index() and Bio.SeqIO.to_dict()
     """
     #Try and give helpful error messages:
@@ -841,11 +1052,15 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
     if alphabet is not None and not (isinstance(alphabet, Alphabet) or \
                                      isinstance(alphabet, AlphabetEncoder)):
         raise ValueError("Invalid alphabet, %s" % repr(alphabet))
+    if processes is not None and processes < 1:
+        raise ValueError("Number of processes should be at least one")
 
     #Map the file format to a sequence iterator:
     import _index #Lazy import
     return _index._SQLiteManySeqFilesDict(index_filename, filenames, format,
-                                          alphabet, key_function)
+                                          alphabet, key_function,
+                                          processes=processes,
+                                          memory_map=memory_map)
 
 
 def convert(in_file, in_format, out_file, out_format, alphabet=None):
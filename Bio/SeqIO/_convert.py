@@ -45,39 +45,81 @@ def _embl_convert_fasta(in_handle, out_handle, alphabet=None):
     return SeqIO.write(records, out_handle, "fasta")
 
 
-def _fastq_generic(in_handle, out_handle, mapping):
-    """FASTQ helper function where can't have data loss by truncation (PRIVATE)."""
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
-    #For real speed, don't even make SeqRecord and Seq objects!
-    count = 0
-    null = chr(0)
-    for title, seq, old_qual in FastqGeneralIterator(in_handle):
-        count += 1
-        #map the qual...
-        qual = old_qual.translate(mapping)
-        if null in qual:
-            raise ValueError("Invalid character in quality string")
-        out_handle.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
-    return count
+def _imgt_convert_fasta(in_handle, out_handle, alphabet=None):
+    """Fast IMGT to FASTA (PRIVATE)."""
+    #We don't need to parse the features...
+    from Bio.SeqIO.InsdcIO import _ImgtScanner
+    records = _ImgtScanner().parse_records(in_handle, do_features=False)
+    #For FASTA output we can ignore the alphabet too
+    return SeqIO.write(records, out_handle, "fasta")
 
-    
-def _fastq_generic2(in_handle, out_handle, mapping, truncate_char, truncate_msg):
-    """FASTQ helper function where there could be data loss by truncation (PRIVATE)."""
-    from Bio.SeqIO.QualityIO import FastqGeneralIterator
+
+def _genbank_convert_tab(in_handle, out_handle, alphabet=None):
+    """Fast GenBank to simple tabbed conversion (PRIVATE)."""
+    #We don't need to parse the features...
+    from Bio.GenBank.Scanner import GenBankScanner
+    records = GenBankScanner().parse_records(in_handle, do_features=False)
+    #For tabbed output we can ignore the alphabet too
+    return SeqIO.write(records, out_handle, "tab")
+
+
+def _embl_convert_tab(in_handle, out_handle, alphabet=None):
+    """Fast EMBL to simple tabbed conversion (PRIVATE)."""
+    #We don't need to parse the features...
+    from Bio.GenBank.Scanner import EmblScanner
+    records = EmblScanner().parse_records(in_handle, do_features=False)
+    #For tabbed output we can ignore the alphabet too
+    return SeqIO.write(records, out_handle, "tab")
+
+
+def _imgt_convert_tab(in_handle, out_handle, alphabet=None):
+    """Fast IMGT to simple tabbed conversion (PRIVATE)."""
+    #We don't need to parse the features...
+    from Bio.SeqIO.InsdcIO import _ImgtScanner
+    records = _ImgtScanner().parse_records(in_handle, do_features=False)
+    #For tabbed output we can ignore the alphabet too
+    return SeqIO.write(records, out_handle, "tab")
+
+
+def _batches(iterator, batch_size=1000):
+    """Yield lists of up to batch_size items from an iterator (PRIVATE)."""
+    batch = []
+    for item in iterator:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _fastq_generic(in_handle, out_handle, in_format, out_format):
+    """FASTQ helper function for converting between FASTQ variants (PRIVATE).
+
+    The quality strings for a batch of reads are converted in one go using
+    a translation table (see Bio.SeqIO.QualityIO.convert_fastq_quality),
+    which checks for invalid characters, and gives a warning if any scores
+    had to be truncated (once per batch). Each batch of reads is written in
+    one go. If a batch has an invalid quality string, the reads before it
+    are still written before the exception is raised.
+    """
+    from Bio.SeqIO.QualityIO import FastqGeneralIterator, convert_fastq_quality
     #For real speed, don't even make SeqRecord and Seq objects!
     count = 0
-    null = chr(0)
-    for title, seq, old_qual in FastqGeneralIterator(in_handle):
-        count += 1
-        #map the qual...
-        qual = old_qual.translate(mapping)
-        if null in qual:
-            raise ValueError("Invalid character in quality string")
-        if truncate_char in qual:
-            qual = qual.replace(truncate_char, chr(126))
-            import warnings
-            warnings.warn(truncate_msg)
-        out_handle.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+    for reads in _batches(FastqGeneralIterator(in_handle)):
+        try:
+            quals = convert_fastq_quality([qual for title, seq, qual in reads],
+                                          in_format, out_format)
+        except ValueError:
+            #Write the reads one by one until we reach the bad one
+            for title, seq, qual in reads:
+                qual = convert_fastq_quality(qual, in_format, out_format)
+                out_handle.write("@%s\n%s\n+\n%s\n" % (title, seq, qual))
+            raise
+        out_handle.write("".join(["@%s\n%s\n+\n%s\n" % (title, seq, qual) \
+                                  for (title, seq, old), qual \
+                                  in zip(reads, quals)]))
+        count += len(reads)
     return count
 
 
@@ -90,12 +132,7 @@ def _fastq_sanger_convert_fastq_sanger(in_handle, out_handle, alphabet=None):
     Avoids creating SeqRecord and Seq objects in order to speed up this
     conversion.
     """
-    #Map unexpected chars to null
-    mapping = "".join([chr(0) for ascii in range(0, 33)] \
-                     +[chr(ascii) for ascii in range(33, 127)] \
-                     +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic(in_handle, out_handle, mapping)
+    return _fastq_generic(in_handle, out_handle, "fastq-sanger", "fastq-sanger")
 
 
 def _fastq_solexa_convert_fastq_solexa(in_handle, out_handle, alphabet=None):
@@ -106,12 +143,7 @@ def _fastq_solexa_convert_fastq_solexa(in_handle, out_handle, alphabet=None):
     Avoids creating SeqRecord and Seq objects in order to speed up this
     conversion.
     """
-    #Map unexpected chars to null
-    mapping = "".join([chr(0) for ascii in range(0, 59)] \
-                     +[chr(ascii) for ascii in range(59, 127)] \
-                     +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic(in_handle, out_handle, mapping)
+    return _fastq_generic(in_handle, out_handle, "fastq-solexa", "fastq-solexa")
 
 
 def _fastq_illumina_convert_fastq_illumina(in_handle, out_handle, alphabet=None):
@@ -122,12 +154,8 @@ def _fastq_illumina_convert_fastq_illumina(in_handle, out_handle, alphabet=None)
     Avoids creating SeqRecord and Seq objects in order to speed up this
     conversion.
     """
-    #Map unexpected chars to null
-    mapping = "".join([chr(0) for ascii in range(0, 64)] \
-                     +[chr(ascii) for ascii in range(64,127)] \
-                     +[chr(0) for ascii in range(127,256)])
-    assert len(mapping)==256
-    return _fastq_generic(in_handle, out_handle, mapping)
+    return _fastq_generic(in_handle, out_handle,
+                          "fastq-illumina", "fastq-illumina")
 
 
 def _fastq_illumina_convert_fastq_sanger(in_handle, out_handle, alphabet=None):
@@ -136,12 +164,8 @@ def _fastq_illumina_convert_fastq_sanger(in_handle, out_handle, alphabet=None):
     Avoids creating SeqRecord and Seq objects in order to speed up this
     conversion.
     """
-    #Map unexpected chars to null
-    mapping = "".join([chr(0) for ascii in range(0, 64)] \
-                     +[chr(33+q) for q in range(0, 62+1)] \
-                     +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic(in_handle, out_handle, mapping)
+    return _fastq_generic(in_handle, out_handle,
+                          "fastq-illumina", "fastq-sanger")
 
 
 def _fastq_sanger_convert_fastq_illumina(in_handle, out_handle, alphabet=None):
@@ -151,15 +175,8 @@ def _fastq_sanger_convert_fastq_illumina(in_handle, out_handle, alphabet=None):
     conversion. Will issue a warning if the scores had to be truncated at 62
     (maximum possible in the Illumina 1.3+ FASTQ format)
     """
-    #Map unexpected chars to null
-    trunc_char = chr(1)
-    mapping = "".join([chr(0) for ascii in range(0, 33)] \
-                     +[chr(64+q) for q in range(0, 62+1) ] \
-                     +[trunc_char for ascii in range(96,127)] \
-                     +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic2(in_handle, out_handle, mapping, trunc_char,
-                          "Data loss - max PHRED quality 62 in Illumina 1.3+ FASTQ")
+    return _fastq_generic(in_handle, out_handle,
+                          "fastq-sanger", "fastq-illumina")
 
 
 def _fastq_solexa_convert_fastq_sanger(in_handle, out_handle, alphabet=None):
@@ -168,14 +185,7 @@ def _fastq_solexa_convert_fastq_sanger(in_handle, out_handle, alphabet=None):
     Avoids creating SeqRecord and Seq objects in order to speed up this
     conversion.
     """
-    #Map unexpected chars to null
-    from Bio.SeqIO.QualityIO import phred_quality_from_solexa
-    mapping = "".join([chr(0) for ascii in range(0, 59)] \
-                     +[chr(33+int(round(phred_quality_from_solexa(q)))) \
-                       for q in range(-5, 62+1)]\
-                      +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic(in_handle, out_handle, mapping)
+    return _fastq_generic(in_handle, out_handle, "fastq-solexa", "fastq-sanger")
 
 def _fastq_sanger_convert_fastq_solexa(in_handle, out_handle, alphabet=None):
     """Fast Sanger FASTQ to Solexa FASTQ conversion (PRIVATE).
@@ -184,17 +194,7 @@ def _fastq_sanger_convert_fastq_solexa(in_handle, out_handle, alphabet=None):
     conversion. Will issue a warning if the scores had to be truncated at 62
     (maximum possible in the Solexa FASTQ format)
     """
-    #Map unexpected chars to null
-    from Bio.SeqIO.QualityIO import solexa_quality_from_phred
-    trunc_char = chr(1)
-    mapping = "".join([chr(0) for ascii in range(0, 33)] \
-                     +[chr(64+int(round(solexa_quality_from_phred(q)))) \
-                       for q in range(0, 62+1)] \
-                     +[trunc_char for ascii in range(96, 127)] \
-                     +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic2(in_handle, out_handle, mapping, trunc_char,
-                          "Data loss - max Solexa quality 62 in Solexa FASTQ")
+    return _fastq_generic(in_handle, out_handle, "fastq-sanger", "fastq-solexa")
 
 
 def _fastq_solexa_convert_fastq_illumina(in_handle, out_handle, alphabet=None):
@@ -203,14 +203,8 @@ def _fastq_solexa_convert_fastq_illumina(in_handle, out_handle, alphabet=None):
     Avoids creating SeqRecord and Seq objects in order to speed up this
     conversion.
     """
-    #Map unexpected chars to null
-    from Bio.SeqIO.QualityIO import phred_quality_from_solexa
-    mapping = "".join([chr(0) for ascii in range(0, 59)] \
-                     +[chr(64+int(round(phred_quality_from_solexa(q)))) \
-                       for q in range(-5, 62+1)]\
-                      +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic(in_handle, out_handle, mapping)
+    return _fastq_generic(in_handle, out_handle,
+                          "fastq-solexa", "fastq-illumina")
 
 
 def _fastq_illumina_convert_fastq_solexa(in_handle, out_handle, alphabet=None):
@@ -219,15 +213,8 @@ def _fastq_illumina_convert_fastq_solexa(in_handle, out_handle, alphabet=None):
     Avoids creating SeqRecord and Seq objects in order to speed up this
     conversion.
     """
-    #Map unexpected chars to null
-    from Bio.SeqIO.QualityIO import solexa_quality_from_phred
-    trunc_char = chr(1)
-    mapping = "".join([chr(0) for ascii in range(0, 64)] \
-                     +[chr(64+int(round(solexa_quality_from_phred(q)))) \
-                       for q in range(0, 62+1)] \
-                     +[chr(0) for ascii in range(127, 256)])
-    assert len(mapping)==256
-    return _fastq_generic(in_handle, out_handle, mapping)
+    return _fastq_generic(in_handle, out_handle,
+                          "fastq-illumina", "fastq-solexa")
 
 
 def _fastq_convert_fasta(in_handle, out_handle, alphabet=None):
@@ -242,12 +229,16 @@ def _fastq_convert_fasta(in_handle, out_handle, alphabet=None):
     from Bio.SeqIO.QualityIO import FastqGeneralIterator
     #For real speed, don't even make SeqRecord and Seq objects!
     count = 0
-    for title, seq, qual in FastqGeneralIterator(in_handle):
-        count += 1
-        out_handle.write(">%s\n" % title)
-        #Do line wrapping
-        for i in range(0, len(seq), 60):
-            out_handle.write(seq[i:i+60] + "\n")
+    for reads in _batches(FastqGeneralIterator(in_handle)):
+        lines = []
+        for title, seq, qual in reads:
+            lines.append(">" + title)
+            #Do line wrapping
+            for i in range(0, len(seq), 60):
+                lines.append(seq[i:i+60])
+        lines.append("")
+        out_handle.write("\n".join(lines))
+        count += len(reads)
     return count
 
 def _fastq_convert_tab(in_handle, out_handle, alphabet=None):
@@ -262,9 +253,10 @@ def _fastq_convert_tab(in_handle, out_handle, alphabet=None):
     from Bio.SeqIO.QualityIO import FastqGeneralIterator
     #For real speed, don't even make SeqRecord and Seq objects!
     count = 0
-    for title, seq, qual in FastqGeneralIterator(in_handle):
-        count += 1
-        out_handle.write("%s\t%s\n" % (title.split(None, 1)[0], seq))
+    for reads in _batches(FastqGeneralIterator(in_handle)):
+        out_handle.write("".join(["%s\t%s\n" % (title.split(None, 1)[0], seq) \
+                                  for title, seq, qual in reads]))
+        count += len(reads)
     return count
 
 def _fastq_convert_qual(in_handle, out_handle, mapping):
@@ -276,25 +268,29 @@ def _fastq_convert_qual(in_handle, out_handle, mapping):
     from Bio.SeqIO.QualityIO import FastqGeneralIterator
     #For real speed, don't even make SeqRecord and Seq objects!
     count = 0
-    for title, seq, qual in FastqGeneralIterator(in_handle):
-        count += 1
-        out_handle.write(">%s\n" % title)
-        #map the qual...
-        try:
-            qualities_strs = [mapping[ascii] for ascii in qual]
-        except KeyError:
-            raise ValueError("Invalid character in quality string")
-        data = " ".join(qualities_strs)
-        while True:
-            if len(data) <= 60:
-                out_handle.write(data + "\n")
-                break
-            else:
-                #By construction there must be spaces in the first 60 chars
-                #(unless we have 60 digit or higher quality scores!)
-                i = data.rfind(" ", 0, 60)
-                out_handle.write(data[:i] + "\n")
-                data = data[i+1:]
+    for reads in _batches(FastqGeneralIterator(in_handle)):
+        lines = []
+        for title, seq, qual in reads:
+            lines.append(">" + title)
+            #map the qual...
+            try:
+                qualities_strs = [mapping[ascii] for ascii in qual]
+            except KeyError:
+                raise ValueError("Invalid character in quality string")
+            data = " ".join(qualities_strs)
+            while True:
+                if len(data) <= 60:
+                    lines.append(data)
+                    break
+                else:
+                    #By construction there must be spaces in the first 60 chars
+                    #(unless we have 60 digit or higher quality scores!)
+                    i = data.rfind(" ", 0, 60)
+                    lines.append(data[:i])
+                    data = data[i+1:]
+        lines.append("")
+        out_handle.write("\n".join(lines))
+        count += len(reads)
     return count
 
     
@@ -323,6 +319,11 @@ _converter = {
     ("genbank", "fasta") : _genbank_convert_fasta,
     ("gb", "fasta") : _genbank_convert_fasta,
     ("embl", "fasta") : _embl_convert_fasta,
+    ("imgt", "fasta") : _imgt_convert_fasta,
+    ("genbank", "tab") : _genbank_convert_tab,
+    ("gb", "tab") : _genbank_convert_tab,
+    ("embl", "tab") : _embl_convert_tab,
+    ("imgt", "tab") : _imgt_convert_tab,
     ("fastq", "fasta") : _fastq_convert_fasta,
     ("fastq-sanger", "fasta") : _fastq_convert_fasta,
     ("fastq-solexa", "fasta") : _fastq_convert_fasta,
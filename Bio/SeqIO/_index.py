@@ -29,6 +29,7 @@ try:
 except ImportError:
     from UserDict import DictMixin as _dict_base
 import re
+import mmap
 import itertools
 from StringIO import StringIO
 
@@ -46,6 +47,71 @@ from Bio._py3k import _bytes_to_string, _as_bytes, _as_string
 
 from Bio import SeqIO
 from Bio import Alphabet
+from Bio import bgzf
+from Bio.Seq import Seq, UnknownSeq
+
+_offsets_magic = "#Biopython SeqIO.index offsets v1"
+
+def _offsets_header(filename, format):
+    """Header line for an offsets file, with the file size and date (PRIVATE).
+
+    The modification time is recorded using repr to keep full precision.
+    """
+    return "%s\t%s\t%i\t%r\n" % (_offsets_magic, format,
+                                  os.path.getsize(filename),
+                                  os.path.getmtime(filename))
+
+def _load_offsets(offsets_filename, filename, format):
+    """Load the record identifiers and offsets from a sidecar file (PRIVATE).
+
+    Returns a list of (identifier, offset) tuples, or None if the offsets
+    file is missing, is for another format, or if the size or modification
+    time of the sequence file has changed since it was written.
+    """
+    if not os.path.isfile(offsets_filename):
+        return None
+    handle = open(offsets_filename, "r")
+    try:
+        if handle.readline() != _offsets_header(filename, format):
+            return None
+        id_offsets = []
+        for line in handle:
+            key, offset = line.rstrip("\n").rsplit("\t", 1)
+            id_offsets.append((key, int(offset)))
+    except ValueError:
+        #Truncated or otherwise corrupt, treat it as out of date
+        return None
+    finally:
+        handle.close()
+    return id_offsets
+
+def _save_offsets(offsets_filename, filename, format, random_access_proxy):
+    """Scan the sequence file and save the identifiers and offsets (PRIVATE).
+
+    Returns a list of (identifier, offset) tuples. The offsets are written
+    to a temporary file which is then renamed, so that an interrupted scan
+    will not leave behind an incomplete offsets file.
+    """
+    header = _offsets_header(filename, format)
+    id_offsets = [(k,o) for (k,o,l) in random_access_proxy]
+    tmp_filename = offsets_filename + ".tmp"
+    handle = open(tmp_filename, "w")
+    try:
+        handle.write(header)
+        for key, offset in id_offsets:
+            if "\n" in key:
+                raise ValueError("Can't save key %r to an offsets file" % key)
+            handle.write("%s\t%i\n" % (key, offset))
+        handle.close()
+    except:
+        handle.close()
+        os.remove(tmp_filename)
+        raise
+    if os.path.isfile(offsets_filename):
+        #Needed on Windows where rename won't replace an existing file
+        os.remove(offsets_filename)
+    os.rename(tmp_filename, offsets_filename)
+    return id_offsets
 
 class _IndexedSeqFileDict(_dict_base):
     """Read only dictionary interface to a sequential sequence file.
@@ -66,24 +132,46 @@ class _IndexedSeqFileDict(_dict_base):
     NCBI style FASTA identifiers, and extract the GI number to use
     as the dictionary key.
 
+    Optionally the record identifiers and offsets can be saved to (and
+    reloaded from) a simple tab separated sidecar file, which records the
+    indexed file's size and modification time. If these no longer match
+    the file is rescanned and the sidecar file replaced.
+
+    Optionally the file can be memory mapped, rather than using a normal
+    file handle (see the SeqFileRandomAccess class).
+
+    Optionally the sequences of the SeqRecord objects can be loaded on
+    demand from the file (currently for FASTA and GenBank files), so that
+    taking a slice only reads that part of the sequence.
+
     Note that this dictionary is essentially read only. You cannot
     add or change values, pop values, nor clear the dictionary.
     """
-    def __init__(self, filename, format, alphabet, key_function):
-        #Use key_function=None for default value
+    def __init__(self, filename, format, alphabet, key_function,
+                 offsets_filename=None, memory_map=False, lazy_seq=False):
+        #Use key_function=None and offsets_filename=None for default values
         try:
             proxy_class = _FormatToRandomAccess[format]
         except KeyError:
             raise ValueError("Unsupported format '%s'" % format)
-        random_access_proxy = proxy_class(filename, format, alphabet)
+        random_access_proxy = proxy_class(filename, format, alphabet,
+                                          memory_map)
         self._proxy = random_access_proxy
         self._key_function = key_function
-        if key_function:
-            offset_iter = ((key_function(k),o,l) for (k,o,l) in random_access_proxy)
+        self._offsets_filename = offsets_filename
+        self._lazy_seq = lazy_seq
+        if offsets_filename:
+            offset_iter = _load_offsets(offsets_filename, filename, format)
+            if offset_iter is None:
+                #Missing or out of date, scan the file and save the offsets
+                offset_iter = _save_offsets(offsets_filename, filename, format,
+                                            random_access_proxy)
         else:
-            offset_iter = random_access_proxy
+            offset_iter = ((k,o) for (k,o,l) in random_access_proxy)
+        if key_function:
+            offset_iter = ((key_function(k),o) for (k,o) in offset_iter)
         offsets = {}
-        for key, offset, length in offset_iter:
+        for key, offset in offset_iter:
             #Note - we don't store the length because I want to minimise the
             #memory requirements. With the SQLite backend the length is kept
             #and is used to speed up the get_raw method (by about 3 times).
@@ -95,9 +183,16 @@ class _IndexedSeqFileDict(_dict_base):
         self._offsets = offsets
     
     def __repr__(self):
-        return "SeqIO.index(%r, %r, alphabet=%r, key_function=%r)" \
-               % (self._proxy._handle.name, self._proxy._format,
-                  self._proxy._alphabet, self._key_function)
+        extra = ""
+        if self._offsets_filename:
+            extra += ", offsets_filename=%r" % self._offsets_filename
+        if self._proxy._memory_map:
+            extra += ", memory_map=True"
+        if self._lazy_seq:
+            extra += ", lazy_seq=True"
+        return "SeqIO.index(%r, %r, alphabet=%r, key_function=%r%s)" \
+               % (self._proxy._filename, self._proxy._format,
+                  self._proxy._alphabet, self._key_function, extra)
 
     def __str__(self):
         if self:
@@ -180,7 +275,10 @@ class _IndexedSeqFileDict(_dict_base):
     def __getitem__(self, key):
         """x.__getitem__(y) <==> x[y]"""
         #Pass the offset to the proxy
-        record = self._proxy.get(self._offsets[key])
+        if self._lazy_seq:
+            record = self._proxy.get_lazy(self._offsets[key])
+        else:
+            record = self._proxy.get(self._offsets[key])
         if self._key_function:
             key2 = self._key_function(record.id)
         else:
@@ -209,6 +307,85 @@ class _IndexedSeqFileDict(_dict_base):
         #Pass the offset to the proxy
         return self._proxy.get_raw(self._offsets[key])
 
+    def get_many(self, keys, file_order=False):
+        """Iterate over the SeqRecord objects for many keys.
+
+        Rather than looking up each key in turn, all the offsets are found
+        first and the records are then read in the order they appear in the
+        file(s), which avoids random access seeking back and forth. By
+        default the records are returned in the order of the keys given
+        (working in batches), but with file_order=True they are returned in
+        the order they are found in the file(s), once for each unique key.
+
+        If any key is not found, a KeyError exception is raised before any
+        records are returned (for that batch).
+        """
+        key_function = self._key_function
+        for key, record in self._iter_many(keys, file_order, False):
+            if key_function:
+                key2 = key_function(record.id)
+            else:
+                key2 = record.id
+            if key != key2:
+                raise ValueError("Key did not match (%s vs %s)" % (key, key2))
+            yield record
+
+    def get_raw_many(self, keys, file_order=False):
+        """Iterate over the raw records for many keys (see get_many).
+
+        Note that on Python 3 bytes strings are returned, not typical
+        unicode strings.
+
+        NOTE - This functionality is not supported for every file format.
+        """
+        for key, raw in self._iter_many(keys, file_order, True):
+            yield raw
+
+    def _iter_many(self, keys, file_order, raw, batch_size=10000):
+        """Iterate over (key, record or raw string) tuples (PRIVATE).
+
+        Looks up the locations of a batch of keys, sorts them by file and
+        offset, and reads them in that order. If not using file_order,
+        the records are then returned in the order of the keys given.
+        """
+        keys = iter(keys)
+        while True:
+            if file_order:
+                #Need all the keys at once
+                batch = list(keys)
+            else:
+                batch = list(itertools.islice(keys, batch_size))
+            if not batch:
+                break
+            locations = self._locate_many(set(batch))
+            locations.sort()
+            if file_order:
+                for file_number, offset, length, key in locations:
+                    yield key, self._fetch(file_number, offset, length, raw)
+                break
+            results = {}
+            for file_number, offset, length, key in locations:
+                results[key] = self._fetch(file_number, offset, length, raw)
+            for key in batch:
+                yield key, results[key]
+
+    def _locate_many(self, keys):
+        """Returns a list of (file number, offset, length, key) tuples (PRIVATE).
+
+        The length is not stored in memory, so is given as zero.
+        """
+        offsets = self._offsets
+        return [(0, offsets[key], 0, key) for key in keys]
+
+    def _fetch(self, file_number, offset, length, raw):
+        """Get the SeqRecord or raw string at this offset (PRIVATE)."""
+        if raw:
+            return self._proxy.get_raw(offset)
+        elif self._lazy_seq:
+            return self._proxy.get_lazy(offset)
+        else:
+            return self._proxy.get(offset)
+
     def __setitem__(self, key, value):
         """Would allow setting or replacing records, but not implemented."""
         raise NotImplementedError("An indexed a sequence file is read only.")
@@ -242,6 +419,21 @@ class _IndexedSeqFileDict(_dict_base):
                                   "support this.")
 
 
+def _scan_offsets(args):
+    """Scan a sequence file for the record keys, offsets and lengths (PRIVATE).
+
+    Takes a tuple of the filename, format and alphabet (so that it can be
+    used with multiprocessing's Pool.imap) and returns a list of (key,
+    offset, length) tuples from the format's random access proxy.
+    """
+    filename, format, alphabet = args
+    random_access_proxy = _FormatToRandomAccess[format](filename, format,
+                                                        alphabet)
+    try:
+        return list(random_access_proxy)
+    finally:
+        random_access_proxy._handle.close()
+
 class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     """Read only dictionary interface to many sequential sequence files.
 
@@ -251,10 +443,12 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     
     There are OS limits on the number of files that can be open at once,
     so a pool are kept. If a record is required from a closed file, then
-    one of the open handles is closed first.
+    one of the open handles is closed first. This limit does not apply
+    when the files are memory mapped, as the file handle is closed once
+    the file has been mapped.
     """
     def __init__(self, index_filename, filenames, format, alphabet,
-                 key_function, max_open=10):
+                 key_function, max_open=10, processes=None, memory_map=False):
         random_access_proxies = {}
         #TODO? - Don't keep filename list in memory (just in DB)?
         #Should save a chunk of memory if dealing with 1000s of files.
@@ -338,27 +532,69 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             con.execute("CREATE TABLE file_data (file_number INTEGER, name TEXT);")
             con.execute("CREATE TABLE offset_data (key TEXT, file_number INTEGER, offset INTEGER, length INTEGER);")
             count = 0
-            for i, filename in enumerate(filenames):
-                con.execute("INSERT INTO file_data (file_number, name) VALUES (?,?);",
-                            (i, filename))
-                random_access_proxy = proxy_class(filename, format, alphabet)
-                if key_function:
-                    offset_iter = ((key_function(k),i,o,l) for (k,o,l) in random_access_proxy)
-                else:
-                    offset_iter = ((k,i,o,l) for (k,o,l) in random_access_proxy)
-                while True:
-                    batch = list(itertools.islice(offset_iter, 100))
-                    if not batch: break
-                    #print "Inserting batch of %i offsets, %s ... %s" \
-                    # % (len(batch), batch[0][0], batch[-1][0])
-                    con.executemany("INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
-                                    batch)
-                    con.commit()
-                    count += len(batch)
-                if len(random_access_proxies) < max_open:
-                    random_access_proxies[i] = random_access_proxy
-                else:
-                    random_access_proxy._handle.close()
+            pool = None
+            if processes and processes > 1 and len(filenames) > 1:
+                #Scan the files in worker processes, but keep the order
+                #of the inserts the same so the database is the same
+                import multiprocessing
+                pool = multiprocessing.Pool(processes)
+                scanned = pool.imap(_scan_offsets,
+                                    [(filename, format, alphabet) \
+                                     for filename in filenames])
+            try:
+                for i, filename in enumerate(filenames):
+                    con.execute("INSERT INTO file_data (file_number, name) VALUES (?,?);",
+                                (i, filename))
+                    if pool is not None:
+                        offsets = scanned.next()
+                        if key_function:
+                            offsets = [(key_function(k),i,o,l) for (k,o,l) in offsets]
+                        else:
+                            offsets = [(k,i,o,l) for (k,o,l) in offsets]
+                        #One large transaction for all the files, which
+                        #is committed once they have all been scanned
+                        con.executemany("INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
+                                        offsets)
+                        count += len(offsets)
+                        random_access_proxy = proxy_class(filename, format,
+                                                          alphabet, memory_map)
+                        if random_access_proxy._memory_map \
+                        or _count_unmapped(random_access_proxies) < max_open:
+                            random_access_proxies[i] = random_access_proxy
+                        else:
+                            random_access_proxy._handle.close()
+                        continue
+                    random_access_proxy = proxy_class(filename, format,
+                                                      alphabet, memory_map)
+                    if key_function:
+                        offset_iter = ((key_function(k),i,o,l) for (k,o,l) in random_access_proxy)
+                    else:
+                        offset_iter = ((k,i,o,l) for (k,o,l) in random_access_proxy)
+                    while True:
+                        batch = list(itertools.islice(offset_iter, 100))
+                        if not batch: break
+                        #print "Inserting batch of %i offsets, %s ... %s" \
+                        # % (len(batch), batch[0][0], batch[-1][0])
+                        con.executemany("INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
+                                        batch)
+                        con.commit()
+                        count += len(batch)
+                    if random_access_proxy._memory_map \
+                    or _count_unmapped(random_access_proxies) < max_open:
+                        random_access_proxies[i] = random_access_proxy
+                    else:
+                        random_access_proxy._handle.close()
+            except:
+                if pool is not None:
+                    pool.terminate()
+                for proxy in random_access_proxies.itervalues():
+                    proxy._handle.close()
+                con.close()
+                raise
+            if pool is not None:
+                con.commit()
+                pool.close()
+                pool.join()
             self._length = count
             #print "About to index %i entries" % count
             try:
@@ -376,11 +612,16 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             #print "Index created"
         self._proxies = random_access_proxies
         self._max_open = max_open
+        self._memory_map = memory_map
         self._index_filename = index_filename
         self._alphabet = alphabet
         self._key_function = key_function
     
     def __repr__(self):
+        if self._memory_map:
+            return "SeqIO.index_db(%r, filenames=%r, format=%r, alphabet=%r, key_function=%r, memory_map=True)" \
+                   % (self._index_filename, self._filenames, self._format,
+                      self._alphabet, self._key_function)
         return "SeqIO.index_db(%r, filenames=%r, format=%r, alphabet=%r, key_function=%r)" \
                % (self._index_filename, self._filenames, self._format,
                   self._alphabet, self._key_function)
@@ -418,15 +659,7 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         if file_number in proxies:
             record = proxies[file_number].get(offset)
         else:
-            if len(proxies) >= self._max_open:
-                #Close an old handle...
-                proxies.popitem()[1]._handle.close()
-            #Open a new handle...
-            proxy = _FormatToRandomAccess[self._format]( \
-                        self._filenames[file_number],
-                        self._format, self._alphabet)
-            record = proxy.get(offset)
-            proxies[file_number] = proxy
+            record = self._open_proxy(file_number).get(offset)
         if self._key_function:
             key2 = self._key_function(record.id)
         else:
@@ -457,32 +690,70 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
                                 (key,)).fetchone()
         if not row: raise KeyError
         file_number, offset, length = row
-        proxies = self._proxies
-        if file_number in proxies:
-            if length:
-                #Shortcut if we have the length
-                h = proxies[file_number]._handle
-                h.seek(offset)
-                return h.read(length)
-            else:
-                return proxies[file_number].get_raw(offset)
+        return self._fetch(file_number, offset, length, True)
+
+    def _locate_many(self, keys):
+        """Returns a list of (file number, offset, length, key) tuples (PRIVATE).
+
+        Uses one query for each chunk of keys (SQLite limits the number
+        of parameters in a single query).
+        """
+        keys = list(keys)
+        locations = []
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i+500]
+            rows = self._con.execute("SELECT file_number, offset, length, key "
+                                     "FROM offset_data WHERE key IN (%s);" \
+                                     % ",".join("?" * len(chunk)),
+                                     chunk).fetchall()
+            if len(rows) != len(chunk):
+                found = set(str(row[3]) for row in rows)
+                for key in chunk:
+                    if key not in found:
+                        raise KeyError(key)
+            locations.extend((file_number, offset, length, str(key)) \
+                             for (file_number, offset, length, key) in rows)
+        return locations
+
+    def _fetch(self, file_number, offset, length, raw):
+        """Get the SeqRecord or raw string at this offset (PRIVATE)."""
+        try:
+            proxy = self._proxies[file_number]
+        except KeyError:
+            proxy = self._open_proxy(file_number)
+        if not raw:
+            return proxy.get(offset)
+        elif length:
+            #Shortcut if we have the length
+            h = proxy._handle
+            if proxy._memory_map:
+                return h[offset:offset+length]
+            h.seek(offset)
+            return h.read(length)
         else:
-            #This code is duplicated from __getitem__ to avoid a function call
-            if len(proxies) >= self._max_open:
-                #Close an old handle...
-                proxies.popitem()[1]._handle.close()
-            #Open a new handle...
-            proxy = _FormatToRandomAccess[self._format]( \
-                        self._filenames[file_number],
-                        self._format, self._alphabet)
-            proxies[file_number] = proxy
-            if length:
-                #Shortcut if we have the length
-                h = proxy._handle
-                h.seek(offset)
-                return h.read(length)
-            else:
-                return proxy.get_raw(offset)
+            return proxy.get_raw(offset)
+
+    def _open_proxy(self, file_number):
+        """Open and return the random access proxy for a file (PRIVATE).
+
+        Memory mapped files don't count towards max_open, but any other
+        handles do (including BGZF files, which are never memory mapped),
+        so if needed an old unmapped handle is closed first.
+        """
+        proxies = self._proxies
+        if _count_unmapped(proxies) >= self._max_open:
+            #Close an old handle...
+            for old_number, old_proxy in proxies.items():
+                if not old_proxy._memory_map:
+                    del proxies[old_number]
+                    old_proxy._handle.close()
+                    break
+        #Open a new handle...
+        proxy = _FormatToRandomAccess[self._format]( \
+                    self._filenames[file_number],
+                    self._format, self._alphabet, self._memory_map)
+        proxies[file_number] = proxy
+        return proxy
 
     def close(self):
         """Close any open file handles."""
@@ -491,11 +762,169 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             proxies.popitem()[1]._handle.close()
         
 
+def _count_unmapped(proxies):
+    """Count the proxies whose handles are not memory mapped (PRIVATE)."""
+    count = 0
+    for proxy in proxies.itervalues():
+        if not proxy._memory_map:
+            count += 1
+    return count
+
 ##############################################################################
 
+class _MappedFile(mmap.mmap):
+    """Read only memory mapped file, with a name attribute (PRIVATE).
+
+    This offers the same seek, tell, read and readline methods as a file
+    handle opened in binary mode, but also supports slicing and searching
+    (e.g. with a regular expression) without reading the file into memory.
+    """
+    pass
+
+def _open_for_random_access(filename, memory_map=False):
+    """Open a file in binary mode, spot if it is BGZF format etc (PRIVATE).
+
+    This funcationality is used by the Bio.SeqIO index methods. BGZF
+    compressed files are opened using a bgzf.BgzfReader, in which case
+    the offsets used are BGZF virtual offsets (see the Bio.bgzf module).
+    Plain gzip compressed files are not supported.
+
+    If memory_map is true, other files are memory mapped and returned as a
+    _MappedFile (except empty files which cannot be mapped). The file handle
+    itself is closed once the file is mapped (the mapping remains valid), so
+    this does not use up a file handle.
+    """
+    handle = open(filename, "rb")
+    magic = handle.read(4)
+    handle.seek(0)
+    if magic == bgzf._bgzf_magic:
+        return bgzf.BgzfReader(mode="rb", fileobj=handle)
+    elif magic[:2] == _as_bytes("\x1f\x8b"):
+        handle.close()
+        raise ValueError("Plain gzip compressed files are not supported "
+                         "for indexing, only BGZF compressed files. Try "
+                         "using bgzip from samtools to recompress %s" \
+                         % filename)
+    if not memory_map or not magic:
+        return handle
+    try:
+        mapped = _MappedFile(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        handle.close()
+    mapped.name = filename
+    return mapped
+
+#Characters which can appear between the letters of a sequence in a flat
+#file (line breaks, spaces, and the GenBank style position numbers), which
+#are removed when loading part of the sequence:
+_seq_skip_chars = "0123456789 \t\r\n"
+_seq_identity = "".join(chr(i) for i in range(256))
+
+class _IndexedFileSeq(Seq):
+    """Read only sequence, loaded on demand from an indexed file (PRIVATE).
+
+    This is used by Bio.SeqIO.index(..., lazy_seq=True) and is similar
+    to the DBSeq class in BioSQL. Rather than holding the sequence as a
+    string, it records where the sequence lines start in the file, and the
+    line layout (assumed to be the same for all but the last line, as for
+    the samtools faidx tool). Taking a slice gives another lazy sequence,
+    and the letters are only read from the file when needed (e.g. via str,
+    or by indexing a single letter). Only the bytes actually needed are
+    read from the file.
+
+    The layout is a tuple of the file offset of the first sequence line,
+    the number of bytes in a full line (including the line break), the
+    number of letters in a full line, the number of bytes before the first
+    letter in each line, and the number of letters in each block and the
+    number of bytes between blocks (e.g. GenBank files use blocks of ten
+    letters separated by a space).
+    """
+    def __init__(self, handle, layout, alphabet, start, length, upper=False):
+        self._handle = handle
+        self._layout = layout
+        self.alphabet = alphabet
+        self._start = start
+        self._length = length
+        self._upper = upper
+
+    def __len__(self):
+        return self._length
+
+    def _offset(self, index):
+        """File offset of the letter at this index in the file (PRIVATE)."""
+        seq_offset, line_length, line_bases, prefix, block, gap = self._layout
+        line, col = divmod(index, line_bases)
+        return seq_offset + line * line_length + prefix + col \
+               + (col // block) * gap
+
+    def _get_subseq_as_string(self, start, end):
+        """Read letters start to end (relative to this sequence) (PRIVATE)."""
+        if start >= end:
+            return ""
+        start += self._start
+        end += self._start
+        offset = self._offset(start)
+        handle = self._handle
+        handle.seek(offset)
+        data = _bytes_to_string(handle.read(self._offset(end - 1) + 1
+                                            - offset))
+        data = data.translate(_seq_identity, _seq_skip_chars)
+        if len(data) != end - start:
+            raise ValueError("Expected %i letters but found %i, the "
+                             "sequence lines must all be the same length "
+                             "(except the last line)" \
+                             % (end - start, len(data)))
+        if self._upper:
+            return data.upper()
+        return data
+
+    def __getitem__(self, index):
+        """Returns a letter, or a new lazy sequence or Seq for a slice."""
+        if isinstance(index, int):
+            i = index
+            if i < 0:
+                i += self._length
+            if not 0 <= i < self._length:
+                raise IndexError(index)
+            return self._get_subseq_as_string(i, i + 1)
+        if not isinstance(index, slice):
+            raise ValueError("Unexpected index type")
+        start, end, step = index.indices(self._length)
+        if step != 1:
+            return Seq(str(self)[index], self.alphabet)
+        end = max(start, end)
+        return _IndexedFileSeq(self._handle, self._layout, self.alphabet,
+                               self._start + start, end - start, self._upper)
+
+    def __str__(self):
+        """Returns the full sequence as a python string."""
+        return self._get_subseq_as_string(0, self._length)
+
+    def toseq(self):
+        """Returns the full sequence as a Seq object."""
+        return Seq(str(self), self.alphabet)
+
+    def __add__(self, other):
+        #Let the Seq object deal with the alphabet issues etc
+        return self.toseq() + other
+
+    def __radd__(self, other):
+        #Let the Seq object deal with the alphabet issues etc
+        return other + self.toseq()
+
+    def complement(self):
+        """Returns the complement sequence. New Seq object."""
+        return self.toseq().complement()
+
+    def reverse_complement(self):
+        """Returns the reverse complement sequence. New Seq object."""
+        return self.toseq().reverse_complement()
+
 class SeqFileRandomAccess(object):
-    def __init__(self, filename, format, alphabet):
-        self._handle = open(filename, "rb")
+    def __init__(self, filename, format, alphabet, memory_map=False):
+        self._handle = _open_for_random_access(filename, memory_map)
+        self._memory_map = isinstance(self._handle, _MappedFile)
+        self._filename = filename
         self._alphabet = alphabet
         self._format = format
         #Load the parser class/function once an avoid the dict lookup in each
@@ -532,6 +961,14 @@ class SeqFileRandomAccess(object):
         #Should be done by each sub-class (if possible)
         raise NotImplementedError("Not available for this file format.")
 
+    def get_lazy(self, offset):
+        """Returns SeqRecord, with the sequence loaded on demand if possible.
+
+        Sub-classes supporting this should override it, otherwise this
+        parses the record as normal (see the get method).
+        """
+        return self.get(offset)
+
 
 
 
@@ -546,8 +983,12 @@ class SeqFileRandomAccess(object):
 
 class SffRandomAccess(SeqFileRandomAccess):
     """Random access to a Standard Flowgram Format (SFF) file."""
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, memory_map=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     memory_map)
+        if isinstance(self._handle, bgzf.BgzfReader):
+            self._handle.close()
+            raise ValueError("BGZF compressed SFF files are not supported")
         header_length, index_offset, index_length, number_of_reads, \
         self._flows_per_read, self._flow_chars, self._key_sequence \
             = SeqIO.SffIO._sff_file_header(self._handle)
@@ -620,8 +1061,9 @@ class SffTrimedRandomAccess(SffRandomAccess) :
 ###################
 
 class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, memory_map=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     memory_map)
         marker = {"ace" : "CO ",
                   "embl" : "ID ",
                   "fasta" : ">",
@@ -637,6 +1079,16 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
                    }[format]
         self._marker = marker
         self._marker_re = re.compile(_as_bytes("^%s" % marker))
+        #For searching a memory mapped file for the next record,
+        #string find is faster than a regular expression (if possible)
+        if "." in marker:
+            self._next_marker = None
+            self._next_marker_re = re.compile(_as_bytes("^%s" % marker),
+                                              re.MULTILINE)
+        else:
+            self._next_marker = _as_bytes("\n" + marker)
+        #Sequence layouts found by the get_lazy method
+        self._layouts = {}
         
     def __iter__(self):
         """Returns (id,offset) tuples."""
@@ -655,19 +1107,35 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
             #Here we can assume the record.id is the first word after the
             #marker. This is generally fine... but not for GenBank, EMBL, Swiss
             id = line[marker_offset:].strip().split(None, 1)[0]
+            #Track the length explicitly, as we can't take the difference
+            #of two BGZF virtual offsets
+            length = len(line)
             while True:
+                end_offset = handle.tell()
                 line = handle.readline()
                 if marker_re.match(line) or not line:
-                    end_offset = handle.tell() - len(line)
-                    yield _bytes_to_string(id), start_offset, end_offset - start_offset
+                    yield _bytes_to_string(id), start_offset, length
                     start_offset = end_offset
                     break
+                length += len(line)
         assert not line, repr(line)
 
     def get_raw(self, offset):
         """Similar to the get method, but returns the record as a raw string."""
         #For non-trivial file formats this must be over-ridden in the subclass
         handle = self._handle
+        if self._memory_map:
+            #Search for the start of the next record (or end of file)
+            #rather than reading line by line
+            if self._next_marker:
+                end = handle.find(self._next_marker, offset)
+                if end != -1:
+                    return handle[offset:end+1]
+            else:
+                match = self._next_marker_re.search(handle, offset + 1)
+                if match:
+                    return handle[offset:match.start()]
+            return handle[offset:]
         marker_re = self._marker_re
         handle.seek(offset)
         lines = [handle.readline()]
@@ -679,6 +1147,93 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
             lines.append(line)
         return _as_bytes("").join(lines)
 
+    def _find_record_end(self, offset):
+        """Returns the offset of the next record or the end of file (PRIVATE).
+
+        The offset given should be in the middle of a line (e.g. the line
+        break at the end of the record's first line). This does not hold
+        the whole record in memory.
+        """
+        marker = self._next_marker
+        handle = self._handle
+        if self._memory_map:
+            end = handle.find(marker, offset)
+            if end == -1:
+                return len(handle)
+            return end + 1
+        chunk_size = 65536
+        while True:
+            handle.seek(offset)
+            chunk = handle.read(chunk_size)
+            i = chunk.find(marker)
+            if i != -1:
+                return offset + i + 1
+            if len(chunk) < chunk_size:
+                return offset + len(chunk)
+            offset += len(chunk) - len(marker) + 1
+
+    def _fasta_layout(self, offset):
+        """Returns the title line, sequence layout and length (PRIVATE).
+
+        The sequence line length is taken from the first line of the sequence,
+        and the sequence length is worked out from where the record ends. If
+        the layout doesn't look consistent, returns None.
+        """
+        handle = self._handle
+        handle.seek(offset)
+        title = handle.readline()
+        seq_offset = handle.tell()
+        line = handle.readline()
+        line_length = len(line)
+        line_bases = len(line.rstrip())
+        if not line.endswith(_as_bytes("\n")):
+            #Last line of the file, allow for the missing line break
+            line_length += 1
+        end = self._find_record_end(seq_offset - 1)
+        #Ignore any trailing white space (e.g. blank lines)
+        tail_start = max(seq_offset, end - 2 * line_length)
+        handle.seek(tail_start)
+        tail = handle.read(end - tail_start).rstrip()
+        size = tail_start + len(tail) - seq_offset
+        if size <= 0:
+            return title, (seq_offset, 1, 1, 0, 1, 0), 0
+        elif not line_bases:
+            return None
+        lines, rest = divmod(size, line_length)
+        if not 0 < rest <= line_bases:
+            return None
+        #Check the last line is where and as long as expected
+        last = seq_offset + lines * line_length
+        handle.seek(last - 1)
+        data = handle.read(rest + 1)
+        if (lines and data[:1] != _as_bytes("\n")) \
+        or len(data[1:].split()) != 1:
+            return None
+        layout = (seq_offset, line_length, line_bases, 0, line_bases, 0)
+        return title, layout, lines * line_bases + rest
+
+    def get_lazy(self, offset):
+        """Returns SeqRecord, with the sequence loaded on demand (FASTA only).
+
+        Only the title line is parsed. Finding the end of a record means
+        scanning the file, so the layout of each record is cached. If the
+        layout doesn't look consistent, the record is parsed as normal.
+        """
+        handle = self._handle
+        if self._format != "fasta" or isinstance(handle, bgzf.BgzfReader):
+            return self.get(offset)
+        try:
+            found = self._layouts[offset]
+        except KeyError:
+            found = self._layouts[offset] = self._fasta_layout(offset)
+        if found is None:
+            return self.get(offset)
+        title, layout, length = found
+        record = self._parse(StringIO(_bytes_to_string(title)))
+        record.seq = _IndexedFileSeq(handle, layout, record.seq.alphabet,
+                                     0, length)
+        return record
+
 
 #######################################
 # Fiddly indexers: GenBank, EMBL, ... #
@@ -704,16 +1259,18 @@ class GenBankRandomAccess(SequentialSeqFileRandomAccess):
             #We cannot assume the record.id is the first word after LOCUS,
             #normally the first entry on the VERSION or ACCESSION line is used.
             key = None
+            length = len(line)
             while True:
+                end_offset = handle.tell()
                 line = handle.readline()
                 if marker_re.match(line) or not line:
                     if not key:
                         raise ValueError("Did not find ACCESSION/VERSION lines")
-                    end_offset = handle.tell() - len(line)
-                    yield _bytes_to_string(key), start_offset, end_offset - start_offset
+                    yield _bytes_to_string(key), start_offset, length
                     start_offset = end_offset
                     break
-                elif line.startswith(accession_marker):
+                length += len(line)
+                if line.startswith(accession_marker):
                     key = line.rstrip().split()[1]
                 elif line.startswith(version_marker):
                     version_id = line.rstrip().split()[1]
@@ -722,6 +1279,66 @@ class GenBankRandomAccess(SequentialSeqFileRandomAccess):
                         key = version_id
         assert not line, repr(line)
 
+    def get_lazy(self, offset):
+        """Returns SeqRecord, with the sequence loaded on demand.
+
+        The header and features are parsed as normal, and the sequence
+        length is taken from the LOCUS line. The layout of the sequence
+        lines is taken from the first line (e.g. ten letters in each block,
+        with six blocks a line) and checked against the last line. Records
+        without an ORIGIN line (e.g. CONTIG records) are parsed as normal.
+        """
+        handle = self._handle
+        if isinstance(handle, bgzf.BgzfReader):
+            return self.get(offset)
+        origin_marker = _as_bytes("ORIGIN")
+        end_marker = _as_bytes("//")
+        handle.seek(offset)
+        lines = [handle.readline()]
+        while True:
+            line = handle.readline()
+            if not line or line.startswith(end_marker) \
+            or self._marker_re.match(line):
+                return self.get(offset)
+            lines.append(line)
+            if line.startswith(origin_marker):
+                break
+        seq_offset = handle.tell()
+        first = handle.readline()
+        lines.append(end_marker + _as_bytes("\n"))
+        data = _bytes_to_string(_as_bytes("").join(lines))
+        record = self._parse(StringIO(data))
+        if not isinstance(record.seq, UnknownSeq) or not len(record.seq) \
+        or isinstance(Alphabet._get_base_alphabet(record.seq.alphabet),
+                      Alphabet.RNAAlphabet):
+            #Missing the length, or may need the sequence to decide between
+            #DNA and RNA, see the GenBank parser
+            return self.get(offset)
+        length = len(record.seq)
+        parts = first.split()
+        if len(parts) < 2 or parts[0] != _as_bytes("1"):
+            return self.get(offset)
+        prefix = first.find(parts[1], first.find(parts[0]) + 1)
+        block = len(parts[1])
+        line_bases = sum(len(p) for p in parts[1:])
+        if len(parts) > 2:
+            gap = first.find(parts[2], prefix + block) - prefix - block
+        else:
+            gap = 0
+        line_length = len(first)
+        #Check the last line is where and as long as expected
+        lines = (length - 1) // line_bases
+        handle.seek(seq_offset + lines * line_length)
+        parts = handle.readline().split()
+        if not parts or parts[0] != _as_bytes(str(lines * line_bases + 1)) \
+        or sum(len(p) for p in parts[1:]) != length - lines * line_bases \
+        or not handle.readline().startswith(end_marker):
+            return self.get(offset)
+        layout = (seq_offset, line_length, line_bases, prefix, block, gap)
+        record.seq = _IndexedFileSeq(handle, layout, record.seq.alphabet,
+                                     0, length, upper=True)
+        return record
+
 
 class EmblRandomAccess(SequentialSeqFileRandomAccess):
     """Indexed dictionary like access to an EMBL file."""
@@ -755,14 +1372,16 @@ class EmblRandomAccess(SequentialSeqFileRandomAccess):
                 key = line[3:].strip().split(None,1)[0]
             else:
                 raise ValueError('Did not recognise the ID line layout:\n' + line)
+            length = len(line)
             while True:
+                end_offset = handle.tell()
                 line = handle.readline()
                 if marker_re.match(line) or not line:
-                    end_offset = handle.tell() - len(line)
-                    yield _bytes_to_string(key), start_offset, end_offset - start_offset
+                    yield _bytes_to_string(key), start_offset, length
                     start_offset = end_offset
                     break
-                elif line.startswith(sv_marker):
+                length += len(line)
+                if line.startswith(sv_marker):
                     key = line.rstrip().split()[1]
         assert not line, repr(line)
 
@@ -784,16 +1403,19 @@ class SwissRandomAccess(SequentialSeqFileRandomAccess):
         while marker_re.match(line):
             #We cannot assume the record.id is the first word after ID,
             #normally the following AC line is used.
+            length = len(line)
             line = handle.readline()
+            length += len(line)
             assert line.startswith(_as_bytes("AC "))
             key = line[3:].strip().split(semi_char)[0].strip()
             while True:
+                end_offset = handle.tell()
                 line = handle.readline()
                 if marker_re.match(line) or not line:
-                    end_offset = handle.tell() - len(line)
-                    yield _bytes_to_string(key), start_offset, end_offset - start_offset
+                    yield _bytes_to_string(key), start_offset, length
                     start_offset = end_offset
                     break
+                length += len(line)
         assert not line, repr(line)
 
 
@@ -818,23 +1440,26 @@ class UniprotRandomAccess(SequentialSeqFileRandomAccess):
             #(possibly with leading spaces)
             #but allow it to be later on within the <entry>
             key = None
-            done = False
+            length = len(line)
             while True:
                 line = handle.readline()
                 if key is None and start_acc_marker in line:
                     assert end_acc_marker in line, line
                     key = line[line.find(start_acc_marker)+11:].split(_as_bytes("<"))[0]
+                    length += len(line)
                 elif end_entry_marker in line:
-                    end_offset = handle.tell() - len(line) \
-                               + line.find(end_entry_marker) + 8
+                    length += line.find(end_entry_marker) + 8
                     break
                 elif marker_re.match(line) or not line:
                     #Start of next record or end of file
                     raise ValueError("Didn't find end of record")
+                else:
+                    length += len(line)
             if not key:
-                raise ValueError("Did not find <accession> line in bytes %i to %i" \
-                                 % (start_offset, end_offset))
-            yield _bytes_to_string(key), start_offset, end_offset - start_offset
+                raise ValueError("Did not find <accession> line in the "
+                                 "%i bytes from offset %i" \
+                                 % (length, start_offset))
+            yield _bytes_to_string(key), start_offset, length
             #Find start of next record
             while not marker_re.match(line) and line:
                 start_offset = handle.tell()
@@ -878,8 +1503,9 @@ class UniprotRandomAccess(SequentialSeqFileRandomAccess):
 
 class IntelliGeneticsRandomAccess(SeqFileRandomAccess):
     """Random access to a IntelliGenetics file."""
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, memory_map=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     memory_map)
         self._marker_re = re.compile(_as_bytes("^;"))
 
     def __iter__(self):
@@ -941,7 +1567,7 @@ class TabRandomAccess(SeqFileRandomAccess):
                     raise err
             else:
                 end_offset = handle.tell()
-                yield _bytes_to_string(key), start_offset, end_offset - start_offset
+                yield _bytes_to_string(key), start_offset, len(line)
                 start_offset = end_offset
 
     def get_raw(self, offset):
@@ -978,10 +1604,14 @@ class FastqRandomAccess(SeqFileRandomAccess):
             #assert line[0]=="@"
             #This record seems OK (so far)
             id = line[1:].rstrip().split(None, 1)[0]
+            #Track the length explicitly, as we can't take the difference
+            #of two BGZF virtual offsets
+            length = len(line)
             #Find the seq line(s)
             seq_len = 0
             while line:
                 line = handle.readline()
+                length += len(line)
                 if line.startswith(plus_char) : break
                 seq_len += len(line.strip())
             if not line:
@@ -992,17 +1622,18 @@ class FastqRandomAccess(SeqFileRandomAccess):
             while line:
                 if seq_len == qual_len:
                     #Should be end of record...
+                    end_offset = handle.tell()
                     line = handle.readline()
                     if line and line[0:1] != at_char:
                         ValueError("Problem with line %s" % repr(line))
                     break
                 else:
                     line = handle.readline()
+                    length += len(line)
                     qual_len += len(line.strip())
             if seq_len != qual_len:
                 raise ValueError("Problem with quality section")
-            end_offset = handle.tell() - len(line)
-            yield _bytes_to_string(id), start_offset, end_offset - start_offset
+            yield _bytes_to_string(id), start_offset, length
             start_offset = end_offset
         #print "EOF"
 
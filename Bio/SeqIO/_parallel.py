@@ -0,0 +1,188 @@
+# Copyright 2012 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Parsing large sequence files using several processes (PRIVATE).
+
+You are not expected to access this module, or any of its code, directly. This
+is all handled internally by the Bio.SeqIO.parse_parallel(...) function which
+is the public interface for this functionality.
+
+The basic idea is that we scan over the sequence file looking for the record
+boundaries, using the same code as the Bio.SeqIO.index(...) function, and
+group the records into chunks of about the requested size. Each chunk is then
+read and parsed by a worker process (using the multiprocessing module), which
+returns a list of SeqRecord objects (which are pickled to send them back to
+the main process).
+
+This only makes sense for file formats where any run of complete records can
+be parsed on its own (e.g. there is no file header which is needed to parse
+the records), and where parsing is slow compared to finding the records.
+
+The binary SFF format is handled as a special case, where the read offsets
+come from the Roche index block (if present) and each worker process reads
+the file header itself and then parses the reads it was given one by one.
+"""
+
+import collections
+
+from StringIO import StringIO
+
+from Bio._py3k import _bytes_to_string, _as_bytes
+
+from Bio import SeqIO
+from Bio import bgzf
+from Bio.SeqIO._index import _FormatToRandomAccess, _open_for_random_access
+
+#File formats where a chunk of whole records can be parsed as a file
+#in its own right:
+_ChunkableFormats = set(["embl", "fasta", "fastq", "fastq-sanger",
+                         "fastq-solexa", "fastq-illumina", "genbank", "gb",
+                         "imgt", "qual", "swiss", "tab"])
+
+#Binary file formats where the workers parse the reads at the given offsets:
+_SffFormats = set(["sff", "sff-trim"])
+
+
+def _chunks(filename, format, alphabet, chunk_size):
+    """Scan the file, yielding lists of (offset, length) tuples (PRIVATE).
+
+    Each list covers whole records with a total length of about chunk_size,
+    with consecutive records merged into a single (offset, length) span
+    (except for BGZF files, where offsets are virtual offsets).
+    """
+    if format in _SffFormats:
+        for chunk in _sff_chunks(filename, format, alphabet, chunk_size):
+            yield chunk
+        return
+    proxy = _FormatToRandomAccess[format](filename, format, alphabet)
+    merge = not isinstance(proxy._handle, bgzf.BgzfReader)
+    try:
+        spans = []
+        size = 0
+        for key, offset, length in proxy:
+            if merge and spans and sum(spans[-1]) == offset:
+                spans[-1] = (spans[-1][0], spans[-1][1] + length)
+            else:
+                spans.append((offset, length))
+            size += length
+            if size >= chunk_size:
+                yield spans
+                spans = []
+                size = 0
+        if spans:
+            yield spans
+    finally:
+        proxy._handle.close()
+
+
+def _sff_chunks(filename, format, alphabet, chunk_size):
+    """Load the SFF read offsets, yielding lists of (offset, 0) tuples (PRIVATE).
+
+    The offsets come from the Roche index if the file has one (which is
+    sorted by read name) so are sorted back into file order, and grouped
+    so that each list covers about chunk_size bytes of reads.
+    """
+    proxy = _FormatToRandomAccess[format](filename, format, alphabet)
+    try:
+        offsets = sorted([offset for key, offset, length in proxy])
+    finally:
+        proxy._handle.close()
+    spans = []
+    for offset in offsets:
+        if spans and offset - spans[0][0] >= chunk_size:
+            yield spans
+            spans = []
+        spans.append((offset, 0))
+    if spans:
+        yield spans
+
+
+def _parse_sff_chunk(filename, format, alphabet, spans):
+    """Parse the SFF reads at the given offsets, returns a list (PRIVATE)."""
+    from Bio import Alphabet
+    from Bio.SeqIO.SffIO import _sff_file_header, _sff_read_seq_record
+    if alphabet is None:
+        alphabet = Alphabet.generic_dna
+    handle = open(filename, "rb")
+    try:
+        header_length, index_offset, index_length, number_of_reads, \
+        flows_per_read, flow_chars, key_sequence = _sff_file_header(handle)
+        records = []
+        for offset, length in spans:
+            handle.seek(offset)
+            records.append(_sff_read_seq_record(handle, flows_per_read,
+                                                flow_chars, key_sequence,
+                                                alphabet,
+                                                format == "sff-trim"))
+    finally:
+        handle.close()
+    return records
+
+
+def _parse_chunk(args):
+    """Read and parse a chunk of records, returns a list of SeqRecords (PRIVATE).
+
+    Takes a tuple of the filename, format, alphabet and a list of (offset,
+    length) tuples (so that it can be used with a multiprocessing Pool).
+    """
+    filename, format, alphabet, spans = args
+    if format in _SffFormats:
+        return _parse_sff_chunk(filename, format, alphabet, spans)
+    handle = _open_for_random_access(filename)
+    try:
+        data = []
+        for offset, length in spans:
+            handle.seek(offset)
+            data.append(handle.read(length))
+    finally:
+        handle.close()
+    data = _bytes_to_string(_as_bytes("").join(data))
+    return list(SeqIO.parse(StringIO(data), format, alphabet))
+
+
+def _next_ready(pending):
+    """Remove and return the first finished job in the queue (PRIVATE)."""
+    while True:
+        for result in pending:
+            if result.ready():
+                pending.remove(result)
+                return result
+        pending[0].wait(0.01)
+
+
+def _parse_parallel(filename, format, alphabet, processes, ordered,
+                    chunk_size):
+    """Generator function used by Bio.SeqIO.parse_parallel (PRIVATE).
+
+    The file is scanned in this process (so any problem found while
+    scanning is raised here), and only a few chunks per worker process
+    are queued at any one time to limit the memory used.
+    """
+    import multiprocessing
+    pool = multiprocessing.Pool(processes)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    pending = collections.deque()
+    try:
+        for spans in _chunks(filename, format, alphabet, chunk_size):
+            pending.append(pool.apply_async(_parse_chunk,
+                                            ((filename, format, alphabet,
+                                              spans),)))
+            while len(pending) >= 2 * processes:
+                if ordered:
+                    result = pending.popleft()
+                else:
+                    result = _next_ready(pending)
+                for record in result.get():
+                    yield record
+        while pending:
+            if ordered:
+                result = pending.popleft()
+            else:
+                result = _next_ready(pending)
+            for record in result.get():
+                yield record
+    finally:
+        pool.terminate()
+        pool.join()
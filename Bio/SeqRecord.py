@@ -84,6 +84,37 @@ class _RestrictedDict(dict):
             self[key] = value
 
 
+def _slice_features(features, start, stop):
+    """Returns the features within start:stop, with shifted locations (PRIVATE).
+
+    Used when slicing a SeqRecord (only for a stride of one).
+    """
+    answer = []
+    for f in features:
+        if f.ref or f.ref_db:
+            #TODO - Implement this (with lots of tests)?
+            import warnings
+            warnings.warn("When slicing SeqRecord objects, any "
+                  "SeqFeature referencing other sequences (e.g. "
+                  "from segmented GenBank records) are ignored.")
+            continue
+        if start <= f.location.nofuzzy_start \
+        and f.location.nofuzzy_end <= stop:
+            answer.append(f._shift(-start))
+    return answer
+
+def _flip_features(features, length):
+    """Returns the features flipped for the reverse complement (PRIVATE)."""
+    answer = [f._flip(length) for f in features]
+    #The old list should have been sorted by start location,
+    #reversing it will leave it sorted by what is now the end position,
+    #so we need to resort in case of overlapping features.
+    #NOTE - In the common case of gene before CDS (and similar) with
+    #the exact same locations, this will still maintain gene before CDS
+    answer.sort(key=lambda x : x.location.start.position)
+    return answer
+
+
 class SeqRecord(object):
     """A SeqRecord object holds a sequence and information about it.
 
@@ -442,17 +473,8 @@ class SeqRecord(object):
             if step == 1:
                 #Select relevant features, add them with shifted locations
                 #assert str(self.seq)[index] == str(self.seq)[start:stop]
-                for f in self.features:
-                    if f.ref or f.ref_db:
-                        #TODO - Implement this (with lots of tests)?
-                        import warnings
-                        warnings.warn("When slicing SeqRecord objects, any "
-                              "SeqFeature referencing other sequences (e.g. "
-                              "from segmented GenBank records) are ignored.")
-                        continue
-                    if start <= f.location.nofuzzy_start \
-                    and f.location.nofuzzy_end <= stop:
-                        answer.features.append(f._shift(-start))
+                answer.features.extend(_slice_features(self.features,
+                                                       start, stop))
 
             #Slice all the values to match the sliced sequence
             #(this should also work with strides, even negative strides):
@@ -728,6 +750,72 @@ class SeqRecord(object):
         """
         return True
 
+    def index_features(self):
+        """Index the features by location, returns them as a FeatureList.
+
+        The record's features are replaced by an equivalent FeatureList (a
+        python list subclass from Bio.SeqFeature), which offers fast location
+        based queries. For example, to find the features overlapping a region:
+
+        >>> from Bio import SeqIO
+        >>> record = SeqIO.read("GenBank/NC_005816.gb", "gb")
+        >>> features = record.index_features()
+        >>> features is record.features
+        True
+        >>> for f in features.overlapping(2900, 3000):
+        ...     print f.type, f.location
+        source [0:9609](+)
+        gene [2924:3119](+)
+        CDS [2924:3119](+)
+        misc_feature [2924:3107](+)
+
+        Calling this again reuses the existing FeatureList. See the FeatureList
+        class for more details.
+        """
+        from Bio.SeqFeature import FeatureList
+        if not isinstance(self.features, FeatureList):
+            self.features = FeatureList(self.features)
+        return self.features
+
+    def view(self):
+        """Returns a lightweight view of the record, for slicing (SeqRecord).
+
+        Slicing a SeqRecord or taking its reverse complement normally builds
+        the new sequence, per-letter-annotations and features straight away.
+        This method instead returns a view of the record, which is equivalent
+        to record[:] except that its sequence, per-letter-annotations and
+        features are only worked out from this (parent) record when they are
+        first used. Slicing or taking the reverse complement of a view gives
+        another view (still referring to the original parent record), so the
+        work is done once however many times a record gets sliced. This is
+        useful when trimming reads, e.g.
+
+        >>> from Bio import SeqIO
+        >>> handle = open("Quality/example.fastq", "rU")
+        >>> record = SeqIO.parse(handle, "fastq").next()
+        >>> handle.close()
+        >>> print record.id, len(record), record.seq
+        EAS54_6_R1_2_1_413_324 25 CCCTTCTTGTCTTCAGCGTTTCTCC
+        >>> trimmed = record.view()[2:][:-3]
+        >>> len(trimmed)
+        20
+        >>> trimmed = trimmed.reverse_complement(id=True)
+        >>> print trimmed.id, trimmed.seq
+        EAS54_6_R1_2_1_413_324 GAAACGCTGAAGACAAGAAG
+        >>> print trimmed.letter_annotations["phred_quality"]
+        [26, 26, 26, 26, 26, 26, 22, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 18]
+
+        As with record[:] the annotations dictionary and dbxrefs list are
+        not kept. Since the view refers to the parent record, any changes
+        made to the parent's sequence, per-letter-annotations or features
+        before the view first uses them will show up in the view. Once
+        worked out, the view's values are independent of the parent.
+        """
+        length = len(self)
+        return _SeqRecordView(self, 0, 1, length, False,
+                              (_slice_features, 0, length),
+                              self.id, self.name, self.description)
+
     def __add__(self, other):
         """Add another sequence or string to this sequence.
 
@@ -1102,14 +1190,7 @@ class SeqRecord(object):
             answer.features = features
         elif features:
             #Copy the old features, adjusting location and string
-            l = len(answer)
-            answer.features = [f._flip(l) for f in self.features]
-            #The old list should have been sorted by start location,
-            #reversing it will leave it sorted by what is now the end position,
-            #so we need to resort in case of overlapping features.
-            #NOTE - In the common case of gene before CDS (and similar) with
-            #the exact same locations, this will still maintain gene before CDS
-            answer.features.sort(key=lambda x : x.location.start.position)
+            answer.features = _flip_features(self.features, len(answer))
         if isinstance(annotations, dict):
             answer.annotations = annotations
         elif annotations:
@@ -1123,6 +1204,227 @@ class SeqRecord(object):
                 answer._per_letter_annotations[key] = value[::-1]
         return answer
 
+
+
+def _view_slice(start, step, length):
+    """Returns a slice object for a view's start, step and length (PRIVATE)."""
+    if not length:
+        return slice(0, 0)
+    stop = start + length * step
+    if stop < 0:
+        stop = None
+    return slice(start, stop, step)
+
+
+class _SeqRecordView(SeqRecord):
+    """A SeqRecord which is a slice or reverse complement of another (PRIVATE).
+
+    These are returned by the SeqRecord's view method (see that for details).
+    The sequence, per-letter-annotations and features are each worked out
+    from the parent record (and then cached) when first used, much like the
+    BioSQL DBSeqRecord loads them from the database when needed.
+
+    Until then each of these is described by a private tuple, giving the
+    original record plus the start, step (and for the sequence, if it is
+    complemented) needed to get the values for this view, or for the
+    features the list of operations to apply to the original features.
+    This means that slicing a view of a view still refers to the original
+    record, rather than building the intermediate values.
+    """
+    def __init__(self, parent, start, step, length, complement, feature_op,
+                 id, name, description):
+        #Note this doesn't call SeqRecord.__init__ deliberately
+        self.id = id
+        self.name = name
+        self.description = description
+        self.dbxrefs = []
+        self.annotations = {}
+        self._length = length
+        if isinstance(parent, _SeqRecordView) and hasattr(parent, "_seq_view"):
+            source, p_start, p_step, p_complement = parent._seq_view
+            self._seq_view = (source, p_start + start * p_step,
+                              p_step * step, p_complement != complement)
+        else:
+            self._seq_view = (parent, start, step, complement)
+        if isinstance(parent, _SeqRecordView) \
+        and hasattr(parent, "_letters_view"):
+            source, p_start, p_step = parent._letters_view
+            self._letters_view = (source, p_start + start * p_step,
+                                  p_step * step)
+        else:
+            self._letters_view = (parent, start, step)
+        if feature_op is None:
+            self._features = []
+        elif isinstance(parent, _SeqRecordView) \
+        and hasattr(parent, "_features_view"):
+            source, ops = parent._features_view
+            self._features_view = (source, ops + (feature_op,))
+        else:
+            self._features_view = (parent, (feature_op,))
+
+    def _get_seq(self):
+        try:
+            return self._seq
+        except AttributeError:
+            pass
+        from Bio.Seq import MutableSeq #Lazy to avoid circular imports
+        source, start, step, complement = self._seq_view
+        length = self._length
+        reverse = step < 0 and length > 1
+        if reverse:
+            #Take the slice in the forward direction, then reverse it (so
+            #that we can use the sequence's reverse_complement method)
+            start += (length - 1) * step
+            step = -step
+        seq = source.seq[_view_slice(start, step, length)]
+        if complement and isinstance(seq, MutableSeq):
+            #Currently the MutableSeq (reverse) complement is in situ
+            seq = seq.toseq()
+        if reverse and complement:
+            seq = seq.reverse_complement()
+        elif reverse:
+            seq = seq[::-1]
+        elif complement:
+            seq = seq.complement()
+        self._seq = seq
+        del self._seq_view
+        return seq
+
+    def _set_seq(self, value):
+        if self.letter_annotations:
+            raise ValueError("You must empty the letter annotations first!")
+        self._seq = value
+        self._length = len(value)
+        self._per_letter_annotations = _RestrictedDict(length=self._length)
+        if hasattr(self, "_seq_view"):
+            del self._seq_view
+
+    seq = property(fget=_get_seq, fset=_set_seq,
+                   doc="The sequence itself, as a Seq or MutableSeq object.")
+
+    def _get_per_letter_annotations(self):
+        try:
+            return self._per_letter_annotations
+        except AttributeError:
+            pass
+        source, start, step = self._letters_view
+        index = _view_slice(start, step, self._length)
+        answer = _RestrictedDict(length=self._length)
+        for key, value in source.letter_annotations.iteritems():
+            #The length must be right, so don't need to check it
+            dict.__setitem__(answer, key, value[index])
+        self._per_letter_annotations = answer
+        del self._letters_view
+        return answer
+
+    def _set_per_letter_annotations(self, value):
+        if not isinstance(value, dict):
+            raise TypeError("The per-letter-annotations should be a "
+                            "(restricted) dictionary.")
+        answer = _RestrictedDict(length=self._length)
+        answer.update(value)
+        self._per_letter_annotations = answer
+        if hasattr(self, "_letters_view"):
+            del self._letters_view
+
+    letter_annotations = property(fget=_get_per_letter_annotations,
+                                  fset=_set_per_letter_annotations,
+                                  doc="Dictionary of per-letter-annotation "
+                                      "for the sequence.")
+
+    def _get_features(self):
+        try:
+            return self._features
+        except AttributeError:
+            pass
+        source, ops = self._features_view
+        features = source.features
+        for op in ops:
+            features = op[0](features, *op[1:])
+        self._features = features
+        del self._features_view
+        return features
+
+    def _set_features(self, value):
+        self._features = value
+        if hasattr(self, "_features_view"):
+            del self._features_view
+
+    features = property(fget=_get_features, fset=_set_features,
+                        doc="Any (sub)features (list of SeqFeature objects)")
+
+    def __len__(self):
+        """Returns the length of the sequence."""
+        return self._length
+
+    def __getitem__(self, index):
+        """Returns a sub-sequence (as a view) or an individual letter."""
+        if isinstance(index, int):
+            return self.seq[index]
+        elif isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            length = len(xrange(start, stop, step))
+            if step == 1:
+                feature_op = (_slice_features, start, stop)
+            else:
+                #Features are dropped with a stride, as in SeqRecord slicing
+                feature_op = None
+            return _SeqRecordView(self, start, step, length, False,
+                                  feature_op, self.id, self.name,
+                                  self.description)
+        raise ValueError("Invalid index")
+
+    def reverse_complement(self, id=False, name=False, description=False,
+                           features=True, annotations=False,
+                           letter_annotations=True, dbxrefs=False):
+        """Returns the reverse complement as a view (see SeqRecord method)."""
+        from Bio import Alphabet #Lazy to avoid circular imports
+        try:
+            alphabet = self._seq.alphabet
+        except AttributeError:
+            alphabet = self._seq_view[0].seq.alphabet
+        if isinstance(Alphabet._get_base_alphabet(alphabet),
+                      Alphabet.ProteinAlphabet):
+            raise ValueError("Proteins do not have complements!")
+        length = self._length
+        if features and not isinstance(features, list):
+            feature_op = (_flip_features, length)
+        else:
+            feature_op = None
+        answer = _SeqRecordView(self, max(length - 1, 0), -1, length, True,
+                                feature_op, "<unknown id>", "<unknown name>",
+                                "<unknown description>")
+        if isinstance(id, basestring):
+            answer.id = id
+        elif id:
+            answer.id = self.id
+        if isinstance(name, basestring):
+            answer.name = name
+        elif name:
+            answer.name = self.name
+        if isinstance(description, basestring):
+            answer.description = description
+        elif description:
+            answer.description = self.description
+        if isinstance(dbxrefs, list):
+            answer.dbxrefs = dbxrefs
+        elif dbxrefs:
+            #Copy the old dbxrefs
+            answer.dbxrefs = self.dbxrefs[:]
+        if isinstance(features, list):
+            answer.features = features
+        if isinstance(annotations, dict):
+            answer.annotations = annotations
+        elif annotations:
+            #Copy the old annotations,
+            answer.annotations = self.annotations.copy()
+        if isinstance(letter_annotations, dict):
+            answer.letter_annotations = letter_annotations
+        elif not letter_annotations:
+            answer.letter_annotations = {}
+        return answer
+
+
 def _test():
     """Run the Bio.SeqRecord module's doctests (PRIVATE).
 
@@ -253,14 +253,15 @@ def six_frame_translations(seq, genetic_code = 1):
     from Bio.SeqUtils import six_frame_translations
     print six_frame_translations("AUGGCCAUUGUAAUGGGCCGCUGA")
     """
-    from Bio.Seq import reverse_complement, translate
+    from Bio.Seq import reverse_complement, translate_six_frames
     anti = reverse_complement(seq)
     comp = anti[::-1]
     length = len(seq)
     frames = {}
+    translations = translate_six_frames(seq, genetic_code)
     for i in range(0,3):
-        frames[i+1]  = translate(seq[i:], genetic_code)
-        frames[-(i+1)] = reverse(translate(anti[i:], genetic_code))
+        frames[i+1]  = translations[i]
+        frames[-(i+1)] = translations[i+3][::-1]
 
     # create header
     if length > 20:
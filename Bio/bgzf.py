@@ -0,0 +1,650 @@
+# Copyright 2012 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Read and write BGZF compressed files (the GZIP variant used in BAM).
+
+The SAM/BAM file format (Sequence Alignment/Map) comes in a plain text
+format (SAM), and a compressed binary format (BAM). The latter uses a
+modified form of gzip compression called BGZF (Blocked GNU Zip Format),
+which can be applied to any file format to provide compression with
+efficient random access. BGZF is described together with the SAM/BAM
+file format at http://samtools.sourceforge.net/SAM1.pdf
+
+Please read the text below about 'virtual offsets' before using BGZF
+files for random access.
+
+
+Aim of this module
+------------------
+
+The Python gzip library can be used to read BGZF files, since for
+decompression they are just (specialised) multi-member gzip files.
+
+What this module aims to facilitate is random access to BGZF files
+(using the 'virtual offset' idea), and writing BGZF files (which means
+using suitably sized gzip blocks and writing the extra 'BC' field in the
+gzip headers). As in the gzip library, the zlib library is used
+internally.
+
+In addition to being required for random access to and writing of BAM
+files, the BGZF format can also be used on other sequential data (in the
+sense of one record after another), such as most of the sequence data
+formats supported in Bio.SeqIO (like FASTA, FASTQ, GenBank, etc) or
+large MAF alignments. The Bio.SeqIO indexing functions use this module
+to support BGZF files.
+
+
+Technical Introduction to BGZF
+------------------------------
+
+The gzip file format allows multiple compressed blocks, each of which
+could be a stand alone gzip file. As an interesting bonus, this means
+you can use Unix "cat" to combine two gzip files into one by
+concatenating them. Also, each block can have one of several compression
+levels (including uncompressed, which actually takes up a little bit
+more space due to the gzip header).
+
+What the BAM designers realised was that while random access to data
+stored in traditional gzip files was slow, breaking the file into gzip
+blocks would allow fast random access to each block. To access a
+particular piece of the decompressed data, you just need to know which
+block it starts in (the offset of the gzip block start), and how far
+into the (decompressed) contents of the block you need to read.
+
+One problem with this is finding the gzip block sizes efficiently.
+You can do it with a standard gzip file, but it requires every block
+to be decompressed -- and that would be rather slow. Additionally
+typical gzip files may use very large blocks.
+
+All that differs in BGZF is that compressed size of each gzip block
+is limited to 2^16 bytes, and an extra 'BC' field in the gzip header
+records this size. Traditional decompression tools can ignore this,
+and unzip the file just like any other gzip file.
+
+The point of this is you can look at the first BGZF block, find out
+how big it is from this 'BC' header, and thus seek immediately to
+the second block, and so on.
+
+The BAM indexing scheme records read positions using a 64 bit
+'virtual offset', comprising coffset << 16 | uoffset, where coffset
+is the file offset of the BGZF block containing the start of the read
+(unsigned integer using up to 64-16 = 48 bits), and uoffset is the
+offset within the (decompressed) block (unsigned 16 bit integer).
+
+This limits you to BAM files where the last block starts by 2^48
+bytes, or 256 petabytes, and the decompressed size of each block
+is at most 2^16 bytes, or 64kb. Note that this matches the BGZF
+'BC' field size which limits the compressed size of each block to
+2^16 bytes, allowing for BAM files to use BGZF with no gzip
+compression (useful for intermediate files in memory to reduce
+CPU load).
+
+
+Warning about namespaces
+------------------------
+
+It is considered a bad idea to use "from XXX import *" in Python, because
+it pollutes the namespace. This is a real issue with Bio.bgzf (and the
+standard Python library gzip) because they contain a function called
+open (i.e. suppose you do this "from Bio.bgzf import *", and then
+"from gzip import *"), which would shadow the builtin open function.
+"""
+
+import __builtin__ #Python 3 uses builtins instead
+import zlib
+import struct
+
+from Bio._py3k import _as_bytes, _as_string
+
+#For Python 2 can just use: _bgzf_magic = '\x1f\x8b\x08\x04'
+#but need to use bytes on Python 3
+_bgzf_magic = _as_bytes("\x1f\x8b\x08\x04")
+_bgzf_header = _as_bytes("\x1f\x8b\x08\x04\x00\x00\x00\x00"
+                         "\x00\xff\x06\x00\x42\x43\x02\x00")
+_bgzf_eof = _as_bytes("\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC" +
+                      "\x02\x00\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00")
+_bytes_BC = _as_bytes("BC")
+_empty_bytes_string = _as_bytes("")
+_bytes_newline = _as_bytes("\n")
+
+#Maximum amount of uncompressed data per block (as used in samtools),
+#leaving room for the compressed block to be at most 64kb even if the
+#data does not compress at all.
+_block_size = 65280
+
+
+def open(filename, mode="rb"):
+    """Open a BGZF file for reading, writing or appending."""
+    if "r" in mode.lower():
+        return BgzfReader(filename, mode)
+    elif "w" in mode.lower() or "a" in mode.lower():
+        return BgzfWriter(filename, mode)
+    else:
+        raise ValueError("Bad mode %r" % mode)
+
+
+def make_virtual_offset(block_start_offset, within_block_offset):
+    """Compute a BGZF virtual offset from block start and within block offsets.
+
+    The BAM indexing scheme records read positions using a 64 bit
+    'virtual offset', comprising in C terms:
+
+    block_start_offset<<16 | within_block_offset
+
+    Here block_start_offset is the file offset of the BGZF block
+    start (unsigned integer using up to 64-16 = 48 bits), and
+    within_block_offset within the (decompressed) block (unsigned
+    16 bit integer).
+
+    >>> make_virtual_offset(0, 0)
+    0
+    >>> make_virtual_offset(0, 1)
+    1
+    >>> make_virtual_offset(0, 2**16 - 1)
+    65535
+    >>> make_virtual_offset(0, 2**16)
+    Traceback (most recent call last):
+    ...
+    ValueError: Require 0 <= within_block_offset < 2**16, got 65536
+
+    >>> 65536 == make_virtual_offset(1, 0)
+    True
+    >>> 65537 == make_virtual_offset(1, 1)
+    True
+    >>> 131071 == make_virtual_offset(1, 2**16 - 1)
+    True
+    """
+    if within_block_offset < 0 or within_block_offset >= 65536:
+        raise ValueError("Require 0 <= within_block_offset < 2**16, got %i" \
+                         % within_block_offset)
+    if block_start_offset < 0 or block_start_offset >= 281474976710656:
+        raise ValueError("Require 0 <= block_start_offset < 2**48, got %i" \
+                         % block_start_offset)
+    return (block_start_offset<<16) | within_block_offset
+
+
+def split_virtual_offset(virtual_offset):
+    """Divides a 64-bit BGZF virtual offset into block start & within block offsets.
+
+    >>> (100000, 0) == split_virtual_offset(6553600000)
+    True
+    >>> (100000, 10) == split_virtual_offset(6553600010)
+    True
+    """
+    start = virtual_offset>>16
+    return start, virtual_offset ^ (start<<16)
+
+
+def BgzfBlocks(handle):
+    """Low level debugging function to inspect BGZF blocks.
+
+    Returns the block start offset (see virtual offsets), the block
+    length (add these for the start of the next block), and the
+    decompressed length of the blocks contents (limited to 65536 in
+    BGZF).
+
+    >>> from __builtin__ import open
+    >>> handle = open("GenBank/NC_000932.gb.bgz", "rb")
+    >>> for values in BgzfBlocks(handle):
+    ...     print "Raw start %i, raw length %i; data start %i, data length %i" % values
+    Raw start 0, raw length 15063; data start 0, data length 65280
+    Raw start 15063, raw length 17690; data start 65280, data length 65280
+    Raw start 32753, raw length 22051; data start 130560, data length 65280
+    Raw start 54804, raw length 22161; data start 195840, data length 65280
+    Raw start 76965, raw length 15261; data start 261120, data length 44502
+    Raw start 92226, raw length 28; data start 305622, data length 0
+    >>> handle.close()
+    """
+    data_start = 0
+    while True:
+        start_offset = handle.tell()
+        try:
+            block_length, data = _load_bgzf_block(handle)
+        except StopIteration:
+            break
+        data_len = len(data)
+        yield start_offset, block_length, data_start, data_len
+        data_start += data_len
+
+
+def _load_bgzf_block(handle, text_mode=False):
+    """Load the next BGZF block of compressed data (PRIVATE).
+
+    Returns a tuple of the raw block length and the decompressed data,
+    or raises StopIteration at the end of the file.
+    """
+    magic = handle.read(4)
+    if not magic:
+        #End of file
+        raise StopIteration
+    if magic != _bgzf_magic:
+        raise ValueError(r"A BGZF (e.g. a BAM file) block should start with "
+                         r"%r, not %r; handle.tell() now says %r"
+                         % (_bgzf_magic, magic, handle.tell()))
+    gzip_mod_time, gzip_extra_flags, gzip_os, extra_len = \
+        struct.unpack("<LBBH", handle.read(8))
+
+    block_size = None
+    x_len = 0
+    while x_len < extra_len:
+        subfield_id = handle.read(2)
+        subfield_len = struct.unpack("<H", handle.read(2))[0] #uint16_t
+        subfield_data = handle.read(subfield_len)
+        x_len += subfield_len + 4
+        if subfield_id == _bytes_BC:
+            assert subfield_len == 2, "Wrong BC payload length"
+            assert block_size is None, "Two BC subfields?"
+            block_size = struct.unpack("<H", subfield_data)[0]+1 #uint16_t
+    assert x_len == extra_len, (x_len, extra_len)
+    if block_size is None:
+        raise ValueError("Missing BC, this isn't a BGZF file!")
+    #Now comes the compressed data, CRC, and length of uncompressed data.
+    deflate_size = block_size - 1 - extra_len - 19
+    d = zlib.decompressobj(-15) #Negative window size means no headers
+    data = d.decompress(handle.read(deflate_size)) + d.flush()
+    expected_crc = handle.read(4)
+    expected_size = struct.unpack("<I", handle.read(4))[0]
+    if expected_size != len(data):
+        raise RuntimeError("Decompressed to %i, not %i" \
+                           % (len(data), expected_size))
+    #Should cope with a mix of Python platforms...
+    crc = zlib.crc32(data)
+    if crc < 0:
+        crc = struct.pack("<i", crc)
+    else:
+        crc = struct.pack("<I", crc)
+    if expected_crc != crc:
+        raise RuntimeError("CRC is %s, not %s" % (crc, expected_crc))
+    if text_mode:
+        return block_size, _as_string(data)
+    else:
+        return block_size, data
+
+
+class BgzfReader(object):
+    r"""BGZF reader, acts like a read only handle but seek/tell differ.
+
+    Let's use the BgzfBlocks function to have a peak at the BGZF blocks
+    in an example BGZF compressed GenBank file,
+
+    >>> from __builtin__ import open
+    >>> handle = open("GenBank/NC_000932.gb.bgz", "rb")
+    >>> for values in BgzfBlocks(handle):
+    ...     print "Raw start %i, raw length %i; data start %i, data length %i" % values
+    Raw start 0, raw length 15063; data start 0, data length 65280
+    Raw start 15063, raw length 17690; data start 65280, data length 65280
+    Raw start 32753, raw length 22051; data start 130560, data length 65280
+    Raw start 54804, raw length 22161; data start 195840, data length 65280
+    Raw start 76965, raw length 15261; data start 261120, data length 44502
+    Raw start 92226, raw length 28; data start 305622, data length 0
+    >>> handle.close()
+
+    Now let's see how to use this block information to jump to
+    specific parts of the decompressed GenBank file:
+
+    >>> handle = BgzfReader("GenBank/NC_000932.gb.bgz", "rb")
+    >>> assert 0 == handle.tell()
+    >>> print handle.read(5)
+    LOCUS
+    >>> assert 5 == handle.tell()
+
+    So far nothing so strange, we got the LOCUS line keyword at the
+    start of the decompressed GenBank file, and the handle position makes
+    sense. Now however, let's jump to the end of this block and 5
+    bytes into the next block by reading 65280 bytes,
+
+    >>> data = handle.read(65280)
+    >>> len(data)
+    65280
+    >>> assert 987168773 == handle.tell()
+
+    Expecting 5 + 65280 = 65285 were you? Well this is a BGZF 64-bit
+    virtual offset, which means:
+
+    >>> split_virtual_offset(987168773)
+    (15063, 5)
+
+    You should spot 15063 as the start of the second BGZF block, while
+    the 5 is the offset into this block. See also make_virtual_offset,
+
+    >>> make_virtual_offset(15063, 5)
+    987168773
+
+    Let's jump back to almost the start of the file,
+
+    >>> make_virtual_offset(0, 2)
+    2
+    >>> handle.seek(2)
+    2
+    >>> print handle.readline().rstrip()
+    CUS       NC_000932             154478 bp    DNA     circular PLN 15-APR-2009
+    >>> handle.close()
+
+    Note that you can use the max_cache argument to limit the number of
+    BGZF blocks cached in memory. The default is 100, and since each
+    block can be up to 64kb, the default cache could take up to 6MB of
+    RAM. The cache is not important for reading through the file in one
+    pass, but is important for improving performance of random access.
+    """
+
+    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100):
+        if max_cache < 1:
+            raise ValueError("Use max_cache with a minimum of 1")
+        #Must open the BGZF file in binary mode, but we may want to
+        #treat the contents as either text or binary (unicode or
+        #bytes under Python 3)
+        if fileobj:
+            assert filename is None
+            handle = fileobj
+            assert "b" in handle.mode.lower()
+        else:
+            if "w" in mode.lower() \
+            or "a" in mode.lower():
+                raise ValueError("Must use read mode (default), not write or append mode")
+            handle = __builtin__.open(filename, "rb")
+            self.name = filename
+        self._text = "b" not in mode.lower()
+        if self._text:
+            self._newline = "\n"
+        else:
+            self._newline = _bytes_newline
+        self._handle = handle
+        self.max_cache = max_cache
+        self._buffers = {}
+        self._block_start_offset = None
+        self._block_raw_length = None
+        self._load_block(handle.tell())
+
+    def _load_block(self, start_offset=None):
+        if start_offset is None:
+            #If the file is being read sequentially, then _handle.tell()
+            #should be pointing at the start of the next block.
+            #However, if seek has been used, we can't assume that.
+            start_offset = self._block_start_offset + self._block_raw_length
+        if start_offset == self._block_start_offset:
+            self._within_block_offset = 0
+            return
+        elif start_offset in self._buffers:
+            #Already in cache
+            self._buffer, self._block_raw_length = self._buffers[start_offset]
+            self._within_block_offset = 0
+            self._block_start_offset = start_offset
+            return
+        #Must hit the disk... first check cache limits,
+        while len(self._buffers) >= self.max_cache:
+            #Drop an arbitrary block from the cache
+            self._buffers.popitem()
+        #Now load the block
+        handle = self._handle
+        if start_offset is not None:
+            #Check the block start can be used in a virtual offset
+            make_virtual_offset(start_offset, 0)
+            handle.seek(start_offset)
+        self._block_start_offset = handle.tell()
+        try:
+            block_size, self._buffer = _load_bgzf_block(handle, self._text)
+        except StopIteration:
+            #EOF
+            block_size = 0
+            if self._text:
+                self._buffer = ""
+            else:
+                self._buffer = _empty_bytes_string
+        self._within_block_offset = 0
+        self._block_raw_length = block_size
+        #Finally save the block in our cache,
+        self._buffers[self._block_start_offset] = self._buffer, block_size
+
+    def tell(self):
+        """Returns a 64-bit unsigned BGZF virtual offset."""
+        if 0 < self._within_block_offset == len(self._buffer):
+            #Special case where we're right at the end of a (non empty) block.
+            #For non-maximal blocks could give two possible virtual offsets,
+            #but for a maximal block can't use 65536 as the within block
+            #offset. Therefore for consistency, use the next block and a
+            #within block offset of zero.
+            return (self._block_start_offset + self._block_raw_length) << 16
+        else:
+            #Do this inline to avoid a function call (the block start was
+            #checked by make_virtual_offset in _load_block, and the within
+            #block offset is less than the block size, at most 2**16),
+            #return make_virtual_offset(self._block_start_offset,
+            #                           self._within_block_offset)
+            return (self._block_start_offset<<16) | self._within_block_offset
+
+    def seek(self, virtual_offset):
+        """Seek to a 64-bit unsigned BGZF virtual offset."""
+        #Do this inline to avoid a function call,
+        #start_offset, within_block = split_virtual_offset(virtual_offset)
+        start_offset = virtual_offset>>16
+        within_block = virtual_offset ^ (start_offset<<16)
+        if start_offset != self._block_start_offset:
+            #Don't need to load the block if already there
+            #(this avoids a function call since _load_block would do nothing)
+            self._load_block(start_offset)
+            assert start_offset == self._block_start_offset
+        if within_block > len(self._buffer) \
+        and not (within_block == 0 and len(self._buffer)==0):
+            raise ValueError("Within offset %i but block size only %i" \
+                             % (within_block, len(self._buffer)))
+        self._within_block_offset = within_block
+        #assert virtual_offset == self.tell(), \
+        #    "Did seek to %i (%i, %i), but tell says %i (%i, %i)" \
+        #    % (virtual_offset, start_offset, within_block,
+        #       self.tell(), self._block_start_offset, self._within_block_offset)
+        return virtual_offset
+
+    def read(self, size=-1):
+        """Read up to size bytes, or until the end of the file if negative."""
+        parts = []
+        while size:
+            start = self._within_block_offset
+            if size < 0:
+                end = len(self._buffer)
+            else:
+                end = min(len(self._buffer), start + size)
+                size -= end - start
+            if end > start:
+                parts.append(self._buffer[start:end])
+                self._within_block_offset = end
+            if size and end == len(self._buffer):
+                #Need the next block (which may be empty, or the EOF)
+                self._load_block()
+                if not self._block_raw_length:
+                    break
+        return self._newline[:0].join(parts)
+
+    def readline(self):
+        """Read a single line, including the trailing new line character."""
+        newline = self._newline
+        parts = []
+        while True:
+            start = self._within_block_offset
+            i = self._buffer.find(newline, start)
+            if i != -1:
+                i += 1
+                parts.append(self._buffer[start:i])
+                self._within_block_offset = i
+                break
+            parts.append(self._buffer[start:])
+            self._within_block_offset = len(self._buffer)
+            #Need the next block (which may be empty, or the EOF)
+            self._load_block()
+            if not self._block_raw_length:
+                break
+        return newline[:0].join(parts)
+
+    def next(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def __iter__(self):
+        return self
+
+    def close(self):
+        self._handle.close()
+        self._buffer = None
+        self._block_start_offset = None
+        self._buffers = None
+
+    def seekable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def fileno(self):
+        return self._handle.fileno()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class BgzfWriter(object):
+    """BGZF writer, acts like a write only handle.
+
+    Each block holds at most 65280 bytes of uncompressed data (as in
+    samtools), and the tell method returns a BGZF virtual offset.
+    """
+
+    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6):
+        if fileobj:
+            assert filename is None
+            handle = fileobj
+        else:
+            if "w" not in mode.lower() \
+            and "a" not in mode.lower():
+                raise ValueError("Must use write or append mode, not %r" % mode)
+            if "a" in mode.lower():
+                handle = __builtin__.open(filename, "ab")
+            else:
+                handle = __builtin__.open(filename, "wb")
+            self.name = filename
+        self._text = "b" not in mode.lower()
+        self._handle = handle
+        self._buffer = []
+        self._buffer_size = 0
+        self.compresslevel = compresslevel
+
+    def _write_block(self, block):
+        #print "Saving %i bytes" % len(block)
+        c = zlib.compressobj(self.compresslevel,
+                             zlib.DEFLATED,
+                             -15,
+                             zlib.DEF_MEM_LEVEL,
+                             0)
+        compressed = c.compress(block) + c.flush()
+        del c
+        if len(compressed) > 65536 - 26:
+            #Didn't compress enough, try less data in each block
+            half = len(block) // 2
+            self._write_block(block[:half])
+            self._write_block(block[half:])
+            return
+        crc = zlib.crc32(block)
+        #Should cope with a mix of Python platforms...
+        if crc < 0:
+            crc = struct.pack("<i", crc)
+        else:
+            crc = struct.pack("<I", crc)
+        bsize = struct.pack("<H", len(compressed)+25) #includes -1
+        uncompressed_length = struct.pack("<I", len(block))
+        #Fixed 16 bytes,
+        # gzip magic bytes (4) mod time (4),
+        # gzip flag (1), os (1), extra length which is six (2),
+        # sub field which is BC (2), sub field length of two (2),
+        #Variable data,
+        #2 bytes: block length as BC sub field (2)
+        #X bytes: the data
+        #8 bytes: crc (4), uncompressed data length (4)
+        data = _bgzf_header + bsize + compressed + crc + uncompressed_length
+        self._handle.write(data)
+
+    def write(self, data):
+        data = _as_bytes(data)
+        #block_size = 2**16 = 65536
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        if self._buffer_size >= _block_size:
+            data = _empty_bytes_string.join(self._buffer)
+            start = 0
+            while len(data) - start >= _block_size:
+                self._write_block(data[start:start+_block_size])
+                start += _block_size
+            data = data[start:]
+            self._buffer = [data]
+            self._buffer_size = len(data)
+
+    def flush(self):
+        """Write any buffered data as a BGZF block, and flush the handle."""
+        if self._buffer_size:
+            self._write_block(_empty_bytes_string.join(self._buffer))
+            self._buffer = []
+            self._buffer_size = 0
+        self._handle.flush()
+
+    def close(self):
+        """Flush data, write 28 bytes empty BGZF EOF marker, and close the BGZF file."""
+        if self._buffer_size:
+            self.flush()
+        #samtools will look for a magic EOF marker, just a 28 byte empty BGZF block,
+        #and if it is missing warns the BAM file may be truncated. In addition to
+        #samtools writing this block, so too does bgzip - so we should too.
+        self._handle.write(_bgzf_eof)
+        self._handle.flush()
+        self._handle.close()
+
+    def tell(self):
+        """Returns a BGZF 64-bit virtual offset."""
+        return make_virtual_offset(self._handle.tell(), self._buffer_size)
+
+    def seekable(self):
+        #Not seekable, but we do support tell...
+        return False
+
+    def isatty(self):
+        return False
+
+    def fileno(self):
+        return self._handle.fileno()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        print "Call this with no arguments and pipe uncompressed data in on stdin"
+        print "and it will produce BGZF compressed data on stdout. e.g."
+        print ""
+        print "./bgzf.py < example.fastq > example.fastq.bgz"
+        print ""
+        print "The extension convention of *.bgz is to distinugish these from *.gz"
+        print "used for standard gzipped files without the block structure of BGZF."
+        print "You can use the standard gunzip command to decompress BGZF files,"
+        print "if it complains about the extension try something like this:"
+        print ""
+        print "cat example.fastq.bgz | gunzip > example.fastq"
+        print ""
+        sys.exit(0)
+
+    sys.stderr.write("Producing BGZF output from stdin...\n")
+    w = BgzfWriter(fileobj=sys.stdout)
+    while True:
+        data = sys.stdin.read(65536)
+        w.write(data)
+        if not data:
+            break
+    #Doing close with write an empty BGZF block as EOF marker:
+    w.close()
+    sys.stderr.write("BGZF data produced\n")
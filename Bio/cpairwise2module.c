@@ -159,7 +159,9 @@ double _get_match_score(PyObject *py_sequenceA, PyObject *py_sequenceB,
 			char *sequenceA, char *sequenceB, 
 			int use_sequence_cstring,
 			double match, double mismatch, 
-			int use_match_mismatch_scores)
+			int use_match_mismatch_scores,
+			double *score_table, int num_residues,
+			int *indexA, int *indexB)
 {
     PyObject *py_A=NULL, 
 	*py_B=NULL;
@@ -170,6 +172,8 @@ double _get_match_score(PyObject *py_sequenceA, PyObject *py_sequenceB,
 	score = (sequenceA[i] == sequenceB[j]) ? match : mismatch;
 	return score;
     }
+    if(score_table)
+	return score_table[indexA[i]*num_residues + indexB[j]];
     /* Calculate the match score. */
     if(!(py_A = PySequence_GetItem(py_sequenceA, i)))
 	goto _get_match_score_cleanup;
@@ -197,6 +201,93 @@ double _get_match_score(PyObject *py_sequenceA, PyObject *py_sequenceB,
     return score;
 }
 
+/* Optimize for substitution matrices.  If py_match_fn has a compiled
+ * score table (see dictionary_match in pairwise2.py), copy the table and
+ * translate the sequences into indexes into it.  Returns the table, or
+ * NULL if it can't be used (e.g. a residue isn't in the table), in which
+ * case the match function should be called instead.
+ */
+static double *_get_score_table(PyObject *py_match_fn,
+				char *sequenceA, int lenA,
+				char *sequenceB, int lenB,
+				int *num_residues, int **indexA, int **indexB)
+{
+    PyObject *py_residues=NULL, *py_table=NULL;
+#if PY_MAJOR_VERSION >= 3
+    PyObject *py_bytes=NULL;
+#endif
+    char *residues;
+    int lookup[256];
+    int i, n;
+    double *score_table=NULL, *retval=NULL;
+    int *iA=NULL, *iB=NULL;
+
+    if(!(py_residues = PyObject_GetAttrString(py_match_fn, "_residues")))
+	goto _get_score_table_cleanup;
+    if(!(py_table = PyObject_GetAttrString(py_match_fn, "_flat_table")))
+	goto _get_score_table_cleanup;
+#if PY_MAJOR_VERSION < 3
+    if(!PyString_Check(py_residues))
+	goto _get_score_table_cleanup;
+    residues = PyString_AS_STRING(py_residues);
+    n = PyString_GET_SIZE(py_residues);
+#else
+    if(!PyUnicode_Check(py_residues))
+	goto _get_score_table_cleanup;
+    if(!(py_bytes = PyUnicode_AsASCIIString(py_residues)))
+	goto _get_score_table_cleanup;
+    residues = PyBytes_AS_STRING(py_bytes);
+    n = PyBytes_GET_SIZE(py_bytes);
+#endif
+    if(!PyList_Check(py_table) || PyList_GET_SIZE(py_table) != n*n)
+	goto _get_score_table_cleanup;
+
+    score_table = malloc(n*n*sizeof(*score_table));
+    iA = malloc(lenA*sizeof(*iA));
+    iB = malloc(lenB*sizeof(*iB));
+    if(!score_table || !iA || !iB)
+	goto _get_score_table_cleanup;
+    for(i=0; i<n*n; i++) {
+	score_table[i] = PyFloat_AsDouble(PyList_GET_ITEM(py_table, i));
+	if(PyErr_Occurred())
+	    goto _get_score_table_cleanup;
+    }
+    for(i=0; i<256; i++)
+	lookup[i] = -1;
+    for(i=0; i<n; i++)
+	lookup[(unsigned char)residues[i]] = i;
+    for(i=0; i<lenA; i++) {
+	if((iA[i] = lookup[(unsigned char)sequenceA[i]]) < 0)
+	    goto _get_score_table_cleanup;
+    }
+    for(i=0; i<lenB; i++) {
+	if((iB[i] = lookup[(unsigned char)sequenceB[i]]) < 0)
+	    goto _get_score_table_cleanup;
+    }
+    *num_residues = n;
+    *indexA = iA;
+    *indexB = iB;
+    retval = score_table;
+
+ _get_score_table_cleanup:
+    if(PyErr_Occurred())
+	PyErr_Clear();
+    if(!retval) {
+	if(score_table)
+	    free(score_table);
+	if(iA)
+	    free(iA);
+	if(iB)
+	    free(iB);
+    }
+    Py_XDECREF(py_residues);
+    Py_XDECREF(py_table);
+#if PY_MAJOR_VERSION >= 3
+    Py_XDECREF(py_bytes);
+#endif
+    return retval;
+}
+
 #if PY_MAJOR_VERSION >= 3
 static PyObject* _create_bytes_object(PyObject* o) {
     PyObject* b;
@@ -239,6 +330,9 @@ static PyObject *cpairwise2__make_score_matrix_fast(
     double first_A_gap, first_B_gap;
     double match, mismatch;
     int use_match_mismatch_scores;
+    double *score_table = (double *)NULL;
+    int num_residues = 0;
+    int *indexA = (int *)NULL, *indexB = (int *)NULL;
     int lenA, lenB;
     double *score_matrix = (double *)NULL;
     struct IndexList *trace_matrix = (struct IndexList *)NULL;
@@ -317,6 +411,13 @@ cleanup_after_py_match_fn:
         Py_DECREF(py_mismatch);
     }
 
+    lenA = PySequence_Length(py_sequenceA);
+    lenB = PySequence_Length(py_sequenceB);
+    if(use_sequence_cstring && !use_match_mismatch_scores)
+	score_table = _get_score_table(py_match_fn, sequenceA, lenA,
+				       sequenceB, lenB, &num_residues,
+				       &indexA, &indexB);
+
     /* Cache some commonly used gap penalties */
     first_A_gap = calc_affine_penalty(1, open_A, extend_A, 
 				      penalize_extend_when_opening);
@@ -324,8 +425,6 @@ cleanup_after_py_match_fn:
 				      penalize_extend_when_opening);
 
     /* Allocate matrices for storing the results and initalize them. */
-    lenA = PySequence_Length(py_sequenceA);
-    lenB = PySequence_Length(py_sequenceB);
     score_matrix = malloc(lenA*lenB*sizeof(*score_matrix));
     trace_matrix = malloc(lenA*lenB*sizeof(*trace_matrix));
     if(!score_matrix || !trace_matrix) {
@@ -344,7 +443,9 @@ cleanup_after_py_match_fn:
 					sequenceA, sequenceB,
 					use_sequence_cstring,
 					match, mismatch,
-					use_match_mismatch_scores);
+					use_match_mismatch_scores,
+					score_table, num_residues,
+					indexA, indexB);
 	if(PyErr_Occurred())
 	    goto _cleanup_make_score_matrix_fast;
 	if(penalize_end_gaps)
@@ -358,7 +459,9 @@ cleanup_after_py_match_fn:
 					sequenceA, sequenceB,
 					use_sequence_cstring,
 					match, mismatch,
-					use_match_mismatch_scores);
+					use_match_mismatch_scores,
+					score_table, num_residues,
+					indexA, indexB);
 	if(PyErr_Occurred())
 	    goto _cleanup_make_score_matrix_fast;
 	if(penalize_end_gaps)
@@ -424,7 +527,9 @@ cleanup_after_py_match_fn:
 						  sequenceA, sequenceB,
 						  use_sequence_cstring,
 						  match, mismatch,
-						  use_match_mismatch_scores);
+						  use_match_mismatch_scores,
+						  score_table, num_residues,
+						  indexA, indexB);
 	    if(PyErr_Occurred())
 		goto _cleanup_make_score_matrix_fast;
 	    if(!align_globally && score < 0)
@@ -537,6 +642,12 @@ cleanup_after_py_match_fn:
  _cleanup_make_score_matrix_fast:
     if(score_matrix)
 	free(score_matrix);
+    if(score_table)
+	free(score_table);
+    if(indexA)
+	free(indexA);
+    if(indexB)
+	free(indexB);
     if(trace_matrix) {
 	for(i=0; i<lenA*lenB; i++)
 	    IndexList_free(&trace_matrix[i]);
@@ -571,6 +682,254 @@ cleanup_after_py_match_fn:
     return py_retval;
 }
 
+/* Return the best score, as in _score_only_fast in pairwise2.py (please
+ * see there for the details).  Only the previous row of the score matrix
+ * is kept, and for a compiled substitution matrix the match scores come
+ * from a profile of sequenceB with a row for each residue, so the inner
+ * loop doesn't call back into Python.
+ */
+static PyObject *cpairwise2__score_only_fast(
+    PyObject *self, PyObject *args)
+{
+    int k;
+    int row, col;
+
+    PyObject *py_sequenceA, *py_sequenceB, *py_match_fn;
+#if PY_MAJOR_VERSION >= 3
+    PyObject *py_bytesA, *py_bytesB;
+#endif
+    char *sequenceA=NULL, *sequenceB=NULL;
+    int use_sequence_cstring;
+    double open_A, extend_A, open_B, extend_B;
+    int penalize_extend_when_opening, penalize_end_gaps;
+    int align_globally;
+
+    PyObject *py_match=NULL, *py_mismatch=NULL;
+    double first_A_gap, first_B_gap;
+    double match, mismatch;
+    int use_match_mismatch_scores;
+    double *score_table = (double *)NULL;
+    int num_residues = 0;
+    int *indexA = (int *)NULL, *indexB = (int *)NULL;
+    int lenA, lenB;
+
+    double *profile = (double *)NULL, *match_scores = (double *)NULL;
+    double *prev = (double *)NULL, *current = (double *)NULL;
+    double *col_cache_score = (double *)NULL;
+    double *swap;
+    double score, best_score = 0;
+
+    PyObject *py_retval = NULL;
+
+    if(!PyArg_ParseTuple(args, "OOOddddiii", &py_sequenceA, &py_sequenceB,
+			 &py_match_fn, &open_A, &extend_A, &open_B, &extend_B,
+			 &penalize_extend_when_opening, &penalize_end_gaps,
+			 &align_globally))
+	return NULL;
+    if(!PySequence_Check(py_sequenceA) || !PySequence_Check(py_sequenceB)) {
+	PyErr_SetString(PyExc_TypeError, 
+			"py_sequenceA and py_sequenceB should be sequences.");
+	return NULL;
+    }
+
+#if PY_MAJOR_VERSION < 3
+    use_sequence_cstring = 0;
+    if(PyString_Check(py_sequenceA) && PyString_Check(py_sequenceB)) {
+	sequenceA = PyString_AS_STRING(py_sequenceA);
+	sequenceB = PyString_AS_STRING(py_sequenceB);
+	use_sequence_cstring = 1;
+    }
+#else
+    py_bytesA = _create_bytes_object(py_sequenceA);
+    py_bytesB = _create_bytes_object(py_sequenceB);
+    if (py_bytesA && py_bytesB) {
+        sequenceA = PyBytes_AS_STRING(py_bytesA);
+        sequenceB = PyBytes_AS_STRING(py_bytesB);
+	use_sequence_cstring = 1;
+    }
+    else {
+        Py_XDECREF(py_bytesA);
+        Py_XDECREF(py_bytesB);
+        py_bytesA = py_bytesB = NULL;
+        use_sequence_cstring = 0;
+    }
+#endif
+
+    if(!PyCallable_Check(py_match_fn)) {
+	PyErr_SetString(PyExc_TypeError, "py_match_fn must be callable.");
+	goto _cleanup_score_only_fast;
+    }
+    /* Check for an identity_match, as in _make_score_matrix_fast. */
+    match = mismatch = 0;
+    use_match_mismatch_scores = 0;
+    if(!(py_match = PyObject_GetAttrString(py_match_fn, "match")))
+        goto cleanup_after_py_match_fn;
+    match = PyNumber_AsDouble(py_match);
+    if(PyErr_Occurred())
+        goto cleanup_after_py_match_fn;
+    if(!(py_mismatch = PyObject_GetAttrString(py_match_fn, "mismatch")))
+        goto cleanup_after_py_match_fn;
+    mismatch = PyNumber_AsDouble(py_mismatch);
+    if(PyErr_Occurred())
+        goto cleanup_after_py_match_fn;
+    use_match_mismatch_scores = 1;
+cleanup_after_py_match_fn:
+    if(PyErr_Occurred())
+        PyErr_Clear();
+    Py_XDECREF(py_match);
+    Py_XDECREF(py_mismatch);
+
+    lenA = PySequence_Length(py_sequenceA);
+    lenB = PySequence_Length(py_sequenceB);
+    if(use_sequence_cstring && !use_match_mismatch_scores)
+	score_table = _get_score_table(py_match_fn, sequenceA, lenA,
+				       sequenceB, lenB, &num_residues,
+				       &indexA, &indexB);
+
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A, 
+				      penalize_extend_when_opening);
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+				      penalize_extend_when_opening);
+
+    prev = malloc(lenB*sizeof(*prev));
+    current = malloc(lenB*sizeof(*current));
+    col_cache_score = malloc(lenB*sizeof(*col_cache_score));
+    match_scores = malloc(lenB*sizeof(*match_scores));
+    if(!prev || !current || !col_cache_score || !match_scores) {
+	PyErr_SetString(PyExc_MemoryError, "Out of memory");
+	goto _cleanup_score_only_fast;
+    }
+    if(score_table) {
+	/* The profile has the scores of each residue against sequenceB. */
+	if(!(profile = malloc(num_residues*lenB*sizeof(*profile)))) {
+	    PyErr_SetString(PyExc_MemoryError, "Out of memory");
+	    goto _cleanup_score_only_fast;
+	}
+	for(k=0; k<num_residues; k++) {
+	    for(col=0; col<lenB; col++)
+		profile[k*lenB+col] = score_table[k*num_residues+indexB[col]];
+	}
+    }
+
+    for(row=0; row<lenA; row++) {
+	/* Get the match scores of this row against sequenceB. */
+	if(profile) {
+	    memcpy(match_scores, &profile[indexA[row]*lenB],
+		   lenB*sizeof(*match_scores));
+	} else {
+	    for(col=0; col<lenB; col++) {
+		match_scores[col] = _get_match_score(
+		    py_sequenceA, py_sequenceB, py_match_fn, row, col,
+		    sequenceA, sequenceB, use_sequence_cstring,
+		    match, mismatch, use_match_mismatch_scores,
+		    NULL, 0, NULL, NULL);
+		if(PyErr_Occurred())
+		    goto _cleanup_score_only_fast;
+	    }
+	}
+
+	if(row == 0) {
+	    /* The first row is a border of the score matrix. */
+	    for(col=0; col<lenB; col++) {
+		current[col] = match_scores[col];
+		if(penalize_end_gaps)
+		    current[col] += calc_affine_penalty(
+			col, open_A, extend_A, penalize_extend_when_opening);
+		col_cache_score[col] = current[col] + first_B_gap;
+	    }
+	} else {
+	    double row_cache_score = prev[0] + first_A_gap;
+
+	    current[0] = match_scores[0];
+	    if(penalize_end_gaps)
+		current[0] += calc_affine_penalty(
+		    row, open_B, extend_B, penalize_extend_when_opening);
+	    for(col=1; col<lenB; col++) {
+		double nogap_score, row_score, col_score;
+		double open_score, extend_score;
+
+		nogap_score = prev[col-1];
+		row_score = (col > 1) ? row_cache_score : nogap_score-1;
+		col_score = (row > 1) ? col_cache_score[col-1] : nogap_score-1;
+		score = (row_score > col_score) ? row_score : col_score;
+		if(nogap_score > score)
+		    score = nogap_score;
+		score += match_scores[col];
+		if(!align_globally && score < 0)
+		    score = 0;
+		current[col] = score;
+
+		/* Update the cached column and row scores. */
+		open_score = nogap_score + first_B_gap;
+		extend_score = col_cache_score[col-1] + extend_B;
+		col_cache_score[col-1] =
+		    (rint(extend_score) > rint(open_score)) ?
+		    extend_score : open_score;
+		open_score = nogap_score + first_A_gap;
+		extend_score = row_cache_score + extend_A;
+		row_cache_score =
+		    (rint(extend_score) > rint(open_score)) ?
+		    extend_score : open_score;
+	    }
+	}
+
+	/* Look for the best score, as in _find_start. */
+	if(align_globally) {
+	    score = current[lenB-1];
+	    if(penalize_end_gaps)
+		score += calc_affine_penalty(lenA-row-1, open_B, extend_B,
+					     penalize_extend_when_opening);
+	    if(row == 0 || score > best_score)
+		best_score = score;
+	    if(row == lenA-1) {
+		for(col=0; col<lenB-1; col++) {
+		    score = current[col];
+		    if(penalize_end_gaps)
+			score += calc_affine_penalty(
+			    lenB-col-1, open_A, extend_A,
+			    penalize_extend_when_opening);
+		    if(score > best_score)
+			best_score = score;
+		}
+	    }
+	} else {
+	    for(col=0; col<lenB; col++) {
+		if((row == 0 && col == 0) || current[col] > best_score)
+		    best_score = current[col];
+	    }
+	}
+	swap = prev;
+	prev = current;
+	current = swap;
+    }
+
+    py_retval = PyFloat_FromDouble(best_score);
+
+ _cleanup_score_only_fast:
+    if(score_table)
+	free(score_table);
+    if(indexA)
+	free(indexA);
+    if(indexB)
+	free(indexB);
+    if(profile)
+	free(profile);
+    if(match_scores)
+	free(match_scores);
+    if(prev)
+	free(prev);
+    if(current)
+	free(current);
+    if(col_cache_score)
+	free(col_cache_score);
+#if PY_MAJOR_VERSION >= 3
+    if (py_bytesA != NULL && py_bytesA != py_sequenceA) Py_DECREF(py_bytesA);
+    if (py_bytesB != NULL && py_bytesB != py_sequenceB) Py_DECREF(py_bytesB);
+#endif
+
+    return py_retval;
+}
+
 static PyObject *cpairwise2_rint(
     PyObject *self, PyObject *args, PyObject *keywds)
 {
@@ -596,6 +955,8 @@ static PyObject *cpairwise2_rint(
 static PyMethodDef cpairwise2Methods[] = {
     {"_make_score_matrix_fast", 
      (PyCFunction)cpairwise2__make_score_matrix_fast, METH_VARARGS, ""},
+    {"_score_only_fast", 
+     (PyCFunction)cpairwise2__score_only_fast, METH_VARARGS, ""},
     {"rint", (PyCFunction)cpairwise2_rint, METH_VARARGS|METH_KEYWORDS, ""},
     {NULL, NULL, 0, NULL}
 };
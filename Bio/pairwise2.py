@@ -124,6 +124,36 @@ Biopython ( Bio.SubsMat -> MatrixInfo ).
       Score=13
     <BLANKLINE>
 
+For long sequences, the linear_memory option keeps only a couple of rows
+of the score matrix (rather than the whole matrix), and returns just one
+alignment.  For similar sequences, the band_width option also restricts
+the alignment to near the main diagonal, which saves a lot of time:
+
+    >>> for a in pairwise2.align.globalms("ACCGT", "ACG", 2, -1, -.5, -.1,
+    ...                                   linear_memory=True):
+    ...     print format_alignment(*a)
+    ACCGT
+    |||||
+    A-CG-
+      Score=5
+    <BLANKLINE>
+    >>> pairwise2.align.globalms("ACCGT", "ACG", 2, -1, -.5, -.1,
+    ...                          band_width=1, score_only=True)
+    5.0
+
+To align one query against many targets (or all the sequences in a list
+against each other), use the one_to_many (or all_vs_all) method of an
+alignment function.  This decodes the parameters once rather than for every
+pair, returns the score or the best alignment for each pair, and can share
+the work between several processes:
+
+    >>> pairwise2.align.globalms.one_to_many("ACCGT", ["ACG", "ACCGT"],
+    ...                                      2, -1, -.5, -.1, score_only=True)
+    [5.0, 10.0]
+    >>> pairwise2.align.globalxx.all_vs_all(["ACCGT", "ACG", "CG"],
+    ...                                     score_only=True)
+    [(0, 1, 3.0), (0, 2, 2.0), (1, 2, 2.0)]
+
 To see a description of the parameters for a function, please look at
 the docstring for the function via the help function, e.g.
 type help(pairwise2.align.localds) at the Python prompt.
@@ -145,9 +175,24 @@ type help(pairwise2.align.localds) at the Python prompt.
 #   For debugging.
 # - score_only: boolean
 #   Only get the best score, don't recover any alignments.  The return
-#   value of the function is the score.
+#   value of the function is the score.  With affine gap penalties
+#   (i.e. not the XXc functions), this only keeps one row of the score
+#   matrix, and the C code scores substitution matrices and simple
+#   match/mismatch scores without calling back into Python, which makes
+#   scanning many sequences much faster.
 # - one_alignment_only: boolean
 #   Only recover one alignment.
+# - linear_memory: boolean
+#   Use memory proportional to the sequence lengths rather than their
+#   product, by only keeping a couple of rows of the score matrix and
+#   recovering one alignment by divide and conquer (which takes about
+#   twice as long).  Needs affine gap penalties (i.e. not the XXc
+#   functions), and only returns one alignment.
+# - band_width: integer
+#   Only consider alignments where the residue pairs stay within this
+#   distance of the main diagonal, i.e. aligning sequenceA[i] with
+#   sequenceB[j] only if abs(i - j) <= band_width.  This is much faster
+#   for long similar sequences.  Implies linear_memory.
 
 MAX_ALIGNMENTS = 1000   # maximum alignments recovered in traceback
 
@@ -290,15 +335,66 @@ alignment occurs.
                 ('gap_char', '-'),
                 ('force_generic', 0),
                 ('score_only', 0),
-                ('one_alignment_only', 0)
+                ('one_alignment_only', 0),
+                ('linear_memory', 0),
+                ('band_width', None)
                 ]
             for name, default in default_params:
                 keywds[name] = keywds.get(name, default)
+            # Compile any substitution matrix once for all the alignments
+            # made with these parameters.
+            _compile_match_fn(keywds['match_fn'])
             return keywds
             
         def __call__(self, *args, **keywds):
             keywds = self.decode(*args, **keywds)
             return _align(**keywds)
+
+        def one_to_many(self, query, targets, *args, **keywds):
+            """Align a query to each of the targets, returns a list.
+
+            Takes the same parameters as the alignment function itself,
+            except that instead of sequenceA and sequenceB there is a query
+            sequence and an iterable of target sequences.  The parameters
+            are decoded once, rather than for each pair.  For each target
+            the list holds the best alignment (or None if there isn't one)
+            as a tuple, or with score_only=True just the score.  Either way
+            if the query or a target is empty that entry is None.
+
+            Two additional keyword arguments are taken: processes, the
+            number of worker processes (default 1 meaning none, None
+            meaning the number of CPUs) and chunk_size, the number of
+            pairs given to a worker process at a time (default 100).
+            Using processes requires the multiprocessing module, and the
+            match and gap functions must be able to be pickled.
+            """
+            processes = keywds.pop('processes', 1)
+            chunk_size = keywds.pop('chunk_size', 100)
+            keywds['one_alignment_only'] = 1
+            keywds = self.decode(query, None, *args, **keywds)
+            pairs = ((query, target) for target in targets)
+            return _align_pairs(keywds, pairs, processes, chunk_size)
+
+        def all_vs_all(self, sequences, *args, **keywds):
+            """Align all pairs of the sequences, returns a list.
+
+            Takes the same parameters as the alignment function itself,
+            except that instead of sequenceA and sequenceB there is a list
+            of sequences.  Returns a list of (i, j, result) tuples, for
+            each pair of indices i < j (in that order), where result is as
+            in the one_to_many method (which also describes the additional
+            processes and chunk_size arguments).
+            """
+            processes = keywds.pop('processes', 1)
+            chunk_size = keywds.pop('chunk_size', 100)
+            keywds['one_alignment_only'] = 1
+            keywds = self.decode(None, None, *args, **keywds)
+            indices = [(i, j) for i in range(len(sequences))
+                       for j in range(i+1, len(sequences))]
+            pairs = ((sequences[i], sequences[j]) for i, j in indices)
+            results = _align_pairs(keywds, pairs, processes, chunk_size)
+            return [(i, j, result) for (i, j), result
+                    in zip(indices, results)]
         
     def __getattr__(self, attr):
         return self.alignment_function(attr)
@@ -308,14 +404,25 @@ align = align()
 def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
            penalize_extend_when_opening, penalize_end_gaps,
            align_globally, gap_char, force_generic, score_only,
-           one_alignment_only):
+           one_alignment_only, linear_memory, band_width):
     if not sequenceA or not sequenceB:
         return []
 
+    if linear_memory or band_width is not None:
+        return _align_linear(
+            sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
+            penalize_extend_when_opening, penalize_end_gaps, align_globally,
+            gap_char, score_only, band_width)
+
     if (not force_generic) and isinstance(gap_A_fn, affine_penalty) \
     and isinstance(gap_B_fn, affine_penalty):
         open_A, extend_A = gap_A_fn.open, gap_A_fn.extend
         open_B, extend_B = gap_B_fn.open, gap_B_fn.extend
+        if score_only:
+            return _score_only_fast(
+                sequenceA, sequenceB, match_fn, open_A, extend_A, open_B,
+                extend_B, penalize_extend_when_opening, penalize_end_gaps,
+                align_globally)
         x = _make_score_matrix_fast(
             sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
             penalize_extend_when_opening, penalize_end_gaps, align_globally,
@@ -359,6 +466,54 @@ def _align(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
         align_globally, penalize_end_gaps, gap_char, one_alignment_only)
     return x
 
+def _align_pair(keywds, sequenceA, sequenceB):
+    # Align a pair of sequences given the decoded parameters, returning
+    # the score, or the best alignment (or None, also if either sequence
+    # is empty).
+    if not sequenceA or not sequenceB:
+        return None
+    keywds['sequenceA'], keywds['sequenceB'] = sequenceA, sequenceB
+    result = _align(**keywds)
+    if keywds['score_only']:
+        return result
+    if result:
+        return result[0]
+    return None
+
+def _align_chunk(args):
+    # Align a list of pairs, used by the worker processes.
+    keywds, pairs = args
+    return [_align_pair(keywds, seqA, seqB) for seqA, seqB in pairs]
+
+def _align_pairs(keywds, pairs, processes, chunk_size):
+    # Align each pair of sequences from an iterable, returning a list of
+    # the results, using a pool of worker processes if requested.
+    if processes == 1:
+        return [_align_pair(keywds, seqA, seqB) for seqA, seqB in pairs]
+    if processes is not None and processes < 1:
+        raise ValueError("Number of processes should be at least one")
+    if chunk_size < 1:
+        raise ValueError("The chunk_size should be a positive integer")
+    import multiprocessing
+    def chunks():
+        chunk = []
+        for pair in pairs:
+            chunk.append(pair)
+            if len(chunk) >= chunk_size:
+                yield keywds, chunk
+                chunk = []
+        if chunk:
+            yield keywds, chunk
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = []
+        for chunk_results in pool.imap(_align_chunk, chunks()):
+            results.extend(chunk_results)
+    finally:
+        pool.terminate()
+        pool.join()
+    return results
+
 def _make_score_matrix_generic(
     sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn, 
     penalize_extend_when_opening, penalize_end_gaps, align_globally,
@@ -458,6 +613,13 @@ def _make_score_matrix_fast(
         score_matrix.append([None] * lenB)
         trace_matrix.append([[None]] * lenB)
 
+    # A compiled substitution matrix gives the match scores for each row
+    # by looking up the row's residue in a profile of sequenceB, instead
+    # of calling the match function for every cell.
+    profile = None
+    if isinstance(match_fn, dictionary_match):
+        profile = match_fn._profile(sequenceA, sequenceB)
+
     # The top and left borders of the matrices are special cases
     # because there are no previously aligned characters.  To simplify
     # the main loop, handle these separately.
@@ -504,6 +666,11 @@ def _make_score_matrix_fast(
         
     # Fill in the score_matrix.
     for row in range(1, lenA):
+        if profile is not None:
+            match_scores = profile[row]
+        else:
+            charA = sequenceA[row]
+            match_scores = [match_fn(charA, charB) for charB in sequenceB]
         for col in range(1, lenB):
             # Calculate the score that would occur by extending the
             # alignment without gaps.
@@ -533,7 +700,7 @@ def _make_score_matrix_fast(
                 best_index.extend(col_cache_index[col-1])
 
             # Set the score and traceback matrices.
-            score = best_score + match_fn(sequenceA[row], sequenceB[col])
+            score = best_score + match_scores[col]
             if not align_globally and score < 0:
                 score_matrix[row][col] = 0
             else:
@@ -577,7 +744,391 @@ def _make_score_matrix_fast(
                                              [(row-1, col-1)]
                     
     return score_matrix, trace_matrix
-    
+
+def _score_only_fast(
+    sequenceA, sequenceB, match_fn, open_A, extend_A, open_B, extend_B,
+    penalize_extend_when_opening, penalize_end_gaps, align_globally):
+    # Return the best score, exactly as _make_score_matrix_fast and
+    # _find_start would find it, but keeping only the previous row of
+    # the score matrix and no traceback.  Each row of the score matrix
+    # only depends on the previous row and the cached gap scores, so
+    # this needs memory proportional to the length of sequenceB.
+    first_A_gap = calc_affine_penalty(1, open_A, extend_A,
+                                      penalize_extend_when_opening)
+    first_B_gap = calc_affine_penalty(1, open_B, extend_B,
+                                      penalize_extend_when_opening)
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    profile = None
+    if isinstance(match_fn, dictionary_match):
+        profile = match_fn._profile(sequenceA, sequenceB)
+
+    # The first row of the score matrix.
+    if profile is not None:
+        match_scores = profile[0]
+    else:
+        charA = sequenceA[0]
+        match_scores = [match_fn(charA, charB) for charB in sequenceB]
+    prev = list(match_scores)
+    if penalize_end_gaps:
+        for col in range(1, lenB):
+            prev[col] += calc_affine_penalty(
+                col, open_A, extend_A, penalize_extend_when_opening)
+    col_cache_score = [score + first_B_gap for score in prev[:-1]]
+
+    # The possible starting points are the same as in _find_start, with
+    # the best local score anywhere, or the best global score in the
+    # last column or the last row.
+    best_scores = []
+    for row in range(1, lenA):
+        if align_globally:
+            score = prev[-1]
+            if penalize_end_gaps:
+                score += calc_affine_penalty(lenA-row, open_B, extend_B,
+                                             penalize_extend_when_opening)
+            best_scores.append(score)
+        else:
+            best_scores.append(max(prev))
+
+        if profile is not None:
+            match_scores = profile[row]
+        else:
+            charA = sequenceA[row]
+            match_scores = [match_fn(charA, charB) for charB in sequenceB]
+        score = match_scores[0]
+        if penalize_end_gaps:
+            score += calc_affine_penalty(
+                row, open_B, extend_B, penalize_extend_when_opening)
+        current = [score] * lenB
+        row_cache_score = prev[0] + first_A_gap
+        for col in range(1, lenB):
+            # This follows the main loop of _make_score_matrix_fast,
+            # please see there for the details.
+            nogap_score = prev[col-1]
+            if col > 1:
+                row_score = row_cache_score
+            else:
+                row_score = nogap_score - 1
+            if row > 1:
+                col_score = col_cache_score[col-1]
+            else:
+                col_score = nogap_score - 1
+            score = max(nogap_score, row_score, col_score) + match_scores[col]
+            if not align_globally and score < 0:
+                score = 0
+            current[col] = score
+
+            # Update the cached column and row scores, preferring to
+            # open a gap if the scores are equal after rounding.
+            open_score = nogap_score + first_B_gap
+            extend_score = col_cache_score[col-1] + extend_B
+            if rint(extend_score) > rint(open_score):
+                col_cache_score[col-1] = extend_score
+            else:
+                col_cache_score[col-1] = open_score
+            open_score = nogap_score + first_A_gap
+            extend_score = row_cache_score + extend_A
+            if rint(extend_score) > rint(open_score):
+                row_cache_score = extend_score
+            else:
+                row_cache_score = open_score
+        prev = current
+
+    if align_globally:
+        for col in range(lenB):
+            score = prev[col]
+            if penalize_end_gaps:
+                score += calc_affine_penalty(lenB-col-1, open_A, extend_A,
+                                             penalize_extend_when_opening)
+            best_scores.append(score)
+    else:
+        best_scores.append(max(prev))
+    return max(best_scores)
+
+# Linear memory alignment.  This uses the same scoring scheme as
+# _make_score_matrix_fast (affine gap penalties only), but never holds
+# more than a couple of rows of the score matrix.  A first pass finds
+# the best score, and the cells where that alignment starts and ends.
+# Then a divide and conquer approach (after Hirschberg, and Myers and
+# Miller for the affine gaps) finds the alignment between those cells.
+# Scores are kept in "band" rows, where index x in row i is for column
+# i - band + x, so that the previous row's score for column col-1 is
+# also at index x.  Without a band, the band is just made big enough to
+# hold the whole row.
+
+_NEG_INF = float("-inf")
+
+def _gap_penalty(length, first, extend):
+    # Same as calc_affine_penalty, given the penalty for a gap of one.
+    if length <= 0:
+        return 0
+    return first + extend * (length - 1)
+
+def _linear_find_ends(sequenceA, sequenceB, match_fn, first_A, extend_A,
+                      first_B, extend_B, penalize_end_gaps, align_globally,
+                      band):
+    # Fill in the score matrix one row at a time, as in
+    # _make_score_matrix_fast (including the borders, and the zero
+    # floor for local alignments), but keeping only the previous row.
+    # Along with each score, keep the cell where that alignment starts
+    # (None when it starts at the cell itself, i.e. a local alignment
+    # whose previous cell scored zero or less).  Return a tuple of the
+    # best score, the starting cell and the ending cell.
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    local = not align_globally
+    NEG = _NEG_INF
+    width = 2 * band + 1
+    best, best_start, best_end = NEG, None, None
+
+    # The first row is a border, like opening a gap in sequenceA.
+    lo = -band
+    M, O = [NEG] * width, [None] * width
+    b = sequenceA[0]
+    for col in range(0, min(lenB, band + 1)):
+        score = match_fn(b, sequenceB[col])
+        if penalize_end_gaps:
+            score += _gap_penalty(col, first_A, extend_A)
+        M[col - lo], O[col - lo] = score, (0, col)
+    # The vertical gap scores (gaps in sequenceB), and their start cells.
+    C, CO = [NEG] * width, [None] * width
+
+    for row in range(lenA):
+        if row:
+            a = sequenceA[row]
+            lo += 1
+            NM, NO = [NEG] * width, [None] * width
+            NC, NCO = [NEG] * width, [None] * width
+            R = RO = NEG
+            for col in range(max(0, lo), min(lenB, lo + width)):
+                x = col - lo
+                # Extend the gaps in sequenceB down into this row.
+                if x + 1 < width:
+                    prev = M[x+1]
+                    open_score = prev + first_B
+                    extend_score = C[x+1] + extend_B
+                    if open_score >= extend_score:
+                        NC[x] = open_score
+                        if local and prev <= 0:
+                            NCO[x] = None
+                        else:
+                            NCO[x] = O[x+1]
+                    else:
+                        NC[x], NCO[x] = extend_score, CO[x+1]
+                if not col:
+                    # The left border, like opening a gap in sequenceB.
+                    score = match_fn(a, sequenceB[0])
+                    if penalize_end_gaps:
+                        score += _gap_penalty(row, first_B, extend_B)
+                    NM[x], NO[x] = score, (row, 0)
+                    continue
+                # No gap, from the previous row and column.
+                score, origin = M[x], O[x]
+                if local and score <= 0:
+                    origin = None
+                # A gap in sequenceA, from an earlier column.
+                if x:
+                    prev = M[x-1]
+                    open_score = prev + first_A
+                    extend_score = R + extend_A
+                    if open_score >= extend_score:
+                        R = open_score
+                        if local and prev <= 0:
+                            RO = None
+                        else:
+                            RO = O[x-1]
+                    else:
+                        R = extend_score
+                    if R > score:
+                        score, origin = R, RO
+                # A gap in sequenceB, from an earlier row.
+                if C[x] > score:
+                    score, origin = C[x], CO[x]
+                if score == NEG:
+                    continue
+                score += match_fn(a, sequenceB[col])
+                if local and score < 0:
+                    score = 0
+                NM[x], NO[x] = score, origin or (row, col)
+            M, O, C, CO = NM, NO, NC, NCO
+
+        # Look for the best place to end the alignment.
+        if local:
+            score = max(M)
+            if score > best:
+                x = M.index(score)
+                best, best_start, best_end = score, O[x], (row, x + lo)
+            continue
+        x = lenB - 1 - lo
+        if 0 <= x < width and M[x] != NEG:
+            score = M[x]
+            if penalize_end_gaps:
+                score += _gap_penalty(lenA - 1 - row, first_B, extend_B)
+            if score > best:
+                best, best_start, best_end = score, O[x], (row, lenB - 1)
+        if row == lenA - 1:
+            for col in range(max(0, lo), min(lenB - 1, lo + width)):
+                x = col - lo
+                if M[x] == NEG:
+                    continue
+                score = M[x]
+                if penalize_end_gaps:
+                    score += _gap_penalty(lenB - 1 - col, first_A, extend_A)
+                if score > best:
+                    best, best_start, best_end = score, O[x], (row, col)
+    return best, best_start, best_end
+
+def _linear_anchored_rows(sequenceA, sequenceB, match_fn, first_A, extend_A,
+                          first_B, extend_B, diagonal, band):
+    # Score the alignments which start by aligning sequenceA[0] with
+    # sequenceB[0], one row at a time down to the last row of
+    # sequenceA, using only the cells where
+    # abs(row - col - diagonal) <= band.  There are no borders or end
+    # gaps here.  Returns the last row's scores, its scores for the
+    # gaps in sequenceB reaching down to that row, the rows those gaps
+    # were opened from, and the column of index zero in these rows.
+    lenA, lenB = len(sequenceA), len(sequenceB)
+    NEG = _NEG_INF
+    width = 2 * band + 1
+    lo = -diagonal - band
+    M, C, CR = [NEG] * width, [NEG] * width, [0] * width
+    M[-lo] = match_fn(sequenceA[0], sequenceB[0])
+    for row in range(1, lenA):
+        a = sequenceA[row]
+        lo += 1
+        NM, NC, NCR = [NEG] * width, [NEG] * width, [0] * width
+        R = NEG
+        for col in range(max(0, lo), min(lenB, lo + width)):
+            x = col - lo
+            if x + 1 < width:
+                open_score = M[x+1] + first_B
+                extend_score = C[x+1] + extend_B
+                if open_score >= extend_score:
+                    NC[x], NCR[x] = open_score, row - 1
+                else:
+                    NC[x], NCR[x] = extend_score, CR[x+1]
+            if not col:
+                continue
+            score = M[x]
+            if x:
+                R = max(R + extend_A, M[x-1] + first_A)
+                if R > score:
+                    score = R
+            if C[x] > score:
+                score = C[x]
+            if score != NEG:
+                NM[x] = score + match_fn(a, sequenceB[col])
+        M, C, CR = NM, NC, NCR
+    return M, C, CR, lo
+
+def _linear_traceback(sequenceA, sequenceB, match_fn, first_A, extend_A,
+                      first_B, extend_B, start, end, band):
+    # Find the cells (aligned pairs of residues) of a best alignment
+    # from the start cell to the end cell.  Split the problem at the
+    # middle row, and find where a best alignment crosses it, either
+    # at a cell in that row, or by a gap in sequenceB passing through
+    # it.  Then solve the two halves the same way.
+    chain = [start]
+    stack = [(start, end)]
+    while stack:
+        (rowA, colA), (rowB, colB) = stack.pop()
+        if rowB - rowA <= 1 or colB - colA <= 1:
+            # The end cell follows on directly (maybe after a gap).
+            if (rowB, colB) != (rowA, colA):
+                chain.append((rowB, colB))
+            continue
+        mid = (rowA + rowB) // 2
+        # Score the top half forwards, and the bottom half backwards.
+        rows, cols = mid - rowA, colB - colA
+        if band is None:
+            diagonal, width = 0, max(rows, cols)
+        else:
+            diagonal, width = colA - rowA, band
+        M1, C1, CR1, lo1 = _linear_anchored_rows(
+            sequenceA[rowA:mid+1], sequenceB[colA:colB+1], match_fn,
+            first_A, extend_A, first_B, extend_B, diagonal, width)
+        rows = rowB - mid
+        if band is None:
+            diagonal, width = 0, max(rows, cols)
+        else:
+            diagonal, width = rowB - colB, band
+        M2, C2, CR2, lo2 = _linear_anchored_rows(
+            sequenceA[mid:rowB+1][::-1], sequenceB[colA:colB+1][::-1],
+            match_fn, first_A, extend_A, first_B, extend_B, diagonal, width)
+        best, split = _NEG_INF, None
+        for col in range(colA, colB + 1):
+            x1 = col - colA - lo1
+            if not 0 <= x1 < len(M1):
+                continue
+            # The alignment could use the cell (mid, col)...
+            x2 = colB - col - lo2
+            if 0 <= x2 < len(M2) and M1[x1] != _NEG_INF \
+            and M2[x2] != _NEG_INF:
+                score = M1[x1] + M2[x2] - match_fn(sequenceA[mid],
+                                                   sequenceB[col])
+                if score > best:
+                    best, split = score, [(mid, col)]
+            # ...or a gap in sequenceB from column col to col + 1.  The
+            # backwards gap score includes opening it, which the
+            # forward gap score already did.
+            x2 -= 1
+            if col < colB and 0 <= x2 < len(M2):
+                score = C1[x1] + C2[x2] - first_B
+                if score > best:
+                    best = score
+                    split = [(rowA + CR1[x1], col),
+                             (rowB - CR2[x2], col + 1)]
+        assert split is not None
+        if len(split) == 1:
+            stack.append((split[0], (rowB, colB)))
+            stack.append(((rowA, colA), split[0]))
+        else:
+            stack.append((split[1], (rowB, colB)))
+            stack.append((split[0], split[1]))
+            stack.append(((rowA, colA), split[0]))
+    return chain
+
+def _align_linear(sequenceA, sequenceB, match_fn, gap_A_fn, gap_B_fn,
+                  penalize_extend_when_opening, penalize_end_gaps,
+                  align_globally, gap_char, score_only, band_width):
+    # Do the alignment in linear memory, returning only one alignment.
+    if not isinstance(gap_A_fn, affine_penalty) \
+    or not isinstance(gap_B_fn, affine_penalty):
+        raise ValueError("The linear_memory and band_width options need "
+                         "affine gap penalties")
+    if band_width is not None and band_width < 0:
+        raise ValueError("The band_width should not be negative")
+    first_A = calc_affine_penalty(1, gap_A_fn.open, gap_A_fn.extend,
+                                  penalize_extend_when_opening)
+    first_B = calc_affine_penalty(1, gap_B_fn.open, gap_B_fn.extend,
+                                  penalize_extend_when_opening)
+    extend_A, extend_B = gap_A_fn.extend, gap_B_fn.extend
+    # Work with lists of the residues, which can be sliced and reversed.
+    listA, listB = list(sequenceA), list(sequenceB)
+    if band_width is None:
+        band = max(len(listA), len(listB))
+    else:
+        band = band_width
+    score, start, end = _linear_find_ends(
+        listA, listB, match_fn, first_A, extend_A, first_B, extend_B,
+        penalize_end_gaps, align_globally, band)
+    if score_only:
+        return score
+    if not align_globally and score <= 0:
+        return []
+    chain = _linear_traceback(listA, listB, match_fn, first_A, extend_A,
+                              first_B, extend_B, start, end, band_width)
+    # Make a sparse traceback matrix holding just this alignment, which
+    # starts at the first cell.  The traceback only checks the scores
+    # of local alignments are positive (i.e. it hasn't reached the start).
+    score_matrix, trace_matrix = {}, {}
+    prev_pos = None
+    for row, col in chain:
+        score_matrix[row] = {col : 1}
+        trace_matrix[row] = {col : [prev_pos]}
+        prev_pos = (row, col)
+    return _recover_alignments(
+        sequenceA, sequenceB, [(score, end)], score_matrix, trace_matrix,
+        align_globally, penalize_end_gaps, gap_char, True)
+
 def _recover_alignments(sequenceA, sequenceB, starts,
                         score_matrix, trace_matrix, align_globally,
                         penalize_end_gaps, gap_char, one_alignment_only):
@@ -780,10 +1331,62 @@ class dictionary_match:
     true, then if (res 1, res 2) doesn't exist, I will use the score
     at (res 2, res 1).
 
+    When an alignment starts, the scores are compiled into a table
+    indexed by residue, so that aligning with a substitution matrix
+    (e.g. from Bio.SubsMat.MatrixInfo) can look the scores up directly
+    instead of calling this function for every pair of residues.  This
+    is not done for subclasses which override __call__.
+
     """
     def __init__(self, score_dict, symmetric=1):
         self.score_dict = score_dict
         self.symmetric = symmetric
+        self._index = self._table = None
+        self._residues = self._flat_table = None
+    def _compile(self):
+        # Turn the score dictionary into a dense table, indexed by the
+        # position of each residue in self._residues.  If the score
+        # dictionary is symmetric, then a missing pair takes the score
+        # of the reversed pair.  The table is only used if every pair of
+        # residues has a score, otherwise self._table is None.
+        residues = {}
+        for charA, charB in self.score_dict:
+            residues[charA] = residues[charB] = None
+        residues = sorted(residues)
+        index = dict([(char, i) for i, char in enumerate(residues)])
+        scores = {}
+        for (charA, charB), score in self.score_dict.items():
+            scores[(charA, charB)] = score
+            if self.symmetric and (charB, charA) not in self.score_dict:
+                scores[(charB, charA)] = score
+        self._index = index
+        self._table = None
+        if len(scores) == len(residues) ** 2:
+            table = [[None] * len(residues) for char in residues]
+            for (charA, charB), score in scores.items():
+                table[index[charA]][index[charB]] = score
+            self._table = table
+        # For the C code, the residues as a string and the table as a
+        # flat list (only when all the residues are single characters):
+        self._residues = self._flat_table = None
+        if self._table is not None \
+        and [c for c in residues if not isinstance(c, str) or len(c) != 1] == []:
+            self._residues = "".join(residues)
+            self._flat_table = [float(score) for row in self._table
+                                for score in row]
+    def _profile(self, sequenceA, sequenceB):
+        # Return a list with a row of match scores against sequenceB for
+        # each residue of sequenceA, or None if there is no table or a
+        # residue isn't in it.
+        if self._table is None:
+            return None
+        try:
+            indexA = [self._index[char] for char in sequenceA]
+            indexB = [self._index[char] for char in sequenceB]
+        except (KeyError, TypeError):
+            return None
+        rows = [[row[i] for i in indexB] for row in self._table]
+        return [rows[i] for i in indexA]
     def __call__(self, charA, charB):
         if self.symmetric and (charA, charB) not in self.score_dict:
             # If the score dictionary is symmetric, then look up the
@@ -791,6 +1394,15 @@ class dictionary_match:
             charB, charA = charA, charB
         return self.score_dict[(charA, charB)]
 
+def _compile_match_fn(match_fn):
+    # Compile the scores of a dictionary_match for the fast code, unless
+    # a subclass has its own __call__ which must be used instead.  This
+    # is done as each alignment starts, so that any changes made to the
+    # score dictionary (or symmetric flag) are used.
+    if isinstance(match_fn, dictionary_match) \
+    and match_fn.__class__.__call__ == dictionary_match.__call__:
+        match_fn._compile()
+
 class affine_penalty:
     """affine_penalty(open, extend[, penalize_extend_when_opening]) -> gap_fn
 
@@ -848,7 +1460,7 @@ def format_alignment(align1, align2, score, begin, end):
 # Try and load C implementations of functions.  If I can't,
 # then just ignore and use the pure python implementations.
 try:
-    from cpairwise2 import rint, _make_score_matrix_fast
+    from cpairwise2 import rint, _make_score_matrix_fast, _score_only_fast
 except ImportError:
     pass
 
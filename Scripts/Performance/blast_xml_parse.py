@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Time parsing a large BLAST XML file with Bio.Blast.NCBIXML.
+
+This makes a large XML file in a temporary directory by repeating the
+iterations (queries) of the BLAST XML files in the unit tests, and then
+times parsing it keeping all the fields, keeping just the e-values and
+bit scores, and also applying an e-value cutoff.
+"""
+import os
+import time
+import tempfile
+
+from Bio.Blast import NCBIXML
+
+
+def make_xml(filename, example, copies):
+    data = open(example).read()
+    start = data.index("<Iteration>")
+    end = data.rindex("</Iteration>") + len("</Iteration>")
+    handle = open(filename, "w")
+    handle.write(data[:start])
+    for i in range(copies):
+        handle.write(data[start:end])
+        handle.write("\n")
+    handle.write(data[end:])
+    handle.close()
+
+
+def time_parse(label, filename, **keywds):
+    size = os.path.getsize(filename)
+    start = time.time()
+    queries = hits = hsps = 0
+    handle = open(filename)
+    for record in NCBIXML.parse(handle, **keywds):
+        queries += 1
+        hits += len(record.alignments)
+        for alignment in record.alignments:
+            hsps += len(alignment.hsps)
+    handle.close()
+    taken = time.time() - start
+    print "\t%-36s %6.1f MB/s %8.0f queries/s (%i hits, %i HSPs)" \
+          % (label, size / taken / 1024.0 / 1024.0, queries / taken,
+             hits, hsps)
+
+
+if __name__ == "__main__":
+    example = os.path.join(os.path.dirname(__file__), "..", "..", "Tests",
+                           "Blast", "xbt010.xml")
+    temp_dir = tempfile.mkdtemp()
+    filename = os.path.join(temp_dir, "big.xml")
+    try:
+        make_xml(filename, example, 500)
+        print "%0.1f MB of BLAST XML" \
+              % (os.path.getsize(filename) / 1024.0 / 1024.0)
+        time_parse("all fields", filename)
+        time_parse("fields expect and bits", filename,
+                   fields=["expect", "bits"])
+        time_parse("expect and bits, max_evalue=1e-100", filename,
+                   fields=["expect", "bits"], max_evalue=1e-100)
+    finally:
+        os.remove(filename)
+        os.rmdir(temp_dir)
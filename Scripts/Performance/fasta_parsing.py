@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Compare the speed of the FASTA parsers in Bio.SeqIO.FastaIO.
+
+This times the reference readline based FastaIterator against the
+FastaBlockIterator on two generated files, one with a few long wrapped
+sequences (like a reference genome) and one with many short sequences
+(like reads or a protein database). Optionally give a FASTA filename
+on the command line to time that as well.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+from Bio.SeqIO.FastaIO import FastaIterator, FastaBlockIterator
+
+
+def make_file(filename, count, length, wrap=60):
+    handle = open(filename, "w")
+    for i in range(count):
+        seq = "".join(random.choice("ACGT") for j in range(length))
+        handle.write(">seq%i Example record %i\n" % (i, i))
+        for j in range(0, length, wrap):
+            handle.write(seq[j:j+wrap] + "\n")
+    handle.close()
+
+
+def time_parser(parser, filename, repeats=3):
+    best = None
+    for r in range(repeats):
+        handle = open(filename)
+        start = time.time()
+        count = 0
+        total = 0
+        for record in parser(handle):
+            count += 1
+            total += len(record)
+        taken = time.time() - start
+        handle.close()
+        if best is None or taken < best:
+            best = taken
+    return count, total, best
+
+
+def compare(filename, label):
+    print label
+    results = []
+    for name, parser in [("FastaIterator", FastaIterator),
+                         ("FastaBlockIterator", FastaBlockIterator)]:
+        count, total, taken = time_parser(parser, filename)
+        results.append(taken)
+        print "\t%s: %i records, %i letters in %0.3fs" \
+              % (name, count, total, taken)
+    if results[1]:
+        print "\tSpeed up %0.2f times" % (results[0] / results[1])
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        long_file = os.path.join(temp_dir, "long.fasta")
+        short_file = os.path.join(temp_dir, "short.fasta")
+        make_file(long_file, 5, 2000000)
+        make_file(short_file, 200000, 100)
+        compare(long_file, "Long records (5 x 2Mbp, wrapped at 60)")
+        compare(short_file, "Short records (200000 x 100bp)")
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
+    for filename in sys.argv[1:]:
+        compare(filename, filename)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Time parsing a large GenBank file with and without lazy feature parsing.
+
+This generates a GenBank file in a temporary directory with one record
+holding many copies of the features in Tests/GenBank/NC_000932.gb (which
+must be run from the Biopython source tree, or give another single record
+GenBank file on the command line). It then times parsing it with the
+default eager feature parsing, and with lazy_features=True when just
+counting the features, selecting the CDS features, and using them all.
+"""
+import os
+import sys
+import time
+import tempfile
+
+from Bio import SeqIO
+from Bio.Seq import Seq
+from Bio.SeqIO.InsdcIO import GenBankIterator
+
+
+def make_file(example, filename, copies):
+    record = SeqIO.read(example, "genbank")
+    features = record.features
+    length = len(record)
+    record.features = []
+    for i in range(copies):
+        record.features.extend(f._shift(i * length) for f in features)
+    record.seq = Seq(str(record.seq) * copies, record.seq.alphabet)
+    SeqIO.write(record, filename, "genbank")
+    return len(record.features)
+
+
+def time_parse(filename, lazy_features, action):
+    start = time.time()
+    handle = open(filename)
+    for record in GenBankIterator(handle, lazy_features=lazy_features):
+        action(record)
+    handle.close()
+    return time.time() - start
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        example = sys.argv[1]
+    else:
+        example = os.path.join(os.path.dirname(__file__), "..", "..",
+                               "Tests", "GenBank", "NC_000932.gb")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(temp_dir, "big.gb")
+        count = make_file(example, filename, 200)
+        print "One record with %i features" % count
+        eager = time_parse(filename, False, len)
+        print "Eager parsing: %0.2fs" % eager
+        for label, action in [("count features", lambda r: len(r.features)),
+                              ("select CDS", lambda r: r.features.by_type("CDS")),
+                              ("use all features", lambda r: list(r.features))]:
+            lazy = time_parse(filename, True, action)
+            print "Lazy parsing, %s: %0.2fs (%0.2f times faster)" \
+                  % (label, lazy, eager / lazy)
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Time building a Bio.SeqIO.index_db() database using several processes.
+
+This generates a number of FASTQ files in a temporary directory, and then
+times indexing them with index_db using one process and then using several
+worker processes (the number of CPUs, at least two). Optionally give the
+number of files and reads per file on the command line (default 64 and 20000).
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import multiprocessing
+
+from Bio import SeqIO
+
+
+def make_file(filename, prefix, count, length=100):
+    handle = open(filename, "w")
+    qual = "I" * length
+    for i in range(count):
+        seq = "".join(random.choice("ACGT") for j in range(length))
+        handle.write("@%s_%i\n%s\n+\n%s\n" % (prefix, i, seq, qual))
+    handle.close()
+
+
+def time_index(filenames, processes):
+    index_filename = filenames[0] + ".idx"
+    if os.path.isfile(index_filename):
+        os.remove(index_filename)
+    start = time.time()
+    d = SeqIO.index_db(index_filename, filenames, "fastq",
+                       processes=processes)
+    taken = time.time() - start
+    count = len(d)
+    d.close()
+    os.remove(index_filename)
+    return count, taken
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    if len(sys.argv) > 2:
+        files, reads = int(sys.argv[1]), int(sys.argv[2])
+    else:
+        files, reads = 64, 20000
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filenames = []
+        for i in range(files):
+            filename = os.path.join(temp_dir, "run%i.fastq" % i)
+            make_file(filename, "run%i" % i, reads)
+            filenames.append(filename)
+        count, serial = time_index(filenames, None)
+        print "%i files, %i reads, one process: %0.2fs" \
+              % (files, count, serial)
+        processes = max(2, multiprocessing.cpu_count())
+        count, parallel = time_index(filenames, processes)
+        print "%i files, %i reads, %i processes: %0.2fs (%0.2f times faster)" \
+              % (files, count, processes, parallel, serial / parallel)
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""Time aligning one query against many targets with Bio.pairwise2.
+
+This compares calling the alignment function in a plain loop over the
+targets with the one_to_many method (which decodes the parameters once),
+both on its own and using a pool of worker processes, for scores only
+and for the best alignment of each pair.
+"""
+import time
+import random
+
+from Bio import pairwise2
+
+
+def random_seq(length):
+    return "".join(random.choice("ACGT") for i in range(length))
+
+
+def compare(label, query, targets, args, processes=(2, 4)):
+    print label
+    function = pairwise2.align.localms
+    for score_only in [True, False]:
+        keywds = {"score_only": score_only,
+                  "one_alignment_only": not score_only}
+        start = time.time()
+        expected = [function(query, target, *args, **keywds)
+                    for target in targets]
+        loop = time.time() - start
+        print "\tscore_only=%-5s loop          %8.0f pairs/s" \
+              % (score_only, len(targets) / loop)
+        for count in (1,) + processes:
+            keywds = {"score_only": score_only, "processes": count}
+            start = time.time()
+            results = function.one_to_many(query, targets, *args, **keywds)
+            taken = time.time() - start
+            if score_only:
+                assert results == expected
+            print "\tscore_only=%-5s processes=%-3i %8.0f pairs/s" \
+                  % (score_only, count, len(targets) / taken)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    args = (2, -1, -2, -0.5)
+    compare("Short targets (5000 x 30bp against a 30bp query)",
+            random_seq(30), [random_seq(30) for i in range(5000)], args)
+    compare("Longer targets (500 x 150bp against a 150bp query)",
+            random_seq(150), [random_seq(150) for i in range(500)], args)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Time Bio.pairwise2 alignments using the full score matrix, linear memory
+and a band (and report the peak memory used by each).
+
+This aligns pairs of similar random DNA sequences (with about 5% of the
+positions changed, and some small insertions and deletions) of increasing
+length. Each alignment is run in a separate process so that its peak
+memory use (from the resource module, on Unix only) can be reported.
+"""
+import sys
+import time
+import random
+import resource
+import subprocess
+
+
+def mutate(seq, rate=0.05):
+    result = []
+    for base in seq:
+        r = random.random()
+        if r < rate * 0.6:
+            result.append(random.choice("ACGT"))
+        elif r < rate * 0.8:
+            pass #deletion
+        elif r < rate:
+            result.append(base + random.choice("ACGT"))
+        else:
+            result.append(base)
+    return "".join(result)
+
+
+def run(length, mode):
+    from Bio import pairwise2
+    random.seed(length)
+    a = "".join(random.choice("ACGT") for i in range(length))
+    b = mutate(a)
+    kwargs = {"one_alignment_only": True}
+    if mode == "linear":
+        kwargs["linear_memory"] = True
+    elif mode == "band":
+        kwargs["band_width"] = 50
+    start = time.time()
+    alignments = pairwise2.align.globalms(a, b, 2, -1, -2, -0.5, **kwargs)
+    taken = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print "%6i bp %-6s %8.2fs %8.1f MB peak, score %g" \
+          % (length, mode, taken, peak, alignments[0][2])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(int(sys.argv[1]), sys.argv[2])
+        sys.exit(0)
+    for length, modes in [(500, ["full", "linear", "band"]),
+                          (1000, ["full", "linear", "band"]),
+                          (2000, ["linear", "band"]),
+                          (20000, ["band"]),
+                          (50000, ["band"])]:
+        for mode in modes:
+            subprocess.call([sys.executable, sys.argv[0], str(length), mode])
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Time scanning a protein query against a set of targets with Bio.pairwise2.
+
+This scores a random query protein against random target proteins using
+local alignments (score_only=True) with the BLOSUM62 matrix, as when
+rescoring database search hits, and also with simple match/mismatch
+scores and a Python callback.  It reports pairs and matrix cells per
+second, and whether the C code from Bio.cpairwise2 is being used.
+"""
+import time
+import random
+
+from Bio import pairwise2
+from Bio.SubsMat import MatrixInfo
+
+
+def random_protein(length):
+    return "".join(random.choice("ACDEFGHIKLMNPQRSTVWY")
+                   for i in range(length))
+
+
+def scan(label, function, query, targets, *args):
+    cells = sum([len(query) * len(target) for target in targets])
+    start = time.time()
+    scores = function.one_to_many(query, targets, *args,
+                                  **{"score_only": True})
+    taken = time.time() - start
+    print "\t%-28s %8.0f pairs/s %8.2f million cells/s" \
+          % (label, len(targets) / taken, cells / taken / 1e6)
+    return scores
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    try:
+        from Bio import cpairwise2
+        print "Using the C code in Bio.cpairwise2"
+    except ImportError:
+        print "Using the pure Python code"
+    query = random_protein(250)
+    targets = [random_protein(random.randint(100, 400)) for i in range(200)]
+    blosum62 = MatrixInfo.blosum62
+    def match_fn(charA, charB):
+        if charA == charB:
+            return 2
+        return -1
+    print "Query of %i aa against %i targets" % (len(query), len(targets))
+    scan("localds (BLOSUM62)", pairwise2.align.localds, query, targets,
+         blosum62, -11, -1)
+    scan("globalds (BLOSUM62)", pairwise2.align.globalds, query, targets,
+         blosum62, -11, -1)
+    scan("localms (2, -1)", pairwise2.align.localms, query, targets,
+         2, -1, -11, -1)
+    scan("localcs (callback)", pairwise2.align.localcs, query, targets[:20],
+         match_fn, -11, -1)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Compare memory use and speed of the Seq, BytesSeq and TwoBitSeq objects.
+
+This makes a random DNA sequence, and times slicing it into many smaller
+sequences, counting and searching for bases, and taking the reverse
+complement, using the plain Seq object and the compact BytesSeq (on a
+bytearray) and TwoBitSeq objects.
+"""
+import time
+import random
+
+from Bio.Alphabet import generic_dna
+from Bio.Seq import Seq, BytesSeq, TwoBitSeq
+
+
+def timed(label, function, *args):
+    start = time.time()
+    answer = function(*args)
+    print "\t%-25s %6.3fs" % (label, time.time() - start)
+    return answer
+
+
+def slices(seq, size=1000):
+    return [seq[i:i+size] for i in xrange(0, len(seq), size // 2)]
+
+
+def compare(length=10000000):
+    dna = "".join([random.choice("ACGT") for i in xrange(length)])
+    print "Random DNA, %i bp" % length
+    for label, maker in [("Seq", lambda: Seq(dna, generic_dna)),
+                         ("BytesSeq", lambda: BytesSeq(bytearray(dna),
+                                                       generic_dna)),
+                         ("TwoBitSeq", lambda: TwoBitSeq(dna, generic_dna))]:
+        print label
+        seq = timed("create", maker)
+        if label == "TwoBitSeq":
+            size = len(seq._packed)
+        else:
+            size = length
+        print "\t%-25s %6.1f MB" % ("sequence data", size / 1048576.0)
+        parts = timed("slice into 1kbp halves", slices, seq)
+        if label == "Seq":
+            extra = sum(len(p) for p in parts)
+        else:
+            extra = 0
+        print "\t%-25s %6.1f MB" % ("slice data copied", extra / 1048576.0)
+        timed("count G", seq.count, "G")
+        timed("find missing 12-mer", seq.find, "ACGTACGTACGTA")
+        timed("reverse complement", seq.reverse_complement)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    compare()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Microbenchmark of (reverse) complement and transcription in Bio.Seq.
+
+This times the complement, reverse_complement and transcribe methods of the
+Seq, MutableSeq and UnknownSeq objects, and the module level functions on
+plain strings, for many short reads and for a few long contigs. It also
+times the reverse_complement_many function (which takes a whole list of
+sequences at once) against calling reverse_complement on each sequence.
+"""
+import time
+import random
+
+from Bio import Seq as SeqModule
+from Bio.Seq import Seq, MutableSeq, UnknownSeq, reverse_complement, \
+                    transcribe
+from Bio.Alphabet import generic_dna, generic_nucleotide
+from Bio.Alphabet import IUPAC
+
+
+def timed(label, function, items, repeats=1):
+    start = time.time()
+    for i in xrange(repeats):
+        #Keep the results (as the batch function must do)
+        results = [function(item) for item in items]
+    taken = time.time() - start
+    total = len(items) * repeats
+    print "  %-45s %10.0f per second" % (label, total / taken)
+
+
+def batch_timed(label, function, items, repeats=1):
+    start = time.time()
+    for i in xrange(repeats):
+        results = function(items)
+    taken = time.time() - start
+    total = len(items) * repeats
+    print "  %-45s %10.0f per second" % (label, total / taken)
+
+
+def bench(label, strings, repeats):
+    print "%s (%i x %ibp)" % (label, len(strings), len(strings[0]))
+    dna = [Seq(s, IUPAC.ambiguous_dna) for s in strings]
+    generic = [Seq(s, generic_nucleotide) for s in strings]
+    timed("Seq.complement (IUPAC DNA)",
+          lambda s: s.complement(), dna, repeats)
+    timed("Seq.reverse_complement (IUPAC DNA)",
+          lambda s: s.reverse_complement(), dna, repeats)
+    timed("Seq.reverse_complement (generic nucleotide)",
+          lambda s: s.reverse_complement(), generic, repeats)
+    timed("Seq.transcribe (IUPAC DNA)",
+          lambda s: s.transcribe(), dna, repeats)
+    timed("reverse_complement(string)", reverse_complement, strings, repeats)
+    timed("transcribe(string)", transcribe, strings, repeats)
+    mutable = [MutableSeq(s, generic_dna) for s in strings]
+    timed("MutableSeq.complement (in place)",
+          lambda s: s.complement(), mutable, repeats)
+    timed("MutableSeq.reverse_complement (in place)",
+          lambda s: s.reverse_complement(), mutable, repeats)
+    unknown = [UnknownSeq(len(s), generic_dna) for s in strings]
+    timed("UnknownSeq.reverse_complement",
+          lambda s: s.reverse_complement(), unknown, repeats)
+    if hasattr(SeqModule, "reverse_complement_many"):
+        batch_timed("reverse_complement_many(strings)",
+                    SeqModule.reverse_complement_many, strings, repeats)
+        batch_timed("reverse_complement_many(Seq objects)",
+                    SeqModule.reverse_complement_many, dna, repeats)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    reads = ["".join(random.choice("ACGT") for i in xrange(100))
+             for j in xrange(10000)]
+    bench("Short reads", reads, 5)
+    contigs = ["".join(random.choice("ACGTN") for i in xrange(1000000))
+               for j in xrange(5)]
+    bench("Long contigs", contigs, 2)
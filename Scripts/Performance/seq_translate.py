@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Time translating nucleotide sequences with Bio.Seq.
+
+This generates random DNA sequences (optionally give the number of contigs
+and their length on the command line, default 100 and 30000), and times
+translating them with the translate function, the translate_many function,
+and in all six frames with the translate_six_frames function. For comparison
+it also times the codon by codon translation used for sequences with
+invalid codons (which is how all translation used to be done).
+"""
+import sys
+import time
+import random
+
+from Bio.Seq import translate_many, translate_six_frames
+from Bio.Seq import reverse_complement, _translate_codons, _get_codon_table
+
+
+def timed(label, function, *args):
+    start = time.time()
+    function(*args)
+    taken = time.time() - start
+    print "%-40s %0.2fs" % (label, taken)
+    return taken
+
+
+def codon_by_codon(contigs, table):
+    for contig in contigs:
+        _translate_codons(contig.upper(), table, "*", False, False, "X")
+
+
+def six_frames_codon_by_codon(contigs, table):
+    for contig in contigs:
+        rev_comp = reverse_complement(contig)
+        for i in range(3):
+            codon_by_codon([contig[i:], rev_comp[i:]], table)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    if len(sys.argv) > 2:
+        count, length = int(sys.argv[1]), int(sys.argv[2])
+    else:
+        count, length = 100, 30000
+    contigs = ["".join(random.choice("ACGT") for i in range(length)) \
+               for j in range(count)]
+    print "%i contigs of %i bp" % (count, length)
+    table = _get_codon_table("Standard")
+    old = timed("Codon by codon translation", codon_by_codon, contigs, table)
+    new = timed("translate_many", translate_many, contigs)
+    print "(%0.1f times faster)" % (old / new)
+    old = timed("Six frames codon by codon", six_frames_codon_by_codon,
+                contigs, table)
+    new = timed("Six frames using translate_six_frames",
+                lambda c: [translate_six_frames(s) for s in c], contigs)
+    print "(%0.1f times faster)" % (old / new)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Time feature location queries with and without a FeatureList index.
+
+This makes a record with many random features (some of them joins of
+several parts, plus one source feature covering the whole sequence), and
+times finding the features overlapping random regions by checking every
+feature in turn, and using the index from the SeqRecord's index_features
+method (including the time to build the index).
+"""
+import time
+import random
+
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.SeqFeature import SeqFeature, FeatureLocation
+from Bio.Alphabet import generic_dna
+
+
+def make_record(length, count):
+    features = [SeqFeature(FeatureLocation(0, length), type="source")]
+    for i in xrange(count):
+        start = random.randint(0, length - 5000)
+        if random.random() < 0.3:
+            parts = []
+            for j in range(random.randint(2, 5)):
+                end = start + random.randint(50, 500)
+                parts.append(SeqFeature(FeatureLocation(start, end),
+                                        type="CDS"))
+                start = end + random.randint(50, 500)
+            features.append(SeqFeature(FeatureLocation(parts[0].location.start,
+                                                       parts[-1].location.end),
+                                       type="CDS", location_operator="join",
+                                       sub_features=parts))
+        else:
+            end = start + random.randint(50, 2000)
+            features.append(SeqFeature(FeatureLocation(start, end),
+                                       type="gene"))
+    return SeqRecord(Seq("N" * length, generic_dna), id="example",
+                     features=features)
+
+
+def overlapping(features, start, end):
+    answer = []
+    for f in features:
+        if f.sub_features:
+            parts = [sub.location for sub in f.sub_features]
+        else:
+            parts = [f.location]
+        for loc in parts:
+            if loc.nofuzzy_start < end and loc.nofuzzy_end > start:
+                answer.append(f)
+                break
+    return answer
+
+
+def compare(length, count, queries=1000):
+    print "%i features on %ibp, %i queries" % (count, length, queries)
+    record = make_record(length, count)
+    regions = []
+    for i in range(queries):
+        start = random.randint(0, length)
+        regions.append((start, start + random.randint(1, 1000)))
+    start_time = time.time()
+    expected = [overlapping(record.features, s, e) for s, e in regions]
+    print "\t%-25s %8.3fs" % ("Checking every feature",
+                               time.time() - start_time)
+    start_time = time.time()
+    features = record.index_features()
+    found = [features.overlapping(s, e) for s, e in regions]
+    print "\t%-25s %8.3fs" % ("Using the index", time.time() - start_time)
+    assert found == expected
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    compare(100000, 1000)
+    compare(2000000, 20000, 200)
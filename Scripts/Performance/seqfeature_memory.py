@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Measure the memory used per SeqFeature object (including its location).
+
+This parses some GenBank files from the Tests directory, and also makes a
+large number of simple features, and adds up the size of all the objects
+reachable from the features (counting each object once, so any shared
+objects such as interned positions or strings are only counted once) using
+sys.getsizeof (Python 2.6 or later).
+
+Run this from the Tests directory, or give the filenames to use.
+"""
+import sys
+import random
+
+from Bio import SeqIO
+from Bio.SeqFeature import SeqFeature, FeatureLocation
+
+
+def deep_size(objects):
+    """Total size in bytes of the objects and all they refer to."""
+    seen = set()
+    total = 0
+    todo = list(objects)
+    while todo:
+        obj = todo.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            todo.extend(obj.keys())
+            todo.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            todo.extend(obj)
+        elif isinstance(obj, basestring):
+            pass
+        else:
+            try:
+                todo.append(obj.__dict__)
+            except AttributeError:
+                pass
+            for cls in type(obj).__mro__:
+                for name in cls.__dict__.get("__slots__", ()):
+                    if name not in ("__dict__", "__weakref__"):
+                        try:
+                            todo.append(getattr(obj, name))
+                        except AttributeError:
+                            pass
+    return total
+
+
+def report(label, features):
+    #Don't count the strings and None etc which are (mostly) shared
+    size = deep_size(features)
+    print "%-40s %7i features %7.1f bytes/feature" \
+          % (label, len(features), float(size) / len(features))
+
+
+if __name__ == "__main__":
+    filenames = sys.argv[1:] or ["GenBank/NC_000932.gb", "GenBank/NC_005816.gb",
+                                 "GenBank/arab1.gb"]
+    for filename in filenames:
+        features = []
+        for record in SeqIO.parse(filename, "genbank"):
+            features.extend(record.features)
+        report(filename, features)
+    random.seed(0)
+    features = []
+    for i in xrange(100000):
+        start = random.randint(0, 5000000)
+        features.append(SeqFeature(FeatureLocation(start, start + 1000,
+                                                   strand=1), type="gene"))
+    report("Simple features", features)
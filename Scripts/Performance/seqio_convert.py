@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Benchmark the optimised Bio.SeqIO.convert() code paths.
+
+For each input/output format pair with a special case converter in
+Bio.SeqIO._convert this reports the records per second for SeqIO.convert
+and for the generic approach of SeqIO.parse followed by SeqIO.write.
+
+Run this from the Biopython source directory (it uses example files from
+the Tests directory), optionally giving the number of copies of each
+example file to concatenate (default 200).
+"""
+import os
+import sys
+import time
+import warnings
+from StringIO import StringIO
+
+from Bio import SeqIO
+from Bio import BiopythonWarning
+from Bio.SeqIO._convert import _converter
+
+examples = {"fastq": "Quality/example.fastq",
+            "fastq-sanger": "Quality/sanger_faked.fastq",
+            "fastq-solexa": "Quality/solexa_faked.fastq",
+            "fastq-illumina": "Quality/illumina_faked.fastq",
+            "genbank": "GenBank/cor6_6.gb",
+            "gb": "GenBank/NC_005816.gb",
+            "embl": "EMBL/U87107.embl",
+            "imgt": "EMBL/A04195.imgt",
+            }
+
+
+def best_time(function, data, repeats=3):
+    best = None
+    for r in range(repeats):
+        start = time.time()
+        count = function(StringIO(data))
+        taken = max(time.time() - start, 1e-6)
+        if best is None or taken < best:
+            best = taken
+    return count, best
+
+
+def main(copies):
+    tests_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "..", "..", "Tests")
+    warnings.simplefilter("ignore", BiopythonWarning)
+    print "%-16s %-16s %12s %12s %8s" \
+          % ("Input", "Output", "convert/s", "generic/s", "Gain")
+    for in_format, out_format in sorted(_converter):
+        filename = os.path.join(tests_dir, examples[in_format])
+        data = open(filename).read() * copies
+
+        def special(handle):
+            return SeqIO.convert(handle, in_format, StringIO(), out_format)
+
+        def generic(handle):
+            return SeqIO.write(SeqIO.parse(handle, in_format),
+                               StringIO(), out_format)
+
+        count, fast = best_time(special, data)
+        count2, slow = best_time(generic, data)
+        assert count == count2
+        print "%-16s %-16s %12.0f %12.0f %7.2fx" \
+              % (in_format, out_format, count / fast, count / slow,
+                 slow / fast)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main(200)
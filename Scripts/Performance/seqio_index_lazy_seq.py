@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Time fetching short regions of long sequences from Bio.SeqIO.index().
+
+This generates FASTA and GenBank files of a few long random sequences in a
+temporary directory, indexes them and then times fetching randomly chosen
+500bp regions, with the whole sequence parsed for each record (the default)
+and with lazy_seq=True where only the region itself is read from the file.
+"""
+import os
+import time
+import random
+import tempfile
+
+from Bio import SeqIO
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Alphabet import generic_dna
+
+
+def make_records(count, length):
+    for i in range(count):
+        seq = "".join([random.choice("ACGT") for j in xrange(length)])
+        yield SeqRecord(Seq(seq, generic_dna), id="chr%i" % i,
+                        name="chr%i" % i, description="Example %i" % i)
+
+
+def time_regions(rec_dict, regions):
+    start = time.time()
+    for key, offset in regions:
+        str(rec_dict[key].seq[offset:offset+500])
+    return time.time() - start
+
+
+def compare(label, filename, format, lookups=1000):
+    print label
+    for memory_map in [False, True]:
+        for lazy_seq in [False, True]:
+            rec_dict = SeqIO.index(filename, format, memory_map=memory_map,
+                                   lazy_seq=lazy_seq)
+            lengths = dict((key, len(rec_dict[key])) for key in rec_dict)
+            if lazy_seq:
+                count = lookups
+            else:
+                #Much slower, so do fewer lookups
+                count = lookups // 100
+            regions = []
+            for i in range(count):
+                key = random.choice(lengths.keys())
+                regions.append((key, random.randint(0, lengths[key] - 500)))
+            taken = time_regions(rec_dict, regions)
+            print "\tmemory_map=%-5s lazy_seq=%-5s %10.1f regions/s" \
+                  % (memory_map, lazy_seq, count / taken)
+            rec_dict._proxy._handle.close()
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fasta = os.path.join(temp_dir, "genome.fasta")
+        genbank = os.path.join(temp_dir, "genome.gb")
+        records = list(make_records(5, 2000000))
+        SeqIO.write(records, fasta, "fasta")
+        SeqIO.write(records, genbank, "genbank")
+        del records
+        compare("FASTA (5 x 2Mbp)", fasta, "fasta")
+        compare("GenBank (5 x 2Mbp)", genbank, "gb")
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Time random record lookups in Bio.SeqIO.index() and index_db() objects.
+
+This generates a FASTA file of long wrapped sequences and a FASTQ file of
+short reads in a temporary directory, indexes them and then times calling
+get_raw (and the normal dictionary lookup) for randomly chosen keys, using
+normal file handles and using memory mapping. It also times fetching the
+same keys in one call using the get_raw_many method.
+"""
+import os
+import time
+import random
+import tempfile
+
+from Bio import SeqIO
+
+
+def make_fasta(filename, count, length, wrap=60):
+    handle = open(filename, "w")
+    for i in range(count):
+        seq = "".join(random.choice("ACGT") for j in range(length))
+        handle.write(">seq%i Example record %i\n" % (i, i))
+        for j in range(0, length, wrap):
+            handle.write(seq[j:j+wrap] + "\n")
+    handle.close()
+
+
+def make_fastq(filename, count, length=100):
+    handle = open(filename, "w")
+    qual = "I" * length
+    for i in range(count):
+        seq = "".join(random.choice("ACGT") for j in range(length))
+        handle.write("@read%i\n%s\n+\n%s\n" % (i, seq, qual))
+    handle.close()
+
+
+def time_lookups(rec_dict, keys, method):
+    start = time.time()
+    for key in keys:
+        method(key)
+    return time.time() - start
+
+
+def compare(label, filename, format, lookups=5000):
+    print label
+    index_filename = filename + ".idx"
+    for memory_map in [False, True]:
+        for name in ["index", "index_db"]:
+            if name == "index":
+                rec_dict = SeqIO.index(filename, format,
+                                       memory_map=memory_map)
+            else:
+                if os.path.isfile(index_filename):
+                    os.remove(index_filename)
+                rec_dict = SeqIO.index_db(index_filename, filename, format,
+                                          memory_map=memory_map)
+            all_keys = rec_dict.keys()
+            keys = [random.choice(all_keys) for i in range(lookups)]
+            raw = time_lookups(rec_dict, keys, rec_dict.get_raw)
+            parsed = time_lookups(rec_dict, keys[:lookups//10],
+                                  rec_dict.__getitem__) * 10
+            start = time.time()
+            for data in rec_dict.get_raw_many(keys):
+                pass
+            batch = time.time() - start
+            print "\t%-8s memory_map=%-5s %8.0f get_raw/s %8.0f records/s " \
+                  "%8.0f get_raw_many/s" % (name, memory_map, lookups / raw,
+                                            lookups / parsed, lookups / batch)
+            if name == "index":
+                rec_dict._proxy._handle.close()
+            else:
+                rec_dict.close()
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fasta = os.path.join(temp_dir, "long.fasta")
+        fastq = os.path.join(temp_dir, "reads.fastq")
+        make_fasta(fasta, 200, 20000)
+        make_fastq(fastq, 100000)
+        compare("FASTA (200 x 20kbp, wrapped at 60)", fasta, "fasta", 2000)
+        compare("FASTQ (100000 x 100bp)", fastq, "fastq")
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
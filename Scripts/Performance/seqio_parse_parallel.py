@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Time parsing a large GenBank file with Bio.SeqIO.parse_parallel().
+
+This generates a GenBank file in a temporary directory by repeating the
+records in Tests/GenBank/cor6_6.gb (which must be run from the Biopython
+source tree, or give another GenBank file on the command line), and then
+times parsing it with Bio.SeqIO.parse() and with parse_parallel() using
+several worker processes (the number of CPUs, at least two).
+"""
+import os
+import sys
+import time
+import tempfile
+import multiprocessing
+
+from Bio import SeqIO
+
+
+def time_parse(function, filename, **kwargs):
+    start = time.time()
+    count = 0
+    for record in function(filename, "genbank", **kwargs):
+        count += 1
+    return count, time.time() - start
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        example = sys.argv[1]
+    else:
+        example = os.path.join(os.path.dirname(__file__), "..", "..",
+                               "Tests", "GenBank", "cor6_6.gb")
+    data = open(example).read()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(temp_dir, "big.gb")
+        handle = open(filename, "w")
+        for i in range(500):
+            handle.write(data)
+        handle.close()
+        count, serial = time_parse(SeqIO.parse, filename)
+        print "%i records, SeqIO.parse: %0.2fs" % (count, serial)
+        processes = max(2, multiprocessing.cpu_count())
+        for ordered in [True, False]:
+            count, parallel = time_parse(SeqIO.parse_parallel, filename,
+                                         processes=processes,
+                                         ordered=ordered)
+            print "%i records, SeqIO.parse_parallel, %i processes, " \
+                  "ordered=%s: %0.2fs (%0.2f times faster)" \
+                  % (count, processes, ordered, parallel, serial / parallel)
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Time writing sequence files with Bio.SeqIO.write().
+
+This writes simulated short reads as FASTA, QUAL and FASTQ, and a selection
+of GenBank records as GenBank and EMBL, to a real file in a temporary
+directory, and to a gzip handle (where each write call is more expensive).
+For FASTA and QUAL it also times writing without line wrapping.
+"""
+import os
+import gzip
+import time
+import random
+import tempfile
+
+from Bio import SeqIO
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Alphabet import generic_dna
+
+
+def make_reads(count, length=100):
+    records = []
+    for i in range(count):
+        seq = "".join(random.choice("ACGT") for j in range(length))
+        quals = [random.randint(0, 40) for j in range(length)]
+        records.append(SeqRecord(Seq(seq, generic_dna), id="read%i" % i,
+                                 description="",
+                                 letter_annotations={"phred_quality": quals}))
+    return records
+
+
+def time_write(filename, records, format, compress=False, repeats=3,
+               **kwargs):
+    best = None
+    for i in range(repeats):
+        start = time.time()
+        if compress:
+            handle = gzip.open(filename, "wb", 1)
+        else:
+            handle = open(filename, "w")
+        count = SeqIO.write(records, handle, format, **kwargs)
+        handle.close()
+        taken = time.time() - start
+        if best is None or taken < best:
+            best = taken
+    assert count == len(records)
+    return best
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    reads = make_reads(50000)
+    genbank = list(SeqIO.parse("Tests/GenBank/NC_005816.gb", "gb")) \
+            + list(SeqIO.parse("Tests/GenBank/cor6_6.gb", "gb"))
+    genbank = genbank * 100
+    temp_dir = tempfile.mkdtemp()
+    filename = os.path.join(temp_dir, "output")
+    try:
+        for label, records, format, kwargs in [
+                ("FASTA (50000 reads)", reads, "fasta", {}),
+                ("FASTA, no wrap", reads, "fasta", {"wrap": None}),
+                ("QUAL (50000 reads)", reads, "qual", {}),
+                ("QUAL, no wrap", reads, "qual", {"wrap": None}),
+                ("FASTQ (50000 reads)", reads, "fastq", {}),
+                ("GenBank (%i records)" % len(genbank), genbank, "gb", {}),
+                ("EMBL (%i records)" % len(genbank), genbank, "embl", {})]:
+            try:
+                plain = time_write(filename, records, format, **kwargs)
+                gz = time_write(filename, records, format, True, **kwargs)
+            except TypeError:
+                #Older Bio.SeqIO.write without the wrap argument
+                print "%-24s (not supported)" % label
+                continue
+            print "%-24s %8.0f records/s %8.0f records/s (gzip)" \
+                  % (label, len(records) / plain, len(records) / gz)
+    finally:
+        if os.path.isfile(filename):
+            os.remove(filename)
+        os.rmdir(temp_dir)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Time read trimming using SeqRecord slicing versus SeqRecord views.
+
+This makes some FASTQ reads in memory, then trims each read several times
+(as a read trimming pipeline might, e.g. removing a barcode, an adapter and
+a poor quality tail) before either discarding short reads or turning the
+result into a FASTQ string. This is done with normal slicing (which copies
+the sequence and quality scores at each step) and using the SeqRecord's
+view method (where the slices refer back to the original read until used).
+"""
+import time
+import random
+
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.Alphabet import generic_dna
+
+
+def make_reads(count, length=250):
+    reads = []
+    for i in xrange(count):
+        seq = "".join(random.choice("ACGT") for j in xrange(length))
+        qual = [random.randint(2, 40) for j in xrange(length)]
+        reads.append(SeqRecord(Seq(seq, generic_dna), id="read%i" % i,
+                               description="",
+                               letter_annotations={"phred_quality": qual}))
+    return reads
+
+
+def trim(read, min_length):
+    read = read[6:]
+    read = read[:-random.randint(0, 50)]
+    read = read[:-random.randint(0, 50)]
+    if len(read) < min_length:
+        return None
+    return read
+
+
+def trim_view(read, min_length):
+    return trim(read.view(), min_length)
+
+
+def bench(function, reads, min_length, output):
+    random.seed(1)
+    start = time.time()
+    kept = 0
+    for read in reads:
+        read = function(read, min_length)
+        if read is not None:
+            kept += 1
+            if output:
+                read.format("fastq")
+    taken = time.time() - start
+    print "min_length=%-4i output=%-5s %-10s %8.0f reads/s (%i kept)" \
+          % (min_length, output, function.__name__, len(reads) / taken, kept)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    reads = make_reads(20000)
+    for output in [False, True]:
+        for min_length in [0, 180]:
+            bench(trim, reads, min_length, output)
+            bench(trim_view, reads, min_length, output)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Time parsing SFF files with Bio.SeqIO, and the memory used per read.
+
+This builds a larger SFF file (with an index) in a temporary directory by
+repeating the reads from the small Roche example in the unit tests, then
+times parsing it as "sff" and "sff-trim", with and without the arrays
+option of the SffIterator, and using Bio.SeqIO.parse_parallel.
+"""
+import os
+import sys
+import time
+import tempfile
+
+from Bio import SeqIO
+from Bio.SeqIO.SffIO import SffIterator, SffWriter
+
+
+def make_sff(filename, copies):
+    reads = list(SeqIO.parse("Tests/Roche/E3MFGYR02_random_10_reads.sff",
+                             "sff"))
+    records = []
+    for i in range(copies):
+        for read in reads:
+            #Keep the read names valid 454 names (14 characters):
+            new = read[:]
+            new.annotations = read.annotations
+            new.id = new.name = read.id[:9] + ("%05i" % i)
+            records.append(new)
+    handle = open(filename, "wb")
+    SffWriter(handle, xml=None).write_file(records)
+    handle.close()
+    return len(records)
+
+
+def deep_size(record):
+    size = sys.getsizeof(record) + sys.getsizeof(record.__dict__)
+    for key in ["flow_values", "flow_index"]:
+        if key in record.annotations:
+            values = record.annotations[key]
+            size += sys.getsizeof(values)
+            if isinstance(values, tuple):
+                size += sum(sys.getsizeof(v) for v in values if v > 256)
+    size += sys.getsizeof(record.letter_annotations["phred_quality"])
+    return size
+
+
+def time_parse(label, count, function):
+    start = time.time()
+    n = 0
+    for record in function():
+        n += 1
+    taken = time.time() - start
+    assert n == count, n
+    print "%-32s %6.2fs %8.0f reads/s %6i bytes/read" \
+          % (label, taken, count / taken, deep_size(record))
+
+
+if __name__ == "__main__":
+    temp_dir = tempfile.mkdtemp()
+    filename = os.path.join(temp_dir, "reads.sff")
+    try:
+        count = make_sff(filename, 2000)
+
+        def iterate(trim=False, arrays=False):
+            handle = open(filename, "rb")
+            try:
+                kwargs = {}
+                if arrays:
+                    kwargs["arrays"] = True
+                for record in SffIterator(handle, trim=trim, **kwargs):
+                    yield record
+            finally:
+                handle.close()
+
+        time_parse("sff", count, lambda: iterate())
+        time_parse("sff-trim", count, lambda: iterate(trim=True))
+        try:
+            time_parse("sff (arrays)", count, lambda: iterate(arrays=True))
+            time_parse("sff-trim (arrays)", count,
+                       lambda: iterate(trim=True, arrays=True))
+        except TypeError:
+            print "(arrays option not supported)"
+        try:
+            time_parse("parse_parallel sff", count,
+                       lambda: SeqIO.parse_parallel(filename, "sff",
+                                                    processes=2))
+        except ValueError, err:
+            print "parse_parallel: %s" % err
+    finally:
+        for name in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
@@ -76,7 +76,9 @@ DOCTEST_MODULES = [
                    "Bio.AlignIO.StockholmIO",
                    "Bio.Alphabet",
                    "Bio.Application",
+                   "Bio.bgzf",
                    "Bio.Blast.Applications",
+                   "Bio.Blast.NCBIXML",
                    "Bio.Emboss.Applications",
                    "Bio.GenBank",
                    "Bio.KEGG.Compound",
@@ -86,6 +88,8 @@ DOCTEST_MODULES = [
                    "Bio.Seq",
                    "Bio.SeqIO",
                    "Bio.SeqIO.AceIO",
+                   "Bio.SeqIO.FastaIO",
+                   "Bio.SeqIO.InsdcIO",
                    "Bio.SeqIO.PhdIO",
                    "Bio.SeqIO.QualityIO",
                    "Bio.SeqIO.SffIO",
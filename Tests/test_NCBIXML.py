@@ -1866,6 +1866,62 @@ class TestNCBIXML(unittest.TestCase):
         handle.close()
 
 
+class TestNCBIXMLFields(unittest.TestCase):
+    """Parsing with the fields and max_evalue arguments."""
+
+    def parse(self, filename, **keywds):
+        handle = open(os.path.join("Blast", filename))
+        records = list(NCBIXML.parse(handle, **keywds))
+        handle.close()
+        return records
+
+    def test_fields(self):
+        "Parsing only selected HSP fields (xbt009)"
+        full = self.parse("xbt009.xml")
+        records = self.parse("xbt009.xml", fields=["expect", "bits"])
+        self.assertEqual(len(full), len(records))
+        for old, new in zip(full, records):
+            self.assertEqual(old.query, new.query)
+            self.assertEqual([a.hit_id for a in old.alignments],
+                             [a.hit_id for a in new.alignments])
+            self.assertEqual([d.e for d in old.descriptions],
+                             [d.e for d in new.descriptions])
+            self.assertEqual(new.num_letters_in_database, [])
+            self.assertEqual(new.ka_params, (None, None, None))
+            for a, b in zip(old.alignments, new.alignments):
+                self.assertEqual([(h.expect, h.bits) for h in a.hsps],
+                                 [(h.expect, h.bits) for h in b.hsps])
+                for hsp in b.hsps:
+                    self.assertEqual(hsp.query, "")
+                    self.assertEqual(hsp.match, "")
+                    self.assertEqual(hsp.score, None)
+                    self.assertEqual(hsp.query_start, None)
+
+    def test_max_evalue(self):
+        "Parsing with an e-value cutoff (xbt001 and xbt011)"
+        record = self.parse("xbt001.xml", max_evalue=1e-30)[0]
+        self.assertEqual(len(record.alignments), 4)
+        self.assertEqual(len(record.descriptions), 4)
+        self.assertTrue(max([h.expect for a in record.alignments
+                             for h in a.hsps]) <= 1e-30)
+        full = self.parse("xbt001.xml")[0]
+        for old, new in zip(full.alignments, record.alignments):
+            self.assertEqual(old.hit_id, new.hit_id)
+            self.assertEqual(old.hsps[0].sbjct, new.hsps[0].sbjct)
+        records = self.parse("xbt011.xml", fields=["expect"],
+                             max_evalue=1e-50)
+        self.assertEqual([[(a.hit_id, [h.expect for h in a.hsps])
+                           for a in r.alignments] for r in records],
+                         [[("gi|75750454|ref|YP_319893.1|", [4.72196e-70])],
+                          [("gi|75750454|ref|YP_319893.1|", [1.28615e-59])],
+                          [("gi|75750454|ref|YP_319893.1|", [3.43623e-53])]])
+        self.assertEqual(records[0].descriptions[0].num_alignments, 1)
+
+    def test_bad_fields(self):
+        "Parsing with an unknown field"
+        self.assertRaises(ValueError, self.parse, "xbt002.xml",
+                          fields=["evalue"])
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
@@ -8,7 +8,7 @@ import unittest
 from StringIO import StringIO
 
 from Bio import SeqIO
-from Bio.SeqIO.FastaIO import FastaIterator
+from Bio.SeqIO.FastaIO import FastaIterator, FastaBlockIterator
 from Bio.Alphabet import generic_protein, generic_nucleotide, generic_dna
 
 def title_to_ids(title):
@@ -111,6 +111,66 @@ class TitleFunctions(unittest.TestCase):
         self.assertEqual("", record.description)
 
 
+class BlockParser(unittest.TestCase):
+    """Compare FastaBlockIterator against the reference FastaIterator."""
+    def compare(self, data, block_sizes=(1, 2, 3, 5, 17, 1048576)):
+        expected = list(FastaIterator(StringIO(data), generic_dna))
+        for block_size in block_sizes:
+            records = list(FastaBlockIterator(StringIO(data), generic_dna,
+                                              block_size=block_size))
+            self.assertEqual(len(records), len(expected))
+            for old, new in zip(expected, records):
+                self.assertEqual(old.id, new.id)
+                self.assertEqual(old.name, new.name)
+                self.assertEqual(old.description, new.description)
+                self.assertEqual(str(old.seq), str(new.seq))
+                self.assertEqual(old.seq.alphabet, new.seq.alphabet)
+
+    def test_empty(self):
+        """Block parsing of empty and record free data."""
+        self.compare("")
+        self.compare("\n\n")
+        self.compare("Comment\nACGT >\n")
+
+    def test_leading_text(self):
+        """Block parsing with text before the first record."""
+        self.compare("Comment line\n\n>Alpha desc\nACGT\nTT\n>Beta\nGG\n")
+
+    def test_no_trailing_newline(self):
+        """Block parsing without a final new line."""
+        self.compare(">Alpha\nACGT\n>Beta")
+        self.compare(">Alpha\nACGT\n>Beta\nAC")
+
+    def test_whitespace(self):
+        """Block parsing with spaces, tabs and carriage returns."""
+        self.compare(">Alpha \r\nAC GT \r\nA\tC\t\n\n>\nTT\n")
+
+    def test_title2ids(self):
+        """Block parsing with a title2ids function."""
+        filename = "Fasta/fa01"
+        expected = list(FastaIterator(open(filename), generic_protein,
+                                      title_to_ids))
+        records = list(FastaBlockIterator(open(filename), generic_protein,
+                                          title_to_ids, block_size=10))
+        self.assertEqual([r.id for r in expected], [r.id for r in records])
+        self.assertEqual([r.name for r in expected],
+                         [r.name for r in records])
+        self.assertEqual([str(r.seq) for r in expected],
+                         [str(r.seq) for r in records])
+
+    def test_files(self):
+        """Block parsing of the example FASTA files."""
+        for filename in single_nucleic_files + multi_dna_files \
+        + single_amino_files + multi_amino_files:
+            self.compare(open(filename).read(), (1, 7, 1048576))
+
+    def test_bad_block_size(self):
+        """Block parsing with an invalid block size."""
+        iterator = FastaBlockIterator(StringIO(">Alpha\nACGT\n"),
+                                      block_size=0)
+        self.assertRaises(ValueError, iterator.next)
+
+
 single_nucleic_files = ['Fasta/lupine.nu', 'Fasta/elderberry.nu',
                         'Fasta/phlox.nu', 'Fasta/centaurea.nu',
                         'Fasta/wisteria.nu', 'Fasta/sweetpea.nu',
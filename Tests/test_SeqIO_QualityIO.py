@@ -140,6 +140,15 @@ class TestFastqErrors(unittest.TestCase):
                 self.assertTrue(isinstance(record, SeqRecord))
             self.assertRaises(ValueError, records.next)
             handle.close()
+            #Now check the compact record parser
+            handle = open(filename, "rU")
+            records = QualityIO.FastqCompactIterator(handle, format)
+            for i in range(good_count):
+                record = records.next() #Make sure no errors!
+                self.assertTrue(isinstance(record,
+                                           QualityIO.FastqCompactRecord))
+            self.assertRaises(ValueError, records.next)
+            handle.close()
 
     def check_general_fails(self, filename, good_count):
         handle = open(filename, "rU")
@@ -711,6 +720,96 @@ class MappingTests(unittest.TestCase):
         self.assertEqual(record.letter_annotations["phred_quality"],
                          expected_phred)
 
+    def test_convert_fastq_quality(self):
+        """Batch quality conversion matches parse and write."""
+        ranges = {"fastq-sanger": (33, 126), "fastq-solexa": (59, 126),
+                  "fastq-illumina": (64, 126)}
+        warnings.simplefilter('ignore', BiopythonWarning)
+        for in_format, (low, high) in ranges.items():
+            qual = "".join(chr(a) for a in range(low, high+1))
+            seq = "N" * len(qual)
+            for out_format in ranges:
+                out_handle = StringIO()
+                SeqIO.write(SeqIO.parse(StringIO("@Test\n%s\n+\n%s\n" \
+                                                 % (seq, qual)), in_format),
+                            out_handle, out_format)
+                expected = out_handle.getvalue().split("\n")[3]
+                self.assertEqual(expected, QualityIO.convert_fastq_quality(
+                                 qual, in_format, out_format))
+                self.assertEqual([expected, expected[:5], ""],
+                                 QualityIO.convert_fastq_quality(
+                                 [qual, qual[:5], ""], in_format, out_format))
+        warnings.filters.pop()
+        self.assertEqual([], QualityIO.convert_fastq_quality([], "fastq",
+                                                             "fastq-solexa"))
+        self.assertRaises(ValueError, QualityIO.convert_fastq_quality,
+                          "II II", "fastq", "fastq-solexa")
+        self.assertRaises(ValueError, QualityIO.convert_fastq_quality,
+                          ["II", "I\nI"], "fastq", "fastq-solexa")
+        self.assertRaises(ValueError, QualityIO.convert_fastq_quality,
+                          "IIII", "fastq", "fasta")
+
+
+class TestCompactRecords(unittest.TestCase):
+    """Check the compact FASTQ records match the SeqRecord parsers."""
+    def check(self, filename, format):
+        expected = list(SeqIO.parse(open(filename, "rU"), format))
+        compact = list(QualityIO.FastqCompactIterator(open(filename, "rU"),
+                                                      format))
+        self.assertEqual(len(expected), len(compact))
+        for old, new in zip(expected, compact):
+            self.assertEqual(old.id, new.id)
+            self.assertEqual(old.description, new.title)
+            self.assertEqual(len(old), len(new))
+            self.assertEqual(str(old.seq), new.seq)
+            if format == "fastq-solexa":
+                key = "solexa_quality"
+            else:
+                key = "phred_quality"
+            self.assertEqual(old.letter_annotations[key],
+                             list(new.quality_scores()))
+            record = new.to_seqrecord()
+            self.assertTrue(compare_record(old, record))
+            self.assertEqual(old.format(format), new.format(format))
+            self.assertEqual(old.format("fasta"), new.format("fasta"))
+
+    def test_example(self):
+        """Compact records from example.fastq"""
+        self.check("Quality/example.fastq", "fastq")
+        self.check("Quality/example.fastq", "fastq-sanger")
+
+    def test_tricky(self):
+        """Compact records from tricky.fastq"""
+        self.check("Quality/tricky.fastq", "fastq")
+
+    def test_sanger(self):
+        """Compact records from sanger_full_range_original_sanger.fastq"""
+        self.check("Quality/sanger_full_range_original_sanger.fastq",
+                   "fastq-sanger")
+
+    def test_solexa(self):
+        """Compact records from solexa_full_range_original_solexa.fastq"""
+        self.check("Quality/solexa_full_range_original_solexa.fastq",
+                   "fastq-solexa")
+
+    def test_illumina(self):
+        """Compact records from illumina_full_range_original_illumina.fastq"""
+        self.check("Quality/illumina_full_range_original_illumina.fastq",
+                   "fastq-illumina")
+
+    def test_wrapping(self):
+        """Compact records from wrapping_original_sanger.fastq"""
+        self.check("Quality/wrapping_original_sanger.fastq", "fastq")
+
+    def test_bad_variant(self):
+        """Compact records with an invalid FASTQ variant."""
+        records = QualityIO.FastqCompactIterator(StringIO(""), "fasta")
+        self.assertRaises(ValueError, records.next)
+        self.assertRaises(ValueError, QualityIO.FastqCompactRecord,
+                          "Test", "ACGT", "IIII", "fastq-bad")
+        self.assertRaises(ValueError, QualityIO.FastqCompactRecord,
+                          "Test", "ACGT", "III", "fastq")
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
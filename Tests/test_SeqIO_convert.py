@@ -7,6 +7,7 @@
 import os
 import unittest
 import warnings
+from Bio import BiopythonWarning
 from Bio.Seq import UnknownSeq
 from Bio import SeqIO
 from Bio.SeqIO import QualityIO
@@ -163,6 +164,38 @@ class ConvertTests(unittest.TestCase):
     def failure_check(self, filename, in_format, out_format, alphabet):
         check_convert_fails(filename, in_format, out_format, alphabet)
 
+    def test_fastq_invalid_partial(self):
+        """Reads before an invalid quality string are still written."""
+        data = "@a\nACGT\n+\nIIII\n@b\nACGT\n+\nII I\n@c\nACGT\n+\nIIII\n"
+        for out_format in ["fastq-sanger", "fastq-illumina"]:
+            handle = StringIO()
+            self.assertRaises(ValueError, SeqIO.convert, StringIO(data),
+                              "fastq", handle, out_format)
+            expected = StringIO()
+            SeqIO.write(SeqIO.parse(StringIO(data[:data.index("@b")]),
+                                    "fastq"), expected, out_format)
+            self.assertEqual(expected.getvalue(), handle.getvalue())
+
+    def test_fastq_truncation_warning(self):
+        """Truncating scores warns once per batch of reads."""
+        data = "@a\nACGT\n+\n~~~~\n" * 10
+        #Python 2 won't repeat a warning already in the module registry
+        QualityIO.__dict__.pop("__warningregistry__", None)
+        warnings.simplefilter("always", BiopythonWarning)
+        try:
+            caught = []
+            old_showwarning = warnings.showwarning
+            warnings.showwarning = lambda *args, **kwargs: caught.append(args)
+            try:
+                SeqIO.convert(StringIO(data), "fastq", StringIO(),
+                              "fastq-illumina")
+            finally:
+                warnings.showwarning = old_showwarning
+        finally:
+            warnings.filters.pop(0)
+        self.assertEqual(1, len(caught))
+        self.assertTrue(issubclass(caught[0][1], BiopythonWarning))
+
 tests = [
     ("Quality/example.fastq", "fastq", None),
     ("Quality/example.fastq", "fastq-sanger", generic_dna),
@@ -175,6 +208,7 @@ tests = [
     ("EMBL/TRBG361.embl", "embl", None),
     ("GenBank/NC_005816.gb", "gb", None),
     ("GenBank/cor6_6.gb", "genbank", None),
+    ("EMBL/A04195.imgt", "imgt", None),
     ]
 for filename, format, alphabet in tests:
     for (in_format, out_format) in converter_dict:
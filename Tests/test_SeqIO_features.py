@@ -16,9 +16,10 @@ from Bio.Seq import Seq, UnknownSeq, MutableSeq, reverse_complement
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqFeature import SeqFeature, FeatureLocation, ExactPosition, \
                            BeforePosition, AfterPosition, OneOfPosition, \
-                           WithinPosition
+                           WithinPosition, FeatureList
 from StringIO import StringIO
 from Bio.SeqIO.InsdcIO import _insdc_feature_location_string
+from Bio.SeqIO.InsdcIO import GenBankIterator, EmblIterator
 
 #Top level function as this makes it easier to use for debugging:
 def write_read(filename, in_format="gb", out_formats=["gb", "embl", "imgt"]):
@@ -453,6 +454,57 @@ class SeqFeatureCreation(unittest.TestCase):
                 qualifiers={"test": ["a test"]})
         self.assertEqual(f.qualifiers["test"], ["a test"])
 
+    def test_interned_positions(self):
+        """Small exact positions are shared objects.
+        """
+        self.assertTrue(ExactPosition(5) is ExactPosition(5))
+        self.assertTrue(FeatureLocation(5, 10).start is ExactPosition(5))
+        self.assertEqual(ExactPosition(5000000), 5000000)
+        self.assertEqual(repr(ExactPosition(-1)), "ExactPosition(-1)")
+        #Subclasses are not shared
+        p = BeforePosition(5)
+        self.assertFalse(p is ExactPosition(5))
+        self.assertEqual(repr(p), "BeforePosition(5)")
+
+    def test_shared_genbank_positions(self):
+        """GenBank features with the same coordinates share positions.
+        """
+        record = SeqIO.read("GenBank/NC_005816.gb", "gb")
+        gene, cds = record.features[2:4]
+        self.assertEqual(gene.type, "gene")
+        self.assertEqual(cds.type, "CDS")
+        self.assertTrue(gene.location.start is cds.location.start)
+        self.assertTrue(gene.location.end is cds.location.end)
+
+    def test_pickle_and_copy(self):
+        """Pickle and copy SeqFeatures with fuzzy locations.
+        """
+        import copy
+        import pickle
+        sub = SeqFeature(FeatureLocation(BeforePosition(5),
+                                         WithinPosition(20, 18, 20),
+                                         strand=-1), type="exon")
+        f = SeqFeature(FeatureLocation(OneOfPosition(5, [ExactPosition(5),
+                                                         ExactPosition(9)]),
+                                       AfterPosition(500), strand=-1,
+                                       ref="X12345.1", ref_db="EMBL"),
+                       type="CDS", id="test", location_operator="join",
+                       qualifiers={"note": ["example"]}, sub_features=[sub])
+        f.comment = "Extra attribute"
+        for new in [copy.copy(f), copy.deepcopy(f),
+                    pickle.loads(pickle.dumps(f, 0)),
+                    pickle.loads(pickle.dumps(f, 2))]:
+            self.assertEqual(repr(f), repr(new))
+            self.assertEqual(repr(f.location), repr(new.location))
+            self.assertEqual(str(f.location), str(new.location))
+            self.assertEqual(str(sub.location),
+                             str(new.sub_features[0].location))
+            self.assertEqual(f.qualifiers, new.qualifiers)
+            self.assertEqual(f.ref_db, new.ref_db)
+            self.assertEqual("Extra attribute", new.comment)
+        self.assertTrue(pickle.loads(pickle.dumps(ExactPosition(5), 0)) \
+                        is ExactPosition(5))
+
 class FeatureWriting(unittest.TestCase):
     def setUp(self):
         self.record = SeqRecord(Seq("ACGT"*100, generic_dna),
@@ -1157,6 +1209,182 @@ class TestWriteRead(unittest.TestCase):
         write_read(os.path.join("EMBL", "U87107.embl"), "embl")
 
 
+class LazyFeatures(unittest.TestCase):
+    """Compare lazy and normal parsing of GenBank and EMBL features."""
+
+    def lazy_read(self, filename, iterator):
+        handle = open(filename)
+        records = list(iterator(handle, lazy_features=True))
+        handle.close()
+        return records
+
+    def check(self, filename, iterator):
+        handle = open(filename)
+        old = list(iterator(handle))
+        handle.close()
+        #Access by index, in reverse order
+        new = self.lazy_read(filename, iterator)
+        for o, n in zip(old, new):
+            self.assertEqual(len(o.features), len(n.features))
+            for i in range(len(o.features) - 1, -1, -1):
+                compare_feature(o.features[i], n.features[i])
+        #Access by iteration, and check the records in full
+        new = self.lazy_read(filename, iterator)
+        self.assertTrue(compare_records(old, new))
+
+    def test_genbank(self):
+        """Lazy feature parsing of GenBank files"""
+        for name in ["NC_000932.gb", "NC_005816.gb", "one_of.gb",
+                     "arab1.gb", "NT_019265.gb", "protein_refseq.gb"]:
+            self.check(os.path.join("GenBank", name), GenBankIterator)
+
+    def test_embl(self):
+        """Lazy feature parsing of EMBL files"""
+        for name in ["AE017046.embl", "TRBG361.embl", "location_wrap.embl"]:
+            self.check(os.path.join("EMBL", name), EmblIterator)
+
+    def test_by_type(self):
+        """Selecting lazily parsed features by type"""
+        record = SeqIO.read("GenBank/NC_005816.gb", "genbank")
+        lazy = self.lazy_read("GenBank/NC_005816.gb", GenBankIterator)[0]
+        features = lazy.features
+        genes = features.by_type("gene")
+        compare_features([f for f in record.features if f.type == "gene"],
+                         genes)
+        #Those features are now parsed, so should be the same objects
+        self.assertTrue(genes[0] is features.by_type("gene")[0])
+        self.assertTrue(genes[0] in features)
+        self.assertEqual(len(record.features), len(features))
+        both = features.by_type("CDS", "gene")
+        self.assertEqual(len(both), len(genes) + len(features.by_type("CDS")))
+        self.assertEqual([], features.by_type("missing"))
+
+    def test_list_methods(self):
+        """Lazily parsed features as a list"""
+        record = SeqIO.read("GenBank/NC_005816.gb", "genbank")
+        lazy = self.lazy_read("GenBank/NC_005816.gb", GenBankIterator)[0]
+        compare_features(record.features[2:5], lazy.features[2:5])
+        compare_features(record.features[::-3], lazy.features[::-3])
+        compare_feature(record.features[-1], lazy.features.pop())
+        extra = SeqFeature(FeatureLocation(5, 10), type="misc_feature")
+        lazy.features.insert(0, extra)
+        self.assertTrue(lazy.features[0] is extra)
+        self.assertEqual(1, lazy.features.count(extra))
+        compare_features(record.features[:-1], lazy.features[1:])
+        #Slicing the record parses and shifts the features
+        compare_features(record[100:2000].features,
+                         lazy[100:2000].features)
+        #Copying or pickling should give a plain list
+        import copy, pickle
+        lazy = self.lazy_read("GenBank/NC_005816.gb", GenBankIterator)[0]
+        for features in [copy.copy(lazy.features),
+                         pickle.loads(pickle.dumps(lazy.features))]:
+            self.assertEqual(list, type(features))
+            compare_features(record.features, features)
+
+
+class FeatureIndex(unittest.TestCase):
+    """Compare FeatureList location queries to checking every feature."""
+
+    def parts(self, feature):
+        if feature.sub_features:
+            return [(int(f.location.start), int(f.location.end)) \
+                    for f in feature.sub_features]
+        return [(int(feature.location.start), int(feature.location.end))]
+
+    def distance(self, feature, position):
+        answer = []
+        for start, end in self.parts(feature):
+            if position < start:
+                answer.append(start - position)
+            elif position >= end:
+                answer.append(position - end + 1)
+            else:
+                answer.append(0)
+        return min(answer)
+
+    def check(self, features, positions):
+        index = FeatureList(features)
+        for position in positions:
+            self.assertEqual([f for f in features if position in f],
+                             index.containing(position))
+            for length in [1, 10, 500]:
+                start, end = position, position + length
+                self.assertEqual([f for f in features if \
+                                  [s for s, e in self.parts(f) \
+                                   if s < end and e > start]],
+                                 index.overlapping(start, end))
+                self.assertEqual([f for f in features if \
+                                  min(self.parts(f))[0] >= start and \
+                                  max(e for s, e in self.parts(f)) <= end],
+                                 index.within(start, end))
+            if features:
+                best = min(self.distance(f, position) for f in features)
+                self.assertEqual([f for f in features if \
+                                  self.distance(f, position) == best],
+                                 index.nearest(position))
+            else:
+                self.assertEqual([], index.nearest(position))
+
+    def test_genbank(self):
+        """Feature location queries on GenBank files"""
+        record = SeqIO.read("GenBank/NC_000932.gb", "gb")
+        self.check(record.features, range(-5, len(record) + 5, 97))
+        self.check(record.features[1:], range(1700, 4400, 7))
+        record = SeqIO.read("GenBank/NC_005816.gb", "gb")
+        self.check(record.features, range(-5, len(record) + 5, 11))
+
+    def test_random(self):
+        """Feature location queries on random features"""
+        import random
+        random.seed(0)
+        features = []
+        for i in range(200):
+            start = random.randint(0, 5000)
+            end = start + random.randint(1, 300)
+            if random.random() < 0.2:
+                middle = random.randint(start, end)
+                sub_features = [SeqFeature(FeatureLocation(start, middle)),
+                                SeqFeature(FeatureLocation(middle + 20,
+                                                           end + 20))]
+                features.append(SeqFeature(FeatureLocation(start, end + 20),
+                                           location_operator="join",
+                                           sub_features=sub_features))
+            else:
+                features.append(SeqFeature(FeatureLocation(start, end)))
+        self.check(features, range(-10, 5400, 13))
+        self.check([], [0, 10])
+
+    def test_changes(self):
+        """Feature location queries after changing the list"""
+        record = SeqIO.read("GenBank/NC_005816.gb", "gb")
+        features = record.index_features()
+        self.assertTrue(isinstance(features, list))
+        self.assertTrue(features is record.index_features())
+        self.assertEqual(4, len(features.containing(3000)))
+        extra = SeqFeature(FeatureLocation(2990, 3010), type="misc_feature")
+        features.append(extra)
+        self.assertEqual(5, len(features.containing(3000)))
+        self.assertTrue(extra in features.containing(3000))
+        features.remove(extra)
+        self.assertEqual(4, len(features.containing(3000)))
+        features[0:1] = [extra]
+        self.assertEqual([extra], features.within(2000, 4000)[:1])
+        del features[0]
+        self.assertEqual(3, len(features.containing(3000)))
+        features.insert(5, extra)
+        self.assertEqual(4, len(features.containing(3000)))
+        features.pop(5)
+        features += [extra]
+        self.assertEqual(4, len(features.containing(3000)))
+        #Changing a location in place needs an explicit reindex
+        extra.location = FeatureLocation(5, 10)
+        features.reindex()
+        self.assertEqual(3, len(features.containing(3000)))
+        self.assertTrue(extra in features.containing(7))
+        self.assertFalse(extra in features.containing(3000))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
@@ -13,6 +13,7 @@ except ImportError:
     sqlite3 = None
 
 import os
+import gzip
 import unittest
 from StringIO import StringIO
 try:
@@ -25,7 +26,8 @@ from Bio._py3k import _as_bytes, _bytes_to_string
 
 from Bio.SeqRecord import SeqRecord
 from Bio import SeqIO
-from Bio.SeqIO._index import _FormatToRandomAccess
+from Bio.SeqIO._index import _FormatToRandomAccess, _IndexedFileSeq
+from Bio.SeqIO._index import _SQLiteManySeqFilesDict
 from Bio.Alphabet import generic_protein, generic_nucleotide, generic_dna
 
 from seq_tests_common import compare_record
@@ -78,6 +80,103 @@ if sqlite3:
 
 
 
+    class ParallelIndexTest(unittest.TestCase):
+        """Building an index_db using several processes."""
+        files = ["GenBank/NC_000932.faa", "GenBank/NC_005816.faa",
+                 "SwissProt/multi_ex.fasta"]
+
+        def tearDown(self):
+            for i in range(2):
+                name = "temp_parallel_%i.idx" % i
+                if os.path.isfile(name):
+                    os.remove(name)
+
+        def build(self, processes, key_function=None):
+            name = "temp_parallel_%i.idx" % (processes > 1)
+            d = SeqIO.index_db(name, self.files, "fasta", generic_protein,
+                               key_function, processes=processes)
+            self.assertEqual(len(d), 85 + 10 + 8)
+            key = "gi|7525076|ref|NP_051101.1|"
+            if key_function:
+                self.assertEqual(d[key_function(key)].id, key)
+            else:
+                self.assertEqual(d[key].id, key)
+            d.close()
+            con = sqlite3.connect(name)
+            dump = list(con.iterdump())
+            con.close()
+            return dump
+
+        def test_same_database(self):
+            """Parallel scanning gives the same SQLite database."""
+            self.assertEqual(self.build(1), self.build(2))
+
+        def test_key_function(self):
+            """Parallel scanning with a key function."""
+            self.assertEqual(self.build(1, add_prefix),
+                             self.build(3, add_prefix))
+
+        def test_duplicates(self):
+            """Parallel scanning with duplicate keys."""
+            self.assertRaises(ValueError, SeqIO.index_db, ":memory:",
+                              ["Fasta/dups.fasta", "Fasta/dups.fasta"],
+                              "fasta", processes=2)
+
+        def test_bad_processes(self):
+            """Invalid number of processes."""
+            self.assertRaises(ValueError, SeqIO.index_db, ":memory:",
+                              self.files, "fasta", processes=0)
+
+
+    class MappedIndexDbTest(unittest.TestCase):
+        """Memory mapped index_db with a mixture of BGZF and plain files."""
+        files = ["GenBank/NC_000932.faa.bgz", "GenBank/NC_005816.faa",
+                 "temp_multi_ex.fasta.bgz"]
+
+        def setUp(self):
+            from Bio import bgzf
+            handle = bgzf.BgzfWriter(self.files[-1], "wb")
+            handle.write(open("SwissProt/multi_ex.fasta", "rb").read())
+            handle.close()
+
+        def tearDown(self):
+            if os.path.isfile(self.files[-1]):
+                os.remove(self.files[-1])
+
+        def check_open(self, d):
+            #BGZF files can't be memory mapped, so count towards max_open
+            unmapped = [p for p in d._proxies.values() if not p._memory_map]
+            self.assertTrue(len(unmapped) <= 1)
+
+        def test_mapped_bgzf(self):
+            """Raw access with memory_map=True and BGZF files."""
+            plain = SeqIO.index_db(":memory:", self.files, "fasta",
+                                   generic_protein)
+            #index_db doesn't expose max_open, so use the class directly
+            d = _SQLiteManySeqFilesDict(":memory:", self.files, "fasta",
+                                        generic_protein, None, max_open=1,
+                                        memory_map=True)
+            self.assertEqual(len(d), 85 + 10 + 8)
+            self.check_open(d)
+            #Alternate between the BGZF files to force handles to be closed
+            keys = ["gi|7525076|ref|NP_051101.1|", "sp|P00750|TPA_HUMAN",
+                    "gi|45478712|ref|NP_995567.1|",
+                    "gi|7525099|ref|NP_051123.1|", "sp|P56540|CBBQ_CHRVI"]
+            for key in keys:
+                self.assertEqual(d.get_raw(key), plain.get_raw(key))
+                self.check_open(d)
+                self.assertEqual(d[key].id, key)
+                self.check_open(d)
+            self.assertEqual(list(d.get_raw_many(keys)),
+                             [plain.get_raw(key) for key in keys])
+            self.check_open(d)
+            #The plain FASTA file stays memory mapped
+            mapped = [p for p in d._proxies.values() if p._memory_map]
+            self.assertEqual(len(mapped), 1)
+            d.close()
+            plain.close()
+
+
 class IndexDictTests(unittest.TestCase):
     """Cunning unit test where methods are added at run time."""
     def simple_check(self, filename, format, alphabet):
@@ -89,6 +188,39 @@ class IndexDictTests(unittest.TestCase):
         rec_dict._proxy._handle.close() #TODO - Better solution
         del rec_dict
 
+        #Saving the offsets to a sidecar file, then reloading them
+        offsets_tmp = filename + ".offsets"
+        if os.path.isfile(offsets_tmp):
+            os.remove(offsets_tmp)
+        for i in range(2):
+            rec_dict = SeqIO.index(filename, format, alphabet,
+                                   offsets_filename=offsets_tmp)
+            self.assertTrue(os.path.isfile(offsets_tmp))
+            self.check_dict_methods(rec_dict, id_list, id_list)
+            rec_dict._proxy._handle.close() #TODO - Better solution
+            del rec_dict
+        #Memory mapped
+        rec_dict = SeqIO.index(filename, format, alphabet, memory_map=True)
+        self.check_dict_methods(rec_dict, id_list, id_list)
+        rec_dict._proxy._handle.close() #TODO - Better solution
+        del rec_dict
+        #Sequences loaded on demand
+        for memory_map in [False, True]:
+            rec_dict = SeqIO.index(filename, format, alphabet,
+                                   memory_map=memory_map, lazy_seq=True)
+            self.check_dict_methods(rec_dict, id_list, id_list)
+            rec_dict._proxy._handle.close() #TODO - Better solution
+            del rec_dict
+
+        #Reuse the same offsets file with a key function
+        key_list = [add_prefix(id) for id in id_list]
+        rec_dict = SeqIO.index(filename, format, alphabet, add_prefix,
+                               offsets_filename=offsets_tmp)
+        self.check_dict_methods(rec_dict, key_list, id_list)
+        rec_dict._proxy._handle.close() #TODO - Better solution
+        del rec_dict
+        os.remove(offsets_tmp)
+
         if not sqlite3:
             return
 
@@ -118,6 +250,13 @@ class IndexDictTests(unittest.TestCase):
         rec_dict.close()
         del rec_dict
 
+        #Reload it memory mapped
+        rec_dict = SeqIO.index_db(index_tmp, filename, format, alphabet,
+                                  memory_map=True)
+        self.check_dict_methods(rec_dict, id_list, id_list)
+        rec_dict.close()
+        del rec_dict
+
         #Now reload it...
         rec_dict = SeqIO.index_db(index_tmp, [filename], format, alphabet)
         self.check_dict_methods(rec_dict, id_list, id_list)
@@ -203,6 +342,14 @@ class IndexDictTests(unittest.TestCase):
             pass
         self.assertEqual(rec_dict.get(chr(0)), None)
         self.assertEqual(rec_dict.get(chr(0), chr(1)), chr(1))
+        #Batch lookups, in the requested order (here reversed),
+        self.assertEqual(ids[::-1],
+                         [rec.id for rec in rec_dict.get_many(keys[::-1])])
+        #and in the file order
+        self.assertEqual(sorted(ids),
+                         sorted([rec.id for rec in \
+                                 rec_dict.get_many(keys, file_order=True)]))
+        self.assertRaises(KeyError, list, rec_dict.get_many(keys + [chr(0)]))
         if hasattr(dict, "iteritems"):
             #Python 2.x
             for key, rec in rec_dict.iteritems():
@@ -233,7 +380,10 @@ class IndexDictTests(unittest.TestCase):
         self.assertRaises(NotImplementedError, rec_dict.fromkeys, [])
 
     def get_raw_check(self, filename, format, alphabet):
-        handle = open(filename, "rb")
+        if filename.endswith(".bgz"):
+            handle = gzip.open(filename, "rb")
+        else:
+            handle = open(filename, "rb")
         raw_file = handle.read()
         handle.close()
         #Also checking the key_function here
@@ -289,6 +439,18 @@ class IndexDictTests(unittest.TestCase):
             else:
                 rec2 = SeqIO.read(handle, format, alphabet)
             self.assertEqual(True, compare_record(rec1, rec2))
+        #Batch lookups should give the same raw records
+        self.assertEqual([rec_dict.get_raw(key) for key in id_list[::-1]],
+                         list(rec_dict.get_raw_many(id_list[::-1])))
+        self.assertEqual(sorted([rec_dict.get_raw(key) for key in id_list]),
+                         sorted(rec_dict.get_raw_many(id_list, True)))
+        #Memory mapped, should give the same raw records
+        mapped_dict = SeqIO.index(filename, format, alphabet,
+                                  key_function = lambda x : x.lower(),
+                                  memory_map = True)
+        for key in id_list:
+            self.assertEqual(rec_dict.get_raw(key), mapped_dict.get_raw(key))
+        mapped_dict._proxy._handle.close()
         rec_dict._proxy._handle.close() #TODO - Better solution
         del rec_dict
 
@@ -309,6 +471,147 @@ class IndexDictTests(unittest.TestCase):
         self.assertRaises(ValueError, SeqIO.to_dict, iterator)
         handle.close()
 
+class OffsetsFileTests(unittest.TestCase):
+    """Saving and reloading Bio.SeqIO.index() offsets."""
+    def setUp(self):
+        self.filename = "Fasta/temp_offsets.fasta"
+        self.offsets = self.filename + ".offsets"
+        handle = open(self.filename, "w")
+        handle.write(">alpha\nACGT\n>beta\nGGGG\n")
+        handle.close()
+
+    def tearDown(self):
+        for name in [self.filename, self.offsets]:
+            if os.path.isfile(name):
+                os.remove(name)
+
+    def index(self):
+        rec_dict = SeqIO.index(self.filename, "fasta",
+                               offsets_filename=self.offsets)
+        keys = sorted(rec_dict)
+        seqs = [str(rec_dict[k].seq) for k in keys]
+        rec_dict._proxy._handle.close()
+        return keys, seqs
+
+    def test_reload(self):
+        """Reload offsets from an up to date offsets file."""
+        self.assertEqual(self.index(), (["alpha", "beta"], ["ACGT", "GGGG"]))
+        #Tamper with the offsets file (keeping the header) to prove
+        #it is used rather than rescanning the sequence file:
+        lines = open(self.offsets).readlines()
+        self.assertEqual(3, len(lines))
+        handle = open(self.offsets, "w")
+        handle.write(lines[0] + lines[1])
+        handle.close()
+        self.assertEqual(self.index(), (["alpha"], ["ACGT"]))
+
+    def test_stale(self):
+        """Rescan when the file has changed since the offsets were saved."""
+        self.assertEqual(self.index(), (["alpha", "beta"], ["ACGT", "GGGG"]))
+        handle = open(self.filename, "a")
+        handle.write(">gamma\nTTTT\n")
+        handle.close()
+        self.assertEqual(self.index(), (["alpha", "beta", "gamma"],
+                                        ["ACGT", "GGGG", "TTTT"]))
+        #Same size, but a different modification time
+        handle = open(self.filename, "w")
+        handle.write(">delta\nACGT\n>omega\nGGGG\n>gamma\nTTTT\n")
+        handle.close()
+        stamp = os.path.getmtime(self.filename) + 10
+        os.utime(self.filename, (stamp, stamp))
+        self.assertEqual(self.index(), (["delta", "gamma", "omega"],
+                                        ["ACGT", "TTTT", "GGGG"]))
+
+    def test_corrupt(self):
+        """Rescan when the offsets file is not valid."""
+        handle = open(self.offsets, "w")
+        handle.write("Not an offsets file\n")
+        handle.close()
+        self.assertEqual(self.index(), (["alpha", "beta"], ["ACGT", "GGGG"]))
+        self.assertEqual(open(self.offsets).read().count("\n"), 3)
+
+    def test_other_format(self):
+        """Rescan when the offsets file was for another format."""
+        self.assertEqual(self.index(), (["alpha", "beta"], ["ACGT", "GGGG"]))
+        lines = open(self.offsets).readlines()
+        handle = open(self.offsets, "w")
+        handle.write(lines[0].replace("\tfasta\t", "\ttab\t"))
+        handle.write(lines[1])
+        handle.close()
+        self.assertEqual(self.index(), (["alpha", "beta"], ["ACGT", "GGGG"]))
+
+
+class LazySeqTests(unittest.TestCase):
+    """Bio.SeqIO.index() with the sequences loaded on demand."""
+    def setUp(self):
+        self.filename = "Fasta/temp_lazy.fasta"
+
+    def tearDown(self):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+
+    def check(self, filename, format, lazy_count):
+        records = list(SeqIO.parse(filename, format))
+        for memory_map in [False, True]:
+            rec_dict = SeqIO.index(filename, format, memory_map=memory_map,
+                                   lazy_seq=True)
+            count = 0
+            for old in records:
+                new = rec_dict[old.id]
+                self.assertTrue(compare_record(old, new))
+                if not isinstance(new.seq, _IndexedFileSeq):
+                    continue
+                count += 1
+                seq = str(old.seq)
+                for start, end in [(0, 1), (5, 70), (59, 61), (60, 121),
+                                   (-30, None), (100, 50), (-1, None)]:
+                    self.assertEqual(seq[start:end], str(new.seq[start:end]))
+                    self.assertEqual(seq[start:end][1:-1],
+                                     str(new.seq[start:end][1:-1]))
+                self.assertEqual(seq[::7], str(new.seq[::7]))
+                if seq:
+                    self.assertEqual(seq[-1], new.seq[-1])
+                    self.assertEqual(seq[0], new.seq[0])
+            self.assertEqual(lazy_count, count)
+            rec_dict._proxy._handle.close()
+
+    def write(self, data):
+        handle = open(self.filename, "wb")
+        handle.write(_as_bytes(data))
+        handle.close()
+
+    def test_genbank(self):
+        """Lazy loading of GenBank sequences."""
+        self.check("GenBank/NC_005816.gb", "gb", 1)
+        self.check("GenBank/cor6_6.gb", "gb", 6)
+
+    def test_fasta(self):
+        """Lazy loading of FASTA sequences."""
+        self.check("GenBank/NC_005816.fna", "fasta", 1)
+        self.check("GenBank/NC_000932.faa", "fasta", 85)
+
+    def test_fasta_layouts(self):
+        """Lazy loading of FASTA sequences with unusual layouts."""
+        self.write(">a\r\nACGTA\r\nCGTAC\r\nGT\r\n\r\n>b empty\n"
+                   ">c\nACGTACGT\n>d\nACGTA\nCGT\n\n\n\n>e\nA")
+        self.check(self.filename, "fasta", 5)
+
+    def test_fasta_irregular(self):
+        """Lazy loading of FASTA sequences with irregular line lengths."""
+        #Here the mistake can be seen from the last line, so the record is
+        #parsed as normal:
+        self.write(">a\nACGTA\nCGTACG\nGT\n")
+        self.check(self.filename, "fasta", 0)
+        #Here it can only be seen when reading part of the sequence:
+        self.write(">a\nACGTA\nCGT\nACGTACG\nTA\n")
+        rec_dict = SeqIO.index(self.filename, "fasta", lazy_seq=True)
+        seq = rec_dict["a"].seq
+        self.assertEqual(17, len(seq))
+        self.assertEqual("ACGTA", str(seq[:5]))
+        self.assertRaises(ValueError, str, seq[8:9])
+        rec_dict._proxy._handle.close()
+
+
 tests = [
     ("Ace/contig1.ace", "ace", generic_dna),
     ("Ace/consed_sample.ace", "ace", None),
@@ -316,6 +619,7 @@ tests = [
     ("Quality/wrapping_original_sanger.fastq", "fastq", None),
     ("Quality/example.fastq", "fastq", None),
     ("Quality/example.fastq", "fastq-sanger", generic_dna),
+    ("Quality/example.fastq.bgz", "fastq", None),
     ("Quality/tricky.fastq", "fastq", generic_nucleotide),
     ("Quality/sanger_faked.fastq", "fastq-sanger", generic_dna),
     ("Quality/solexa_faked.fastq", "fastq-solexa", generic_dna),
@@ -326,12 +630,14 @@ tests = [
     ("EMBL/A04195.imgt", "embl", None), #Not a proper EMBL file, an IMGT file
     ("EMBL/A04195.imgt", "imgt", None),
     ("GenBank/NC_000932.faa", "fasta", generic_protein),
+    ("GenBank/NC_000932.faa.bgz", "fasta", generic_protein),
     ("GenBank/NC_005816.faa", "fasta", generic_protein),
     ("GenBank/NC_005816.tsv", "tab", generic_protein),
     ("GenBank/NC_005816.ffn", "fasta", generic_dna),
     ("GenBank/NC_005816.fna", "fasta", generic_dna),
     ("GenBank/NC_005816.gb", "gb", None),
     ("GenBank/cor6_6.gb", "genbank", None),
+    ("GenBank/NC_000932.gb.bgz", "gb", None),
     ("IntelliGenetics/vpu_nucaligned.txt", "ig", generic_nucleotide),
     ("IntelliGenetics/TAT_mase_nuc.txt", "ig", None),
     ("IntelliGenetics/VIF_mase-pro.txt", "ig", generic_protein),
@@ -346,7 +652,9 @@ tests = [
     ("SwissProt/sp010", "swiss", None),
     ("SwissProt/sp016", "swiss", None),
     ("SwissProt/multi_ex.txt", "swiss", None),
+    ("SwissProt/multi_ex.txt.bgz", "swiss", None),
     ("SwissProt/multi_ex.xml", "uniprot-xml", None),
+    ("SwissProt/multi_ex.xml.bgz", "uniprot-xml", None),
     ("SwissProt/multi_ex.fasta", "fasta", None),
     ("Roche/E3MFGYR02_random_10_reads.sff", "sff", generic_dna),
     ("Roche/E3MFGYR02_random_10_reads.sff", "sff-trim", generic_dna),
@@ -0,0 +1,103 @@
+# Copyright 2012 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Unit tests for the Bio.SeqIO.parse_parallel(...) function."""
+
+try:
+    import multiprocessing
+except ImportError:
+    from Bio import MissingPythonDependencyError
+    raise MissingPythonDependencyError("Bio.SeqIO.parse_parallel requires "
+                                       "the multiprocessing module "
+                                       "(Python 2.6 or later)")
+
+import unittest
+
+from Bio import SeqIO
+from Bio.Alphabet import generic_protein, generic_dna
+
+from seq_tests_common import compare_record
+
+
+class ParallelParseTests(unittest.TestCase):
+    """Compare records from parse_parallel with those from parse."""
+
+    def check(self, filename, format, alphabet=None, chunk_size=1000):
+        expected = list(SeqIO.parse(filename, format, alphabet))
+        self.assertTrue(expected, "No records in %s" % filename)
+        records = list(SeqIO.parse_parallel(filename, format, alphabet,
+                                            processes=2,
+                                            chunk_size=chunk_size))
+        self.assertEqual(len(expected), len(records))
+        for old, new in zip(expected, records):
+            self.assertTrue(compare_record(old, new))
+        #Also try one chunk for the whole file, and unordered records
+        records = list(SeqIO.parse_parallel(filename, format, alphabet,
+                                            processes=2, ordered=False))
+        self.assertEqual(len(expected), len(records))
+        self.assertEqual(sorted([r.id for r in expected]),
+                         sorted([r.id for r in records]))
+
+    def test_fasta(self):
+        """Parallel parsing of FASTA"""
+        self.check("Fasta/f002", "fasta", generic_dna, 200)
+        self.check("GenBank/NC_000932.faa", "fasta", generic_protein)
+
+    def test_fastq(self):
+        """Parallel parsing of FASTQ"""
+        self.check("Quality/example.fastq", "fastq", chunk_size=100)
+        self.check("Quality/solexa_example.fastq", "fastq-solexa",
+                   chunk_size=100)
+
+    def test_qual(self):
+        """Parallel parsing of QUAL"""
+        self.check("Quality/example.qual", "qual", chunk_size=100)
+
+    def test_genbank(self):
+        """Parallel parsing of GenBank"""
+        self.check("GenBank/cor6_6.gb", "genbank")
+        self.check("GenBank/NC_000932.gb", "gb", chunk_size=100000)
+
+    def test_embl(self):
+        """Parallel parsing of EMBL and IMGT"""
+        self.check("EMBL/epo_prt_selection.embl", "embl")
+        self.check("EMBL/A04195.imgt", "imgt")
+
+    def test_swiss(self):
+        """Parallel parsing of SwissProt"""
+        self.check("SwissProt/multi_ex.txt", "swiss")
+
+    def test_tab(self):
+        """Parallel parsing of tab separated plain text"""
+        self.check("GenBank/NC_005816.tsv", "tab", generic_protein, 100)
+
+    def test_sff(self):
+        """Parallel parsing of SFF using the Roche index"""
+        self.check("Roche/E3MFGYR02_random_10_reads.sff", "sff",
+                   chunk_size=2000)
+        self.check("Roche/E3MFGYR02_index_in_middle.sff", "sff-trim",
+                   chunk_size=2000)
+        self.check("Roche/E3MFGYR02_no_manifest.sff", "sff")
+
+    def test_bgzf(self):
+        """Parallel parsing of BGZF compressed files"""
+        self.check("GenBank/NC_000932.faa.bgz", "fasta", generic_protein)
+        self.check("SwissProt/multi_ex.txt.bgz", "swiss")
+
+    def test_bad_arguments(self):
+        """Parallel parsing argument checks"""
+        self.assertRaises(ValueError, SeqIO.parse_parallel,
+                          "SwissProt/multi_ex.xml", "uniprot-xml")
+        self.assertRaises(ValueError, SeqIO.parse_parallel,
+                          "Fasta/f002", "FASTA")
+        self.assertRaises(ValueError, SeqIO.parse_parallel,
+                          "Fasta/f002", "fasta", processes=0)
+        self.assertRaises(TypeError, SeqIO.parse_parallel,
+                          open("Fasta/f002"), "fasta")
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity = 2)
+    unittest.main(testRunner=runner)
@@ -165,6 +165,90 @@ for (records, descr, errs) in test_records:
                 break
         del funct
 
+
+class CountingHandle(StringIO):
+    """StringIO handle which counts the calls to its write method."""
+    def __init__(self):
+        StringIO.__init__(self)
+        self.calls = 0
+
+    def write(self, data):
+        self.calls += 1
+        StringIO.write(self, data)
+
+
+class BufferedWriterTests(unittest.TestCase):
+    """Check the batched write_records output against write_record."""
+    def check_batch(self, filename, in_format, out_format):
+        records = list(SeqIO.parse(filename, in_format))
+        writer_class = SeqIO._FormatToWriter[out_format]
+        #One record at a time, no buffering
+        expected = StringIO()
+        writer = writer_class(expected)
+        writer.write_header()
+        for record in records:
+            writer.write_record(record)
+        writer._record_written = True
+        writer.write_footer()
+        #Default buffering, should need only one write for the records
+        handle = CountingHandle()
+        self.assertEqual(len(records), writer_class(handle).write_file(records))
+        self.assertEqual(expected.getvalue(), handle.getvalue())
+        self.assertTrue(handle.calls <= 3, handle.calls)
+        #Tiny buffer, forces a flush after every record
+        handle = CountingHandle()
+        writer = writer_class(handle)
+        writer.buffer_size = 1
+        self.assertEqual(len(records), writer.write_file(records))
+        self.assertEqual(expected.getvalue(), handle.getvalue())
+
+    def test_fasta(self):
+        """Batched FASTA output"""
+        self.check_batch("GenBank/NC_005816.gb", "gb", "fasta")
+
+    def test_qual(self):
+        """Batched QUAL output"""
+        self.check_batch("Quality/example.fastq", "fastq", "qual")
+
+    def test_fastq(self):
+        """Batched FASTQ output"""
+        self.check_batch("Quality/example.fastq", "fastq", "fastq")
+
+    def test_genbank(self):
+        """Batched GenBank output"""
+        self.check_batch("GenBank/cor6_6.gb", "gb", "gb")
+
+    def test_embl(self):
+        """Batched EMBL output"""
+        self.check_batch("EMBL/epo_prt_selection.embl", "embl", "embl")
+
+    def test_no_wrap(self):
+        """Writing FASTA and QUAL without line wrapping"""
+        records = list(SeqIO.parse("Quality/example.fastq", "fastq"))
+        for format in ["fasta", "qual"]:
+            handle = StringIO()
+            self.assertEqual(3, SeqIO.write(records, handle, format,
+                                            wrap=None))
+            lines = handle.getvalue().splitlines()
+            self.assertEqual(6, len(lines))
+            handle.seek(0)
+            if format == "qual":
+                new = [r.letter_annotations["phred_quality"] \
+                       for r in SeqIO.parse(handle, format)]
+                old = [r.letter_annotations["phred_quality"] for r in records]
+            else:
+                new = [str(r.seq) for r in SeqIO.parse(handle, format)]
+                old = [str(r.seq) for r in records]
+            self.assertEqual(old, new)
+        #Wrapping at 10 instead
+        handle = StringIO()
+        SeqIO.write(records[0], handle, "fasta", wrap=10)
+        self.assertEqual(">EAS54_6_R1_2_1_413_324\nCCCTTCTTGT\nCTTCAGCGTT"
+                         "\nTCTCC\n", handle.getvalue())
+        self.assertRaises(ValueError, SeqIO.write, records, StringIO(),
+                          "genbank", wrap=None)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
@@ -11,7 +11,7 @@ and confirms they are consistent using our different parsers.
 import unittest
 from Bio import SeqIO
 from Bio.Alphabet import generic_dna, generic_rna, generic_protein
-from Bio.Seq import Seq
+from Bio.Seq import Seq, MutableSeq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqFeature import SeqFeature, FeatureLocation, ExactPosition
 from Bio.SeqFeature import WithinPosition, BeforePosition, AfterPosition, OneOfPosition
@@ -215,7 +215,120 @@ class SeqRecordMethods(unittest.TestCase):
             self.assertEqual(rec.annotations, {}) # May change this...
             self.assertEqual(rec.letter_annotations, {"fake":"X"*26})
             self.assertTrue(len(rec.features) <= len(self.record.features))
-            
+
+
+class SeqRecordViews(unittest.TestCase):
+    """Compare SeqRecord views with normal slicing and reverse complement."""
+
+    def compare(self, old, new):
+        self.assertEqual(len(old), len(new))
+        self.assertEqual(old.id, new.id)
+        self.assertEqual(old.name, new.name)
+        self.assertEqual(old.description, new.description)
+        self.assertEqual(old.dbxrefs, new.dbxrefs)
+        self.assertEqual(old.annotations, new.annotations)
+        self.assertEqual(str(old.seq), str(new.seq))
+        self.assertEqual(repr(old.seq.alphabet), repr(new.seq.alphabet))
+        self.assertEqual(old.letter_annotations, new.letter_annotations)
+        self.assertEqual([str(f) for f in old.features],
+                         [str(f) for f in new.features])
+
+    def check(self, record):
+        import random
+        random.seed(len(record))
+        length = len(record)
+        for i in range(50):
+            old = record[:]
+            new = record.view()
+            self.compare(old, new)
+            for j in range(random.randint(1, 4)):
+                if random.random() < 0.3:
+                    old = old.reverse_complement(id=True, name=True,
+                                                 description="rc")
+                    new = new.reverse_complement(id=True, name=True,
+                                                 description="rc")
+                else:
+                    start = random.randint(-length, length)
+                    end = random.randint(-length, length)
+                    step = random.choice([None, 1, 1, 1, 2, -1, -3])
+                    old = old[start:end:step]
+                    new = new[start:end:step]
+                if random.random() < 0.2:
+                    #Force evaluation of some of the intermediate views
+                    self.assertEqual(len(old.features), len(new.features))
+            self.compare(old, new)
+
+    def test_fastq(self):
+        """Views of FASTQ records"""
+        for record in SeqIO.parse("Quality/example.fastq", "fastq"):
+            self.check(record)
+
+    def test_genbank(self):
+        """Views of GenBank records with features"""
+        self.check(SeqIO.read("GenBank/pBAD30.gb", "gb"))
+        self.check(SeqIO.read("GenBank/NC_005816.gb", "gb"))
+
+    def test_mutable(self):
+        """Views of a record using a MutableSeq"""
+        record = SeqRecord(MutableSeq("ACGTTTGGCA", generic_dna), id="Test",
+                           letter_annotations={"q": range(10)})
+        self.check(record)
+        view = record.view()[2:5]
+        self.assertTrue(isinstance(view.seq, MutableSeq))
+        self.assertEqual("GTT", str(view.seq))
+        self.assertEqual("AAC", str(view.reverse_complement().seq))
+
+    def test_protein(self):
+        """Protein records can be viewed but not reverse complemented"""
+        record = SeqRecord(Seq("MKQHKAMIVALIVICITAVVAALV", generic_protein),
+                           letter_annotations={"ss": "-"*24})
+        self.check(SeqRecord(Seq("MKQHKAMIVALIVICITAVVAALV", generic_dna),
+                             letter_annotations={"ss": "-"*24}))
+        view = record.view()[5:]
+        self.assertEqual("AMIVALIVICITAVVAALV", str(view.seq))
+        self.assertRaises(ValueError, view.reverse_complement)
+
+    def test_lazy(self):
+        """Views only use the parent values when first needed"""
+        record = SeqRecord(Seq("ACGTACGTAC", generic_dna), id="Test",
+                           letter_annotations={"q": range(10)})
+        view = record.view()[1:][:-1].reverse_complement()
+        self.assertEqual(8, len(view))
+        self.assertTrue(hasattr(view, "_seq_view"))
+        self.assertTrue(view._seq_view[0] is record)
+        self.assertTrue(view._letters_view[0] is record)
+        record.letter_annotations["q"][1] = 100
+        self.assertEqual(range(8, 1, -1) + [100],
+                         view.letter_annotations["q"])
+        record.letter_annotations["q"][2] = 200
+        self.assertEqual(range(8, 1, -1) + [100],
+                         view.letter_annotations["q"])
+        #Once evaluated, further views use the view's own values
+        sub = view[:2]
+        self.assertTrue(sub._letters_view[0] is view)
+        self.assertTrue(sub._seq_view[0] is record)
+        self.assertEqual([8, 7], sub.letter_annotations["q"])
+        self.assertEqual("TA", str(sub.seq))
+
+    def test_assignment(self):
+        """Setting the values of a view"""
+        record = SeqRecord(Seq("ACGTACGTAC", generic_dna), id="Test",
+                           letter_annotations={"q": range(10)})
+        view = record.view()[2:6]
+        self.assertRaises(ValueError, setattr, view, "seq", Seq("A"))
+        self.assertRaises(TypeError, view.letter_annotations.__setitem__,
+                          "q", range(10))
+        view.letter_annotations = {"x": "abcd"}
+        self.assertEqual({"x": "abcd"}, view.letter_annotations)
+        view.letter_annotations = {}
+        view.seq = Seq("AAA", generic_dna)
+        self.assertEqual(3, len(view))
+        view.features = [SeqFeature(FeatureLocation(0, 2))]
+        self.assertEqual("AA", str(view.features[0].extract(view.seq)))
+        self.assertEqual("TT", str(view[1:].reverse_complement().seq))
+        self.assertEqual("ACGTACGTAC", str(record.seq))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
@@ -6,6 +6,8 @@
 """Unittests for the Seq objects."""
 import unittest
 import sys
+import array
+import random
 if sys.version_info[0] == 3:
    maketrans = str.maketrans
 else:
@@ -17,8 +19,18 @@ from Bio.Alphabet.IUPAC import protein, extended_protein
 from Bio.Alphabet.IUPAC import unambiguous_dna, ambiguous_dna, ambiguous_rna
 from Bio.Data.IUPACData import ambiguous_dna_values, ambiguous_rna_values
 from Bio.Seq import Seq, UnknownSeq, MutableSeq, translate
+from Bio.Seq import BytesSeq, TwoBitSeq
+from Bio.Seq import translate_many, translate_six_frames, reverse_complement
+from Bio.Seq import reverse_complement_many
+from Bio.Alphabet import Gapped
 from Bio.Data.CodonTable import TranslationError, CodonTable
 
+try:
+    _bytearray = bytearray
+except NameError:
+    #Python 2.5
+    _bytearray = str
+
 #This is just the standard table with less stop codons
 #(replaced with coding for O as an artifical example)
 special_table = CodonTable(forward_table={
@@ -86,6 +98,14 @@ class StringMethodTests(unittest.TestCase):
         UnknownSeq(10, generic_protein, "X"),
         UnknownSeq(10, character="X"),
         UnknownSeq(10),
+        BytesSeq("ACGTGGGGT", generic_dna),
+        BytesSeq("TTACGUGGGGUA", generic_rna, 2, 11),
+        BytesSeq(_bytearray("GG"), generic_protein),
+        BytesSeq(_bytearray("AAAAACGTGGGGT"), generic_nucleotide)[4:-8],
+        TwoBitSeq("ACGTGGGGT", generic_dna),
+        TwoBitSeq("TTACGTGGGGTA", generic_dna)[2:-1],
+        TwoBitSeq("GG", generic_dna),
+        TwoBitSeq("AAAAAAG", generic_dna)[5:6],
         ]
     for seq in _examples[:]:
         if isinstance(seq, Seq):
@@ -519,6 +539,112 @@ class StringMethodTests(unittest.TestCase):
                         #TODO - Use the Bio.Data.IUPACData module for the
                         #ambiguous protein mappings?
 
+    def test_the_translation_of_invalid_after_stop(self):
+        """Check translate() with an invalid codon after a stop codon."""
+        self.assertEqual("MA", translate("ATGGCCTAGTA?", to_stop=True))
+        self.assertRaises(TranslationError, translate, "ATGGCCTAGTA?")
+        self.assertRaises(TranslationError, translate, "ATGTA?TAGTAA",
+                          cds=True)
+        try:
+            translate("ATGTAGTA?TAA", cds=True)
+            self.assertTrue(False, "Translating should fail")
+        except TranslationError, err:
+            self.assertEqual("Extra in frame stop codon found.", str(err))
+        self.assertEqual("M@XX@", translate("ATGTAANNNTANTAR",
+                                             stop_symbol="@"))
+
+    def test_translate_many(self):
+        """Check translate_many() on strings and Seq objects."""
+        sequences = ["ATGGCCTAGTTT", Seq("ATGTGAGTG", generic_dna),
+                     MutableSeq("AUGUGAGUG", generic_rna), "NNNTAN", ""]
+        for kwargs in [{}, {"table" : 2}, {"to_stop" : True},
+                       {"stop_symbol" : "@", "table" : special_table}]:
+            expected = [translate(s, **kwargs) for s in sequences]
+            self.assertEqual([str(p) for p in expected],
+                             [str(p) for p in translate_many(sequences,
+                                                             **kwargs)])
+        self.assertEqual([], translate_many([]))
+        self.assertRaises(TranslationError, translate_many, ["ATG", "TA?"])
+
+    def test_translate_six_frames(self):
+        """Check translate_six_frames() on strings and Seq objects."""
+        for nuc in ["ATGGCCATTGTAATGGGCCGCTGAAAGGGTGCCCGATAGN",
+                    Seq("AUGGCCAUUGUAAUGGGCCGCUGAAAGGGUGCCCGAUAG", generic_rna),
+                    MutableSeq("ATGGCCATTGTAATGGGCCGCTGAAAGGG", generic_dna),
+                    "AC", ""]:
+            rev_comp = reverse_complement(nuc)
+            for table in [1, 2, "Bacterial", special_table]:
+                expected = [translate(nuc[i:], table) for i in range(3)] \
+                         + [translate(rev_comp[i:], table) for i in range(3)]
+                frames = translate_six_frames(nuc, table)
+                self.assertEqual(6, len(frames))
+                self.assertEqual([str(p) for p in expected],
+                                 [str(p) for p in frames])
+        self.assertEqual("MAIVMGR@KGAR@",
+                         translate_six_frames("ATGGCCATTGTAATGGGCCGCTGAAAG"
+                                              "GGTGCCCGATAG",
+                                              stop_symbol="@")[0])
+
+    def test_mutable_complement(self):
+        """Check MutableSeq (reverse) complement in place."""
+        for example1 in self._examples:
+            if isinstance(example1, MutableSeq):
+                continue
+            mutable = example1.tomutable()
+            try:
+                comp = example1.complement()
+            except ValueError, e:
+                self.assertRaises(ValueError, mutable.complement)
+                self.assertRaises(ValueError, mutable.reverse_complement)
+                continue
+            mutable.complement()
+            self.assertEqual(str(comp), str(mutable))
+            self.assertTrue(isinstance(mutable.data, array.array))
+            mutable = example1.tomutable()
+            mutable.reverse_complement()
+            self.assertEqual(str(example1.reverse_complement()), str(mutable))
+        mutable = MutableSeq("ACGU-TNN", generic_nucleotide)
+        self.assertRaises(ValueError, mutable.complement)
+
+    def test_gapped_complement(self):
+        """Check complement with gapped alphabets (not cached by class)."""
+        for alphabet, expected in [(Gapped(ambiguous_dna), "TGCA-"),
+                                   (Gapped(ambiguous_rna), "UGCT-"),
+                                   (Gapped(generic_nucleotide), "TGCA-")]:
+            for i in range(2):
+                self.assertEqual(expected,
+                                 str(Seq("ACGT-", alphabet).complement()))
+        self.assertRaises(ValueError, Seq("ACGT-",
+                          Gapped(protein)).complement)
+
+    def test_reverse_complement_many(self):
+        """Check reverse_complement_many() on strings and Seq objects."""
+        random.seed(0)
+        reads = ["".join(random.choice("ACGTNacgtn") for i in range(50))
+                 for j in range(100)]
+        for sequences in [reads, reads + ["ACUG", "acug"],
+                          reads + ["ACUG", "AC\nGT"],
+                          ["AAA", "ACUUG"], ["AAA", "acuug", "CCGG"],
+                          [Seq("AAA"), Seq("ACUUG")],
+                          ["A" * 5000, "ACUG" * 2000, ""],
+                          [Seq(r, ambiguous_dna) for r in reads],
+                          [Seq(r, generic_nucleotide) for r in reads],
+                          [Seq(r, generic_dna) for r in reads] + ["ACUG"],
+                          ["ACGT", Seq("ACUG", generic_rna),
+                           MutableSeq("ACGT", generic_dna),
+                           UnknownSeq(5, generic_dna, "N")],
+                          []]:
+            expected = [reverse_complement(s) for s in sequences]
+            answer = reverse_complement_many(iter(sequences))
+            self.assertEqual(len(expected), len(answer))
+            for old, new in zip(expected, answer):
+                self.assertEqual(type(old), type(new))
+                self.assertEqual(str(old), str(new))
+                if isinstance(old, Seq):
+                    self.assertEqual(repr(old.alphabet), repr(new.alphabet))
+        self.assertRaises(ValueError, reverse_complement_many,
+                          [Seq("MKQ", protein)])
+
     def test_init_typeerror(self):
         """Check Seq __init__ gives TypeError exceptions."""
         #Only expect it to take strings and unicode - not Seq objects!
@@ -527,6 +653,82 @@ class StringMethodTests(unittest.TestCase):
 
     #TODO - Addition...
 
+
+class CompactStorageTests(unittest.TestCase):
+    """Check BytesSeq and TwoBitSeq against the Seq object."""
+
+    def setUp(self):
+        random.seed(0)
+        self.dna = "".join([random.choice("ACGT") for i in range(1003)])
+
+    def check(self, seq, dna):
+        """Compare a compact sequence to a plain string."""
+        self.assertEqual(len(dna), len(seq))
+        self.assertEqual(dna, str(seq))
+        for sub in ["A", "G", "GA", "TTT", "ACGTA", "", dna[-7:], dna[3:20]]:
+            for start, end in [(0, sys.maxint), (1, 5), (3, 600), (7, -2),
+                               (-20, -1), (-5000, 5000), (500, 400)]:
+                self.assertEqual(dna.count(sub, start, end),
+                                 seq.count(sub, start, end))
+                self.assertEqual(dna.find(sub, start, end),
+                                 seq.find(sub, start, end))
+                self.assertEqual(dna.rfind(sub, start, end),
+                                 seq.rfind(sub, start, end))
+            self.assertEqual(sub in dna, sub in seq)
+        self.assertEqual(str(Seq(dna, generic_dna).complement()),
+                         str(seq.complement()))
+        self.assertEqual(str(Seq(dna, generic_dna).reverse_complement()),
+                         str(seq.reverse_complement()))
+        self.assertEqual(str(Seq(dna, generic_dna).translate()),
+                         str(seq.translate()))
+        self.assertEqual(dna + "ACGT", str(seq + "ACGT"))
+        for i in [0, 1, -1, len(dna) // 2]:
+            if dna:
+                self.assertEqual(dna[i], seq[i])
+        for i, j in [(0, 0), (1, -1), (3, 8), (-5, None), (5, 2), (4, 1000)]:
+            self.assertEqual(dna[i:j], str(seq[i:j]))
+            self.assertEqual(type(seq), type(seq[i:j]))
+        self.assertEqual(dna[::3], str(seq[::3]))
+        self.assertEqual(dna[::-1], str(seq[::-1]))
+
+    def test_bytes_seq(self):
+        """Check BytesSeq using a string."""
+        self.check(BytesSeq(self.dna, generic_dna), self.dna)
+        self.check(BytesSeq(self.dna, generic_dna)[5:-6], self.dna[5:-6])
+        self.check(BytesSeq(self.dna, generic_dna, 3, 500), self.dna[3:500])
+        self.check(BytesSeq("", generic_dna), "")
+
+    def test_bytes_seq_views(self):
+        """Check BytesSeq using other bytes like objects."""
+        data = [_bytearray(self.dna), array.array("c", self.dna)]
+        try:
+            data.append(memoryview(self.dna))
+        except NameError:
+            #Python 2.6 or older
+            pass
+        for d in data:
+            seq = BytesSeq(d, generic_dna)
+            self.check(seq, self.dna)
+            self.check(seq[1:-1], self.dna[1:-1])
+            self.assertTrue(seq[10:100]._bytes is d)
+        self.assertRaises(ValueError, BytesSeq, self.dna, generic_dna, 5, 2)
+
+    def test_two_bit_seq(self):
+        """Check TwoBitSeq including slices not on a byte boundary."""
+        seq = TwoBitSeq(self.dna)
+        self.assertEqual(251, len(seq._packed))
+        self.check(seq, self.dna)
+        for start in range(4):
+            for end in range(len(self.dna) - 4, len(self.dna) + 1):
+                self.check(seq[start:end], self.dna[start:end])
+        self.check(seq[500:505].reverse_complement()[1:3],
+                   reverse_complement(self.dna[500:505])[1:3])
+        self.check(TwoBitSeq(""), "")
+        self.assertRaises(ValueError, TwoBitSeq, "ACGTN")
+        self.assertRaises(ValueError, TwoBitSeq, "acgt")
+        self.assertRaises(ValueError, TwoBitSeq, "ACG", generic_rna)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)
@@ -1,6 +1,9 @@
 import re
 import unittest
+from array import array
+from StringIO import StringIO
 from Bio import SeqIO
+from Bio.SeqIO.SffIO import SffIterator
 
 # sffinfo E3MFGYR02_random_10_reads.sff | sed -n '/>\|Run Prefix\|Region\|XY/p'
 test_data = """
@@ -73,5 +76,63 @@ class TestUAN(unittest.TestCase):
         for record in self.records:
             self.assertEqual(record.annotations["coords"], self.test_annotations[record.name]["coords"])
 
+class TestArrays(unittest.TestCase):
+    """Compare parsing with the arrays option to the default."""
+    def check(self, filename, trim):
+        handle = open(filename, "rb")
+        old_records = list(SffIterator(handle, trim=trim))
+        handle.seek(0)
+        new_records = list(SffIterator(handle, trim=trim, arrays=True))
+        handle.close()
+        self.assertEqual(len(old_records), len(new_records))
+        for old, new in zip(old_records, new_records):
+            self.assertEqual(old.id, new.id)
+            self.assertEqual(str(old.seq), str(new.seq))
+            self.assertEqual(sorted(old.annotations), sorted(new.annotations))
+            for key in ["flow_values", "flow_index"]:
+                if trim:
+                    self.assertFalse(key in new.annotations)
+                    continue
+                self.assertTrue(isinstance(old.annotations[key], tuple))
+                self.assertTrue(isinstance(new.annotations[key], array))
+                self.assertEqual(list(old.annotations[key]),
+                                 list(new.annotations[key]))
+            old_quals = old.letter_annotations["phred_quality"]
+            new_quals = new.letter_annotations["phred_quality"]
+            self.assertTrue(isinstance(old_quals, list))
+            self.assertTrue(isinstance(new_quals, array))
+            self.assertEqual(old_quals, list(new_quals))
+            #Check array based records can be written out again
+            self.assertEqual(old.format("fastq"), new.format("fastq"))
+
+    def test_random_10_reads(self):
+        self.check("Roche/E3MFGYR02_random_10_reads.sff", False)
+        self.check("Roche/E3MFGYR02_random_10_reads.sff", True)
+
+    def test_greek(self):
+        self.check("Roche/greek.sff", False)
+        self.check("Roche/greek.sff", True)
+
+    def test_paired(self):
+        self.check("Roche/paired.sff", False)
+        self.check("Roche/paired.sff", True)
+
+    def test_trim_matches_clipping(self):
+        untrimmed = SeqIO.parse("Roche/E3MFGYR02_random_10_reads.sff", "sff")
+        trimmed = SeqIO.parse("Roche/E3MFGYR02_random_10_reads.sff", "sff-trim")
+        for old, new in zip(untrimmed, trimmed):
+            start = old.annotations["clip_qual_left"]
+            end = old.annotations["clip_qual_right"]
+            self.assertEqual(str(old.seq[start:end]).upper(), str(new.seq))
+            self.assertEqual(old.letter_annotations["phred_quality"][start:end],
+                             new.letter_annotations["phred_quality"])
+
+    def test_truncated(self):
+        data = open("Roche/E3MFGYR02_random_10_reads.sff", "rb").read()
+        #Cut the file in the middle of the first read's quality scores
+        handle = StringIO(data[:1100])
+        self.assertRaises(ValueError, list, SffIterator(handle))
+
+
 if __name__ == '__main__':
     unittest.main()
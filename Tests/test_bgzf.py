@@ -0,0 +1,231 @@
+# Copyright 2012 by the Biopython developers.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Test code for working with BGZF files (used in BAM files).
+
+See also the doctests in bgzf.py which are called via run_tests.py
+"""
+
+import unittest
+import gzip
+import os
+import random
+
+from Bio._py3k import _as_bytes
+from Bio import bgzf
+from Bio import SeqIO
+
+
+class BgzfTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_file = "temp.bgzf"
+        if os.path.isfile(self.temp_file):
+            os.remove(self.temp_file)
+
+    def tearDown(self):
+        for name in [self.temp_file, self.temp_file + ".gz"]:
+            if os.path.isfile(name):
+                os.remove(name)
+
+    def rewrite(self, compressed_input, output_file):
+        h = gzip.open(compressed_input, "rb")
+        data = h.read()
+        h.close()
+
+        h = bgzf.BgzfWriter(output_file, "wb")
+        h.write(data)
+        h.close() #Gives empty BGZF block as BAM EOF marker
+
+        h = gzip.open(output_file)
+        new_data = h.read()
+        h.close()
+
+        #Check the decompressed files agree
+        self.assertTrue(new_data, "Empty BGZF file?")
+        self.assertEqual(len(data), len(new_data))
+        self.assertEqual(data, new_data)
+
+    def check_blocks(self, old_file, new_file):
+        h = open(old_file, "rb")
+        old = list(bgzf.BgzfBlocks(h))
+        h.close()
+        h = open(new_file, "rb")
+        new = list(bgzf.BgzfBlocks(h))
+        h.close()
+        self.assertEqual(len(old), len(new))
+        self.assertEqual(old, new)
+
+    def check_random(self, filename):
+        """Check BGZF random access by reading blocks in forward & reverse order"""
+        h = gzip.open(filename, "rb")
+        old = h.read()
+        h.close()
+
+        h = open(filename, "rb")
+        blocks = list(bgzf.BgzfBlocks(h))
+        h.close()
+
+        #Forward
+        new = _as_bytes("")
+        h = bgzf.BgzfReader(filename, "rb")
+        for start, raw_len, data_start, data_len in blocks:
+            h.seek(bgzf.make_virtual_offset(start, 0))
+            data = h.read(data_len)
+            self.assertEqual(len(data), data_len)
+            self.assertEqual(len(new), data_start)
+            new += data
+        h.close()
+        self.assertEqual(len(old), len(new))
+        self.assertEqual(old, new)
+
+        #Reverse
+        new = _as_bytes("")
+        h = bgzf.BgzfReader(filename, "rb")
+        for start, raw_len, data_start, data_len in blocks[::-1]:
+            h.seek(bgzf.make_virtual_offset(start, 0))
+            data = h.read(data_len)
+            self.assertEqual(len(data), data_len)
+            new = data + new
+        h.close()
+        self.assertEqual(len(old), len(new))
+        self.assertEqual(old, new)
+
+        #Jump back - non-sequential seeking
+        if len(blocks) >= 3:
+            h = bgzf.BgzfReader(filename, "rb", max_cache = 1)
+            #Seek to a late block in the file,
+            #half way into the third last block
+            start, raw_len, data_start, data_len = blocks[-3]
+            voffset = bgzf.make_virtual_offset(start, data_len // 2)
+            h.seek(voffset)
+            self.assertEqual(voffset, h.tell())
+            data = h.read(1000)
+            self.assertTrue(data in old)
+            self.assertEqual(old.find(data), data_start + data_len // 2)
+            #Now seek to an early block in the file,
+            #half way into the second block
+            start, raw_len, data_start, data_len = blocks[1]
+            h.seek(bgzf.make_virtual_offset(start, data_len // 2))
+            voffset = bgzf.make_virtual_offset(start, data_len // 2)
+            h.seek(voffset)
+            self.assertEqual(voffset, h.tell())
+            #Now read all rest of this block and start of next block
+            data = h.read(data_len + 1000)
+            self.assertTrue(data in old)
+            self.assertEqual(old.find(data), data_start + data_len // 2)
+            h.close()
+
+    def check_text(self, filename):
+        """Check the lines and their virtual offsets."""
+        h = gzip.open(filename)
+        old_lines = h.readlines()
+        h.close()
+
+        h = bgzf.BgzfReader(filename, "r")
+        offsets = []
+        for line in old_lines:
+            offsets.append(h.tell())
+            self.assertEqual(line, h.readline())
+        self.assertEqual("", h.readline())
+        self.assertEqual("", h.read(10))
+        #Now jump about using the virtual offsets
+        pairs = zip(offsets, old_lines)
+        random.shuffle(pairs)
+        for offset, line in pairs:
+            h.seek(offset)
+            self.assertEqual(offset, h.tell())
+            self.assertEqual(line, h.readline())
+        h.close()
+
+        #Also check iteration
+        h = bgzf.open(filename, "r")
+        self.assertEqual(old_lines, list(h))
+        h.close()
+
+    def test_random_genbank(self):
+        """Check random access to GenBank/NC_000932.gb.bgz"""
+        self.check_random("GenBank/NC_000932.gb.bgz")
+
+    def test_text_genbank(self):
+        """Check line by line access to GenBank/NC_000932.gb.bgz"""
+        self.check_text("GenBank/NC_000932.gb.bgz")
+
+    def test_text_uniprot(self):
+        """Check line by line access to SwissProt/multi_ex.xml.bgz"""
+        self.check_text("SwissProt/multi_ex.xml.bgz")
+
+    def test_seek_out_of_range(self):
+        """Block starts must fit in a 64-bit virtual offset"""
+        h = bgzf.BgzfReader("GenBank/NC_000932.gb.bgz", "rb")
+        self.assertRaises(ValueError, h.seek, bgzf.make_virtual_offset(0, 5)
+                          + (2**48 << 16))
+        h.close()
+
+    def test_write_genbank(self):
+        """Rewrite GenBank/NC_000932.gb.bgz and check the blocks"""
+        self.rewrite("GenBank/NC_000932.gb.bgz", self.temp_file)
+        self.check_blocks("GenBank/NC_000932.gb.bgz", self.temp_file)
+        self.check_random(self.temp_file)
+
+    def test_write_incompressible(self):
+        """Write random data which does not compress well"""
+        random.seed(0)
+        data = _as_bytes("").join([chr(random.randint(0, 255)) \
+                                   for i in range(200000)])
+        h = bgzf.BgzfWriter(self.temp_file, "wb")
+        h.write(data[:100])
+        self.assertEqual(100, h.tell())
+        h.write(data[100:])
+        h.close()
+        h = gzip.open(self.temp_file, "rb")
+        self.assertEqual(data, h.read())
+        h.close()
+        h = open(self.temp_file, "rb")
+        for start, raw_len, data_start, data_len in bgzf.BgzfBlocks(h):
+            self.assertTrue(raw_len <= 65536)
+        h.close()
+        self.check_random(self.temp_file)
+
+    def test_parse(self):
+        """Parse a BGZF compressed file using Bio.SeqIO"""
+        for filename, format in [("GenBank/NC_000932.gb", "gb"),
+                                 ("GenBank/NC_000932.faa", "fasta"),
+                                 ("SwissProt/multi_ex.xml", "uniprot-xml")]:
+            old = [(r.id, str(r.seq)) for r in SeqIO.parse(filename, format)]
+            new = [(r.id, str(r.seq)) for r in \
+                   SeqIO.parse(filename + ".bgz", format)]
+            self.assertEqual(old, new)
+
+    def test_index_plain_gzip(self):
+        """Plain gzip files can't be indexed"""
+        h = gzip.open(self.temp_file + ".gz", "wb")
+        h.write(open("Quality/example.fastq", "rb").read())
+        h.close()
+        self.assertRaises(ValueError, SeqIO.index,
+                          self.temp_file + ".gz", "fastq")
+
+    def test_index_many_blocks(self):
+        """Index a BGZF FASTQ file with records spanning blocks"""
+        random.seed(0)
+        h = bgzf.BgzfWriter(self.temp_file, "wb")
+        expected = {}
+        for i in range(2000):
+            seq = "".join([random.choice("ACGT") \
+                           for j in range(random.randint(1, 300))])
+            expected["read%i" % i] = seq
+            h.write("@read%i\n%s\n+\n%s\n" % (i, seq, "I" * len(seq)))
+        h.close()
+        d = SeqIO.index(self.temp_file, "fastq")
+        self.assertEqual(len(expected), len(d))
+        for key in sorted(expected)[::7]:
+            self.assertEqual(expected[key], str(d[key].seq))
+        self.assertEqual(sorted(expected),
+                         sorted([r.id for r in d.get_many(expected)]))
+        d._proxy._handle.close()
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity = 2)
+    unittest.main(testRunner=runner)
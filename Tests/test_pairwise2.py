@@ -4,9 +4,11 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 
+import random
 import unittest
 
 from Bio import pairwise2
+from Bio.SubsMat import MatrixInfo
 
 
 class TestPairwiseGlobal(unittest.TestCase):
@@ -331,6 +333,145 @@ ATAT
 """)
 
 
+class TestPairwiseSubstitutionMatrix(unittest.TestCase):
+    """Alignments scored with a compiled substitution matrix."""
+
+    def test_compiled_table(self):
+        """Compiled matrix gives the same scores as the dictionary"""
+        matrix = MatrixInfo.blosum62
+        match_fn = pairwise2.dictionary_match(matrix)
+        match_fn._compile()
+        self.assertEqual(len(match_fn._residues), 23)
+        for charA in match_fn._residues:
+            for charB in match_fn._residues:
+                score = matrix.get((charA, charB), matrix.get((charB, charA)))
+                self.assertEqual(match_fn(charA, charB), score)
+        self.assertRaises(KeyError, match_fn, "A", "J")
+
+    def test_same_as_callback(self):
+        """Compiled matrix alignments match using a callback"""
+        matrix = MatrixInfo.blosum62
+        def match_fn(charA, charB):
+            if (charA, charB) in matrix:
+                return matrix[(charA, charB)]
+            return matrix[(charB, charA)]
+        random.seed(0)
+        for i in range(20):
+            seq1 = "".join([random.choice("ACDEFGHIKLMNPQRSTVWY")
+                            for j in range(random.randint(1, 30))])
+            seq2 = "".join([random.choice("ACDEFGHIKLMNPQRSTVWYBZX")
+                            for j in range(random.randint(1, 30))])
+            self.assertEqual(pairwise2.align.globalds(seq1, seq2, matrix,
+                                                      -10, -0.5),
+                             pairwise2.align.globalcs(seq1, seq2, match_fn,
+                                                      -10, -0.5))
+            self.assertEqual(pairwise2.align.globalds(list(seq1), list(seq2),
+                                                      matrix, -10, -0.5,
+                                                      gap_char=["-"]),
+                             pairwise2.align.globalcs(list(seq1), list(seq2),
+                                                      match_fn, -10, -0.5,
+                                                      gap_char=["-"]))
+            self.assertEqual(pairwise2.align.localds(seq1, seq2, matrix,
+                                                     -4, -1, score_only=True),
+                             pairwise2.align.localcs(seq1, seq2, match_fn,
+                                                     -4, -1, score_only=True))
+
+    def test_unknown_residue(self):
+        """Residues missing from the matrix raise a KeyError"""
+        self.assertRaises(KeyError, pairwise2.align.globaldx,
+                          "ACJ", "AC", MatrixInfo.blosum62)
+
+    def test_incomplete_matrix(self):
+        """Matrices without a score for every pair still work"""
+        match_dict = {("A", "A") : 2, ("A", "C") : -1, ("C", "C") : 3}
+        match_fn = pairwise2.dictionary_match(match_dict, symmetric=0)
+        match_fn._compile()
+        self.assertEqual(match_fn._table, None)
+        self.assertEqual(pairwise2.align.globaldx("AAC", "AC", match_dict,
+                                                  score_only=True), 5)
+        self.assertRaises(KeyError, pairwise2.align.globalcx, "AC", "CA",
+                          match_fn)
+
+    def test_changed_matrix(self):
+        """Changes to the matrix after creating the match function are used"""
+        match_fn = pairwise2.dictionary_match({("A", "A") : 1, ("A", "C") : 0,
+                                               ("C", "C") : 1})
+        function = pairwise2.align.globalcx
+        self.assertEqual(function("AC", "AC", match_fn, score_only=True), 2)
+        match_fn.score_dict = {("A", "A") : 5, ("A", "C") : 0,
+                               ("C", "C") : 1}
+        self.assertEqual(function("AC", "AC", match_fn, score_only=True), 6)
+        match_fn.score_dict[("C", "C")] = 3
+        self.assertEqual(function("AC", "AC", match_fn, score_only=True), 8)
+        self.assertEqual(function.one_to_many("AC", ["AC"], match_fn,
+                                              score_only=True), [8])
+        match_fn.symmetric = 0
+        self.assertEqual(match_fn("A", "C"), 0)
+        self.assertRaises(KeyError, match_fn, "C", "A")
+        self.assertRaises(KeyError, function, "AC", "CA", match_fn)
+
+    def test_subclass(self):
+        """Subclasses overriding __call__ are not bypassed"""
+        class double_match(pairwise2.dictionary_match):
+            def __call__(self, charA, charB):
+                return 2 * pairwise2.dictionary_match.__call__(self, charA,
+                                                               charB)
+        matrix = MatrixInfo.blosum62
+        for function in [pairwise2.align.globalcs, pairwise2.align.localcs]:
+            expected = function("HEAGAWGHEE", "PAWHEAE",
+                                pairwise2.dictionary_match(matrix), -10, -1,
+                                score_only=True)
+            for keywds in [{"score_only" : True},
+                           {"one_alignment_only" : True}]:
+                answer = function("HEAGAWGHEE", "PAWHEAE",
+                                  double_match(matrix), -20, -2, **keywds)
+                if not keywds.get("score_only"):
+                    answer = answer[0][2]
+                self.assertEqual(answer, 2 * expected)
+
+
+class TestPairwiseScoreOnly(unittest.TestCase):
+    """Check the score only alignments against the full score matrix."""
+
+    def check(self, function, seq1, seq2, *args, **keywds):
+        score = function(seq1, seq2, *args, **keywds)
+        keywds["force_generic"] = True
+        self.assertAlmostEqual(score, function(seq1, seq2, *args, **keywds))
+        del keywds["force_generic"]
+        keywds["score_only"] = False
+        keywds["one_alignment_only"] = True
+        aligns = function(seq1, seq2, *args, **keywds)
+        if aligns:
+            self.assertAlmostEqual(score, aligns[0][2])
+
+    def test_random(self):
+        """Score only alignments of random sequences"""
+        random.seed(0)
+        matrix = MatrixInfo.blosum62
+        match_fn = pairwise2.identity_match(2, -1)
+        for i in range(50):
+            seq1 = "".join([random.choice("ACDEFGHIKLMNPQRSTVWY")
+                            for j in range(random.randint(1, 25))])
+            seq2 = "".join([random.choice("ACDEFGHIKLMNPQRSTVWY")
+                            for j in range(random.randint(1, 25))])
+            for penalize_end_gaps in [0, 1]:
+                self.check(pairwise2.align.localds, seq1, seq2, matrix,
+                           -11, -1, score_only=True,
+                           penalize_end_gaps=penalize_end_gaps)
+                self.check(pairwise2.align.globalds, seq1, seq2, matrix,
+                           -5, -2, score_only=True,
+                           penalize_end_gaps=penalize_end_gaps)
+                self.check(pairwise2.align.globalms, seq1, seq2, 2, -1,
+                           -2, -1, score_only=True,
+                           penalize_end_gaps=penalize_end_gaps)
+                self.check(pairwise2.align.localxd, list(seq1), list(seq2),
+                           -1, -1, -2, 0, score_only=True, gap_char=["-"],
+                           penalize_end_gaps=penalize_end_gaps)
+                self.check(pairwise2.align.globalcs, seq1, seq2, match_fn,
+                           -3, -1, score_only=True,
+                           penalize_end_gaps=penalize_end_gaps)
+
+
 class TestPairwiseOneCharacter(unittest.TestCase):
 
     def test_align_one_char1(self):
@@ -379,6 +520,162 @@ abcde
 """)
 
 
+class TestPairwiseLinearMemory(unittest.TestCase):
+    """Check the linear_memory and band_width options."""
+
+    def random_pairs(self, count, max_length, letters="ACG"):
+        random.seed(0)
+        for i in range(count):
+            yield ("".join(random.choice(letters)
+                           for j in range(random.randint(1, max_length))),
+                   "".join(random.choice(letters)
+                           for j in range(random.randint(1, max_length))))
+
+    def test_same_as_full_matrix(self):
+        """Linear memory alignments are among the full matrix ones"""
+        for seq1, seq2 in self.random_pairs(200, 10):
+            for kind, args, keywds in [("globalms", (2, -1, -2, -1), {}),
+                                       ("localms", (2, -1, -2, -1), {}),
+                                       ("globalxx", (), {}),
+                                       ("globalmd", (1, 0, -1, -0.5, -2, -1),
+                                        {"penalize_end_gaps": 0}),
+                                       ("localmd", (5, -4, -3, -1, -1, -1),
+                                        {"penalize_extend_when_opening": 1})]:
+                function = getattr(pairwise2.align, kind)
+                full = function(seq1, seq2, *args, **keywds)
+                keywds["linear_memory"] = True
+                linear = function(seq1, seq2, *args, **keywds)
+                keywds["score_only"] = True
+                score = function(seq1, seq2, *args, **keywds)
+                if not full:
+                    self.assertEqual(linear, [])
+                    continue
+                self.assertEqual(len(linear), 1)
+                self.assertTrue(linear[0] in full, (kind, seq1, seq2))
+                self.assertAlmostEqual(full[0][2], score)
+
+    def test_long_sequences(self):
+        """Linear memory alignment of longer sequences"""
+        for seq1, seq2 in self.random_pairs(3, 150, "ACGT"):
+            score = pairwise2.align.globalms(seq1, seq2, 2, -1, -2, -0.5,
+                                             score_only=True)
+            aligns = pairwise2.align.globalms(seq1, seq2, 2, -1, -2, -0.5,
+                                              linear_memory=True)
+            self.assertEqual(len(aligns), 1)
+            self.assertAlmostEqual(score, aligns[0][2])
+            self.assertEqual(seq1, aligns[0][0].replace("-", ""))
+            self.assertEqual(seq2, aligns[0][1].replace("-", ""))
+
+    def test_band(self):
+        """Banded alignments stay near the diagonal"""
+        seq1, seq2 = "GAACTTGACCT", "GAATTGAACCT"
+        aligns = pairwise2.align.globalms(seq1, seq2, 2, -1, -2, -0.5,
+                                          band_width=0)
+        self.assertEqual(aligns, [(seq1, seq2, 13, 0, 11)])
+        full = pairwise2.align.globalms(seq1, seq2, 2, -1, -2, -0.5)
+        aligns = pairwise2.align.globalms(seq1, seq2, 2, -1, -2, -0.5,
+                                          band_width=1)
+        self.assertEqual(len(aligns), 1)
+        self.assertTrue(aligns[0] in full)
+        self.assertTrue(full[0][2] > 13)
+
+    def test_lists(self):
+        """Linear memory alignment of lists"""
+        aligns = pairwise2.align.globalxx(["A", "C", "C", "G", "T"],
+                                          ["A", "C", "G"], gap_char=["-"],
+                                          linear_memory=True)
+        self.assertEqual(len(aligns), 1)
+        seq1, seq2, score, begin, end = aligns[0]
+        self.assertEqual(score, 3)
+        self.assertEqual(seq1, ["A", "C", "C", "G", "T"])
+        self.assertEqual([c for c in seq2 if c != "-"], ["A", "C", "G"])
+
+    def test_bad_arguments(self):
+        """Linear memory needs affine gap penalties"""
+        gap_fn = lambda index, length : -length
+        self.assertRaises(ValueError, pairwise2.align.globalxc,
+                          "ACGT", "AGT", gap_fn, gap_fn, linear_memory=True)
+        self.assertRaises(ValueError, pairwise2.align.globalxx,
+                          "ACGT", "AGT", band_width=-1)
+
+
+class TestPairwiseBatch(unittest.TestCase):
+    """Check the one_to_many and all_vs_all methods."""
+
+    def setUp(self):
+        random.seed(0)
+        self.seqs = ["".join([random.choice("ACGT") for j in
+                              range(random.randint(5, 30))])
+                     for i in range(12)]
+
+    def test_one_to_many(self):
+        """One to many alignment matches a loop over the targets"""
+        query = self.seqs[0]
+        for function, args in [(pairwise2.align.globalxx, ()),
+                               (pairwise2.align.globalms, (2, -1, -2, -0.5)),
+                               (pairwise2.align.localms, (2, -1, -2, -0.5))]:
+            scores = function.one_to_many(query, self.seqs, *args,
+                                          **{"score_only": True})
+            self.assertEqual(scores, [function(query, target, *args,
+                                               **{"score_only": True})
+                                      for target in self.seqs])
+            aligns = function.one_to_many(query, iter(self.seqs), *args)
+            self.assertEqual(len(aligns), len(self.seqs))
+            for target, align, score in zip(self.seqs, aligns, scores):
+                self.assertEqual([align],
+                                 function(query, target, *args,
+                                          **{"one_alignment_only": True}))
+                self.assertAlmostEqual(score, align[2])
+
+    def test_all_vs_all(self):
+        """All versus all alignment covers each pair once"""
+        results = pairwise2.align.globalms.all_vs_all(self.seqs[:5],
+                                                      2, -1, -2, -0.5)
+        self.assertEqual([(i, j) for i, j, align in results],
+                         [(0, 1), (0, 2), (0, 3), (0, 4), (1, 2),
+                          (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)])
+        for i, j, align in results:
+            self.assertEqual(self.seqs[i], align[0].replace("-", ""))
+            self.assertEqual(self.seqs[j], align[1].replace("-", ""))
+
+    def test_no_alignment(self):
+        """One to many alignment gives None when nothing aligns"""
+        self.assertEqual(pairwise2.align.localxx.one_to_many("AAA",
+                                                             ["CCC", "CAC"]),
+                         [None, ("-AAA", "CAC-", 1, 1, 2)])
+
+    def test_empty_sequence(self):
+        """One to many and all versus all alignment with empty sequences"""
+        function = pairwise2.align.globalxx
+        self.assertEqual(function.one_to_many("ACG", ["", "A"],
+                                              score_only=True),
+                         [None, 1.0])
+        self.assertEqual(function.one_to_many("ACG", ["", "A"]),
+                         [None, ("ACG", "A--", 1.0, 0, 3)])
+        self.assertEqual(function.all_vs_all(["A", "", "AC"],
+                                             score_only=True),
+                         [(0, 1, None), (0, 2, 1.0), (1, 2, None)])
+
+    def test_processes(self):
+        """One to many and all versus all alignment using processes"""
+        try:
+            import multiprocessing
+        except ImportError:
+            return
+        function = pairwise2.align.localms
+        expected = function.one_to_many(self.seqs[0], self.seqs,
+                                        2, -1, -2, -0.5, score_only=True)
+        self.assertEqual(expected,
+                         function.one_to_many(self.seqs[0], self.seqs,
+                                              2, -1, -2, -0.5,
+                                              score_only=True,
+                                              processes=2, chunk_size=5))
+        self.assertEqual(function.all_vs_all(self.seqs, 2, -1, -2, -0.5),
+                         function.all_vs_all(self.seqs, 2, -1, -2, -0.5,
+                                             processes=2, chunk_size=7))
+        self.assertRaises(ValueError, function.one_to_many, "ACGT",
+                          ["ACGT"], 2, -1, -2, -0.5, processes=0)
+
 if __name__ == '__main__':
     runner = unittest.TextTestRunner(verbosity = 2)
     unittest.main(testRunner=runner)